@@ -1,4 +1,6 @@
 # Archivo para hacer que el directorio sea un paquete Python
 from .db_manager import DatabaseManager
+from .pagination import Pagina
+from .query_profiler import get_query_profiler
 
-__all__ = ['DatabaseManager']
+__all__ = ['DatabaseManager', 'Pagina', 'get_query_profiler']
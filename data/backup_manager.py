@@ -0,0 +1,639 @@
+"""
+Copias de seguridad en caliente de la base de datos de Hefest.
+
+La copia usa la API de backup de SQLite (``sqlite3.Connection.backup``)
+por tramos de ``paginas_por_paso`` páginas desde un hilo propio: entre
+tramo y tramo se libera el bloqueo de lectura, así que el TPV sigue
+escribiendo mientras se copia. Si otra conexión escribe durante la copia,
+SQLite la reinicia desde el principio; tras ``MAX_REINICIOS`` reinicios se
+termina de una vez (un único tramo) para no competir indefinidamente con
+un servicio muy cargado.
+
+Cada copia:
+
+1. se escribe en un temporal y se comprueba con ``PRAGMA integrity_check``
+2. se comprime con gzip (opcional) y se registra en un manifiesto JSON
+   (``backup_hefest_YYYYMMDD_HHMMSS.json``) con su SHA-256 y tamaño
+3. se poda: se borran las copias con más de ``retencion_dias`` días,
+   conservando siempre la más reciente
+
+La configuración sale de la sección ``database`` de config/default.json
+y del fichero del entorno (``HEFEST_ENV``):
+
+- ``backup_enabled``: activa la copia programada
+- ``backup_interval``: segundos entre copias
+- ``backup_retention_days`` / ``backup_path`` / ``backup_compress``
+
+La restauración verifica la copia (integridad, SHA-256 y que contenga las
+tablas esenciales), guarda antes una copia de seguridad
+``pre_restauracion`` de la base actual y vuelca la copia sobre la base
+viva con la misma API, en un único tramo. ``restaurar_async`` hace todo
+ello en un hilo y deja el resultado en el estado.
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from .change_log import asegurar_cdc
+
+logger = logging.getLogger(__name__)
+
+RAIZ_PROYECTO = Path(__file__).resolve().parent.parent
+DIRECTORIO_CONFIG = RAIZ_PROYECTO / "config"
+DIRECTORIO_DEFECTO = Path(__file__).resolve().parent / "backups"
+
+PREFIJO = "backup_hefest_"
+FORMATO_FECHA = "%Y%m%d_%H%M%S"
+
+PAGINAS_POR_PASO = 256
+PAUSA_ENTRE_PASOS_S = 0.005
+MAX_REINICIOS = 5
+TIMEOUT_CONEXION_S = 30.0
+# Margen tras el arranque antes de una copia atrasada (no competir con la carga inicial)
+RETRASO_INICIAL_S = 120.0
+TAMANO_BLOQUE = 1024 * 1024
+# Una copia sin estas tablas no es una base de Hefest (p. ej. un fichero vacío)
+TABLAS_ESENCIALES = ("mesas", "comandas", "productos")
+
+CONFIG_DEFECTO: Dict[str, Any] = {
+    "backup_enabled": True,
+    "backup_interval": 86400,
+    "backup_retention_days": 30,
+    "backup_path": None,
+    "backup_compress": True,
+}
+
+
+class BackupError(Exception):
+    """Error al crear, verificar o restaurar una copia de seguridad"""
+
+
+class _CopiaAbortada(Exception):
+    """Señal interna para cortar una copia por tramos que no deja de reiniciarse"""
+
+
+# ========================================
+# CONFIGURACIÓN
+# ========================================
+
+
+def _leer_json(ruta: Path) -> Dict[str, Any]:
+    try:
+        with open(ruta, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def cargar_config_database(
+    prefijo: str, defecto: Dict[str, Any], entorno: Optional[str] = None
+) -> Dict[str, Any]:
+    """Claves ``<prefijo>*`` de la sección ``database`` (default.json y entorno) sobre ``defecto``"""
+    if entorno is None:
+        entorno = os.environ.get("HEFEST_ENV", "").lower() or (
+            "production" if getattr(sys, "frozen", False) else "development"
+        )
+    config = dict(defecto)
+    for nombre in ("default.json", f"{entorno}.json"):
+        seccion = _leer_json(DIRECTORIO_CONFIG / nombre).get("database", {})
+        config.update({clave: valor for clave, valor in seccion.items() if clave.startswith(prefijo)})
+    return config
+
+
+def cargar_config_backup(entorno: Optional[str] = None) -> Dict[str, Any]:
+    """Claves ``backup_*`` de la sección ``database`` (default.json y entorno)"""
+    return cargar_config_database("backup_", CONFIG_DEFECTO, entorno)
+
+
+# ========================================
+# MODELOS
+# ========================================
+
+
+@dataclass
+class InfoBackup:
+    """Una copia de seguridad en disco, según su manifiesto"""
+
+    ruta: str
+    fecha: datetime
+    bytes: int
+    bytes_bd: int
+    sha256: str
+    comprimido: bool
+    integridad: str
+    duracion_s: float = 0.0
+    motivo: str = "programado"
+
+    @property
+    def manifiesto(self) -> Path:
+        return _ruta_manifiesto(Path(self.ruta))
+
+    def to_dict(self) -> Dict[str, Any]:
+        datos = asdict(self)
+        datos["fecha"] = self.fecha.isoformat(timespec="seconds")
+        return datos
+
+
+@dataclass
+class EstadoBackup:
+    """Estado visible desde la interfaz (copia del manager bajo su lock)"""
+
+    en_curso: bool = False
+    progreso: float = 0.0
+    paginas_total: int = 0
+    reinicios: int = 0
+    ultimo: Optional[InfoBackup] = None
+    ultimo_error: str = ""
+    proximo: Optional[datetime] = None
+    programado: bool = False
+    restaurando: bool = False
+    previa_restauracion: Optional[InfoBackup] = None
+    error_restauracion: str = ""
+    historial: List[str] = field(default_factory=list)
+
+
+def _ruta_manifiesto(ruta: Path) -> Path:
+    nombre = ruta.name
+    for sufijo in (".db.gz", ".db"):
+        if nombre.endswith(sufijo):
+            return ruta.with_name(nombre[: -len(sufijo)] + ".json")
+    return ruta.with_suffix(".json")
+
+
+def _sha256(ruta: Path) -> str:
+    resumen = hashlib.sha256()
+    with open(ruta, "rb") as f:
+        for bloque in iter(lambda: f.read(TAMANO_BLOQUE), b""):
+            resumen.update(bloque)
+    return resumen.hexdigest()
+
+
+def _integridad(ruta: Path) -> str:
+    """Resultado de ``PRAGMA integrity_check`` ("ok" si la base es correcta)"""
+    try:
+        conn = sqlite3.connect(f"file:{ruta}?mode=ro", uri=True)
+        try:
+            filas = conn.execute("PRAGMA integrity_check").fetchall()
+        finally:
+            conn.close()
+    except sqlite3.DatabaseError as e:
+        # Fichero que no es una base SQLite (o cabecera dañada)
+        return f"{type(e).__name__}: {e}"
+    return "; ".join(str(fila[0]) for fila in filas[:5])
+
+
+def _tablas_ausentes(ruta: Path) -> List[str]:
+    """Tablas de :data:`TABLAS_ESENCIALES` que no existen en la base"""
+    try:
+        conn = sqlite3.connect(f"file:{ruta}?mode=ro", uri=True)
+        try:
+            tablas = {fila[0] for fila in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        finally:
+            conn.close()
+    except sqlite3.DatabaseError:
+        return list(TABLAS_ESENCIALES)
+    return [tabla for tabla in TABLAS_ESENCIALES if tabla not in tablas]
+
+
+# ========================================
+# GESTOR
+# ========================================
+
+
+class BackupManager:
+    """Crea, poda, verifica y restaura copias de la base de datos"""
+
+    def __init__(
+        self,
+        db_path: Optional[str] = None,
+        directorio: Optional[str] = None,
+        config: Optional[Dict[str, Any]] = None,
+        paginas_por_paso: int = PAGINAS_POR_PASO,
+        pausa_entre_pasos: float = PAUSA_ENTRE_PASOS_S,
+    ):
+        if db_path is None:
+            db_path = os.environ.get("HEFEST_DB_PATH") or str(Path(__file__).resolve().parent / "hefest.db")
+        self.db_path = str(db_path)
+        self.config = config if config is not None else cargar_config_backup()
+        ruta = directorio or self.config.get("backup_path") or DIRECTORIO_DEFECTO
+        self.directorio = Path(ruta) if Path(ruta).is_absolute() else RAIZ_PROYECTO / ruta
+        self.intervalo_s = float(self.config.get("backup_interval") or CONFIG_DEFECTO["backup_interval"])
+        self.retencion_dias = int(self.config.get("backup_retention_days") or CONFIG_DEFECTO["backup_retention_days"])
+        self.comprimir = bool(self.config.get("backup_compress", True))
+        self.paginas_por_paso = paginas_por_paso
+        self.pausa_entre_pasos = pausa_entre_pasos
+
+        self._lock = threading.Lock()
+        self._copia_lock = threading.Lock()
+        self._estado = EstadoBackup()
+        self._stop_event = threading.Event()
+        # Despierta el bucle programado para recalcular la espera (nuevo intervalo)
+        self._despertar = threading.Event()
+        self._hilo: Optional[threading.Thread] = None
+        self._estado.ultimo = self._ultimo_en_disco()
+
+    # ----- estado -----
+
+    def estado(self) -> EstadoBackup:
+        with self._lock:
+            return EstadoBackup(**{**self._estado.__dict__, "historial": list(self._estado.historial)})
+
+    def _actualizar(self, **valores):
+        with self._lock:
+            for clave, valor in valores.items():
+                setattr(self._estado, clave, valor)
+
+    # ----- copia -----
+
+    def crear_backup(
+        self, motivo: str = "manual", progreso: Optional[Callable[[float], None]] = None, podar: bool = True
+    ) -> InfoBackup:
+        """
+        Crea una copia verificada (bloquea hasta terminar; usar desde un hilo).
+
+        Con ``podar`` borra después las copias fuera de la retención; la
+        restauración no poda para no llevarse la copia que va a restaurar.
+
+        Raises:
+            BackupError: si ya hay una copia en curso o la copia falla
+        """
+        if not self._copia_lock.acquire(blocking=False):
+            raise BackupError("Ya hay una copia de seguridad en curso")
+        inicio = time.perf_counter()
+        self._actualizar(en_curso=True, progreso=0.0, paginas_total=0, reinicios=0, ultimo_error="")
+        temporal = None
+        try:
+            self.directorio.mkdir(parents=True, exist_ok=True)
+            fecha = datetime.now().replace(microsecond=0)
+            base = self.directorio / f"{PREFIJO}{fecha.strftime(FORMATO_FECHA)}"
+            if motivo != "programado" and motivo != "manual":
+                base = base.with_name(f"{base.name}_{motivo}")
+            temporal = base.with_name(base.name + ".db.tmp")
+
+            self._copiar_por_tramos(temporal, progreso)
+            integridad = _integridad(temporal)
+            if integridad != "ok":
+                raise BackupError(f"La copia no supera integrity_check: {integridad}")
+
+            bytes_bd = temporal.stat().st_size
+            sha256 = _sha256(temporal)
+            if self.comprimir:
+                destino = base.with_name(base.name + ".db.gz")
+                with open(temporal, "rb") as origen, gzip.open(destino, "wb", compresslevel=6) as comprimido:
+                    shutil.copyfileobj(origen, comprimido, TAMANO_BLOQUE)
+                temporal.unlink()
+            else:
+                destino = base.with_name(base.name + ".db")
+                os.replace(temporal, destino)
+            temporal = None
+
+            info = InfoBackup(
+                ruta=str(destino),
+                fecha=fecha,
+                bytes=destino.stat().st_size,
+                bytes_bd=bytes_bd,
+                sha256=sha256,
+                comprimido=self.comprimir,
+                integridad=integridad,
+                duracion_s=round(time.perf_counter() - inicio, 3),
+                motivo=motivo,
+            )
+            with open(info.manifiesto, "w", encoding="utf-8") as f:
+                json.dump(info.to_dict(), f, ensure_ascii=False, indent=2)
+
+            logger.info(
+                f"Copia de seguridad creada: {destino.name} ({info.bytes / 1024 / 1024:.1f} MB, "
+                f"{info.duracion_s:.1f} s, {self._estado.reinicios} reinicios)"
+            )
+            self._registrar(f"{fecha:%d/%m %H:%M} ✅ {destino.name}")
+            self._actualizar(ultimo=info, progreso=1.0)
+            if podar:
+                self.podar()
+            return info
+        except Exception as e:
+            mensaje = f"{type(e).__name__}: {e}" if not isinstance(e, BackupError) else str(e)
+            logger.error(f"Error creando copia de seguridad: {mensaje}")
+            self._registrar(f"{datetime.now():%d/%m %H:%M} ❌ {mensaje}")
+            self._actualizar(ultimo_error=mensaje)
+            if isinstance(e, BackupError):
+                raise
+            raise BackupError(mensaje) from e
+        finally:
+            if temporal is not None and temporal.exists():
+                temporal.unlink()
+            self._actualizar(en_curso=False)
+            self._copia_lock.release()
+
+    def crear_backup_async(self, motivo: str = "manual") -> threading.Thread:
+        """Lanza ``crear_backup`` en un hilo; el resultado se consulta con ``estado()``"""
+
+        def ejecutar():
+            try:
+                self.crear_backup(motivo)
+            except BackupError:
+                pass  # ya registrado en el estado
+
+        # Visible como en curso desde ya, antes de que el hilo arranque
+        self._actualizar(en_curso=True, progreso=0.0)
+        hilo = threading.Thread(target=ejecutar, name="hefest-backup", daemon=True)
+        hilo.start()
+        return hilo
+
+    def _copiar_por_tramos(self, destino: Path, progreso: Optional[Callable[[float], None]]):
+        origen = sqlite3.connect(self.db_path, timeout=TIMEOUT_CONEXION_S)
+        copia = sqlite3.connect(destino)
+        ultimo_restante = [None]
+
+        def al_avanzar(status, restantes, total):
+            if ultimo_restante[0] is not None and restantes > ultimo_restante[0]:
+                # Otra conexión escribió: SQLite reinicia la copia desde el principio
+                with self._lock:
+                    self._estado.reinicios += 1
+                    reinicios = self._estado.reinicios
+                if reinicios > MAX_REINICIOS:
+                    raise _CopiaAbortada()
+            ultimo_restante[0] = restantes
+            fraccion = (total - restantes) / total if total else 1.0
+            self._actualizar(progreso=fraccion, paginas_total=total)
+            if progreso:
+                progreso(fraccion)
+
+        try:
+            try:
+                origen.backup(copia, pages=self.paginas_por_paso, progress=al_avanzar, sleep=self.pausa_entre_pasos)
+            except _CopiaAbortada:
+                logger.warning(
+                    f"La copia se reinició más de {MAX_REINICIOS} veces por escrituras concurrentes: "
+                    "se completa en un único tramo"
+                )
+                origen.backup(copia, pages=-1)
+                self._actualizar(progreso=1.0)
+        finally:
+            copia.close()
+            origen.close()
+
+    # ----- inventario y poda -----
+
+    def listar_backups(self) -> List[InfoBackup]:
+        """Copias con manifiesto, de la más reciente a la más antigua"""
+        copias = []
+        if not self.directorio.exists():
+            return copias
+        for manifiesto in self.directorio.glob(f"{PREFIJO}*.json"):
+            datos = _leer_json(manifiesto)
+            try:
+                datos["fecha"] = datetime.fromisoformat(datos["fecha"])
+                info = InfoBackup(**datos)
+            except (KeyError, TypeError, ValueError):
+                logger.warning(f"Manifiesto de copia ilegible: {manifiesto.name}")
+                continue
+            if Path(info.ruta).exists():
+                copias.append(info)
+        copias.sort(key=lambda c: c.fecha, reverse=True)
+        return copias
+
+    def _ultimo_en_disco(self) -> Optional[InfoBackup]:
+        copias = self.listar_backups()
+        return copias[0] if copias else None
+
+    def podar(self, retencion_dias: Optional[int] = None) -> List[str]:
+        """Borra las copias más antiguas que la retención (conserva siempre la última)"""
+        dias = self.retencion_dias if retencion_dias is None else retencion_dias
+        limite = datetime.now() - timedelta(days=dias)
+        borradas = []
+        for info in self.listar_backups()[1:]:
+            if info.fecha >= limite:
+                continue
+            for ruta in (Path(info.ruta), info.manifiesto):
+                try:
+                    ruta.unlink()
+                except FileNotFoundError:
+                    pass
+            borradas.append(Path(info.ruta).name)
+        if borradas:
+            logger.info(f"Poda de copias ({dias} días): {len(borradas)} borradas")
+        return borradas
+
+    # ----- verificación y restauración -----
+
+    def _descomprimir(self, info: InfoBackup, directorio: str) -> Path:
+        """Ruta a la base sin comprimir de la copia (temporal si estaba comprimida)"""
+        ruta = Path(info.ruta)
+        if not info.comprimido:
+            return ruta
+        destino = Path(directorio) / "restauracion.db"
+        with gzip.open(ruta, "rb") as origen, open(destino, "wb") as salida:
+            shutil.copyfileobj(origen, salida, TAMANO_BLOQUE)
+        return destino
+
+    def _info_de(self, ruta: str) -> InfoBackup:
+        manifiesto = _ruta_manifiesto(Path(ruta))
+        datos = _leer_json(manifiesto)
+        if datos:
+            datos["fecha"] = datetime.fromisoformat(datos["fecha"])
+            datos["ruta"] = str(ruta)
+            return InfoBackup(**datos)
+        # Copia externa sin manifiesto: solo se podrá comprobar su integridad
+        comprimido = str(ruta).endswith(".gz")
+        return InfoBackup(
+            ruta=str(ruta),
+            fecha=datetime.fromtimestamp(Path(ruta).stat().st_mtime),
+            bytes=Path(ruta).stat().st_size,
+            bytes_bd=0,
+            sha256="",
+            comprimido=comprimido,
+            integridad="",
+            motivo="externo",
+        )
+
+    def verificar_backup(self, ruta: str) -> bool:
+        """Comprueba integridad, SHA-256 (si hay manifiesto) y tablas esenciales de una copia"""
+        try:
+            info = self._info_de(ruta)
+        except OSError as e:
+            logger.error(f"Copia {Path(ruta).name} ilegible: {e}")
+            return False
+        with tempfile.TemporaryDirectory(prefix="hefest_verificacion_") as temporal:
+            try:
+                base = self._descomprimir(info, temporal)
+            except (OSError, EOFError) as e:
+                logger.error(f"Copia {Path(ruta).name} ilegible: {e}")
+                return False
+            if base.stat().st_size == 0:
+                # SQLite abre un fichero vacío como una base vacía y "ok"
+                logger.error(f"Copia {Path(ruta).name} vacía")
+                return False
+            if info.sha256 and _sha256(base) != info.sha256:
+                logger.error(f"Copia {Path(ruta).name}: el SHA-256 no coincide con el manifiesto")
+                return False
+            resultado = _integridad(base)
+            ausentes = _tablas_ausentes(base) if resultado == "ok" else []
+        if resultado != "ok":
+            logger.error(f"Copia {Path(ruta).name}: integrity_check: {resultado}")
+            return False
+        if ausentes:
+            logger.error(f"Copia {Path(ruta).name}: faltan las tablas {', '.join(ausentes)}")
+            return False
+        return True
+
+    def restaurar(self, ruta: str) -> InfoBackup:
+        """
+        Restaura la base de datos desde una copia verificada.
+
+        Antes de sobrescribir guarda una copia ``pre_restauracion`` de la
+        base actual. El volcado usa la API de backup sobre la base viva, así
+        que las conexiones abiertas ven los datos restaurados.
+
+        Returns:
+            La copia de seguridad previa a la restauración
+
+        Raises:
+            BackupError: si la copia no supera la verificación o el volcado
+                falla (p. ej. la base sigue bloqueada tras ``TIMEOUT_CONEXION_S``)
+        """
+        if not self.verificar_backup(ruta):
+            raise BackupError(f"La copia {Path(ruta).name} no supera la verificación")
+        info = self._info_de(ruta)
+        # Sin poda: la copia elegida puede ser más antigua que la retención
+        previa = self.crear_backup(motivo="pre_restauracion", podar=False)
+        inicio = time.perf_counter()
+        # Sin copias programadas a mitad del volcado
+        with self._copia_lock, tempfile.TemporaryDirectory(prefix="hefest_restauracion_") as temporal:
+            base = self._descomprimir(info, temporal)
+            try:
+                origen = sqlite3.connect(f"file:{base}?mode=ro", uri=True)
+                destino = sqlite3.connect(self.db_path, timeout=TIMEOUT_CONEXION_S)
+                try:
+                    origen.backup(destino, pages=-1)
+                    # Copias anteriores al registro de cambios (o a su columna origen)
+                    asegurar_cdc(destino)
+                finally:
+                    destino.close()
+                    origen.close()
+            except sqlite3.Error as e:
+                self._registrar(f"{datetime.now():%d/%m %H:%M} ❌ restauración: {e}")
+                raise BackupError(
+                    f"No se pudo restaurar {Path(ruta).name}: {e} "
+                    f"(la base actual está en {Path(previa.ruta).name})"
+                ) from e
+        logger.warning(
+            f"Base de datos restaurada desde {Path(ruta).name} en {time.perf_counter() - inicio:.2f} s "
+            f"(copia previa: {Path(previa.ruta).name})"
+        )
+        self._registrar(f"{datetime.now():%d/%m %H:%M} 📥 restaurada {Path(ruta).name}")
+        return previa
+
+    def restaurar_async(self, ruta: str) -> threading.Thread:
+        """Lanza ``restaurar`` en un hilo; el resultado se consulta con ``estado()``"""
+
+        def ejecutar():
+            try:
+                self._actualizar(previa_restauracion=self.restaurar(ruta))
+            except (BackupError, OSError, sqlite3.Error) as e:
+                logger.error(f"Error al restaurar {Path(ruta).name}: {e}")
+                self._actualizar(error_restauracion=str(e))
+            finally:
+                self._actualizar(restaurando=False)
+
+        # Visible como en curso desde ya, antes de que el hilo arranque
+        self._actualizar(restaurando=True, previa_restauracion=None, error_restauracion="")
+        hilo = threading.Thread(target=ejecutar, name="hefest-restauracion", daemon=True)
+        hilo.start()
+        return hilo
+
+    # ----- programación -----
+
+    def iniciar_programado(self):
+        """Arranca el hilo que crea una copia cada ``backup_interval`` segundos"""
+        if self._hilo and self._hilo.is_alive():
+            return
+        self._stop_event.clear()
+        self._despertar.clear()
+        self._hilo = threading.Thread(target=self._bucle, name="hefest-backup-programado", daemon=True)
+        self._hilo.start()
+        self._actualizar(programado=True)
+        logger.info(f"Copias programadas cada {self.intervalo_s:.0f} s en {self.directorio}")
+
+    def cambiar_intervalo(self, segundos: float):
+        """Nuevo intervalo entre copias; la programación en curso se recalcula ya"""
+        self.intervalo_s = float(segundos)
+        self._despertar.set()
+
+    def detener(self, timeout: float = 5.0):
+        self._stop_event.set()
+        self._despertar.set()
+        if self._hilo:
+            self._hilo.join(timeout)
+        self._hilo = None
+        self._actualizar(programado=False, proximo=None)
+
+    def _primera_espera(self) -> float:
+        ultimo = self.estado().ultimo
+        if ultimo is None:
+            return RETRASO_INICIAL_S
+        pendiente = self.intervalo_s - (datetime.now() - ultimo.fecha).total_seconds()
+        return max(RETRASO_INICIAL_S, pendiente)
+
+    def _bucle(self):
+        espera = self._primera_espera()
+        while True:
+            self._actualizar(proximo=datetime.now() + timedelta(seconds=espera))
+            despertado = self._despertar.wait(espera)
+            if self._stop_event.is_set():
+                return
+            if despertado:
+                # Cambió el intervalo: recalcular desde la última copia
+                self._despertar.clear()
+                espera = self._primera_espera()
+                continue
+            try:
+                self.crear_backup(motivo="programado")
+            except BackupError:
+                pass  # registrado en el estado; se reintenta en el siguiente intervalo
+            espera = self.intervalo_s
+
+    def _registrar(self, linea: str):
+        with self._lock:
+            self._estado.historial.insert(0, linea)
+            del self._estado.historial[20:]
+
+
+_backup_manager: Optional[BackupManager] = None
+
+
+def get_backup_manager() -> BackupManager:
+    """Instancia global del gestor de copias"""
+    global _backup_manager
+    if _backup_manager is None:
+        _backup_manager = BackupManager()
+    return _backup_manager
+
+
+def iniciar_backups_programados(db_path: Optional[str] = None) -> Optional[BackupManager]:
+    """Arranca las copias programadas si ``backup_enabled`` (``HEFEST_BACKUP=0`` las desactiva)"""
+    global _backup_manager
+    if os.environ.get("HEFEST_BACKUP") == "0":
+        return None
+    try:
+        if _backup_manager is None:
+            _backup_manager = BackupManager(db_path)
+        if not _backup_manager.config.get("backup_enabled", True):
+            return _backup_manager
+        _backup_manager.iniciar_programado()
+        return _backup_manager
+    except Exception as e:
+        logger.error(f"No se pudieron iniciar las copias programadas: {e}")
+        return None
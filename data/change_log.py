@@ -0,0 +1,194 @@
+"""
+Registro de cambios (CDC) de las tablas principales de Hefest.
+
+Triggers ``AFTER INSERT/UPDATE/DELETE`` sobre :data:`TABLAS_CDC` añaden
+una fila a ``cambios_log`` por fila tocada: ``seq`` (``AUTOINCREMENT``:
+creciente y no reutilizado aunque se pode), tabla, id de la fila y
+operación (``I``/``U``/``D``). Como los escribe SQLite, quedan registrados
+los cambios de cualquier conexión: otros terminales, scripts o la propia
+aplicación.
+
+Las conexiones de escritura de este proceso pasan por :func:`marcar_origen`:
+un trigger ``TEMP`` (solo existe en esa conexión) pone en ``origen`` el
+identificador :data:`ORIGEN_LOCAL`, y el lector puede descartar así los
+cambios que ya conoce porque los hizo él mismo.
+
+Un lector guarda el último ``seq`` visto y pide lo posterior con
+:func:`leer_cambios`; antes, ``PRAGMA data_version`` le dice si alguien ha
+escrito desde la última vez, sin tocar el fichero. Si la poda
+(:func:`podar_cambios`, desde el mantenimiento programado) se ha llevado
+cambios que el lector no llegó a ver, o el ``seq`` ha retrocedido (se
+restauró una copia de seguridad, con su propio registro), :func:`leer_cambios`
+devuelve un lote ``completo`` para que recargue todo.
+"""
+
+import logging
+import random
+import sqlite3
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+TABLAS_CDC = (
+    "mesas",
+    "reservas",
+    "comandas",
+    "comanda_detalles",
+    "productos",
+    "proveedores",
+    "habitaciones",
+)
+
+# Filas que conserva la poda: de sobra para terminales que se duermen un rato
+MAX_CAMBIOS_CONSERVADOS = 100_000
+MAX_CAMBIOS_POR_LECTURA = 5_000
+
+SQL_TABLA_CAMBIOS = """CREATE TABLE IF NOT EXISTS cambios_log (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    tabla TEXT NOT NULL,
+    fila_id INTEGER,
+    operacion TEXT NOT NULL,
+    origen INTEGER
+)"""
+
+# Identifica las escrituras de este proceso en ``cambios_log.origen``
+ORIGEN_LOCAL = random.getrandbits(62) + 1
+
+_OPERACIONES = (("ins", "INSERT", "I", "NEW"), ("upd", "UPDATE", "U", "NEW"), ("del", "DELETE", "D", "OLD"))
+
+
+@dataclass
+class LoteCambios:
+    """Cambios leídos del registro, agrupados por tabla"""
+
+    hasta_seq: int
+    filas: Dict[str, Set[int]] = field(default_factory=dict)
+    # True si se perdieron cambios (poda) o hay demasiados: recargar todo
+    completo: bool = False
+
+    def __bool__(self) -> bool:
+        return self.completo or bool(self.filas)
+
+    @property
+    def tablas(self) -> List[str]:
+        return list(TABLAS_CDC) if self.completo else sorted(self.filas)
+
+
+# ========================================
+# ESQUEMA
+# ========================================
+
+
+def asegurar_cdc(conn: sqlite3.Connection) -> List[str]:
+    """
+    Crea ``cambios_log`` y los triggers de las tablas de :data:`TABLAS_CDC` que falten.
+
+    Idempotente; las tablas que aún no existen se saltan (se cubren en la
+    siguiente llamada, p. ej. al crear su servicio).
+
+    Returns:
+        Los triggers creados
+    """
+    conn.execute(SQL_TABLA_CAMBIOS)
+    columnas = {row[1] for row in conn.execute("PRAGMA table_info(cambios_log)")}
+    if "origen" not in columnas:
+        # Registros creados antes de marcar el origen
+        conn.execute("ALTER TABLE cambios_log ADD COLUMN origen INTEGER")
+    existentes = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type IN ('table', 'trigger')")}
+    creados = []
+    for tabla in TABLAS_CDC:
+        if tabla not in existentes:
+            continue
+        for sufijo, evento, operacion, fila in _OPERACIONES:
+            nombre = f"cdc_{tabla}_{sufijo}"
+            if nombre in existentes:
+                continue
+            conn.execute(
+                f"CREATE TRIGGER IF NOT EXISTS {nombre} AFTER {evento} ON {tabla} BEGIN "
+                f"INSERT INTO cambios_log (tabla, fila_id, operacion) VALUES ('{tabla}', {fila}.id, '{operacion}'); "
+                f"END"
+            )
+            creados.append(nombre)
+    conn.commit()
+    if creados:
+        logger.info(f"Registro de cambios: {len(creados)} triggers creados")
+    return creados
+
+
+def marcar_origen(conn: sqlite3.Connection) -> bool:
+    """
+    Marca con :data:`ORIGEN_LOCAL` los cambios que registre ``conn``.
+
+    El trigger es ``TEMP``: no toca el esquema de la base y desaparece al
+    cerrar la conexión. Sin ``cambios_log`` (base sin inicializar) no hace nada.
+
+    Returns:
+        True si la conexión queda marcada
+    """
+    try:
+        conn.execute(
+            "CREATE TEMP TRIGGER IF NOT EXISTS cdc_origen AFTER INSERT ON main.cambios_log BEGIN "
+            f"UPDATE cambios_log SET origen = {ORIGEN_LOCAL} WHERE seq = NEW.seq; "
+            "END"
+        )
+    except sqlite3.OperationalError as e:
+        logger.debug(f"Conexión sin marca de origen: {e}")
+        return False
+    return True
+
+
+# ========================================
+# LECTURA Y PODA
+# ========================================
+
+
+def ultimo_seq(conn: sqlite3.Connection) -> int:
+    fila = conn.execute("SELECT MAX(seq) FROM cambios_log").fetchone()
+    return fila[0] or 0
+
+
+def leer_cambios(
+    conn: sqlite3.Connection,
+    desde_seq: int,
+    limite: int = MAX_CAMBIOS_POR_LECTURA,
+    ignorar_origen: Optional[int] = None,
+) -> LoteCambios:
+    """
+    Cambios con ``seq > desde_seq`` (hasta ``limite``; si hay más, lote completo).
+
+    Los marcados con ``ignorar_origen`` (p. ej. :data:`ORIGEN_LOCAL`) no
+    entran en el lote, pero ``hasta_seq`` sí avanza sobre ellos.
+    """
+    primero, maximo = conn.execute("SELECT MIN(seq), MAX(seq) FROM cambios_log").fetchone()
+    if desde_seq and (maximo or 0) < desde_seq:
+        # El registro retrocedió (copia restaurada): lo visto ya no vale
+        return LoteCambios(hasta_seq=maximo or 0, completo=True)
+
+    filas = conn.execute(
+        "SELECT seq, tabla, fila_id, origen FROM cambios_log WHERE seq > ? ORDER BY seq LIMIT ?",
+        (desde_seq, limite + 1),
+    ).fetchall()
+    if not filas:
+        return LoteCambios(hasta_seq=desde_seq)
+
+    if len(filas) > limite or (primero is not None and desde_seq and primero > desde_seq + 1):
+        # Demasiados cambios o la poda se llevó alguno: más barato recargar
+        return LoteCambios(hasta_seq=ultimo_seq(conn), completo=True)
+
+    lote = LoteCambios(hasta_seq=filas[-1][0])
+    for _, tabla, fila_id, origen in filas:
+        if ignorar_origen is not None and origen == ignorar_origen:
+            continue
+        lote.filas.setdefault(tabla, set()).add(fila_id)
+    return lote
+
+
+def podar_cambios(conn: sqlite3.Connection, conservar: int = MAX_CAMBIOS_CONSERVADOS) -> int:
+    """Borra lo anterior a los últimos ``conservar`` cambios; devuelve las filas borradas"""
+    limite = ultimo_seq(conn) - conservar
+    if limite <= 0:
+        return 0
+    cursor = conn.execute("DELETE FROM cambios_log WHERE seq <= ?", (limite,))
+    conn.commit()
+    return cursor.rowcount
@@ -1,6 +1,20 @@
 import sqlite3
-from contextlib import contextmanager
+from contextlib import contextmanager, nullcontext
 import os
+from datetime import date, datetime, timedelta
+from time import perf_counter
+
+from .change_log import asegurar_cdc, marcar_origen
+from .pagination import Pagina, paginar_consulta, TAMANO_PAGINA_DEFECTO
+from .query_profiler import get_query_profiler
+from .time_keys import a_epoch, asegurar_claves_tiempo, clave_dia_servicio
+from .write_queue import get_cola_escritura
+
+try:
+    from utils.tracing import traza
+except ImportError:  # sin src/ en el path (scripts sueltos)
+    def traza(nombre, categoria="app", **args):
+        return nullcontext()
 
 class DatabaseManager:
     def update_zona_nombre(self, zona_id, nuevo_nombre):
@@ -40,6 +54,8 @@ class DatabaseManager:
         result = self.query("SELECT * FROM zonas WHERE nombre = ?", (nombre,))
         return result[0] if result else None
     def __init__(self, path=None):
+        if path is None:
+            path = os.environ.get("HEFEST_DB_PATH")
         if path is None:
             # Calcular la ruta absoluta a la base de datos
             current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -52,6 +68,9 @@ class DatabaseManager:
 
     def _init_db(self):
         with self._get_connection() as conn:
+            # Solo surte efecto en una base nueva (antes de la primera tabla);
+            # las existentes se convierten con migrate_auto_vacuum_v0_0_14.py
+            conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
             # Tabla de usuarios
             conn.execute('''CREATE TABLE IF NOT EXISTS usuarios (
                 id INTEGER PRIMARY KEY,
@@ -194,6 +213,11 @@ class DatabaseManager:
                 """, usuarios_default)
                 conn.commit()  # ¡Importante! Hacer commit de los usuarios por defecto
 
+            # fecha_hora_ts / dia_servicio indexados para filtrar por rango (data/time_keys.py)
+            asegurar_claves_tiempo(conn)
+            # Triggers del registro de cambios que alimenta el refresco de la interfaz (data/change_log.py)
+            asegurar_cdc(conn)
+
     @contextmanager
     def _get_connection(self):
         conn = sqlite3.connect(self.db_path)
@@ -204,23 +228,104 @@ class DatabaseManager:
             conn.close()
 
     def query(self, sql, params=()):
-        with self._get_connection() as conn:
+        perfil = get_query_profiler()
+        with traza("db.query", "sql", sql=sql), self._get_connection() as conn:
+            inicio = perf_counter()
             cursor = conn.cursor()
             cursor.execute(sql, params)
-            return cursor.fetchall()
+            filas = cursor.fetchall()
+            if perfil.activo:
+                perfil.registrar(sql, params, perf_counter() - inicio, len(filas), conn)
+            return filas
+
+    def query_page(self, sql, orden, cursor=None, limite=TAMANO_PAGINA_DEFECTO,
+                   params=(), descendente=False) -> Pagina:
+        """Consulta paginada por clave (keyset). Ver data/pagination.py"""
+        perfil = get_query_profiler()
+        with traza("db.query_page", "sql", sql=sql), self._get_connection() as conn:
+            inicio = perf_counter()
+            pagina = paginar_consulta(conn, sql, orden, cursor, limite, params, descendente)
+            if perfil.activo:
+                # Se registra la consulta base: la huella no depende del cursor
+                perfil.registrar(sql, params, perf_counter() - inicio, len(pagina.items), conn)
+            return pagina
+
+    def _cola_escritura(self):
+        """Cola del hilo escritor si está activa (data/write_queue.py); dentro de él, None"""
+        cola = get_cola_escritura(self.db_path)
+        return None if cola is None or cola.en_hilo_escritor else cola
+
+    def _escribir(self, sql, params=(), many=False):
+        """
+        Ejecuta y confirma una escritura: por la cola del hilo escritor si está
+        activa (group commit y reintentos ante bloqueos), si no en una conexión propia.
+
+        Returns:
+            tuple: (lastrowid, rowcount)
+        """
+        perfil = get_query_profiler()
+        cola = self._cola_escritura()
+        if cola is not None:
+            inicio = perf_counter()
+            futuro = cola.enviar_many(sql, params) if many else cola.enviar(sql, params)
+            resultado = futuro.result()
+            if perfil.activo:
+                # Incluye la espera en cola; sin plan: la conexión es del escritor
+                perfil.registrar(sql, None if many else params, perf_counter() - inicio, resultado.rowcount)
+            return resultado.lastrowid, resultado.rowcount
 
-    def execute(self, sql, params=()):
         with self._get_connection() as conn:
+            marcar_origen(conn)
+            inicio = perf_counter()
             cursor = conn.cursor()
-            cursor.execute(sql, params)
+            if many:
+                cursor.executemany(sql, params)
+            else:
+                cursor.execute(sql, params)
             conn.commit()
-            return cursor.lastrowid
+            if perfil.activo:
+                # executemany sin plan: no hay un único juego de parámetros representativo
+                perfil.registrar(sql, None if many else params, perf_counter() - inicio,
+                                 max(cursor.rowcount, 0), None if many else conn)
+            return cursor.lastrowid, max(cursor.rowcount, 0)
+
+    def execute(self, sql, params=()):
+        with traza("db.execute", "sql", sql=sql):
+            return self._escribir(sql, params)[0]
 
     def execute_many(self, sql, params_list):
-        with self._get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.executemany(sql, params_list)
-            conn.commit()
+        with traza("db.execute_many", "sql", sql=sql):
+            self._escribir(sql, params_list, many=True)
+
+    def transaccion(self, funcion):
+        """
+        Ejecuta ``funcion(conn)`` en una transacción y devuelve su resultado.
+
+        Para lecturas seguidas de escrituras que deben ser atómicas (stock).
+        Con la cola de escritura activa corre en el hilo escritor y puede
+        repetirse si la base de datos está bloqueada: ``funcion`` no debe
+        hacer ``commit`` ni tener efectos fuera de la conexión. Sin cola, la
+        transacción empieza con ``BEGIN IMMEDIATE`` antes de ``funcion``: sus
+        lecturas ya tienen el bloqueo de escritura y nadie escribe entre medias.
+        """
+        cola = self._cola_escritura()
+        with traza("db.transaccion", "sql"):
+            if cola is not None:
+                return cola.enviar_funcion(funcion).result()
+            with self._get_connection() as conn:
+                marcar_origen(conn)
+                # Transacción explícita: el módulo sqlite3 solo abriría una
+                # (DEFERRED) en la primera escritura, con las lecturas fuera
+                conn.isolation_level = None
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    resultado = funcion(conn)
+                    conn.execute("COMMIT")
+                except BaseException:
+                    if conn.in_transaction:
+                        conn.execute("ROLLBACK")
+                    raise
+                return resultado
 
     def get_by_id(self, table, id):
         sql = f"SELECT * FROM {table} WHERE id = ?"
@@ -239,19 +344,11 @@ class DatabaseManager:
         values = tuple(data.values()) + (id,)
 
         sql = f"UPDATE {table} SET {set_clause} WHERE id = ?"
-        with self._get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute(sql, values)
-            conn.commit()
-            return cursor.rowcount > 0  # Retorna True si se actualizó alguna fila
+        return self._escribir(sql, values)[1] > 0  # Retorna True si se actualizó alguna fila
 
     def delete(self, table, id):
         sql = f"DELETE FROM {table} WHERE id = ?"
-        with self._get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute(sql, (id,))
-            conn.commit()
-            return cursor.rowcount > 0  # Retorna True si se eliminó alguna fila
+        return self._escribir(sql, (id,))[1] > 0  # Retorna True si se eliminó alguna fila
 
     # Métodos para gestión de usuarios
     def get_usuarios(self):
@@ -353,8 +450,8 @@ class DatabaseManager:
                     COUNT(*) as num_comandas,
                     COALESCE(AVG(total), 0) as ticket_promedio
                 FROM comandas
-                WHERE DATE(fecha_hora) = DATE('now')
-            """)
+                WHERE dia_servicio = ?
+            """, (clave_dia_servicio(),))
 
             if ventas_result:
                 ventas_data = ventas_result[0]
@@ -385,10 +482,10 @@ class DatabaseManager:
             tiempo_result = self.query("""
                 SELECT
                     COUNT(*) as comandas_completadas,
-                    COALESCE(AVG(julianday('now') - julianday(fecha_hora)) * 24 * 60, 0) as tiempo_promedio_minutos
+                    COALESCE((? - AVG(fecha_hora_ts)) / 60.0, 0) as tiempo_promedio_minutos
                 FROM comandas
-                WHERE estado = 'completada' AND DATE(fecha_hora) = DATE('now')
-            """)
+                WHERE estado = 'completada' AND dia_servicio = ?
+            """, (a_epoch(datetime.now()), clave_dia_servicio()))
 
             if tiempo_result:
                 tiempo_data = tiempo_result[0]
@@ -459,16 +556,18 @@ class DatabaseManager:
     def get_hospitality_metrics(self):
         """Obtiene métricas de hospedería reales"""
         try:
-            # Métricas de reservas
+            # Métricas de reservas (fechas ISO en texto: los límites de día comparan como texto)
+            hoy = date.today()
+            manana = (hoy + timedelta(days=1)).isoformat()
             reservas_result = self.query("""
                 SELECT
                     COUNT(*) as total_reservas,
                     SUM(CASE WHEN estado = 'confirmada' THEN 1 ELSE 0 END) as reservas_confirmadas,
-                    SUM(CASE WHEN DATE(fecha_entrada) = DATE('now') THEN 1 ELSE 0 END) as check_ins_hoy,
-                    SUM(CASE WHEN DATE(fecha_salida) = DATE('now') THEN 1 ELSE 0 END) as check_outs_hoy
+                    SUM(CASE WHEN fecha_entrada >= ? AND fecha_entrada < ? THEN 1 ELSE 0 END) as check_ins_hoy,
+                    SUM(CASE WHEN fecha_salida >= ? AND fecha_salida < ? THEN 1 ELSE 0 END) as check_outs_hoy
                 FROM reservas
-                WHERE fecha_entrada >= DATE('now', '-30 days')
-            """)
+                WHERE fecha_entrada >= ?
+            """, (hoy.isoformat(), manana, hoy.isoformat(), manana, (hoy - timedelta(days=30)).isoformat()))
 
             # Métricas de habitaciones
             habitaciones_result = self.query("""
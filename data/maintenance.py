@@ -0,0 +1,435 @@
+"""
+Mantenimiento periódico de la base de datos de Hefest.
+
+Con el historial de comandas y reservas creciendo, los planes de consulta
+se degradan si nadie actualiza las estadísticas y el fichero no devuelve
+nunca el espacio de las filas borradas. Este módulo ejecuta, cada una con
+su propia cadencia (sección ``database`` de config/*.json):
+
+- ``optimize``: ``ANALYZE`` completo la primera vez (sin ``sqlite_stat1``)
+  y después ``PRAGMA optimize`` con ``analysis_limit`` acotado
+  (``maintenance_optimize_interval``)
+- ``checkpoint``: ``PRAGMA wal_checkpoint(TRUNCATE)``, solo si la base
+  está en modo WAL (``maintenance_checkpoint_interval``)
+- ``incremental_vacuum``: libera páginas libres por tramos, solo si la base
+  tiene ``auto_vacuum = INCREMENTAL`` (ver migrate_auto_vacuum_v0_0_14.py)
+  (``maintenance_vacuum_interval``)
+- ``integrity_check``: ``PRAGMA integrity_check`` (``maintenance_integrity_interval``)
+- ``change_log``: poda del registro de cambios (data/change_log.py)
+  (``maintenance_change_log_interval``)
+
+El hilo programado solo trabaja en ventanas de ocio: sondea
+``PRAGMA data_version``, que cambia cuando otra conexión (otro terminal u
+otro servicio de la aplicación) confirma una escritura, y no empieza hasta
+llevar ``maintenance_idle_seconds`` sin cambios. Si los terminales escriben
+a mitad de una pasada, se abandona el resto y la ventana de ocio exigida se
+duplica (hasta ``MAX_FACTOR_ESPERA`` veces) para la siguiente.
+
+Cada tarea deja una fila en ``mantenimiento_historial`` (de ahí sale la
+cadencia entre reinicios) y una línea de log con duración y variación de
+tamaño del fichero.
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .backup_manager import cargar_config_database
+from .change_log import podar_cambios
+
+logger = logging.getLogger(__name__)
+
+TAREAS = ("change_log", "optimize", "checkpoint", "incremental_vacuum", "integrity_check")
+
+CONFIG_DEFECTO: Dict[str, Any] = {
+    "maintenance_enabled": True,
+    "maintenance_idle_seconds": 120,
+    "maintenance_optimize_interval": 21600,
+    "maintenance_checkpoint_interval": 3600,
+    "maintenance_vacuum_interval": 86400,
+    "maintenance_integrity_interval": 604800,
+    "maintenance_change_log_interval": 3600,
+}
+
+CLAVE_INTERVALO = {
+    "optimize": "maintenance_optimize_interval",
+    "checkpoint": "maintenance_checkpoint_interval",
+    "incremental_vacuum": "maintenance_vacuum_interval",
+    "integrity_check": "maintenance_integrity_interval",
+    "change_log": "maintenance_change_log_interval",
+}
+
+# Cada cuánto se mira PRAGMA data_version (barato: no toca el fichero)
+SONDEO_S = 15.0
+# Cada cuánto se revisa si hay tareas vencidas
+REVISION_S = 300.0
+# Margen tras el arranque (no competir con la carga inicial ni con la copia atrasada)
+RETRASO_INICIAL_S = 300.0
+MAX_FACTOR_ESPERA = 8
+PAGINAS_VACUUM_POR_PASO = 512
+# Espera máxima por un bloqueo: si los terminales lo tienen, se aplaza
+BUSY_TIMEOUT_S = 2.0
+LIMITE_ANALISIS = 400
+MAX_HISTORIAL = 50
+
+SQL_TABLA_HISTORIAL = """CREATE TABLE IF NOT EXISTS mantenimiento_historial (
+    id INTEGER PRIMARY KEY,
+    tarea TEXT NOT NULL,
+    fecha TEXT NOT NULL,
+    duracion_s REAL,
+    bytes_antes INTEGER,
+    bytes_despues INTEGER,
+    resultado TEXT NOT NULL,
+    detalle TEXT
+)"""
+
+
+class _Ocupado(Exception):
+    """Señal interna: los terminales escribieron a mitad de una tarea"""
+
+
+# ========================================
+# MODELOS
+# ========================================
+
+
+@dataclass
+class ResultadoTarea:
+    """Una ejecución de una tarea de mantenimiento"""
+
+    tarea: str
+    fecha: datetime
+    duracion_s: float
+    bytes_antes: int
+    bytes_despues: int
+    resultado: str  # ok | omitido | ocupado | error
+    detalle: str = ""
+
+    @property
+    def delta_bytes(self) -> int:
+        return self.bytes_despues - self.bytes_antes
+
+
+def cargar_config_mantenimiento(entorno: Optional[str] = None) -> Dict[str, Any]:
+    """Claves ``maintenance_*`` de la sección ``database`` (default.json y entorno)"""
+    return cargar_config_database("maintenance_", CONFIG_DEFECTO, entorno)
+
+
+# ========================================
+# GESTOR
+# ========================================
+
+
+class MantenimientoManager:
+    """Ejecuta las tareas de mantenimiento vencidas cuando la base está ociosa"""
+
+    def __init__(self, db_path: Optional[str] = None, config: Optional[Dict[str, Any]] = None):
+        if db_path is None:
+            db_path = os.environ.get("HEFEST_DB_PATH") or str(Path(__file__).resolve().parent / "hefest.db")
+        self.db_path = str(db_path)
+        self.config = config if config is not None else cargar_config_mantenimiento()
+        self.intervalos = {
+            tarea: float(self.config.get(clave) or CONFIG_DEFECTO[clave]) for tarea, clave in CLAVE_INTERVALO.items()
+        }
+        self.ocio_s = float(self.config.get("maintenance_idle_seconds") or CONFIG_DEFECTO["maintenance_idle_seconds"])
+
+        self.historial: deque = deque(maxlen=MAX_HISTORIAL)
+        self._factor_espera = 1
+        self._version_datos: Optional[int] = None
+        self._ultima_actividad = time.monotonic()
+        self._avisado_auto_vacuum = False
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._hilo: Optional[threading.Thread] = None
+
+    # ----- conexión -----
+
+    def _conectar(self) -> sqlite3.Connection:
+        # Autocommit: los PRAGMA no deben quedar dentro de una transacción implícita
+        conn = sqlite3.connect(self.db_path, timeout=BUSY_TIMEOUT_S, isolation_level=None)
+        conn.execute(SQL_TABLA_HISTORIAL)
+        return conn
+
+    def _tamano(self) -> int:
+        """Bytes de la base más su WAL (si lo hay)"""
+        total = 0
+        for ruta in (self.db_path, self.db_path + "-wal"):
+            try:
+                total += os.path.getsize(ruta)
+            except OSError:
+                pass
+        return total
+
+    # ----- ocio -----
+
+    def sondear_actividad(self, conn: sqlite3.Connection) -> bool:
+        """True si otra conexión ha escrito desde el último sondeo"""
+        version = conn.execute("PRAGMA data_version").fetchone()[0]
+        cambiada = self._version_datos is not None and version != self._version_datos
+        self._version_datos = version
+        if cambiada:
+            self._ultima_actividad = time.monotonic()
+        return cambiada
+
+    def ocupado(self, conn: sqlite3.Connection) -> bool:
+        """True si no se lleva la ventana de ocio exigida sin escrituras ajenas"""
+        self.sondear_actividad(conn)
+        return time.monotonic() - self._ultima_actividad < self.ocio_s * self._factor_espera
+
+    # ----- cadencia -----
+
+    def ultimas_ejecuciones(self, conn: sqlite3.Connection) -> Dict[str, datetime]:
+        """Última ejecución completada (no aplazada) de cada tarea"""
+        filas = conn.execute(
+            "SELECT tarea, MAX(fecha) FROM mantenimiento_historial WHERE resultado != 'ocupado' GROUP BY tarea"
+        ).fetchall()
+        return {tarea: datetime.fromisoformat(fecha) for tarea, fecha in filas if fecha}
+
+    def tareas_pendientes(self, conn: sqlite3.Connection, ahora: Optional[datetime] = None) -> List[str]:
+        ahora = ahora or datetime.now()
+        ultimas = self.ultimas_ejecuciones(conn)
+        return [
+            tarea
+            for tarea in TAREAS
+            if tarea not in ultimas or ahora - ultimas[tarea] >= timedelta(seconds=self.intervalos[tarea])
+        ]
+
+    # ----- ejecución -----
+
+    def ejecutar(self, tareas: Optional[Iterable[str]] = None, esperar_ocio: bool = False) -> List[ResultadoTarea]:
+        """
+        Ejecuta las tareas dadas (por defecto, las vencidas) en una conexión propia.
+
+        Args:
+            tareas: Subconjunto de ``TAREAS``; ``None`` para las vencidas
+            esperar_ocio: Abandonar la pasada si otra conexión escribe
+        """
+        conn = self._conectar()
+        try:
+            # data_version solo es comparable dentro de una misma conexión
+            self._version_datos = None
+            self.sondear_actividad(conn)
+            pendientes = list(tareas) if tareas is not None else self.tareas_pendientes(conn)
+            return self._ejecutar_en(conn, pendientes, esperar_ocio)
+        finally:
+            conn.close()
+
+    def ejecutar_al_cierre(self) -> List[ResultadoTarea]:
+        """Pasada corta al cerrar la aplicación: optimize y checkpoint si toca"""
+        self.detener()
+        try:
+            conn = self._conectar()
+            try:
+                tareas = ["optimize"] + [t for t in self.tareas_pendientes(conn) if t == "checkpoint"]
+                return self._ejecutar_en(conn, tareas, esperar_ocio=False)
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logger.warning(f"Mantenimiento al cierre omitido: {e}")
+            return []
+
+    def _ejecutar_en(self, conn: sqlite3.Connection, tareas: List[str], esperar_ocio: bool) -> List[ResultadoTarea]:
+        resultados = []
+        for tarea in tareas:
+            if tarea not in TAREAS:
+                raise ValueError(f"Tarea de mantenimiento desconocida: {tarea}")
+            if esperar_ocio and self.ocupado(conn):
+                logger.info(f"Mantenimiento aplazado antes de {tarea}: hay actividad en la base de datos")
+                break
+            resultado = self._ejecutar_tarea(conn, tarea, esperar_ocio)
+            resultados.append(resultado)
+            if resultado.resultado == "ocupado":
+                break
+        return resultados
+
+    def _ejecutar_tarea(self, conn: sqlite3.Connection, tarea: str, esperar_ocio: bool) -> ResultadoTarea:
+        fecha = datetime.now().replace(microsecond=0)
+        antes = self._tamano()
+        inicio = time.perf_counter()
+        try:
+            resultado, detalle = getattr(self, f"_tarea_{tarea}")(conn, esperar_ocio)
+        except _Ocupado as e:
+            resultado, detalle = "ocupado", str(e)
+        except sqlite3.OperationalError as e:
+            if "locked" in str(e) or "busy" in str(e):
+                resultado, detalle = "ocupado", str(e)
+            else:
+                resultado, detalle = "error", str(e)
+        except sqlite3.DatabaseError as e:
+            resultado, detalle = "error", str(e)
+
+        info = ResultadoTarea(
+            tarea=tarea,
+            fecha=fecha,
+            duracion_s=round(time.perf_counter() - inicio, 3),
+            bytes_antes=antes,
+            bytes_despues=self._tamano(),
+            resultado=resultado,
+            detalle=detalle,
+        )
+        nivel = logging.ERROR if resultado == "error" else logging.INFO
+        logger.log(
+            nivel,
+            f"Mantenimiento {tarea}: {resultado} en {info.duracion_s:.2f} s, "
+            f"{antes / 1024 / 1024:.1f} → {info.bytes_despues / 1024 / 1024:.1f} MB "
+            f"({info.delta_bytes / 1024:+.0f} KB){f' - {detalle}' if detalle else ''}",
+        )
+        try:
+            conn.execute(
+                "INSERT INTO mantenimiento_historial "
+                "(tarea, fecha, duracion_s, bytes_antes, bytes_despues, resultado, detalle) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (tarea, fecha.isoformat(), info.duracion_s, antes, info.bytes_despues, resultado, detalle),
+            )
+        except sqlite3.OperationalError as e:
+            logger.warning(f"No se pudo registrar el mantenimiento {tarea}: {e}")
+        with self._lock:
+            self.historial.appendleft(info)
+        return info
+
+    # ----- tareas -----
+
+    def _tarea_optimize(self, conn: sqlite3.Connection, esperar_ocio: bool) -> Tuple[str, str]:
+        analizada = conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'").fetchone()
+        if not analizada:
+            conn.execute("ANALYZE")
+            return "ok", "ANALYZE completo"
+        conn.execute(f"PRAGMA analysis_limit = {LIMITE_ANALISIS}")
+        conn.execute("PRAGMA optimize")
+        return "ok", "PRAGMA optimize"
+
+    def _tarea_checkpoint(self, conn: sqlite3.Connection, esperar_ocio: bool) -> Tuple[str, str]:
+        modo = conn.execute("PRAGMA journal_mode").fetchone()[0]
+        if modo.lower() != "wal":
+            return "omitido", f"journal_mode={modo}"
+        bloqueado, paginas_log, paginas_copiadas = conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchone()
+        if bloqueado:
+            raise _Ocupado(f"checkpoint parcial: {paginas_copiadas}/{paginas_log} páginas")
+        return "ok", f"{paginas_copiadas} páginas"
+
+    def _tarea_incremental_vacuum(self, conn: sqlite3.Connection, esperar_ocio: bool) -> Tuple[str, str]:
+        if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+            if not self._avisado_auto_vacuum:
+                logger.warning(
+                    "La base no tiene auto_vacuum = INCREMENTAL: ejecutar data/migrate_auto_vacuum_v0_0_14.py "
+                    "con la aplicación cerrada para recuperar espacio"
+                )
+                self._avisado_auto_vacuum = True
+            return "omitido", "auto_vacuum no incremental"
+
+        libres = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        liberadas = 0
+        while libres > 0:
+            if esperar_ocio and self.ocupado(conn):
+                raise _Ocupado(f"{liberadas} páginas liberadas, {libres} pendientes")
+            # fetchall: incremental_vacuum avanza una página por fila devuelta
+            conn.execute(f"PRAGMA incremental_vacuum({PAGINAS_VACUUM_POR_PASO})").fetchall()
+            restantes = conn.execute("PRAGMA freelist_count").fetchone()[0]
+            if restantes >= libres:
+                break
+            liberadas += libres - restantes
+            libres = restantes
+        return "ok", f"{liberadas} páginas liberadas"
+
+    def _tarea_change_log(self, conn: sqlite3.Connection, esperar_ocio: bool) -> Tuple[str, str]:
+        if not conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'cambios_log'").fetchone():
+            return "omitido", "sin registro de cambios"
+        return "ok", f"{podar_cambios(conn)} cambios podados"
+
+    def _tarea_integrity_check(self, conn: sqlite3.Connection, esperar_ocio: bool) -> Tuple[str, str]:
+        filas = conn.execute("PRAGMA integrity_check").fetchall()
+        texto = "; ".join(str(fila[0]) for fila in filas[:5])
+        if texto != "ok":
+            return "error", f"integrity_check: {texto}"
+        return "ok", ""
+
+    # ----- programación -----
+
+    def iniciar_programado(self):
+        """Arranca el hilo que ejecuta las tareas vencidas en ventanas de ocio"""
+        if self._hilo and self._hilo.is_alive():
+            return
+        self._stop_event.clear()
+        self._hilo = threading.Thread(target=self._bucle, name="hefest-mantenimiento", daemon=True)
+        self._hilo.start()
+        logger.info(f"Mantenimiento programado de {self.db_path} (ocio mínimo {self.ocio_s:.0f} s)")
+
+    def detener(self, timeout: float = 5.0):
+        self._stop_event.set()
+        if self._hilo:
+            self._hilo.join(timeout)
+        self._hilo = None
+
+    def _bucle(self):
+        conn = None
+        proxima_revision = time.monotonic() + RETRASO_INICIAL_S
+        try:
+            while not self._stop_event.wait(SONDEO_S):
+                try:
+                    if conn is None:
+                        conn = self._conectar()
+                        self._version_datos = None
+                    self.sondear_actividad(conn)
+                    if time.monotonic() < proxima_revision:
+                        continue
+                    pendientes = self.tareas_pendientes(conn)
+                    if not pendientes:
+                        proxima_revision = time.monotonic() + REVISION_S
+                        continue
+                    if self.ocupado(conn):
+                        continue  # se vuelve a mirar en el siguiente sondeo
+
+                    resultados = self._ejecutar_en(conn, pendientes, esperar_ocio=True)
+                    if len(resultados) < len(pendientes) or any(r.resultado == "ocupado" for r in resultados):
+                        self._factor_espera = min(self._factor_espera * 2, MAX_FACTOR_ESPERA)
+                        logger.info(
+                            f"Mantenimiento interrumpido por actividad: se exigirán "
+                            f"{self.ocio_s * self._factor_espera:.0f} s de ocio"
+                        )
+                    else:
+                        self._factor_espera = 1
+                    proxima_revision = time.monotonic() + REVISION_S
+                except sqlite3.Error as e:
+                    logger.warning(f"Error en el mantenimiento programado: {e}")
+                    if conn is not None:
+                        conn.close()
+                    conn = None
+                    proxima_revision = time.monotonic() + REVISION_S
+        finally:
+            if conn is not None:
+                conn.close()
+
+
+_mantenimiento_manager: Optional[MantenimientoManager] = None
+
+
+def get_mantenimiento_manager() -> MantenimientoManager:
+    """Instancia global del gestor de mantenimiento"""
+    global _mantenimiento_manager
+    if _mantenimiento_manager is None:
+        _mantenimiento_manager = MantenimientoManager()
+    return _mantenimiento_manager
+
+
+def iniciar_mantenimiento_programado(db_path: Optional[str] = None) -> Optional[MantenimientoManager]:
+    """Arranca el mantenimiento si ``maintenance_enabled`` (``HEFEST_MANTENIMIENTO=0`` lo desactiva)"""
+    global _mantenimiento_manager
+    if os.environ.get("HEFEST_MANTENIMIENTO") == "0":
+        return None
+    try:
+        if _mantenimiento_manager is None:
+            _mantenimiento_manager = MantenimientoManager(db_path)
+        if not _mantenimiento_manager.config.get("maintenance_enabled", True):
+            return None
+        _mantenimiento_manager.iniciar_programado()
+        return _mantenimiento_manager
+    except Exception as e:
+        logger.error(f"No se pudo iniciar el mantenimiento programado: {e}")
+        return None
@@ -0,0 +1,79 @@
+"""
+[v0.0.14] Migración: activar ``auto_vacuum = INCREMENTAL`` en hefest.db.
+
+Cambiar ``auto_vacuum`` en una base que ya tiene tablas exige un ``VACUUM``
+completo (reescribe el fichero con bloqueo exclusivo), así que se ejecuta
+aparte y con la aplicación cerrada en todos los terminales. A partir de
+ahí el mantenimiento programado (data/maintenance.py) devuelve el espacio
+libre por tramos con ``PRAGMA incremental_vacuum``.
+
+Antes de tocar nada se guarda una copia ``pre_migracion`` con el gestor de
+copias de seguridad.
+
+Uso:
+    python data/migrate_auto_vacuum_v0_0_14.py [ruta/a/hefest.db]
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from data.backup_manager import BackupManager
+
+DB_PATH = os.environ.get("HEFEST_DB_PATH", os.path.join(RAIZ, "data", "hefest.db"))
+
+INCREMENTAL = 2
+
+
+def migrate(db_path=DB_PATH):
+    # Una ruta errónea no debe crear (y "migrar") una base vacía
+    if not os.path.isfile(db_path):
+        raise FileNotFoundError(f"No existe la base de datos: {db_path}")
+    uri = f"file:{os.path.abspath(db_path)}?mode=rw"
+    conn = sqlite3.connect(uri, uri=True, isolation_level=None)
+    try:
+        if conn.execute("PRAGMA auto_vacuum").fetchone()[0] == INCREMENTAL:
+            print("auto_vacuum ya es INCREMENTAL: nada que hacer.")
+            return False
+
+        copia = BackupManager(db_path).crear_backup(motivo="pre_migracion")
+        print(f"Copia previa: {copia.ruta}")
+
+        antes = os.path.getsize(db_path)
+        inicio = time.perf_counter()
+        conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        conn.execute("VACUUM")
+        modo = conn.execute("PRAGMA auto_vacuum").fetchone()[0]
+        if modo != INCREMENTAL:
+            raise RuntimeError(f"auto_vacuum sigue en {modo} tras el VACUUM")
+        print(
+            f"auto_vacuum = INCREMENTAL en {time.perf_counter() - inicio:.1f} s "
+            f"({antes / 1024 / 1024:.1f} → {os.path.getsize(db_path) / 1024 / 1024:.1f} MB)"
+        )
+        return True
+    finally:
+        conn.close()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Activa auto_vacuum = INCREMENTAL en hefest.db")
+    parser.add_argument("db_path", nargs="?", default=DB_PATH, help=f"Base de datos (por defecto {DB_PATH})")
+    args = parser.parse_args()
+
+    try:
+        migrate(args.db_path)
+    except (FileNotFoundError, sqlite3.Error) as e:
+        print(f"❌ {e}")
+        parser.print_usage()
+        return 1
+
+    print("Migración completada.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,196 @@
+"""
+Paginación por clave (keyset / seek) para listados grandes.
+
+En lugar de OFFSET, cada página continúa a partir de los valores de la clave
+de orden de la última fila entregada (el cursor), por lo que el coste de
+pedir la página N es el mismo que el de la primera siempre que exista un
+índice que cubra la clave de orden.
+
+La clave de orden debe terminar en una columna única (normalmente ``id``)
+para que el orden sea total y no se pierdan ni repitan filas entre páginas.
+Las columnas de orden pueden contener NULL (SQLite los ordena primero en
+ASC); en ese caso el predicado se expande columna a columna.
+"""
+
+import bisect
+from dataclasses import dataclass, field
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+Cursor = Tuple[Any, ...]
+
+TAMANO_PAGINA_DEFECTO = 200
+
+
+@dataclass
+class Pagina:
+    """Resultado de una consulta paginada"""
+
+    items: List[Any] = field(default_factory=list)
+    cursor_siguiente: Optional[Cursor] = None
+
+    @property
+    def hay_mas(self) -> bool:
+        return self.cursor_siguiente is not None
+
+    def map(self, funcion: Callable[[Any], Any]) -> "Pagina":
+        """Devuelve una página con los items transformados y el mismo cursor"""
+        return Pagina([funcion(item) for item in self.items], self.cursor_siguiente)
+
+
+def _validar(orden: Sequence[str], limite: int):
+    if not orden:
+        raise ValueError("La paginación requiere al menos una columna de orden")
+    if limite <= 0:
+        raise ValueError(f"Tamaño de página inválido: {limite}")
+
+
+def _predicado_expandido(
+    orden: Sequence[str], cursor: Cursor, descendente: bool
+) -> Tuple[str, List[Any]]:
+    """
+    Predicado "después del cursor" tolerante a NULL.
+
+    Equivale a la comparación de row values pero usando ``IS`` para la
+    igualdad y tratando NULL como el menor valor posible.
+    """
+    alternativas = []
+    parametros: List[Any] = []
+    for i, columna in enumerate(orden):
+        condiciones = []
+        valores: List[Any] = []
+        for previa, valor in zip(orden[:i], cursor[:i]):
+            condiciones.append(f"{previa} IS ?")
+            valores.append(valor)
+
+        valor = cursor[i]
+        if valor is None:
+            if descendente:
+                continue  # nada es menor que NULL
+            condiciones.append(f"{columna} IS NOT NULL")
+        elif descendente:
+            condiciones.append(f"({columna} < ? OR {columna} IS NULL)")
+            valores.append(valor)
+        else:
+            condiciones.append(f"{columna} > ?")
+            valores.append(valor)
+
+        alternativas.append("(" + " AND ".join(condiciones) + ")")
+        parametros.extend(valores)
+
+    if not alternativas:
+        return "0", []
+    return "(" + " OR ".join(alternativas) + ")", parametros
+
+
+def construir_consulta_keyset(
+    sql_base: str,
+    orden: Sequence[str],
+    cursor: Optional[Cursor] = None,
+    limite: int = TAMANO_PAGINA_DEFECTO,
+    descendente: bool = False,
+) -> Tuple[str, List[Any]]:
+    """
+    Envuelve una consulta SELECT (sin ORDER BY ni LIMIT) en una consulta keyset.
+
+    Args:
+        sql_base: SELECT con sus filtros; las columnas de ``orden`` deben
+            aparecer en su lista de columnas
+        orden: Columnas de la clave de orden (la última debe ser única)
+        cursor: Valores de la clave de la última fila de la página anterior
+        limite: Número de filas por página
+        descendente: Orden descendente para todas las columnas
+
+    Returns:
+        Tupla (sql, parámetros adicionales) a añadir tras los de ``sql_base``.
+        La consulta pide ``limite + 1`` filas para saber si hay más páginas.
+    """
+    _validar(orden, limite)
+    columnas = ", ".join(orden)
+    direccion = "DESC" if descendente else "ASC"
+
+    sql = f"SELECT * FROM ({sql_base}) AS pagina"
+    parametros: List[Any] = []
+    if cursor is not None:
+        if len(cursor) != len(orden):
+            raise ValueError("El cursor no corresponde con la clave de orden")
+        if descendente or any(valor is None for valor in cursor):
+            # En DESC los NULL van al final y (a, b) < (?, ?) los descartaría
+            predicado, valores = _predicado_expandido(orden, cursor, descendente)
+            sql += f" WHERE {predicado}"
+            parametros.extend(valores)
+        else:
+            marcadores = ", ".join("?" for _ in orden)
+            # Row values: (a, b) > (?, ?) es el orden lexicográfico y permite
+            # a SQLite buscar directamente en un índice sobre (a, b)
+            sql += f" WHERE ({columnas}) > ({marcadores})"
+            parametros.extend(cursor)
+
+    sql += " ORDER BY " + ", ".join(f"{col} {direccion}" for col in orden)
+    sql += " LIMIT ?"
+    parametros.append(limite + 1)
+    return sql, parametros
+
+
+def paginar_consulta(
+    conn,
+    sql_base: str,
+    orden: Sequence[str],
+    cursor: Optional[Cursor] = None,
+    limite: int = TAMANO_PAGINA_DEFECTO,
+    params: Sequence[Any] = (),
+    descendente: bool = False,
+) -> Pagina:
+    """
+    Ejecuta una consulta keyset sobre una conexión sqlite3 abierta.
+
+    Funciona tanto con ``sqlite3.Row`` como con tuplas: el cursor se extrae
+    con las posiciones de las columnas de orden en ``cursor.description``.
+    """
+    sql, extra = construir_consulta_keyset(sql_base, orden, cursor, limite, descendente)
+    cur = conn.execute(sql, list(params) + extra)
+    filas = cur.fetchall()
+
+    if len(filas) <= limite:
+        return Pagina(filas, None)
+
+    filas = filas[:limite]
+    nombres = [d[0] for d in cur.description]
+    posiciones = [nombres.index(col) for col in orden]
+    ultima = filas[-1]
+    return Pagina(filas, tuple(ultima[p] for p in posiciones))
+
+
+def paginar_secuencia(
+    items: Sequence[Any],
+    clave: Callable[[Any], Cursor],
+    cursor: Optional[Cursor] = None,
+    limite: int = TAMANO_PAGINA_DEFECTO,
+    descendente: bool = False,
+) -> Pagina:
+    """
+    Paginación keyset sobre una secuencia en memoria.
+
+    Misma semántica que ``paginar_consulta`` para fuentes que no están en
+    base de datos (registros de auditoría, datos de prueba...).
+
+    Args:
+        items: Elementos a paginar (en cualquier orden)
+        clave: Función que devuelve la tupla de orden de un elemento
+    """
+    if limite <= 0:
+        raise ValueError(f"Tamaño de página inválido: {limite}")
+
+    ordenados = sorted(items, key=clave, reverse=descendente)
+    inicio = 0
+    if cursor is not None:
+        claves = [clave(item) for item in ordenados]
+        if descendente:
+            # bisect requiere orden ascendente: se busca sobre la lista invertida
+            claves.reverse()
+            inicio = len(claves) - bisect.bisect_left(claves, tuple(cursor))
+        else:
+            inicio = bisect.bisect_right(claves, tuple(cursor))
+
+    pagina = ordenados[inicio : inicio + limite]
+    hay_mas = inicio + limite < len(ordenados)
+    return Pagina(pagina, clave(pagina[-1]) if hay_mas and pagina else None)
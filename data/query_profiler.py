@@ -0,0 +1,318 @@
+"""
+Perfilador de consultas SQL para DatabaseManager.
+
+Desactivado por defecto: cuando está inactivo cada consulta solo paga la
+comprobación de un atributo. Al activarlo (variable de entorno
+``HEFEST_PROFILE_SQL=1`` o desde el panel de diagnóstico) agrega por huella
+de consulta (SQL normalizado, sin literales) y módulo llamante:
+
+- número de llamadas, tiempo total/máximo y filas devueltas
+- histograma de latencias en cubetas fijas (de ahí se estiman p50/p95)
+
+Las consultas que superan el umbral de lentitud se escriben, junto con su
+``EXPLAIN QUERY PLAN``, en un log rotativo (logs/slow_queries.log).
+"""
+
+import json
+import logging
+import os
+import re
+import sys
+import threading
+from bisect import bisect_left
+from datetime import datetime
+from functools import lru_cache
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Límites superiores (ms) de las cubetas del histograma; la última es abierta
+CUBETAS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+
+UMBRAL_LENTA_MS_DEFECTO = 100.0
+RUTA_LOG_LENTAS = Path(__file__).resolve().parent.parent / "logs" / "slow_queries.log"
+
+_DIRECTORIO_DATA = os.path.dirname(os.path.abspath(__file__))
+
+# Funciones auxiliares que solo envuelven la consulta: el origen se atribuye a
+# quien las llama (p. ej. el método de RealDataManager que usa _safe_query)
+FUNCIONES_ENVOLTORIO = {"_safe_query", "safe_query", "_execute_query", "_query"}
+
+_RE_CADENA = re.compile(r"'(?:[^']|'')*'")
+_RE_NUMERO = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?\b")
+_RE_LISTA_IN = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_RE_ESPACIOS = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=2048)
+def huella_consulta(sql: str) -> str:
+    """
+    Normaliza una consulta para agrupar ejecuciones equivalentes.
+
+    Sustituye literales por ``?``, colapsa listas ``IN (?, ?, ...)`` y
+    espacios, de modo que ``WHERE id = 3`` y ``WHERE id = 7`` comparten huella.
+    """
+    huella = _RE_CADENA.sub("?", sql)
+    huella = _RE_NUMERO.sub("?", huella)
+    huella = _RE_ESPACIOS.sub(" ", huella).strip()
+    return _RE_LISTA_IN.sub("(?...)", huella)
+
+
+class EstadisticaConsulta:
+    """Acumulado de una huella de consulta desde un origen concreto"""
+
+    __slots__ = ("huella", "origen", "llamadas", "total_ms", "max_ms", "filas", "histograma", "lentas")
+
+    def __init__(self, huella: str, origen: str):
+        self.huella = huella
+        self.origen = origen
+        self.llamadas = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.filas = 0
+        self.histograma = [0] * (len(CUBETAS_MS) + 1)
+        self.lentas = 0
+
+    def registrar(self, ms: float, filas: int, lenta: bool):
+        self.llamadas += 1
+        self.total_ms += ms
+        if ms > self.max_ms:
+            self.max_ms = ms
+        self.filas += filas
+        self.histograma[bisect_left(CUBETAS_MS, ms)] += 1
+        if lenta:
+            self.lentas += 1
+
+    def percentil(self, p: float) -> float:
+        """Estimación del percentil ``p`` (0-100) con el límite de su cubeta"""
+        if not self.llamadas:
+            return 0.0
+        objetivo = self.llamadas * p / 100.0
+        acumulado = 0
+        for i, cuenta in enumerate(self.histograma):
+            acumulado += cuenta
+            if acumulado >= objetivo:
+                return CUBETAS_MS[i] if i < len(CUBETAS_MS) else self.max_ms
+        return self.max_ms
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "huella": self.huella,
+            "origen": self.origen,
+            "llamadas": self.llamadas,
+            "total_ms": round(self.total_ms, 3),
+            "media_ms": round(self.total_ms / self.llamadas, 3) if self.llamadas else 0.0,
+            "p50_ms": self.percentil(50),
+            "p95_ms": self.percentil(95),
+            "max_ms": round(self.max_ms, 3),
+            "filas": self.filas,
+            "lentas": self.lentas,
+            "histograma": dict(zip([f"<={c}" for c in CUBETAS_MS] + ["mayor"], self.histograma)),
+        }
+
+
+class QueryProfiler:
+    """Agregador de tiempos de consulta compartido por todos los DatabaseManager"""
+
+    def __init__(self, umbral_lenta_ms: float = UMBRAL_LENTA_MS_DEFECTO):
+        self.activo = False
+        self.umbral_lenta_ms = umbral_lenta_ms
+        self.ruta_log_lentas = RUTA_LOG_LENTAS
+        self._estadisticas: Dict[Tuple[str, str], EstadisticaConsulta] = {}
+        self._lock = threading.Lock()
+        self._desde: Optional[datetime] = None
+        self._log_lentas: Optional[logging.Logger] = None
+
+    # ========================================
+    # CONTROL
+    # ========================================
+
+    def activar(self, umbral_lenta_ms: Optional[float] = None):
+        if umbral_lenta_ms is not None:
+            self.umbral_lenta_ms = umbral_lenta_ms
+        if not self.activo:
+            self._desde = self._desde or datetime.now()
+            self.activo = True
+            logger.info(f"Perfilador SQL activado (umbral lentas: {self.umbral_lenta_ms} ms)")
+
+    def desactivar(self):
+        if self.activo:
+            self.activo = False
+            logger.info("Perfilador SQL desactivado")
+
+    def reiniciar(self):
+        """Descarta las estadísticas acumuladas"""
+        with self._lock:
+            self._estadisticas.clear()
+            self._desde = datetime.now() if self.activo else None
+
+    # ========================================
+    # REGISTRO
+    # ========================================
+
+    def registrar(
+        self,
+        sql: str,
+        params: Any,
+        segundos: float,
+        filas: int = 0,
+        conn=None,
+    ):
+        """
+        Registra una ejecución. Llamar solo si ``activo``.
+
+        Args:
+            conn: Conexión aún abierta, para obtener el plan si la consulta es lenta
+        """
+        ms = segundos * 1000.0
+        huella = huella_consulta(sql)
+        origen = self._origen()
+        lenta = ms >= self.umbral_lenta_ms
+
+        clave = (huella, origen)
+        with self._lock:
+            estadistica = self._estadisticas.get(clave)
+            if estadistica is None:
+                estadistica = self._estadisticas[clave] = EstadisticaConsulta(huella, origen)
+            estadistica.registrar(ms, filas, lenta)
+
+        if lenta:
+            self._registrar_lenta(sql, params, ms, filas, origen, conn)
+
+    @staticmethod
+    def _origen() -> str:
+        """Primer marco de la pila fuera del paquete data y de los envoltorios"""
+        marco = sys._getframe(2)
+        while marco is not None and os.path.dirname(marco.f_code.co_filename) == _DIRECTORIO_DATA:
+            marco = marco.f_back
+
+        envoltorio = None
+        while marco is not None and marco.f_code.co_name in FUNCIONES_ENVOLTORIO:
+            envoltorio = envoltorio or marco.f_code.co_name
+            marco = marco.f_back
+
+        if marco is None:
+            return "desconocido"
+        origen = f"{marco.f_globals.get('__name__', '?')}.{marco.f_code.co_name}"
+        return f"{origen} ({envoltorio})" if envoltorio else origen
+
+    def _registrar_lenta(self, sql, params, ms, filas, origen, conn):
+        plan: List[str] = []
+        if conn is not None and sql.lstrip()[:6].upper() in ("SELECT", "WITH ", "UPDATE", "DELETE", "INSERT"):
+            try:
+                plan = [
+                    row[3]
+                    for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", _parametros(params))
+                ]
+            except Exception as e:
+                plan = [f"(plan no disponible: {e})"]
+
+        entrada = {
+            "fecha": datetime.now().isoformat(timespec="milliseconds"),
+            "ms": round(ms, 3),
+            "origen": origen,
+            "filas": filas,
+            "sql": _RE_ESPACIOS.sub(" ", sql).strip(),
+            "params": repr(params)[:200],
+            "plan": plan,
+        }
+        try:
+            self._get_log_lentas().warning(json.dumps(entrada, ensure_ascii=False))
+        except Exception as e:
+            logger.debug(f"No se pudo escribir en el log de consultas lentas: {e}")
+
+    def _get_log_lentas(self) -> logging.Logger:
+        if self._log_lentas is None:
+            self.ruta_log_lentas.parent.mkdir(parents=True, exist_ok=True)
+            log = logging.getLogger("hefest.slow_queries")
+            log.propagate = False
+            if not log.handlers:
+                handler = RotatingFileHandler(
+                    self.ruta_log_lentas, maxBytes=2 * 1024 * 1024, backupCount=3, encoding="utf-8"
+                )
+                handler.setFormatter(logging.Formatter("%(message)s"))
+                log.addHandler(handler)
+            self._log_lentas = log
+        return self._log_lentas
+
+    # ========================================
+    # CONSULTA DE RESULTADOS
+    # ========================================
+
+    def get_estadisticas(self, ordenar_por: str = "total_ms") -> List[Dict[str, Any]]:
+        """Estadísticas por (huella, origen), de mayor a menor ``ordenar_por``"""
+        with self._lock:
+            filas = [e.to_dict() for e in self._estadisticas.values()]
+        filas.sort(key=lambda f: f[ordenar_por], reverse=True)
+        return filas
+
+    def get_resumen_por_origen(self) -> List[Dict[str, Any]]:
+        """Llamadas y tiempo total agrupados por módulo llamante"""
+        resumen: Dict[str, Dict[str, Any]] = {}
+        with self._lock:
+            for e in self._estadisticas.values():
+                r = resumen.setdefault(e.origen, {"origen": e.origen, "llamadas": 0, "total_ms": 0.0, "huellas": 0})
+                r["llamadas"] += e.llamadas
+                r["total_ms"] += e.total_ms
+                r["huellas"] += 1
+        return sorted(resumen.values(), key=lambda r: r["total_ms"], reverse=True)
+
+    def get_histogramas_por_operacion(self) -> Dict[str, Tuple[List[int], int, float]]:
+        """
+        Histograma agregado por tipo de sentencia (select, insert...).
+
+        Returns:
+            {operación: (cuentas por cubeta de CUBETAS_MS, llamadas, total_ms)}
+        """
+        resultado: Dict[str, Tuple[List[int], int, float]] = {}
+        with self._lock:
+            for e in self._estadisticas.values():
+                operacion = e.huella.split(" ", 1)[0].lower() or "?"
+                cuentas, llamadas, total = resultado.get(
+                    operacion, ([0] * (len(CUBETAS_MS) + 1), 0, 0.0)
+                )
+                for i, cuenta in enumerate(e.histograma):
+                    cuentas[i] += cuenta
+                resultado[operacion] = (cuentas, llamadas + e.llamadas, total + e.total_ms)
+        return resultado
+
+    def snapshot(self) -> Dict[str, Any]:
+        estadisticas = self.get_estadisticas()
+        return {
+            "generado": datetime.now().isoformat(),
+            "desde": self._desde.isoformat() if self._desde else None,
+            "activo": self.activo,
+            "umbral_lenta_ms": self.umbral_lenta_ms,
+            "llamadas": sum(e["llamadas"] for e in estadisticas),
+            "total_ms": round(sum(e["total_ms"] for e in estadisticas), 3),
+            "por_origen": self.get_resumen_por_origen(),
+            "consultas": estadisticas,
+        }
+
+    def exportar_json(self, ruta) -> Path:
+        """Vuelca el snapshot a un fichero JSON"""
+        ruta = Path(ruta)
+        ruta.parent.mkdir(parents=True, exist_ok=True)
+        with open(ruta, "w", encoding="utf-8") as f:
+            json.dump(self.snapshot(), f, ensure_ascii=False, indent=2)
+        return ruta
+
+
+def _parametros(params: Any) -> Sequence[Any]:
+    return params if isinstance(params, (tuple, list, dict)) else ()
+
+
+_profiler: Optional[QueryProfiler] = None
+
+
+def get_query_profiler() -> QueryProfiler:
+    """Instancia única del perfilador (compartida por todas las conexiones)"""
+    global _profiler
+    if _profiler is None:
+        _profiler = QueryProfiler()
+        if os.environ.get("HEFEST_PROFILE_SQL", "").lower() in ("1", "true", "si", "sí"):
+            umbral = os.environ.get("HEFEST_SLOW_QUERY_MS")
+            _profiler.activar(float(umbral) if umbral else None)
+    return _profiler
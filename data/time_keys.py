@@ -0,0 +1,196 @@
+"""
+Claves de tiempo indexables para comandas y reservas.
+
+``fecha_hora`` se guarda como texto ISO, con ``' '`` (comandas) o ``'T'``
+(reservas) como separador, y las consultas filtraban envolviendo la
+columna en ``DATE()``/``julianday()``: SQLite no puede usar un índice así
+y recorre toda la tabla. Cada tabla lleva además dos columnas generadas
+(``VIRTUAL``: no ocupan espacio ni hay que mantenerlas al escribir) con su
+índice:
+
+- ``fecha_hora_ts``: segundos desde 1970 del reloj de pared guardado, sin
+  zona horaria (igual que ``strftime('%s', fecha_hora)``), así que los
+  límites se calculan en Python con :func:`a_epoch` sobre fechas locales
+- ``dia_servicio``: ``AAAAMMDD`` del día de servicio; lo anterior a la hora
+  de corte (``database.service_day_cutoff``, 05:00 por defecto) cuenta
+  para el día anterior, como la caja de una noche que cierra de madrugada
+
+Las consultas por ventana temporal usan rangos (``fecha_hora_ts >= ? AND
+fecha_hora_ts < ?``) o igualdad (``dia_servicio = ?``) con los valores de
+:func:`rango_dia`, :func:`rango_dia_servicio` y :func:`clave_dia_servicio`.
+
+:func:`asegurar_claves_tiempo` añade las columnas e índices si faltan y
+recrea ``dia_servicio`` si cambia la hora de corte. Requiere SQLite 3.31
+(columnas generadas).
+"""
+
+import calendar
+import logging
+import sqlite3
+from datetime import date, datetime, time, timedelta
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+from .backup_manager import cargar_config_database
+
+logger = logging.getLogger(__name__)
+
+COLUMNA_TS = "fecha_hora_ts"
+COLUMNA_DIA = "dia_servicio"
+HORA_CORTE_DEFECTO = "05:00"
+
+# Tabla -> columna de texto de la que salen las claves
+TABLAS_CON_CLAVES: Dict[str, str] = {
+    "comandas": "fecha_hora",
+    "reservas": "fecha_hora",
+}
+
+INDICES_CLAVES: Dict[str, List[Tuple[str, str]]] = {
+    "comandas": [
+        ("idx_comandas_dia_servicio", COLUMNA_DIA),
+        ("idx_comandas_fecha_ts", COLUMNA_TS),
+    ],
+    "reservas": [
+        ("idx_reservas_mesa_fecha_ts", f"mesa_id, {COLUMNA_TS}"),
+        ("idx_reservas_estado_fecha_ts", f"estado, {COLUMNA_TS}"),
+    ],
+}
+
+
+# ========================================
+# HORA DE CORTE
+# ========================================
+
+
+def _parsear_corte(valor) -> int:
+    """Minutos tras la medianoche de un ``"HH:MM"`` (o de un entero de minutos)"""
+    if isinstance(valor, int):
+        minutos = valor
+    else:
+        horas, _, mins = str(valor).strip().partition(":")
+        minutos = int(horas) * 60 + int(mins or 0)
+    if not 0 <= minutos < 24 * 60:
+        raise ValueError(f"Hora de corte fuera de rango: {valor}")
+    return minutos
+
+
+@lru_cache(maxsize=1)
+def minutos_corte() -> int:
+    """Hora de corte del día de servicio configurada, en minutos"""
+    config = cargar_config_database("service_day_", {"service_day_cutoff": HORA_CORTE_DEFECTO})
+    try:
+        return _parsear_corte(config["service_day_cutoff"])
+    except (TypeError, ValueError) as e:
+        logger.warning(f"service_day_cutoff inválido ({e}): se usa {HORA_CORTE_DEFECTO}")
+        return _parsear_corte(HORA_CORTE_DEFECTO)
+
+
+# ========================================
+# CONVERSIONES
+# ========================================
+
+
+def a_epoch(fecha: datetime) -> int:
+    """Segundos del reloj de pared de ``fecha``, comparables con ``fecha_hora_ts``"""
+    return calendar.timegm(fecha.replace(tzinfo=None).timetuple())
+
+
+def dia_servicio(fecha: Optional[datetime] = None, corte: Optional[int] = None) -> date:
+    """Día de servicio al que pertenece ``fecha`` (por defecto, ahora)"""
+    corte = minutos_corte() if corte is None else corte
+    return ((fecha or datetime.now()) - timedelta(minutes=corte)).date()
+
+
+def clave_dia(dia: date) -> int:
+    """``AAAAMMDD`` de un día, el formato de ``dia_servicio``"""
+    return dia.year * 10000 + dia.month * 100 + dia.day
+
+
+def clave_dia_servicio(fecha: Optional[datetime] = None, dias: int = 0, corte: Optional[int] = None) -> int:
+    """Clave del día de servicio de ``fecha`` desplazado ``dias`` (``-1``: el anterior)"""
+    return clave_dia(dia_servicio(fecha, corte) + timedelta(days=dias))
+
+
+def rango_dia(dia: date) -> Tuple[int, int]:
+    """``[inicio, fin)`` en ``fecha_hora_ts`` del día natural"""
+    inicio = datetime.combine(dia, time())
+    return a_epoch(inicio), a_epoch(inicio + timedelta(days=1))
+
+
+def rango_dia_servicio(dia: date, corte: Optional[int] = None) -> Tuple[int, int]:
+    """``[inicio, fin)`` en ``fecha_hora_ts`` del día de servicio (de corte a corte)"""
+    corte = minutos_corte() if corte is None else corte
+    inicio = datetime.combine(dia, time()) + timedelta(minutes=corte)
+    return a_epoch(inicio), a_epoch(inicio + timedelta(days=1))
+
+
+# ========================================
+# ESQUEMA
+# ========================================
+
+
+def _expresion_ts(columna: str) -> str:
+    return f"CAST(strftime('%s', {columna}) AS INTEGER)"
+
+
+def _expresion_dia(columna: str, corte: int) -> str:
+    return f"CAST(strftime('%Y%m%d', {columna}, '-{corte} minutes') AS INTEGER)"
+
+
+def asegurar_claves_tiempo(conn: sqlite3.Connection, corte: Optional[int] = None) -> List[str]:
+    """
+    Añade las columnas generadas e índices de :data:`TABLAS_CON_CLAVES` que falten.
+
+    Idempotente y barato si ya están (lee ``table_xinfo`` y ``sqlite_master``).
+    Las tablas que no existen o no tienen la columna de origen se saltan.
+
+    Returns:
+        Los cambios aplicados, para el log
+    """
+    corte = minutos_corte() if corte is None else corte
+    cambios: List[str] = []
+    for tabla, origen in TABLAS_CON_CLAVES.items():
+        fila = conn.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (tabla,)).fetchone()
+        if not fila:
+            continue
+        # table_xinfo: table_info no lista las columnas generadas
+        columnas = {row[1] for row in conn.execute(f"PRAGMA table_xinfo({tabla})")}
+        if origen not in columnas:
+            continue
+        try:
+            if COLUMNA_TS not in columnas:
+                conn.execute(
+                    f"ALTER TABLE {tabla} ADD COLUMN {COLUMNA_TS} INTEGER "
+                    f"GENERATED ALWAYS AS ({_expresion_ts(origen)}) VIRTUAL"
+                )
+                cambios.append(f"{tabla}.{COLUMNA_TS}")
+
+            expresion = _expresion_dia(origen, corte)
+            if COLUMNA_DIA in columnas and expresion not in fila[0]:
+                # Cambió la hora de corte: la columna virtual se recrea sin reescribir filas
+                for nombre, definicion in INDICES_CLAVES.get(tabla, []):
+                    if COLUMNA_DIA in definicion:
+                        conn.execute(f"DROP INDEX IF EXISTS {nombre}")
+                conn.execute(f"ALTER TABLE {tabla} DROP COLUMN {COLUMNA_DIA}")
+                columnas.discard(COLUMNA_DIA)
+            if COLUMNA_DIA not in columnas:
+                conn.execute(
+                    f"ALTER TABLE {tabla} ADD COLUMN {COLUMNA_DIA} INTEGER "
+                    f"GENERATED ALWAYS AS ({expresion}) VIRTUAL"
+                )
+                cambios.append(f"{tabla}.{COLUMNA_DIA} (corte {corte // 60:02d}:{corte % 60:02d})")
+
+            existentes = {
+                row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = ?", (tabla,))
+            }
+            for nombre, definicion in INDICES_CLAVES.get(tabla, []):
+                if nombre not in existentes:
+                    conn.execute(f"CREATE INDEX IF NOT EXISTS {nombre} ON {tabla}({definicion})")
+                    cambios.append(nombre)
+        except sqlite3.OperationalError as e:
+            # Otro terminal pudo adelantarse ("duplicate column name"), o SQLite < 3.31
+            logger.warning(f"No se pudieron crear las claves de tiempo de {tabla}: {e}")
+    if cambios:
+        conn.commit()
+        logger.info(f"Claves de tiempo creadas: {', '.join(cambios)}")
+    return cambios
@@ -0,0 +1,387 @@
+"""
+Cola de escritura única para hefest.db.
+
+Un hilo escritor es dueño de la única conexión que escribe desde este
+proceso. Las escrituras (``DatabaseManager.execute``/``execute_many``/
+``update``/``delete``/``transaccion``) se encolan y devuelven un
+``concurrent.futures.Future``; el escritor toma lo que haya en la cola
+(hasta ``write_queue_max_batch`` operaciones) y lo confirma en una sola
+transacción ``BEGIN IMMEDIATE`` (group commit): un solo fsync para todas.
+
+- Cada operación corre en su propio ``SAVEPOINT``: si falla, se deshace
+  solo ella y su futuro recibe la excepción; el resto del lote se confirma.
+- Los futuros se resuelven tras el ``COMMIT``, nunca antes.
+- ``database is locked``/``busy`` (otro terminal escribiendo) deshace el
+  lote entero y lo reintenta con espera exponencial acotada y jitter, hasta
+  ``write_queue_retries`` veces; después fallan todos sus futuros. Por eso
+  las funciones de :meth:`ColaEscritura.enviar_funcion` pueden ejecutarse
+  más de una vez y no deben tener efectos fuera de la conexión.
+- Las transacciones son cortas: el bloqueo de escritura se toma al empezar
+  el lote y se suelta al confirmarlo.
+
+:meth:`ColaEscritura.estadisticas` da la profundidad de la cola y la
+latencia de commit (p50/p95/máx.); con el endpoint de métricas activo se
+publican también como ``hefest_db_write_queue_depth`` y
+``hefest_db_write_commit_seconds``.
+"""
+
+import logging
+import os
+import queue
+import random
+import sqlite3
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from .backup_manager import cargar_config_database
+from .change_log import marcar_origen
+
+logger = logging.getLogger(__name__)
+
+CONFIG_DEFECTO: Dict[str, Any] = {
+    "write_queue_enabled": True,
+    "write_queue_max_batch": 100,
+    "write_queue_retries": 6,
+    "write_queue_busy_timeout_ms": 250,
+}
+
+# Espera entre reintentos: base * 2^intento, con tope y jitter (50-100 %)
+ESPERA_BASE_S = 0.02
+ESPERA_MAX_S = 1.0
+MUESTRAS_LATENCIA = 1000
+
+CUBETAS_COMMIT_SEGUNDOS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+_FIN = object()
+
+
+def es_bloqueo(error: BaseException) -> bool:
+    """``database is locked``/``busy``: contención con otra conexión"""
+    if not isinstance(error, sqlite3.OperationalError):
+        return False
+    mensaje = str(error).lower()
+    return "locked" in mensaje or "busy" in mensaje
+
+
+@dataclass
+class ResultadoEscritura:
+    """Resultado de una sentencia confirmada"""
+
+    lastrowid: Optional[int]
+    rowcount: int
+
+
+@dataclass
+class _Operacion:
+    futuro: Future
+    sql: Optional[str] = None
+    params: Any = ()
+    many: bool = False
+    funcion: Optional[Callable[[sqlite3.Connection], Any]] = None
+    encolada: float = field(default_factory=time.perf_counter)
+
+    def ejecutar(self, conn: sqlite3.Connection) -> Any:
+        if self.funcion is not None:
+            return self.funcion(conn)
+        if self.many:
+            cursor = conn.executemany(self.sql, self.params)
+        else:
+            cursor = conn.execute(self.sql, self.params)
+        return ResultadoEscritura(cursor.lastrowid, max(cursor.rowcount, 0))
+
+
+class ColaEscritura:
+    """Hilo escritor con group commit y reintentos ante bloqueos"""
+
+    def __init__(self, db_path: str, config: Optional[Dict[str, Any]] = None):
+        self.db_path = db_path
+        self.config = config or cargar_config_database("write_queue_", CONFIG_DEFECTO)
+        self.max_lote = max(1, int(self.config["write_queue_max_batch"]))
+        self.max_reintentos = max(0, int(self.config["write_queue_retries"]))
+        self.busy_timeout_s = max(0, int(self.config["write_queue_busy_timeout_ms"])) / 1000.0
+
+        self._cola: "queue.Queue" = queue.Queue()
+        self._hilo: Optional[threading.Thread] = None
+        self._aceptando = False
+        self._lock = threading.Lock()
+
+        self._latencias_commit: deque = deque(maxlen=MUESTRAS_LATENCIA)
+        self.operaciones = 0
+        self.lotes = 0
+        self.reintentos = 0
+        self.lotes_fallidos = 0
+        self.profundidad_max = 0
+        self.ultima_espera_ms = 0.0
+
+        self._histograma_commit = None
+        try:
+            from utils.metrics_endpoint import get_metrics_registry
+
+            self._histograma_commit = get_metrics_registry().histogram(
+                "hefest_db_write_commit_seconds",
+                "Duración de cada transacción de la cola de escritura (BEGIN..COMMIT)",
+                CUBETAS_COMMIT_SEGUNDOS,
+            )
+        except Exception as e:
+            logger.debug(f"Histograma de commits no disponible: {e}")
+
+    # ========================================
+    # CICLO DE VIDA
+    # ========================================
+
+    @property
+    def activa(self) -> bool:
+        return self._aceptando
+
+    @property
+    def en_hilo_escritor(self) -> bool:
+        return self._hilo is not None and threading.current_thread() is self._hilo
+
+    def iniciar(self):
+        if self._hilo is not None:
+            return
+        self._aceptando = True
+        self._hilo = threading.Thread(target=self._bucle, name="hefest-escritor", daemon=True)
+        self._hilo.start()
+        logger.info(f"Cola de escritura activa (lotes de hasta {self.max_lote}, {self.max_reintentos} reintentos)")
+
+    def detener(self, timeout: float = 10.0):
+        """Deja de aceptar escrituras, confirma lo pendiente y para el hilo"""
+        if self._hilo is None:
+            return
+        self._aceptando = False
+        self._cola.put(_FIN)
+        self._hilo.join(timeout)
+        if self._hilo.is_alive():
+            logger.warning("La cola de escritura no terminó a tiempo")
+        self._hilo = None
+
+    # ========================================
+    # API
+    # ========================================
+
+    def _encolar(self, operacion: _Operacion) -> Future:
+        if not self._aceptando:
+            raise RuntimeError("La cola de escritura no está activa")
+        self._cola.put(operacion)
+        profundidad = self._cola.qsize()
+        if profundidad > self.profundidad_max:
+            self.profundidad_max = profundidad
+        return operacion.futuro
+
+    def enviar(self, sql: str, params: Sequence = ()) -> Future:
+        """Encola una sentencia; el futuro da un :class:`ResultadoEscritura`"""
+        return self._encolar(_Operacion(Future(), sql=sql, params=params))
+
+    def enviar_many(self, sql: str, params_list) -> Future:
+        return self._encolar(_Operacion(Future(), sql=sql, params=list(params_list), many=True))
+
+    def enviar_funcion(self, funcion: Callable[[sqlite3.Connection], Any]) -> Future:
+        """
+        Encola ``funcion(conn)``, que puede leer y escribir dentro de la
+        transacción del lote (sin hacer ``commit``); el futuro da lo que devuelva.
+        """
+        return self._encolar(_Operacion(Future(), funcion=funcion))
+
+    @property
+    def profundidad(self) -> int:
+        return self._cola.qsize()
+
+    def estadisticas(self) -> Dict[str, Any]:
+        with self._lock:
+            latencias = sorted(self._latencias_commit)
+
+        def percentil(p: float) -> float:
+            if not latencias:
+                return 0.0
+            return round(latencias[min(len(latencias) - 1, int(len(latencias) * p / 100.0))], 3)
+
+        return {
+            "activa": self.activa,
+            "profundidad": self.profundidad,
+            "profundidad_max": self.profundidad_max,
+            "operaciones": self.operaciones,
+            "lotes": self.lotes,
+            "operaciones_por_lote": round(self.operaciones / self.lotes, 2) if self.lotes else 0.0,
+            "reintentos": self.reintentos,
+            "lotes_fallidos": self.lotes_fallidos,
+            "commit_p50_ms": percentil(50),
+            "commit_p95_ms": percentil(95),
+            "commit_max_ms": round(latencias[-1], 3) if latencias else 0.0,
+            "ultima_espera_ms": round(self.ultima_espera_ms, 3),
+        }
+
+    # ========================================
+    # HILO ESCRITOR
+    # ========================================
+
+    def _conectar(self) -> sqlite3.Connection:
+        # Autocommit: las transacciones las abre y cierra el escritor
+        conn = sqlite3.connect(self.db_path, timeout=self.busy_timeout_s, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        # El sondeo de cambios no debe devolver a la interfaz lo que ella misma escribió
+        marcar_origen(conn)
+        return conn
+
+    def _bucle(self):
+        conn = self._conectar()
+        try:
+            terminar = False
+            while not terminar:
+                operacion = self._cola.get()
+                if operacion is _FIN:
+                    terminar = True
+                    operacion = None
+                lote = [operacion] if operacion is not None else []
+                # Group commit: todo lo que ya espera entra en la misma transacción
+                while len(lote) < self.max_lote:
+                    try:
+                        siguiente = self._cola.get_nowait()
+                    except queue.Empty:
+                        break
+                    if siguiente is _FIN:
+                        terminar = True
+                        continue
+                    lote.append(siguiente)
+                lote = [op for op in lote if op.futuro.set_running_or_notify_cancel()]
+                if not lote:
+                    continue
+                try:
+                    self._procesar(conn, lote)
+                except Exception as e:
+                    # Nunca dejar a nadie esperando un futuro que no llegará
+                    logger.exception(f"Cola de escritura: error inesperado: {e}")
+                    for operacion in lote:
+                        if not operacion.futuro.done():
+                            operacion.futuro.set_exception(e)
+                    conn.close()
+                    conn = self._conectar()
+        finally:
+            conn.close()
+
+    def _procesar(self, conn: sqlite3.Connection, lote: List[_Operacion]):
+        self.ultima_espera_ms = (time.perf_counter() - lote[0].encolada) * 1000
+        for intento in range(self.max_reintentos + 1):
+            try:
+                resultados = self._transaccion(conn, lote)
+            except sqlite3.Error as e:
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+                if es_bloqueo(e) and intento < self.max_reintentos:
+                    self.reintentos += 1
+                    espera = min(ESPERA_MAX_S, ESPERA_BASE_S * (2 ** intento))
+                    time.sleep(espera * random.uniform(0.5, 1.0))
+                    continue
+                self.lotes_fallidos += 1
+                logger.error(f"Cola de escritura: lote de {len(lote)} operaciones descartado: {e}")
+                for operacion in lote:
+                    operacion.futuro.set_exception(e)
+                return
+
+            self.lotes += 1
+            self.operaciones += len(lote)
+            for operacion, (ok, valor) in zip(lote, resultados):
+                if ok:
+                    operacion.futuro.set_result(valor)
+                else:
+                    operacion.futuro.set_exception(valor)
+            return
+
+    def _transaccion(self, conn: sqlite3.Connection, lote: List[_Operacion]) -> List[tuple]:
+        """Ejecuta el lote y confirma; los errores de bloqueo suben para reintentar"""
+        inicio = time.perf_counter()
+        conn.execute("BEGIN IMMEDIATE")
+        resultados = []
+        for operacion in lote:
+            conn.execute("SAVEPOINT operacion")
+            try:
+                valor = operacion.ejecutar(conn)
+            except Exception as e:
+                if es_bloqueo(e):
+                    raise
+                conn.execute("ROLLBACK TO operacion")
+                resultados.append((False, e))
+            else:
+                resultados.append((True, valor))
+            conn.execute("RELEASE operacion")
+        conn.execute("COMMIT")
+
+        duracion = time.perf_counter() - inicio
+        with self._lock:
+            self._latencias_commit.append(duracion * 1000)
+        if self._histograma_commit is not None:
+            self._histograma_commit.observe(duracion)
+        return resultados
+
+
+# ========================================
+# INSTANCIAS POR BASE DE DATOS
+# ========================================
+
+_colas: Dict[str, ColaEscritura] = {}
+_colas_lock = threading.Lock()
+
+
+def _clave(db_path: str) -> str:
+    return os.path.normcase(os.path.abspath(db_path))
+
+
+def get_cola_escritura(db_path: str) -> Optional[ColaEscritura]:
+    """Cola activa de ``db_path``, o ``None`` (se escribe directamente)"""
+    cola = _colas.get(_clave(db_path))
+    return cola if cola is not None and cola.activa else None
+
+
+def iniciar_cola_escritura(db_path: str) -> Optional[ColaEscritura]:
+    """Arranca la cola si ``write_queue_enabled`` (``HEFEST_COLA_ESCRITURA=0`` la desactiva)"""
+    if os.environ.get("HEFEST_COLA_ESCRITURA") == "0":
+        return None
+    try:
+        with _colas_lock:
+            cola = _colas.get(_clave(db_path))
+            nueva = cola is None
+            if nueva:
+                cola = ColaEscritura(db_path)
+                if not cola.config.get("write_queue_enabled", True):
+                    return None
+                _colas[_clave(db_path)] = cola
+            cola.iniciar()
+        if nueva:
+            _registrar_metricas(cola)
+        return cola
+    except Exception as e:
+        logger.error(f"No se pudo iniciar la cola de escritura: {e}")
+        return None
+
+
+def _registrar_metricas(cola: ColaEscritura):
+    try:
+        from utils.metrics_endpoint import get_metrics_registry
+    except ImportError:
+        return
+
+    def recolectar():
+        yield (
+            "hefest_db_write_queue_depth",
+            "gauge",
+            "Escrituras pendientes en la cola del hilo escritor",
+            [("", {}, cola.profundidad)],
+        )
+        yield (
+            "hefest_db_write_batches",
+            "counter",
+            "Transacciones confirmadas por la cola de escritura",
+            [("_total", {}, cola.lotes)],
+        )
+        yield (
+            "hefest_db_write_retries",
+            "counter",
+            "Reintentos por base de datos bloqueada",
+            [("_total", {}, cola.reintentos)],
+        )
+
+    get_metrics_registry().register_collector(recolectar)
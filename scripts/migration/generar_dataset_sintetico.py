@@ -0,0 +1,819 @@
+#!/usr/bin/env python3
+"""
+Generador de datos sintéticos: restaurante y hotel con varios años de historia
+
+Descripción: Crea una base de datos NUEVA con el esquema de data/hefest.db
+(leído en solo lectura, nunca se modifica) y la llena con datos realistas y
+reproducibles: zonas y mesas, categorías, proveedores, productos, empleados,
+clientes, comandas con sus líneas, reservas de mesa, movimientos de stock,
+habitaciones y estancias de hotel.
+
+- Estacionalidad diaria (desayuno, comida y cena), semanal (fines de semana
+  más fuertes), anual (verano y Navidad) y crecimiento interanual.
+- Popularidad de productos tipo Zipf: pocos productos concentran las ventas.
+- Stock coherente: las ventas del día se agregan por producto en
+  movimientos ``venta`` y se repone con ``entrada`` al bajar del umbral.
+- Misma semilla, escala y ``--hasta`` producen exactamente los mismos datos.
+
+Las estancias de hotel se guardan en ``reservas`` con el formato de
+hospedería (``cliente_id``, ``fecha_entrada``, ``fecha_salida``,
+``mesa_id = 0``) y estados distintos de ``activa``, para no mezclarse con
+las reservas de mesa.
+
+Uso (desde la raíz del proyecto):
+
+    python scripts/migration/generar_dataset_sintetico.py /tmp/hefest_mediano.db
+    python scripts/migration/generar_dataset_sintetico.py /tmp/h.db --escala grande --semilla 7
+    python scripts/migration/generar_dataset_sintetico.py /tmp/h.db --anios 5 --hasta 2025-06-30
+
+También se puede importar: ``generar_dataset(ruta, escala="pequeno")``.
+"""
+
+import argparse
+import math
+import os
+import sqlite3
+import sys
+import time
+from dataclasses import dataclass, replace
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+DB_REFERENCIA = os.path.join(RAIZ, "data", "hefest.db")
+
+FORMATO_FECHA_HORA = "%Y-%m-%d %H:%M:%S"
+
+
+# ========================================
+# ESCALAS
+# ========================================
+
+
+@dataclass(frozen=True)
+class EscalaDataset:
+    zonas: int
+    mesas: int
+    productos: int
+    proveedores: int
+    empleados: int
+    clientes: int
+    habitaciones: int
+    anios: int
+    # Comandas por mesa y día en un día medio
+    rotacion_mesa: float
+
+
+ESCALAS: Dict[str, EscalaDataset] = {
+    "pequeno": EscalaDataset(
+        zonas=5, mesas=50, productos=1_000, proveedores=200, empleados=15,
+        clientes=2_000, habitaciones=20, anios=1, rotacion_mesa=0.8,
+    ),
+    "mediano": EscalaDataset(
+        zonas=20, mesas=500, productos=10_000, proveedores=2_000, empleados=60,
+        clientes=20_000, habitaciones=100, anios=2, rotacion_mesa=0.8,
+    ),
+    "grande": EscalaDataset(
+        zonas=60, mesas=2_000, productos=50_000, proveedores=20_000, empleados=250,
+        clientes=100_000, habitaciones=400, anios=5, rotacion_mesa=0.8,
+    ),
+}
+
+# Lunes..domingo
+FACTOR_SEMANAL = np.array([0.70, 0.75, 0.85, 0.95, 1.30, 1.45, 1.10])
+CRECIMIENTO_ANUAL = 0.05
+
+# (nombre, peso, minuto central, desviación en minutos)
+SERVICIOS = (
+    ("desayuno", 0.12, 9 * 60, 50),
+    ("comida", 0.45, 14 * 60 + 15, 45),
+    ("cena", 0.43, 21 * 60 + 30, 55),
+)
+
+# (nombre, descripción, peso, precio medio, stock mínimo)
+CATEGORIAS = (
+    ("Bebidas", "Refrescos, aguas y zumos", 0.20, 2.5, 24),
+    ("Cervezas", "Cervezas de barril y botella", 0.10, 3.0, 24),
+    ("Vinos", "Vinos por copa y botella", 0.12, 18.0, 6),
+    ("Cafetería", "Cafés, infusiones y desayunos", 0.08, 1.8, 20),
+    ("Entrantes", "Raciones y entrantes", 0.14, 9.0, 10),
+    ("Principales", "Carnes, pescados y arroces", 0.16, 16.0, 8),
+    ("Postres", "Postres caseros y helados", 0.08, 5.5, 10),
+    ("Licores", "Destilados y combinados", 0.06, 7.0, 6),
+    ("Limpieza", "Objetos y materiales de limpieza", 0.03, 6.0, 5),
+    ("Menaje", "Vajilla, cubertería y consumibles", 0.03, 4.0, 5),
+)
+CATEGORIAS_VENDIBLES = 8  # Limpieza y Menaje no se venden en sala
+
+PALABRAS_PRODUCTO = {
+    "Bebidas": (["Agua", "Refresco", "Zumo", "Tónica", "Limonada", "Batido"],
+                ["Natural", "de Naranja", "de Limón", "Cola", "sin Gas", "con Gas", "de Melocotón"]),
+    "Cervezas": (["Cerveza", "Caña", "Tercio", "Jarra", "Clara"],
+                 ["Rubia", "Tostada", "Negra", "Sin Alcohol", "Artesana", "de Trigo"]),
+    "Vinos": (["Tinto", "Blanco", "Rosado", "Cava", "Verdejo", "Albariño"],
+              ["Crianza", "Reserva", "Joven", "Roble", "Brut", "Semiseco"]),
+    "Cafetería": (["Café", "Cortado", "Capuchino", "Infusión", "Tostada", "Croissant"],
+                  ["Solo", "con Leche", "Descafeinado", "con Tomate", "Integral", "Doble"]),
+    "Entrantes": (["Croquetas", "Ensalada", "Patatas", "Jamón", "Calamares", "Gambas"],
+                  ["Caseras", "Mixta", "Bravas", "Ibérico", "a la Romana", "al Ajillo"]),
+    "Principales": (["Entrecot", "Merluza", "Paella", "Secreto", "Lubina", "Risotto"],
+                    ["a la Brasa", "a la Plancha", "Mixta", "Ibérico", "al Horno", "de Setas"]),
+    "Postres": (["Tarta", "Flan", "Helado", "Brownie", "Natillas", "Coulant"],
+                ["de Queso", "Casero", "de Vainilla", "de Chocolate", "de la Abuela"]),
+    "Licores": (["Ginebra", "Ron", "Whisky", "Vodka", "Orujo", "Pacharán"],
+                ["Premium", "Añejo", "Reserva", "de Hierbas", "Seco"]),
+    "Limpieza": (["Detergente", "Lejía", "Desengrasante", "Bayetas", "Guantes"],
+                 ["Industrial", "Concentrado", "Multiusos", "Profesional"]),
+    "Menaje": (["Servilletas", "Vasos", "Platos", "Copas", "Cubiertos"],
+               ["Desechables", "de Cristal", "de Porcelana", "Compostables"]),
+}
+FORMATOS = ["", "", "", " 33cl", " 50cl", " 75cl", " 1L", " XL", " Media", " Ración"]
+
+NOMBRES = ["María", "José", "Carmen", "Antonio", "Lucía", "Manuel", "Ana", "Francisco",
+           "Laura", "David", "Marta", "Javier", "Elena", "Daniel", "Sara", "Pablo",
+           "Paula", "Sergio", "Cristina", "Jorge", "Raquel", "Alberto", "Nuria", "Diego"]
+APELLIDOS = ["García", "González", "Rodríguez", "Fernández", "López", "Martínez",
+             "Sánchez", "Pérez", "Gómez", "Martín", "Jiménez", "Ruiz", "Hernández",
+             "Díaz", "Moreno", "Álvarez", "Muñoz", "Romero", "Alonso", "Gutiérrez",
+             "Navarro", "Torres", "Domínguez", "Vázquez", "Ramos", "Gil", "Serrano"]
+TIPOS_EMPRESA = ["Distribuciones", "Suministros", "Comercial", "Bodegas", "Almacenes",
+                 "Hostelería", "Alimentación", "Importaciones"]
+SUFIJOS_EMPRESA = ["S.L.", "S.A.", "e Hijos", "Hermanos", "Grupo", "Ibérica"]
+CALLES = ["Calle Mayor", "Avenida de la Constitución", "Calle Real", "Paseo del Prado",
+          "Calle San Juan", "Polígono Industrial Norte", "Camino Viejo", "Plaza España"]
+ZONAS_BASE = ["Terraza", "Interior", "Barra", "VIP", "Jardín", "Reservado", "Comedor"]
+
+# (tipo, peso, precio base)
+TIPOS_HABITACION = (("Individual", 0.25, 60.0), ("Doble", 0.50, 85.0),
+                    ("Triple", 0.10, 110.0), ("Suite", 0.15, 140.0))
+LETRAS_DNI = "TRWAGMYFPDXBNJZSQVHLCKE"
+
+
+# ========================================
+# ESQUEMA
+# ========================================
+
+
+def _es_base_de_datos_real(ruta: str) -> bool:
+    return os.path.realpath(ruta) == os.path.realpath(DB_REFERENCIA)
+
+
+def copiar_esquema(conn: sqlite3.Connection, referencia: str = DB_REFERENCIA) -> List[str]:
+    """Crea las tablas de la base de referencia y devuelve sus índices (para el final)"""
+    origen = sqlite3.connect(f"file:{referencia}?mode=ro", uri=True)
+    try:
+        objetos = origen.execute(
+            "SELECT type, sql FROM sqlite_master "
+            "WHERE sql IS NOT NULL AND name NOT LIKE 'sqlite_%' "
+            "ORDER BY CASE type WHEN 'table' THEN 0 ELSE 1 END"
+        ).fetchall()
+        usuarios = origen.execute("SELECT * FROM usuarios").fetchall()
+    finally:
+        origen.close()
+
+    indices = []
+    for tipo, sql in objetos:
+        if tipo == "table":
+            conn.execute(sql)
+        else:
+            indices.append(sql)
+    # Los usuarios de acceso se conservan para poder iniciar sesión
+    if usuarios:
+        marcadores = ", ".join("?" for _ in usuarios[0])
+        conn.executemany(f"INSERT INTO usuarios VALUES ({marcadores})", usuarios)
+    return indices
+
+
+# ========================================
+# GENERADOR
+# ========================================
+
+
+class GeneradorDataset:
+    """Genera un dataset completo sobre una conexión con el esquema ya creado"""
+
+    def __init__(
+        self,
+        conn: sqlite3.Connection,
+        escala: EscalaDataset,
+        semilla: int,
+        hasta: datetime,
+        progreso: Callable[[str], None] = print,
+    ):
+        self.conn = conn
+        self.escala = escala
+        self.rng = np.random.default_rng(semilla)
+        self.hasta = hasta
+        self.desde = date(hasta.year - escala.anios, hasta.month, min(hasta.day, 28))
+        self.progreso = progreso
+        self.filas: Dict[str, int] = {}
+
+    def _insertar(self, tabla: str, columnas: Iterable[str], filas: Iterable[tuple]):
+        columnas = list(columnas)
+        cursor = self.conn.executemany(
+            f"INSERT INTO {tabla} ({', '.join(columnas)}) VALUES ({', '.join('?' for _ in columnas)})",
+            filas,
+        )
+        self.filas[tabla] = self.filas.get(tabla, 0) + max(cursor.rowcount, 0)
+
+    def _nombres_personas(self, n: int) -> List[str]:
+        nombres = self.rng.integers(0, len(NOMBRES), n)
+        ap1 = self.rng.integers(0, len(APELLIDOS), n)
+        ap2 = self.rng.integers(0, len(APELLIDOS), n)
+        return [f"{NOMBRES[a]} {APELLIDOS[b]} {APELLIDOS[c]}" for a, b, c in zip(nombres, ap1, ap2)]
+
+    def _telefonos(self, n: int) -> List[str]:
+        return [f"+34 6{t:08d}" for t in self.rng.integers(0, 10**8, n)]
+
+    @staticmethod
+    def _dni(numero: int) -> str:
+        return f"{numero:08d}{LETRAS_DNI[numero % 23]}"
+
+    def generar(self) -> Dict[str, int]:
+        inicio = time.perf_counter()
+        self._maestros()
+        self._historia()
+        self._hotel()
+        self._estado_actual()
+        self.progreso(f"Generación completada en {time.perf_counter() - inicio:.1f} s")
+        return dict(self.filas)
+
+    # ========================================
+    # DATOS MAESTROS
+    # ========================================
+
+    def _maestros(self):
+        e = self.escala
+        rng = self.rng
+        fecha_alta = f"{self.desde.isoformat()} 09:00:00"
+
+        # Zonas y mesas
+        zonas = [ZONAS_BASE[i] if i < len(ZONAS_BASE) else f"Salón {i - len(ZONAS_BASE) + 1}"
+                 for i in range(e.zonas)]
+        prefijos = [z[0] if i < len(ZONAS_BASE) else f"S{i - len(ZONAS_BASE) + 1}-"
+                    for i, z in enumerate(zonas)]
+        self._insertar("zonas", ["id", "nombre"], ((i + 1, z) for i, z in enumerate(zonas)))
+        # Las primeras zonas son las más grandes
+        pesos_zona = 1.0 / np.arange(1, e.zonas + 1) ** 0.5
+        zona_mesa = np.sort(rng.choice(e.zonas, e.mesas, p=pesos_zona / pesos_zona.sum()))
+        zona_mesa[: e.zonas] = np.arange(e.zonas)  # ninguna zona vacía
+        zona_mesa.sort()
+        capacidades = rng.choice([2, 4, 6, 8, 10], e.mesas, p=[0.35, 0.40, 0.15, 0.07, 0.03])
+        filas, contador = [], {}
+        for mesa_id, (zona, capacidad) in enumerate(zip(zona_mesa.tolist(), capacidades.tolist()), 1):
+            contador[zona] = contador.get(zona, 0) + 1
+            filas.append((mesa_id, f"{prefijos[zona]}{contador[zona]:02d}", zonas[zona], "libre", capacidad))
+        self._insertar("mesas", ["id", "numero", "zona", "estado", "capacidad"], filas)
+        self.mesa_capacidad = capacidades
+
+        # Categorías
+        self._insertar(
+            "categorias",
+            ["id", "nombre", "descripcion", "fecha_creacion", "activa"],
+            ((i + 1, c[0], c[1], fecha_alta, 1) for i, c in enumerate(CATEGORIAS)),
+        )
+
+        # Proveedores
+        n = e.proveedores
+        cat_prov = rng.integers(0, len(CATEGORIAS), n)
+        tipos = rng.integers(0, len(TIPOS_EMPRESA), n)
+        apellidos = rng.integers(0, len(APELLIDOS), n)
+        sufijos = rng.integers(0, len(SUFIJOS_EMPRESA), n)
+        contactos = self._nombres_personas(n)
+        telefonos = self._telefonos(n)
+        calles = rng.integers(0, len(CALLES), n)
+        portales = rng.integers(1, 200, n)
+        dias_alta = rng.integers(0, 365 * e.anios, n)
+        activos = rng.random(n) < 0.93
+        self.nombres_proveedor = [
+            f"{TIPOS_EMPRESA[t]} {APELLIDOS[a]} {SUFIJOS_EMPRESA[s]}"
+            for t, a, s in zip(tipos, apellidos, sufijos)
+        ]
+        self._insertar(
+            "proveedores",
+            ["id", "nombre", "contacto", "telefono", "email", "direccion",
+             "fecha_registro", "activo", "notas", "categoria"],
+            (
+                (
+                    i + 1, self.nombres_proveedor[i], contactos[i], telefonos[i],
+                    f"pedidos{i + 1}@proveedor{i + 1}.es",
+                    f"{CALLES[calles[i]]} {portales[i]}",
+                    (self.desde + timedelta(days=int(dias_alta[i]))).isoformat() + " 10:00:00",
+                    int(activos[i]), None, CATEGORIAS[cat_prov[i]][0],
+                )
+                for i in range(n)
+            ),
+        )
+
+        # Productos
+        n = e.productos
+        pesos_cat = np.array([c[2] for c in CATEGORIAS])
+        cat_prod = rng.choice(len(CATEGORIAS), n, p=pesos_cat / pesos_cat.sum())
+        precio_medio = np.array([c[3] for c in CATEGORIAS])[cat_prod]
+        precios = np.round(precio_medio * rng.lognormal(0.0, 0.35, n), 2).clip(0.5)
+        minimos = np.array([c[4] for c in CATEGORIAS])[cat_prod]
+        proveedor_prod = rng.integers(1, e.proveedores + 1, n)
+        nombres = []
+        for i, c in enumerate(cat_prod.tolist()):
+            bases, variantes = PALABRAS_PRODUCTO[CATEGORIAS[c][0]]
+            b, v, f = rng.integers(0, len(bases)), rng.integers(0, len(variantes)), rng.integers(0, len(FORMATOS))
+            nombres.append(f"{bases[b]} {variantes[v]}{FORMATOS[f]}")
+
+        # Popularidad Zipf sobre los productos vendibles, en orden aleatorio
+        vendible = cat_prod < CATEGORIAS_VENDIBLES
+        rango = np.empty(n)
+        rango[rng.permutation(n)] = np.arange(1, n + 1)
+        popularidad = np.where(vendible, 1.0 / rango**1.07, 0.0)
+        self.prob_producto = popularidad / popularidad.sum()
+        self.cdf_producto = np.cumsum(self.prob_producto)
+        self.cdf_producto[-1] = 1.0
+        self.precios = precios
+        self.minimos = minimos
+        self.proveedor_producto = proveedor_prod
+        self.nombres_producto = nombres
+        self.categoria_producto = cat_prod
+
+        # Empleados
+        n = e.empleados
+        nombres_emp = self._nombres_personas(n)
+        roles = rng.choice(["camarero", "cocina", "barra", "recepcion", "encargado"], n,
+                           p=[0.45, 0.2, 0.15, 0.1, 0.1])
+        self._insertar(
+            "empleados",
+            ["id", "username", "nombre", "apellidos", "dni", "rol", "password", "active"],
+            (
+                (
+                    i + 1, f"emp{i + 1:04d}", nombres_emp[i].split(" ", 1)[0],
+                    nombres_emp[i].split(" ", 1)[1], self._dni(20_000_000 + i),
+                    roles[i], "1234", 1,
+                )
+                for i in range(n)
+            ),
+        )
+
+        # Clientes
+        n = e.clientes
+        nombres_cli = self._nombres_personas(n)
+        telefonos = self._telefonos(n)
+        self.nombres_cliente = nombres_cli
+        self.telefonos_cliente = telefonos
+        self._insertar(
+            "clientes",
+            ["id", "nombre", "apellidos", "dni", "telefono", "email"],
+            (
+                (
+                    i + 1, nombres_cli[i].split(" ", 1)[0], nombres_cli[i].split(" ", 1)[1],
+                    self._dni(30_000_000 + i), telefonos[i], f"cliente{i + 1}@correo.es",
+                )
+                for i in range(n)
+            ),
+        )
+        self.conn.commit()
+        self.progreso(
+            f"Maestros: {e.mesas} mesas en {e.zonas} zonas, {e.productos} productos, "
+            f"{e.proveedores} proveedores, {e.clientes} clientes"
+        )
+
+    # ========================================
+    # HISTORIA DIARIA
+    # ========================================
+
+    def _factor_dia(self, dia: date) -> float:
+        doy = dia.timetuple().tm_yday
+        anual = 1.0 + 0.25 * math.cos(2 * math.pi * (doy - 200) / 365.25)
+        anual += 0.35 * math.exp(-(((doy - 355) / 8.0) ** 2))  # cenas de Navidad
+        if (dia.month, dia.day) in ((12, 25), (1, 1)):
+            anual *= 0.2
+        anios = (dia - self.desde).days / 365.25
+        return FACTOR_SEMANAL[dia.weekday()] * anual * (1.0 + CRECIMIENTO_ANUAL) ** anios
+
+    def _minutos_servicio(self, n: int) -> np.ndarray:
+        pesos = np.array([s[1] for s in SERVICIOS])
+        servicio = self.rng.choice(len(SERVICIOS), n, p=pesos / pesos.sum())
+        centro = np.array([s[2] for s in SERVICIOS])[servicio]
+        desviacion = np.array([s[3] for s in SERVICIOS])[servicio]
+        minutos = self.rng.normal(centro, desviacion)
+        return np.sort(minutos.clip(7 * 60, 24 * 60 - 1).astype(np.int64))
+
+    def _historia(self):
+        e = self.escala
+        rng = self.rng
+        n_productos = e.productos
+        base_dia = e.mesas * e.rotacion_mesa
+        lineas_medias = 3.5
+
+        # Demanda diaria esperada por producto para dimensionar la reposición
+        demanda = self.prob_producto * base_dia * lineas_medias * 1.3
+        lote = np.maximum(self.minimos * 4, np.ceil(demanda * 14)).astype(np.int64)
+        umbral = self.minimos + np.ceil(demanda * 3).astype(np.int64)
+        stock = lote.copy()
+
+        comanda_id = 1
+        detalle_id = 1
+        dia = self.desde
+        ultimo = self.hasta.date()
+        corte_ultimo_dia = self.hasta.hour * 60 + self.hasta.minute
+        mes_actual = (dia.year, dia.month)
+        inicio = time.perf_counter()
+
+        while dia <= ultimo:
+            prefijo = dia.isoformat()
+
+            # Reposición al abrir: entradas para lo que está bajo el umbral
+            reponer = np.flatnonzero(stock < umbral)
+            if reponer.size:
+                anterior = stock[reponer]
+                stock[reponer] += lote[reponer]
+                self._insertar(
+                    "movimientos_stock",
+                    ["producto_id", "tipo", "cantidad", "stock_anterior", "stock_nuevo",
+                     "fecha", "observaciones", "usuario_id"],
+                    zip(
+                        (reponer + 1).tolist(), ["entrada"] * reponer.size, lote[reponer].tolist(),
+                        anterior.tolist(), stock[reponer].tolist(),
+                        [f"{prefijo} 08:00:00"] * reponer.size,
+                        [f"Pedido a {self.nombres_proveedor[p - 1]}"
+                         for p in self.proveedor_producto[reponer].tolist()],
+                        [2] * reponer.size,
+                    ),
+                )
+
+            # Comandas del día
+            n_comandas = int(rng.poisson(base_dia * self._factor_dia(dia)))
+            minutos = self._minutos_servicio(n_comandas)
+            if dia == ultimo:
+                minutos = minutos[minutos < corte_ultimo_dia]
+                n_comandas = minutos.size
+            if n_comandas:
+                lineas = 1 + rng.poisson(lineas_medias - 1, n_comandas)
+                n_lineas = int(lineas.sum())
+                propietaria = np.repeat(np.arange(n_comandas), lineas)
+                productos = np.searchsorted(self.cdf_producto, rng.random(n_lineas), side="right")
+                productos = productos.clip(0, n_productos - 1)
+                cantidades = 1 + rng.poisson(0.35, n_lineas)
+                precios = self.precios[productos]
+                totales = np.bincount(propietaria, weights=cantidades * precios, minlength=n_comandas)
+                ids = np.arange(comanda_id, comanda_id + n_comandas)
+                estados = np.where(rng.random(n_comandas) < 0.03, "cancelada", "pagada")
+                segundos = rng.integers(0, 60, n_comandas)
+
+                self._insertar(
+                    "comandas",
+                    ["id", "mesa_id", "empleado_id", "fecha_hora", "estado", "total"],
+                    zip(
+                        ids.tolist(),
+                        rng.integers(1, e.mesas + 1, n_comandas).tolist(),
+                        rng.integers(1, e.empleados + 1, n_comandas).tolist(),
+                        [f"{prefijo} {m // 60:02d}:{m % 60:02d}:{s:02d}"
+                         for m, s in zip(minutos.tolist(), segundos.tolist())],
+                        estados.tolist(),
+                        np.round(totales, 2).tolist(),
+                    ),
+                )
+                self._insertar(
+                    "comanda_detalles",
+                    ["id", "comanda_id", "producto_id", "cantidad", "precio_unitario", "notas"],
+                    zip(
+                        range(detalle_id, detalle_id + n_lineas),
+                        (propietaria + comanda_id).tolist(),
+                        (productos + 1).tolist(),
+                        cantidades.tolist(),
+                        precios.tolist(),
+                        [None] * n_lineas,
+                    ),
+                )
+                comanda_id += n_comandas
+                detalle_id += n_lineas
+
+                # Ventas agregadas por producto (solo comandas pagadas)
+                pagada = (estados == "pagada")[propietaria]
+                vendidas = np.bincount(productos[pagada], weights=cantidades[pagada], minlength=n_productos)
+                vendidos = np.flatnonzero(vendidas)
+                if vendidos.size:
+                    cantidad = vendidas[vendidos].astype(np.int64)
+                    anterior = stock[vendidos]
+                    stock[vendidos] -= cantidad
+                    self._insertar(
+                        "movimientos_stock",
+                        ["producto_id", "tipo", "cantidad", "stock_anterior", "stock_nuevo",
+                         "fecha", "observaciones", "usuario_id"],
+                        zip(
+                            (vendidos + 1).tolist(), ["venta"] * vendidos.size, cantidad.tolist(),
+                            anterior.tolist(), stock[vendidos].tolist(),
+                            [f"{prefijo} 23:30:00"] * vendidos.size,
+                            ["Ventas del día"] * vendidos.size,
+                            [3] * vendidos.size,
+                        ),
+                    )
+
+            # Mermas semanales en una muestra de productos con stock
+            if dia.weekday() == 0:
+                candidatos = np.flatnonzero(stock > 0)
+                if candidatos.size:
+                    muestra = rng.choice(candidatos, min(candidatos.size, max(1, n_productos // 200)), replace=False)
+                    cantidad = np.minimum(stock[muestra], 1 + rng.poisson(1.0, muestra.size))
+                    anterior = stock[muestra]
+                    stock[muestra] -= cantidad
+                    self._insertar(
+                        "movimientos_stock",
+                        ["producto_id", "tipo", "cantidad", "stock_anterior", "stock_nuevo",
+                         "fecha", "observaciones", "usuario_id"],
+                        zip(
+                            (muestra + 1).tolist(), ["merma"] * muestra.size, cantidad.tolist(),
+                            anterior.tolist(), stock[muestra].tolist(),
+                            [f"{prefijo} 23:45:00"] * muestra.size,
+                            ["Caducidad o rotura"] * muestra.size,
+                            [2] * muestra.size,
+                        ),
+                    )
+
+            self._reservas_mesa_dia(dia, n_comandas)
+
+            dia += timedelta(days=1)
+            # Una transacción por mes: pocas sincronizaciones a disco
+            if (dia.year, dia.month) != mes_actual or dia > ultimo:
+                self.conn.commit()
+                if dia.month == 1 or dia > ultimo:
+                    self.progreso(
+                        f"Historia hasta {dia - timedelta(days=1)}: {comanda_id - 1} comandas, "
+                        f"{detalle_id - 1} líneas ({time.perf_counter() - inicio:.0f} s)"
+                    )
+                mes_actual = (dia.year, dia.month)
+
+        self.stock_final = stock
+        self.siguiente_comanda = comanda_id
+        self.siguiente_detalle = detalle_id
+
+    def _reservas_mesa_dia(self, dia: date, n_comandas: int, futura: bool = False):
+        """Reservas de mesa de un día: como mucho una por mesa y servicio"""
+        rng = self.rng
+        e = self.escala
+        filas = []
+        for hora_inicio, hora_fin, peso in ((13 * 60 + 30, 15 * 60, 0.45), (20 * 60 + 30, 22 * 60 + 30, 0.55)):
+            n = min(e.mesas, int(rng.poisson(max(n_comandas, 1) * 0.12 * peso)))
+            if not n:
+                continue
+            mesas = rng.choice(e.mesas, n, replace=False) + 1
+            slots = rng.integers(0, (hora_fin - hora_inicio) // 30 + 1, n) * 30 + hora_inicio
+            clientes = rng.integers(0, e.clientes, n)
+            duraciones = rng.choice([90, 120, 150], n, p=[0.3, 0.55, 0.15])
+            sorteo = rng.random(n)
+            for mesa, slot, cliente, duracion, azar in zip(
+                mesas.tolist(), slots.tolist(), clientes.tolist(), duraciones.tolist(), sorteo.tolist()
+            ):
+                inicio = datetime.combine(dia, datetime.min.time()) + timedelta(minutes=slot)
+                if futura or inicio > self.hasta:
+                    estado = "cancelada" if azar < 0.05 else "activa"
+                else:
+                    estado = "cancelada" if azar < 0.10 else "completada"
+                capacidad = int(self.mesa_capacidad[mesa - 1])
+                filas.append(
+                    (
+                        mesa, self.nombres_cliente[cliente], inicio.isoformat(), duracion, estado,
+                        "", self.telefonos_cliente[cliente], int(rng.integers(1, capacidad + 1)),
+                        cliente + 1, None, None,
+                    )
+                )
+        if filas:
+            self._insertar(
+                "reservas",
+                ["mesa_id", "cliente", "fecha_hora", "duracion_min", "estado", "notas",
+                 "telefono", "personas", "cliente_id", "fecha_entrada", "fecha_salida"],
+                filas,
+            )
+
+    # ========================================
+    # HOTEL
+    # ========================================
+
+    def _ocupacion_objetivo(self, dia: date) -> float:
+        doy = dia.timetuple().tm_yday
+        base = 0.62 + 0.25 * math.cos(2 * math.pi * (doy - 210) / 365.25)
+        return min(0.97, base * (1.15 if dia.weekday() >= 4 else 1.0))
+
+    def _hotel(self):
+        e = self.escala
+        rng = self.rng
+        pesos = np.array([t[1] for t in TIPOS_HABITACION])
+        tipos = rng.choice(len(TIPOS_HABITACION), e.habitaciones, p=pesos / pesos.sum())
+        por_planta = 20
+        self.habitaciones = []
+        for i, t in enumerate(tipos.tolist()):
+            numero = f"{i // por_planta + 1}{i % por_planta + 1:02d}"
+            precio = round(TIPOS_HABITACION[t][2] * float(rng.uniform(0.9, 1.15)), 2)
+            self.habitaciones.append([i + 1, numero, TIPOS_HABITACION[t][0], "disponible", precio])
+
+        horizonte = self.hasta.date() + timedelta(days=90)
+        hoy = self.hasta.date()
+        filas = []
+        for habitacion in self.habitaciones:
+            dia = self.desde + timedelta(days=int(rng.integers(0, 5)))
+            while dia < horizonte:
+                # Huecos más cortos en temporada alta
+                ocupacion = self._ocupacion_objetivo(dia)
+                noches = 1 + int(rng.poisson(1.8))
+                # Hueco medio noches * (1 - o) / o para una ocupación o
+                hueco = int(rng.geometric(ocupacion / (ocupacion + noches * (1.0 - ocupacion)))) - 1
+                entrada = dia + timedelta(days=hueco)
+                salida = entrada + timedelta(days=noches)
+                if entrada >= horizonte:
+                    break
+                cliente = int(rng.integers(0, e.clientes))
+                if salida <= hoy:
+                    estado = "cancelada" if rng.random() < 0.08 else "completada"
+                elif entrada <= hoy:
+                    estado = "confirmada"
+                    habitacion[3] = "ocupada"
+                else:
+                    estado = "pendiente" if rng.random() < 0.3 else "confirmada"
+                filas.append(
+                    (
+                        0, self.nombres_cliente[cliente], f"{entrada.isoformat()}T14:00:00",
+                        noches * 24 * 60, estado, f"Habitación {habitacion[1]}",
+                        self.telefonos_cliente[cliente], int(rng.integers(1, 4)), cliente + 1,
+                        entrada.isoformat(), salida.isoformat(),
+                    )
+                )
+                dia = salida
+            if habitacion[3] == "disponible" and rng.random() < 0.03:
+                habitacion[3] = "mantenimiento"
+
+        self._insertar("habitaciones", ["id", "numero", "tipo", "estado", "precio_base"], self.habitaciones)
+        self._insertar(
+            "reservas",
+            ["mesa_id", "cliente", "fecha_hora", "duracion_min", "estado", "notas",
+             "telefono", "personas", "cliente_id", "fecha_entrada", "fecha_salida"],
+            filas,
+        )
+        self.conn.commit()
+        self.progreso(f"Hotel: {e.habitaciones} habitaciones, {len(filas)} estancias")
+
+    # ========================================
+    # ESTADO ACTUAL
+    # ========================================
+
+    def _estado_actual(self):
+        """Stock final, reservas futuras y servicio en curso en ``hasta``"""
+        e = self.escala
+        rng = self.rng
+
+        self._insertar(
+            "productos",
+            ["id", "nombre", "precio", "stock", "categoria", "stock_actual", "stock_minimo",
+             "proveedor", "proveedor_id", "proveedor_nombre"],
+            (
+                (
+                    i + 1, self.nombres_producto[i], float(self.precios[i]), int(self.stock_final[i]),
+                    CATEGORIAS[self.categoria_producto[i]][0], int(self.stock_final[i]),
+                    int(self.minimos[i]), self.nombres_proveedor[p - 1], p,
+                    self.nombres_proveedor[p - 1],
+                )
+                for i, p in enumerate(self.proveedor_producto.tolist())
+            ),
+        )
+
+        # Reservas de mesa para las próximas semanas
+        for dias in range(1, 31):
+            dia = self.hasta.date() + timedelta(days=dias)
+            esperado = e.mesas * e.rotacion_mesa * self._factor_dia(dia)
+            # Cuanto más lejos, menos reservado todavía
+            self._reservas_mesa_dia(dia, int(esperado * (1.0 - dias / 40.0)), futura=True)
+
+        # Servicio en curso: comandas abiertas en un 10 % de las mesas
+        abiertas = rng.choice(e.mesas, max(1, e.mesas // 10), replace=False) + 1
+        filas, detalles = [], []
+        comanda_id, detalle_id = self.siguiente_comanda, self.siguiente_detalle
+        for mesa in abiertas.tolist():
+            apertura = self.hasta - timedelta(minutes=int(rng.integers(5, 90)))
+            n = 1 + int(rng.poisson(2.0))
+            productos = np.searchsorted(self.cdf_producto, rng.random(n), side="right").clip(0, e.productos - 1)
+            total = 0.0
+            for producto in productos.tolist():
+                cantidad = 1 + int(rng.poisson(0.3))
+                precio = float(self.precios[producto])
+                total += cantidad * precio
+                detalles.append((detalle_id, comanda_id, producto + 1, cantidad, precio, None))
+                detalle_id += 1
+            filas.append(
+                (comanda_id, mesa, int(rng.integers(1, e.empleados + 1)),
+                 apertura.strftime(FORMATO_FECHA_HORA), "abierta", round(total, 2))
+            )
+            comanda_id += 1
+        self._insertar("comandas", ["id", "mesa_id", "empleado_id", "fecha_hora", "estado", "total"], filas)
+        self._insertar(
+            "comanda_detalles",
+            ["id", "comanda_id", "producto_id", "cantidad", "precio_unitario", "notas"],
+            detalles,
+        )
+        self.conn.executemany(
+            "UPDATE mesas SET estado = 'ocupada' WHERE id = ?", [(m,) for m in abiertas.tolist()]
+        )
+        self.conn.commit()
+
+
+# ========================================
+# API
+# ========================================
+
+
+def generar_dataset(
+    ruta: str,
+    escala: str = "pequeno",
+    semilla: int = 42,
+    anios: Optional[int] = None,
+    hasta: Optional[datetime] = None,
+    sobrescribir: bool = False,
+    referencia: str = DB_REFERENCIA,
+    progreso: Callable[[str], None] = print,
+) -> Dict[str, int]:
+    """Genera un dataset sintético en ``ruta`` y devuelve las filas por tabla
+
+    Args:
+        ruta: Base de datos a crear (nunca data/hefest.db)
+        escala: ``pequeno``, ``mediano`` o ``grande``
+        semilla: Semilla del generador
+        anios: Años de historia (por defecto los de la escala)
+        hasta: Instante "actual" del dataset; fijarlo para reproducir los
+            mismos datos en cualquier fecha (por defecto, ahora)
+        sobrescribir: Reemplazar ``ruta`` si ya existe
+        referencia: Base de datos de la que se copia el esquema
+    """
+    if escala not in ESCALAS:
+        raise ValueError(f"Escala no válida: {escala} (opciones: {', '.join(ESCALAS)})")
+    if _es_base_de_datos_real(ruta):
+        raise ValueError("El dataset sintético no puede escribirse sobre data/hefest.db")
+    if os.path.exists(ruta):
+        if not sobrescribir:
+            raise FileExistsError(f"{ruta} ya existe (usar sobrescribir=True)")
+        for sufijo in ("", "-journal", "-wal", "-shm"):
+            if os.path.exists(ruta + sufijo):
+                os.remove(ruta + sufijo)
+
+    config = ESCALAS[escala]
+    if anios:
+        config = replace(config, anios=anios)
+    hasta = (hasta or datetime.now()).replace(second=0, microsecond=0)
+
+    os.makedirs(os.path.dirname(os.path.abspath(ruta)), exist_ok=True)
+    conn = sqlite3.connect(ruta)
+    try:
+        # Carga masiva: sin diario en disco ni sincronización; el fichero
+        # solo es válido al terminar, por eso no se admite reanudar
+        conn.execute("PRAGMA journal_mode = MEMORY")
+        conn.execute("PRAGMA synchronous = OFF")
+        conn.execute("PRAGMA cache_size = -262144")
+        conn.execute("PRAGMA temp_store = MEMORY")
+
+        indices = copiar_esquema(conn, referencia)
+        progreso(
+            f"Generando dataset '{escala}' ({config.anios} años hasta {hasta:%Y-%m-%d %H:%M}, "
+            f"semilla {semilla}) en {ruta}"
+        )
+        filas = GeneradorDataset(conn, config, semilla, hasta, progreso).generar()
+
+        # Índices al final: construirlos una vez es más rápido que mantenerlos
+        for sql in indices:
+            conn.execute(sql)
+        conn.commit()
+        conn.execute("PRAGMA journal_mode = DELETE")
+    finally:
+        conn.close()
+    return filas
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Generador de datos sintéticos de Hefest")
+    parser.add_argument("destino", help="Base de datos a crear (nunca data/hefest.db)")
+    parser.add_argument("--escala", choices=list(ESCALAS), default="pequeno")
+    parser.add_argument("--semilla", type=int, default=42)
+    parser.add_argument("--anios", type=int, help="Años de historia (por defecto los de la escala)")
+    parser.add_argument("--hasta", help="Fecha 'actual' del dataset: AAAA-MM-DD o AAAA-MM-DDTHH:MM")
+    parser.add_argument("--sobrescribir", action="store_true", help="Reemplazar el destino si existe")
+    args = parser.parse_args()
+
+    hasta = None
+    if args.hasta:
+        hasta = datetime.fromisoformat(args.hasta)
+        if len(args.hasta) == 10:
+            hasta = hasta.replace(hour=22)  # mitad del servicio de cena
+
+    try:
+        inicio = time.perf_counter()
+        filas = generar_dataset(
+            args.destino, args.escala, args.semilla, args.anios, hasta, args.sobrescribir
+        )
+    except (ValueError, FileExistsError) as e:
+        print(f"❌ {e}")
+        return 1
+
+    print(f"\n📊 Filas generadas ({time.perf_counter() - inicio:.1f} s):")
+    for tabla, n in sorted(filas.items()):
+        print(f"   {tabla:<20} {n:>12,}")
+    print(f"\n✅ Dataset listo: {args.destino} ({os.path.getsize(args.destino) / 1024**2:.0f} MB)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Comprobación del presupuesto de arranque de Hefest.
+
+Lanza la aplicación varias veces en procesos limpios (Qt offscreen, copia
+temporal de la base de datos), inicia sesión como administrador sin
+diálogos y espera a que se cargue el primer módulo. Compara la mediana del
+tiempo hasta interactivo con el presupuesto de utils/startup_timeline.py.
+
+Uso (desde la raíz del proyecto):
+
+    python scripts/testing/test_arranque_presupuesto.py
+    python scripts/testing/test_arranque_presupuesto.py --repeticiones 5 --presupuesto 3000
+    python scripts/testing/test_arranque_presupuesto.py --salida arranque.json
+
+Devuelve código 1 si la mediana supera el presupuesto.
+"""
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+MARCADOR = "INFORME_ARRANQUE "
+TIMEOUT_HIJO_S = 120
+
+
+def ejecutar_hijo():
+    """Arranque real dentro de este proceso; imprime el informe por stdout"""
+    sys.path[:0] = [RAIZ, os.path.join(RAIZ, "src")]
+    import hefest_application
+    from PyQt6.QtCore import QTimer
+    from utils.startup_timeline import get_startup_timeline
+
+    timeline = get_startup_timeline()
+    app = hefest_application.Hefest()
+
+    # Login sin diálogos (PIN por defecto del administrador)
+    with timeline.fase("login", espera_usuario=True):
+        if not app.auth_service.login(1, "1234"):
+            print("No se pudo iniciar sesión como administrador", file=sys.stderr)
+            return 2
+        app.show_main_window()
+
+    def comprobar():
+        if timeline.finalizado:
+            app.app.quit()
+
+    sondeo = QTimer()
+    sondeo.timeout.connect(comprobar)
+    sondeo.start(50)
+    QTimer.singleShot(TIMEOUT_HIJO_S * 1000, app.app.quit)
+    app.app.exec()
+
+    if not timeline.finalizado:
+        print("El primer módulo no llegó a cargarse", file=sys.stderr)
+        return 3
+    print(MARCADOR + json.dumps(timeline.informe, ensure_ascii=False))
+    return 0
+
+
+def medir_arranque(db_origen: str) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        db_copia = os.path.join(tmp, "hefest.db")
+        if os.path.exists(db_origen):
+            shutil.copy(db_origen, db_copia)
+        entorno = dict(os.environ, QT_QPA_PLATFORM="offscreen", HEFEST_DB_PATH=db_copia)
+        proceso = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--hijo"],
+            cwd=RAIZ,
+            env=entorno,
+            capture_output=True,
+            text=True,
+            timeout=TIMEOUT_HIJO_S + 30,
+        )
+    for linea in proceso.stdout.splitlines():
+        if linea.startswith(MARCADOR):
+            return json.loads(linea[len(MARCADOR):])
+    raise RuntimeError(
+        f"El arranque falló (código {proceso.returncode}):\n{proceso.stderr[-2000:]}"
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Presupuesto de arranque de Hefest")
+    parser.add_argument("--repeticiones", type=int, default=3)
+    parser.add_argument("--presupuesto", type=float, help="ms hasta interactivo")
+    parser.add_argument("--db", default=os.path.join(RAIZ, "data", "hefest.db"))
+    parser.add_argument("--salida", help="Guardar los informes en JSON")
+    parser.add_argument("--hijo", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.hijo:
+        return ejecutar_hijo()
+
+    informes = []
+    for i in range(args.repeticiones):
+        informe = medir_arranque(args.db)
+        informes.append(informe)
+        print(
+            f"Ejecución {i + 1}: {informe['tiempo_hasta_interactivo_ms']:.0f} ms hasta interactivo"
+        )
+
+    mediana = statistics.median(i["tiempo_hasta_interactivo_ms"] for i in informes)
+    presupuesto = args.presupuesto or informes[0]["presupuesto_ms"]
+
+    print("\nFases (última ejecución):")
+    for fase in informes[-1]["fases"]:
+        sangria = "  " * (fase["profundidad"] + 1)
+        print(f"{sangria}{fase['nombre']:<28} {fase['duracion_ms']:>8.0f} ms")
+    print("\nImportaciones más costosas (última ejecución):")
+    for imp in informes[-1]["importaciones_principales"][:10]:
+        print(f"  {imp['modulo']:<50} {imp['acumulado_ms']:>8.0f} ms")
+
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f:
+            json.dump(
+                {"mediana_ms": mediana, "presupuesto_ms": presupuesto, "ejecuciones": informes},
+                f,
+                ensure_ascii=False,
+                indent=2,
+            )
+
+    if mediana > presupuesto:
+        print(f"\n❌ Mediana {mediana:.0f} ms supera el presupuesto de {presupuesto:.0f} ms")
+        return 1
+    print(f"\n✅ Mediana {mediana:.0f} ms dentro del presupuesto de {presupuesto:.0f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,706 @@
+#!/usr/bin/env python3
+"""
+Banco de rendimiento de la interfaz de Hefest en modo headless.
+
+Mide con la plataforma Qt ``offscreen`` los caminos de interfaz más
+pesados y, junto al tiempo, cuenta los widgets, temporizadores y
+conexiones de señales que crea cada uno:
+
+- ``MainWindow.create_module_widget`` para cada módulo
+- ``populate_grid`` del área de mesas con 50, 200 y 1000 mesas
+- ``InventoryTableWidget.load_products`` con 1k, 10k y 50k productos
+- una pulsación en el buscador del gestor de productos de inventario
+- un ciclo de refresco del dashboard (RealDataManager y tarjetas)
+
+El tiempo de cada repetición incluye el procesado de eventos pendientes y
+de los borrados diferidos que provoca, porque también ocurren en el hilo
+de la interfaz. Los recuentos se toman antes de preparar el escenario,
+tras la primera repetición, tras la última y tras limpiarlo:
+
+- ``creados``: lo que deja vivo la primera ejecución (con su fixture)
+- ``crecimiento_por_repeticion``: lo que acumula cada ejecución siguiente;
+  distinto de cero indica una fuga (p. ej. conexiones repetidas)
+- ``residuo``: lo que queda tras destruir el escenario
+
+Los servicios trabajan sobre una copia de un dataset sintético
+(scripts/migration/generar_dataset_sintetico.py); las mesas y productos de
+las tablas se generan en memoria.
+
+Uso (desde la raíz del proyecto):
+
+    python scripts/testing/test_interfaz_rendimiento.py
+    python scripts/testing/test_interfaz_rendimiento.py --filtro inventario --salida ui.json
+    python scripts/testing/test_interfaz_rendimiento.py --pesados --sin-presupuestos
+
+Los presupuestos (``PRESUPUESTOS``) son los de una interfaz aceptable, no
+los tiempos actuales: 1 s para abrir un módulo, 100 ms para responder a
+una tecla o repintar el grid. Un escenario falla si supera su presupuesto,
+si lanza una excepción o registra un error (un módulo que no se construye
+y devuelve el widget de acceso denegado no es un "ok" de 1 ms).
+
+Los escenarios que se sabe que no cumplen están en ``FALLOS_CONOCIDOS``
+con su motivo: se miden y se informan como ``xfail`` sin romper la
+ejecución, y si un día cumplen (``XPASS``) la ejecución falla para que se
+quiten de la lista. Devuelve código 1 si algún escenario falla.
+
+Los escenarios de ``ESCENARIOS_PESADOS`` (la tabla de 50k productos tarda
+más de diez minutos) solo se ejecutan con ``--pesados``.
+"""
+
+import argparse
+import gc
+import json
+import logging
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+# La plataforma y el precalentamiento se fijan antes de importar Qt y la aplicación
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+os.environ.setdefault("HEFEST_PRECALENTAR", "0")
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path[:0] = [
+    RAIZ,
+    os.path.join(RAIZ, "src"),
+    os.path.join(RAIZ, "scripts", "migration"),
+    os.path.join(RAIZ, "scripts", "testing"),
+]
+
+from PyQt6.QtCore import (  # noqa: E402
+    QCoreApplication,
+    QEvent,
+    QMetaMethod,
+    QObject,
+    Qt,
+    QTimer,
+    QtMsgType,
+    qInstallMessageHandler,
+)
+from PyQt6.QtTest import QTest  # noqa: E402
+from PyQt6.QtWidgets import QApplication, QWidget  # noqa: E402
+
+from test_servicios_benchmark import DIRECTORIO_DATASETS, metadatos, percentil, preparar_dataset  # noqa: E402
+
+ESCALA_DEFECTO = "mediano"
+MAX_SEGUNDOS_ESCENARIO = 30.0
+MIN_REPETICIONES = 2
+# Por encima de este número de objetos no se recorren las señales (tarda más que lo medido)
+LIMITE_OBJETOS_CONEXIONES = 60000
+TAMANO_VENTANA = (1280, 800)
+
+MESAS_GRID = (50, 200, 1000)
+PRODUCTOS_TABLA = (1000, 10000, 50000)
+TEXTO_BUSQUEDA = "cerveza"
+
+# Presupuestos por escenario. ``p50_ms`` sobre la mediana de tiempos;
+# ``widgets``/``timers``/``conexiones`` sobre lo creado por la primera
+# ejecución. El crecimiento por repetición no puede superar
+# ``CRECIMIENTO_MAXIMO`` en ningún escenario.
+# Abrir un módulo: por debajo de un segundo el usuario no pierde el hilo
+MODULO_MS = 1000
+# Respuesta a una tecla o un repintado en el hilo de la interfaz
+RESPUESTA_MS = 100
+PRESUPUESTOS: Dict[str, Dict[str, float]] = {
+    "modulo.dashboard": {"p50_ms": MODULO_MS, "widgets": 150, "timers": 20},
+    "modulo.tpv": {"p50_ms": MODULO_MS, "widgets": 1500, "timers": 25},
+    "modulo.advanced_tpv": {"p50_ms": MODULO_MS, "widgets": 150, "timers": 5},
+    "modulo.hospederia": {"p50_ms": MODULO_MS, "widgets": 800, "timers": 10},
+    "modulo.inventario": {"p50_ms": MODULO_MS, "widgets": 300, "timers": 5},
+    "modulo.reportes": {"p50_ms": MODULO_MS, "widgets": 150, "timers": 5},
+    "modulo.configuracion": {"p50_ms": MODULO_MS, "widgets": 400, "timers": 5},
+    "modulo.audit": {"p50_ms": MODULO_MS, "widgets": 100, "timers": 5},
+    "modulo.users": {"p50_ms": MODULO_MS, "widgets": 100, "timers": 5},
+    "modulo.user_management": {"p50_ms": MODULO_MS, "widgets": 100, "timers": 5},
+    # Incluyen la fixture (MesasArea con sus MesaWidget visibles)
+    "tpv.populate_grid_50": {"p50_ms": RESPUESTA_MS, "widgets": 400, "timers": 60},
+    "tpv.populate_grid_200": {"p50_ms": RESPUESTA_MS, "widgets": 400, "timers": 60},
+    "tpv.populate_grid_1000": {"p50_ms": RESPUESTA_MS, "widgets": 400, "timers": 60},
+    # Una tabla de inventario debe costar lo mismo con 1k que con 50k filas:
+    # widgets solo para lo visible y carga por debajo del segundo
+    "inventario.tabla_1000": {"p50_ms": 500, "widgets": 200},
+    "inventario.tabla_10000": {"p50_ms": MODULO_MS, "widgets": 200},
+    "inventario.tabla_50000": {"p50_ms": MODULO_MS, "widgets": 200},
+    "inventario.tecla_busqueda": {"p50_ms": RESPUESTA_MS, "widgets": 100, "timers": 5},
+    "dashboard.tick": {"p50_ms": RESPUESTA_MS, "widgets": 150, "timers": 20},
+}
+CRECIMIENTO_MAXIMO = {"widgets": 0.0, "timers": 0.0, "conexiones": 0.0}
+
+# Incumplimientos conocidos: se miden e informan, pero no rompen la ejecución
+FALLOS_CONOCIDOS: Dict[str, str] = {
+    "modulo.dashboard": "UltraModernAdminDashboard es un stub que no acepta auth_service/db_manager",
+    "modulo.hospederia": "HospederiaModule referencia load_reservations, que no existe",
+    "modulo.tpv": "construye un MesaWidget por mesa del dataset (~2 s y ~6k widgets con 500 mesas)",
+    "modulo.inventario": "carga todo el catálogo al abrir (~1,5 s con 10k productos)",
+    "inventario.tabla_1000": "InventoryTableWidget crea seis widgets por fila",
+    "inventario.tabla_10000": "InventoryTableWidget crea seis widgets por fila",
+    "inventario.tabla_50000": "InventoryTableWidget crea seis widgets por fila",
+}
+
+# Solo con --pesados: una sola repetición tarda más de diez minutos
+ESCENARIOS_PESADOS = ("inventario.tabla_50000",)
+
+
+# ========================================
+# RECUENTO DE OBJETOS QT
+# ========================================
+
+
+_senales_por_clase: Dict[str, List[str]] = {}
+
+
+def _senales(obj: QObject) -> List[str]:
+    """Nombres de las señales de la clase (en caché por nombre de clase Qt)"""
+    meta = obj.metaObject()
+    clave = f"{type(obj).__module__}.{type(obj).__qualname__}:{meta.className()}"
+    nombres = _senales_por_clase.get(clave)
+    if nombres is None:
+        nombres = []
+        for i in range(meta.methodCount()):
+            metodo = meta.method(i)
+            if metodo.methodType() == QMetaMethod.MethodType.Signal:
+                nombre = bytes(metodo.name()).decode()
+                if nombre not in nombres:
+                    nombres.append(nombre)
+        _senales_por_clase[clave] = nombres
+    return nombres
+
+
+def contar_conexiones(raices: List[QObject]) -> Optional[int]:
+    """Receptores conectados a las señales de las raíces y sus descendientes
+
+    PyQt solo permite consultar ``receivers`` en objetos creados desde
+    Python: los hijos internos de Qt (barras de scroll de un QScrollArea,
+    cabeceras de tabla...) no se cuentan.
+    """
+    objetos: List[QObject] = []
+    for raiz in raices:
+        objetos.append(raiz)
+        objetos.extend(raiz.findChildren(QObject))
+        if len(objetos) > LIMITE_OBJETOS_CONEXIONES:
+            return None
+    total = 0
+    for obj in objetos:
+        for nombre in _senales(obj):
+            try:
+                total += obj.receivers(getattr(obj, nombre))
+            except RuntimeError:
+                # Objeto creado por Qt: ninguna de sus señales es consultable
+                break
+            except (AttributeError, TypeError):
+                continue
+    return total
+
+
+_avisos_qt: Dict[str, int] = {}
+
+
+def _registrar_aviso_qt(tipo, contexto, mensaje: str):
+    """Cuenta los avisos de Qt (hojas de estilo no soportadas, etc.) sin imprimirlos"""
+    if tipo in (QtMsgType.QtCriticalMsg, QtMsgType.QtFatalMsg):
+        print(f"Qt: {mensaje}", file=sys.stderr)
+    _avisos_qt[mensaje] = _avisos_qt.get(mensaje, 0) + 1
+
+
+def vaciar_eventos():
+    """Procesa los eventos pendientes y ejecuta los borrados diferidos"""
+    QCoreApplication.processEvents()
+    QCoreApplication.sendPostedEvents(None, QEvent.Type.DeferredDelete.value)
+    QCoreApplication.processEvents()
+
+
+def recuento(raices: List[QObject]) -> Dict[str, Optional[int]]:
+    vaciar_eventos()
+    gc.collect()
+    timers = [o for o in gc.get_objects() if isinstance(o, QTimer)]
+    return {
+        "widgets": len(QApplication.allWidgets()),
+        "timers": len(timers),
+        "timers_activos": sum(1 for t in timers if _timer_activo(t)),
+        "conexiones": contar_conexiones(raices),
+    }
+
+
+def _timer_activo(timer: QTimer) -> bool:
+    try:
+        return timer.isActive()
+    except RuntimeError:
+        # Envoltorio cuyo objeto C++ ya se destruyó
+        return False
+
+
+def _diferencia(a: Dict[str, Optional[int]], b: Dict[str, Optional[int]], divisor: int = 1) -> Dict[str, Any]:
+    return {
+        clave: (None if a[clave] is None or b.get(clave) is None else round((a[clave] - b[clave]) / divisor, 2))
+        for clave in a
+    }
+
+
+# ========================================
+# ESCENARIOS
+# ========================================
+
+
+@dataclass
+class Escenario:
+    """Escenario de interfaz: ``preparar`` y ``limpiar`` quedan fuera del tiempo
+
+    ``preparar`` devuelve el contexto que reciben ``ejecutar``, ``entre`` y
+    ``limpiar``; ``entre`` se llama antes de cada repetición salvo la
+    primera, también fuera del tiempo. ``raices`` indica qué árboles de
+    objetos se recorren para contar conexiones (por defecto, el contexto si
+    es un QObject).
+    """
+
+    nombre: str
+    ejecutar: Callable[[Any, int], Any]
+    preparar: Optional[Callable[[], Any]] = None
+    limpiar: Optional[Callable[[Any], None]] = None
+    entre: Optional[Callable[[Any], None]] = None
+    raices: Optional[Callable[[Any], List[QObject]]] = None
+    repeticiones: int = 5
+
+
+@dataclass
+class ResultadoEscenario:
+    nombre: str
+    tiempos_ms: List[float] = field(default_factory=list)
+    recuentos: Dict[str, Any] = field(default_factory=dict)
+    error: str = ""
+    errores_registrados: List[str] = field(default_factory=list)
+    incumplimientos: List[str] = field(default_factory=list)
+    fallo_conocido: str = ""
+
+    def resumen(self) -> Dict[str, Any]:
+        tiempos = sorted(self.tiempos_ms)
+        datos: Dict[str, Any] = {"n": len(tiempos)}
+        if tiempos:
+            datos.update(
+                {
+                    "p50_ms": round(percentil(tiempos, 0.50), 2),
+                    "p95_ms": round(percentil(tiempos, 0.95), 2),
+                    "max_ms": round(tiempos[-1], 2),
+                }
+            )
+        datos.update(self.recuentos)
+        if self.error:
+            datos["error"] = self.error
+        if self.errores_registrados:
+            datos["errores_registrados"] = self.errores_registrados
+        if self.incumplimientos:
+            datos["incumplimientos"] = self.incumplimientos
+        if self.fallo_conocido:
+            datos["fallo_conocido"] = self.fallo_conocido
+        return datos
+
+    @property
+    def estado(self) -> str:
+        if self.fallo_conocido:
+            return "xfail" if self.incumplimientos else "XPASS"
+        return "FALLO" if self.incumplimientos else "ok"
+
+
+class _CapturaErrores(logging.Handler):
+    """Guarda los registros de nivel ERROR que se emiten durante un escenario"""
+
+    def __init__(self):
+        super().__init__(logging.ERROR)
+        self.mensajes: List[str] = []
+
+    def emit(self, record: logging.LogRecord):
+        self.mensajes.append(f"{record.name}: {record.getMessage()}")
+
+
+def _raices_defecto(contexto: Any) -> List[QObject]:
+    return [contexto] if isinstance(contexto, QObject) else []
+
+
+def ejecutar_escenario(escenario: Escenario, max_segundos: float) -> ResultadoEscenario:
+    resultado = ResultadoEscenario(escenario.nombre)
+    raices = escenario.raices or _raices_defecto
+    _avisos_qt.clear()
+    inicial = recuento([])
+    contexto = None
+    # Un error registrado (p. ej. un módulo que no se construye) hace fallar el escenario
+    captura = _CapturaErrores()
+    logging.getLogger().addHandler(captura)
+    try:
+        contexto = escenario.preparar() if escenario.preparar else None
+        limite = time.perf_counter() + max_segundos
+        tras_primera = tras_ultima = None
+        for i in range(escenario.repeticiones):
+            if i and escenario.entre:
+                escenario.entre(contexto)
+                vaciar_eventos()
+            inicio = time.perf_counter()
+            escenario.ejecutar(contexto, i)
+            vaciar_eventos()
+            resultado.tiempos_ms.append((time.perf_counter() - inicio) * 1000.0)
+
+            if i == 0:
+                tras_primera = tras_ultima = recuento(raices(contexto))
+            if i + 1 >= MIN_REPETICIONES and time.perf_counter() > limite:
+                break
+        if len(resultado.tiempos_ms) > 1:
+            tras_ultima = recuento(raices(contexto))
+
+        repeticiones = len(resultado.tiempos_ms)
+        resultado.recuentos = {
+            "creados": _diferencia(tras_primera, inicial),
+            "crecimiento_por_repeticion": (
+                _diferencia(tras_ultima, tras_primera, repeticiones - 1)
+                if repeticiones > 1
+                else dict.fromkeys(tras_primera)
+            ),
+        }
+    except Exception as e:
+        resultado.error = f"{type(e).__name__}: {e}"
+    finally:
+        if escenario.limpiar and contexto is not None:
+            try:
+                escenario.limpiar(contexto)
+            except Exception as e:
+                resultado.error = resultado.error or f"limpiar: {type(e).__name__}: {e}"
+        contexto = None
+        logging.getLogger().removeHandler(captura)
+        # Sin repetir el mismo mensaje de cada repetición
+        resultado.errores_registrados = list(dict.fromkeys(captura.mensajes))
+        final = recuento([])
+        final.pop("conexiones")
+        resultado.recuentos["residuo"] = _diferencia(final, inicial)
+        resultado.recuentos["avisos_qt"] = sum(_avisos_qt.values())
+        if _avisos_qt:
+            resultado.recuentos["aviso_qt_frecuente"] = max(_avisos_qt, key=_avisos_qt.get)
+    return resultado
+
+
+def destruir(widget: QWidget):
+    """Destruye un widget como lo hace la caché de módulos al expulsarlo"""
+    from ui.windows.module_cache import ModuleCache
+
+    ModuleCache._dispose(widget)
+    vaciar_eventos()
+
+
+def _mostrar(widget: QWidget) -> QWidget:
+    widget.resize(*TAMANO_VENTANA)
+    widget.show()
+    vaciar_eventos()
+    return widget
+
+
+def escenarios_modulos(ventana) -> List[Escenario]:
+    """Construcción de cada módulo con ``MainWindow.create_module_widget``
+
+    Entre repeticiones se destruye el módulo anterior, así que el
+    crecimiento por repetición es lo que deja cada ciclo construir/destruir.
+    """
+    def construir(ctx: list, module_id: str):
+        widget = ventana.create_module_widget(module_id)
+        ctx.append(widget)
+        # El widget de reserva de MainWindow es un QWidget sin subclase
+        if type(widget) is QWidget:
+            raise RuntimeError("create_module_widget devolvió el widget de reserva (acceso denegado)")
+
+    escenarios = []
+    for module_id in ventana.module_permissions:
+        escenarios.append(
+            Escenario(
+                f"modulo.{module_id}",
+                ejecutar=lambda ctx, i, m=module_id: construir(ctx, m),
+                preparar=list,
+                limpiar=lambda ctx: [destruir(w) for w in ctx],
+                entre=lambda ctx: destruir(ctx.pop()),
+                raices=lambda ctx: list(ctx),
+                repeticiones=3,
+            )
+        )
+    return escenarios
+
+
+def _mesas_sinteticas(cantidad: int, rng: random.Random) -> list:
+    from services.tpv_service import Mesa
+
+    zonas = ["Comedor", "Terraza", "Barra", "Salón"]
+    estados = ["libre", "libre", "ocupada", "reservada"]
+    return [
+        Mesa(
+            id=i + 1,
+            numero=str(i + 1),
+            zona=zonas[i % len(zonas)],
+            estado=rng.choice(estados),
+            capacidad=rng.choice([2, 4, 4, 6, 8]),
+        )
+        for i in range(cantidad)
+    ]
+
+
+def escenarios_grid(rng: random.Random) -> List[Escenario]:
+    """Reconstrucción del grid de mesas con ``populate_grid``"""
+    from ui.modules.tpv_module.components.mesas_area.mesas_area_grid import populate_grid
+    from ui.modules.tpv_module.components.mesas_area.mesas_area_main import MesasArea
+
+    def preparar(cantidad: int):
+        area = _mostrar(MesasArea())
+        area.set_mesas(_mesas_sinteticas(cantidad, rng))
+        return area
+
+    return [
+        Escenario(
+            f"tpv.populate_grid_{cantidad}",
+            ejecutar=lambda area, i: populate_grid(area),
+            preparar=lambda c=cantidad: preparar(c),
+            limpiar=destruir,
+            repeticiones=20,
+        )
+        for cantidad in MESAS_GRID
+    ]
+
+
+def escenarios_tabla(rng: random.Random) -> List[Escenario]:
+    """Carga de ``InventoryTableWidget.load_products`` con productos en memoria"""
+    from services.inventario_service_real import Producto
+    from ui.modules.inventario_module.components.inventory_table import InventoryTableWidget
+
+    categorias = ["Bebidas", "Entrantes", "Principales", "Postres", "Vinos", "Cafés"]
+    productos = [
+        Producto(
+            id=i + 1,
+            nombre=f"Producto {i + 1}",
+            categoria=rng.choice(categorias),
+            precio=round(rng.uniform(1, 40), 2),
+            stock_actual=rng.randint(0, 200),
+            stock_minimo=rng.randint(5, 20),
+            proveedor_id=rng.randint(1, 200),
+            proveedor_nombre=f"Proveedor {rng.randint(1, 200)}",
+        )
+        for i in range(max(PRODUCTOS_TABLA))
+    ]
+    return [
+        Escenario(
+            f"inventario.tabla_{cantidad}",
+            ejecutar=lambda tabla, i, c=cantidad: tabla.load_products(productos[:c]),
+            preparar=lambda: _mostrar(InventoryTableWidget()),
+            limpiar=destruir,
+            # Cada fila crea dos widgets de celda: a partir de 10k una sola carga ya son minutos
+            repeticiones=5 if cantidad <= 1000 else 1,
+        )
+        for cantidad in PRODUCTOS_TABLA
+    ]
+
+
+def escenario_busqueda(db) -> Escenario:
+    """Pulsaciones en el buscador del gestor de productos (filtrado en cada tecla)"""
+    from services.inventario_service_real import InventarioService
+    from ui.modules.inventario_module.components.products_manager import ProductsManagerWidget
+
+    # Escribir el término y borrarlo: cada tecla dispara una búsqueda
+    teclas = [Qt.Key(ord(c.upper())) for c in TEXTO_BUSQUEDA] + [Qt.Key.Key_Backspace] * len(TEXTO_BUSQUEDA)
+
+    def ejecutar(gestor, i):
+        QTest.keyClick(gestor.search_input, teclas[i % len(teclas)])
+
+    def preparar():
+        gestor = _mostrar(ProductsManagerWidget(InventarioService(db)))
+        gestor.search_input.setFocus()
+        return gestor
+
+    return Escenario(
+        "inventario.tecla_busqueda",
+        ejecutar=ejecutar,
+        preparar=preparar,
+        limpiar=destruir,
+        repeticiones=len(teclas) * 2,
+    )
+
+
+def escenario_dashboard(db) -> Escenario:
+    """Ciclo del temporizador del dashboard: métricas reales y tarjetas actualizadas"""
+    from ui.modules.dashboard_admin_v3.components.dashboard_metric_components import UltraModernMetricCard
+    from utils.real_data_manager import RealDataManager
+
+    def preparar():
+        contenedor = QWidget()
+        gestor = RealDataManager(db, parent=contenedor)
+        tarjetas = {}
+        for nombre, metrica in gestor._get_real_metrics_formatted().items():
+            tarjetas[nombre] = UltraModernMetricCard(
+                title=metrica["title"], value=str(metrica["value"]), unit=metrica["unit"],
+                trend=metrica["trend"], icon=metrica["icon"], parent=contenedor,
+            )
+        gestor.metric_updated.connect(
+            lambda nombre, datos: tarjetas[nombre].update_metric_data(value=datos["value"], trend=datos["trend"])
+            if nombre in tarjetas else None
+        )
+        contenedor.gestor = gestor
+        return _mostrar(contenedor)
+
+    return Escenario(
+        "dashboard.tick",
+        # Lo mismo que hace el timeout de RealDataManager.update_timer
+        ejecutar=lambda contenedor, i: contenedor.gestor.fetch_all_real_data(),
+        preparar=preparar,
+        limpiar=destruir,
+        repeticiones=20,
+    )
+
+
+# ========================================
+# PRESUPUESTOS
+# ========================================
+
+
+def comprobar_presupuesto(resultado: ResultadoEscenario) -> List[str]:
+    datos = resultado.resumen()
+    fallos = []
+    if resultado.error:
+        fallos.append(f"error: {resultado.error}")
+    for mensaje in resultado.errores_registrados:
+        fallos.append(f"error registrado: {mensaje}")
+    presupuesto = PRESUPUESTOS.get(resultado.nombre, {})
+    if "p50_ms" in presupuesto and datos.get("p50_ms", 0) > presupuesto["p50_ms"]:
+        fallos.append(f"p50 {datos['p50_ms']:.1f} ms > {presupuesto['p50_ms']} ms")
+    creados = datos.get("creados", {})
+    for clave in ("widgets", "timers", "conexiones"):
+        if clave in presupuesto and (creados.get(clave) or 0) > presupuesto[clave]:
+            fallos.append(f"{clave} creados {creados[clave]} > {presupuesto[clave]}")
+    crecimiento = datos.get("crecimiento_por_repeticion", {})
+    for clave, maximo in CRECIMIENTO_MAXIMO.items():
+        if (crecimiento.get(clave) or 0) > maximo:
+            fallos.append(f"{clave} crecen {crecimiento[clave]} por repetición")
+    return fallos
+
+
+def _fila(nombre: str, datos: Dict[str, Any], estado: str) -> str:
+    creados = datos.get("creados", {})
+    crecimiento = datos.get("crecimiento_por_repeticion", {})
+
+    def valor(d, clave):
+        v = d.get(clave)
+        return "-" if v is None else f"{v:g}"
+
+    return (
+        f"{nombre:<30} {datos.get('n', 0):>3} {datos.get('p50_ms', 0):>10.1f} {datos.get('max_ms', 0):>10.1f} "
+        f"{valor(creados, 'widgets'):>8} {valor(creados, 'timers'):>6} {valor(creados, 'conexiones'):>8} "
+        f"{valor(crecimiento, 'widgets'):>7} {valor(crecimiento, 'conexiones'):>7}  {estado}"
+    )
+
+
+# ========================================
+# PRINCIPAL
+# ========================================
+
+
+def preparar_base_datos(escala: str, semilla: int) -> str:
+    """Copia de trabajo del dataset (algunos módulos escriben al construirse)"""
+    origen = preparar_dataset(escala, semilla, DIRECTORIO_DATASETS)
+    destino = os.path.join(tempfile.mkdtemp(prefix="hefest_ui_"), "hefest.db")
+    shutil.copyfile(origen, destino)
+    return destino
+
+
+def construir_escenarios(db_path: str, semilla: int) -> List[Escenario]:
+    from data.db_manager import DatabaseManager
+    from services.auth_service import get_auth_service
+    from ui.windows.hefest_main_window import MainWindow
+
+    rng = random.Random(semilla)
+    auth = get_auth_service()
+    if not auth.login(1, "1234"):
+        raise RuntimeError("No se pudo iniciar sesión como administrador en el dataset")
+    ventana = MainWindow(auth_service=auth)
+    # Dejar que cargue el módulo inicial antes de medir
+    QTest.qWait(700)
+    vaciar_eventos()
+
+    db = DatabaseManager(db_path)
+    return (
+        escenarios_modulos(ventana)
+        + escenarios_grid(rng)
+        + escenarios_tabla(rng)
+        + [escenario_busqueda(db), escenario_dashboard(db)]
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Banco de rendimiento headless de la interfaz de Hefest")
+    parser.add_argument("--escala", default=ESCALA_DEFECTO, help="Escala del dataset para los servicios")
+    parser.add_argument("--semilla", type=int, default=42)
+    parser.add_argument("--filtro", default="", help="Solo escenarios cuyo nombre contenga este texto")
+    parser.add_argument("--excluir", default="", help="Omitir escenarios que contengan alguno de estos textos (a,b)")
+    parser.add_argument("--max-segundos", type=float, default=MAX_SEGUNDOS_ESCENARIO,
+                        help="Tiempo máximo de repeticiones por escenario")
+    parser.add_argument("--salida", help="Fichero JSON con los resultados")
+    parser.add_argument("--sin-presupuestos", action="store_true", help="No fallar por presupuestos")
+    parser.add_argument("--pesados", action="store_true",
+                        help=f"Incluir los escenarios pesados ({', '.join(ESCENARIOS_PESADOS)})")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.ERROR)
+
+    db_path = preparar_base_datos(args.escala, args.semilla)
+    os.environ["HEFEST_DB_PATH"] = db_path
+    app = QApplication.instance() or QApplication(sys.argv[:1])  # noqa: F841
+
+    qInstallMessageHandler(_registrar_aviso_qt)
+    excluir = [x for x in args.excluir.split(",") if x]
+    if not args.pesados:
+        excluir += ESCENARIOS_PESADOS
+    escenarios = [
+        e
+        for e in construir_escenarios(db_path, args.semilla)
+        if args.filtro in e.nombre and not any(x in e.nombre for x in excluir)
+    ]
+    print(f"Interfaz headless ({os.environ['QT_QPA_PLATFORM']}), dataset {args.escala}: {len(escenarios)} escenarios")
+    print(
+        f"{'escenario':<30} {'n':>3} {'p50 ms':>10} {'max ms':>10} "
+        f"{'widgets':>8} {'timers':>6} {'conex.':>8} {'+w/rep':>7} {'+c/rep':>7}"
+    )
+
+    resultados: Dict[str, Any] = {}
+    fallos = conocidos = 0
+    for escenario in escenarios:
+        resultado = ejecutar_escenario(escenario, args.max_segundos)
+        if not args.sin_presupuestos:
+            resultado.incumplimientos = comprobar_presupuesto(resultado)
+            resultado.fallo_conocido = FALLOS_CONOCIDOS.get(escenario.nombre, "")
+        datos = resultado.resumen()
+        datos["estado"] = resultado.estado
+        resultados[escenario.nombre] = datos
+        fallos += resultado.estado in ("FALLO", "XPASS")
+        conocidos += resultado.estado == "xfail"
+        print(_fila(escenario.nombre, datos, resultado.estado))
+        if resultado.error and not resultado.incumplimientos:
+            print(f"   ⚠️ {resultado.error}")
+        marca = "⚠️ " if resultado.estado == "xfail" else "❌"
+        for incumplimiento in resultado.incumplimientos:
+            print(f"   {marca} {incumplimiento}")
+        if resultado.estado == "xfail":
+            print(f"   ℹ️ fallo conocido: {resultado.fallo_conocido}")
+        elif resultado.estado == "XPASS":
+            print("   ❌ cumple el presupuesto: quitarlo de FALLOS_CONOCIDOS")
+
+    informe = {"metadatos": metadatos(), "escala": args.escala, "escenarios": resultados}
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f:
+            json.dump(informe, f, ensure_ascii=False, indent=2)
+        print(f"Resultados guardados en {args.salida}")
+
+    shutil.rmtree(os.path.dirname(db_path), ignore_errors=True)
+    if fallos:
+        print(f"❌ {fallos} escenario(s) fuera de presupuesto")
+        return 1
+    if conocidos:
+        print(f"✅ Sin fallos nuevos ({conocidos} fallo(s) conocido(s) en FALLOS_CONOCIDOS)")
+        return 0
+    print("✅ Todos los escenarios dentro de presupuesto")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
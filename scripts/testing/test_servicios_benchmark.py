@@ -0,0 +1,495 @@
+#!/usr/bin/env python3
+"""
+Benchmark de la capa de servicios de Hefest con línea base versionada.
+
+Ejecuta las operaciones críticas de TPVService, InventarioService,
+ReservaService, HospederiaService, RealDataManager y DatabaseManager sobre
+datasets sintéticos (scripts/migration/generar_dataset_sintetico.py) de
+varias escalas y mide percentiles de latencia y throughput.
+
+Los datasets se generan una vez por día y escala en un directorio de caché
+(con ``hasta`` = hoy a las 21:30, para que las métricas "de hoy" tengan
+datos) y cada ejecución trabaja sobre una copia, porque algunas
+operaciones escriben.
+
+Uso (desde la raíz del proyecto):
+
+    python scripts/testing/test_servicios_benchmark.py
+    python scripts/testing/test_servicios_benchmark.py --escalas pequeno,mediano,grande --salida bench.json
+    python scripts/testing/test_servicios_benchmark.py --comparar            # contra la base (3 rondas)
+    python scripts/testing/test_servicios_benchmark.py --guardar-base        # actualizar la base (5 rondas)
+    python scripts/testing/test_servicios_benchmark.py --rondas 1 --comparar # rápido, más ruidoso
+    python scripts/testing/test_servicios_benchmark.py --solo-comparar bench.json --base otra_base.json
+
+Cada ronda repite toda la batería sobre una copia nueva del dataset. Con
+varias rondas, cada operación guarda la mediana de los p50 y p95 de las
+rondas y su banda (mínimo y máximo entre rondas): la base versionada se
+graba siempre con al menos :data:`MIN_RONDAS_BASE` rondas, porque una
+ejecución suelta puede variar el doble en una máquina de una sola CPU.
+
+Con ``--comparar`` devuelve código 1 si alguna operación supera el techo
+de su banda en la base en más de la tolerancia (p50), o del doble en p95
+cuando hay muestra suficiente, y siempre en más del umbral absoluto. Si la
+medida actual también tiene varias rondas se compara su mejor ronda: una
+regresión real empeora todas las rondas, el ruido solo alguna.
+"""
+
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path[:0] = [RAIZ, os.path.join(RAIZ, "src"), os.path.join(RAIZ, "scripts", "migration")]
+
+RUTA_BASE = os.path.join(RAIZ, "scripts", "testing", "baselines", "servicios_benchmark.json")
+DIRECTORIO_DATASETS = os.path.join(tempfile.gettempdir(), "hefest_benchmark")
+ESCALAS_DEFECTO = "pequeno,mediano"
+
+TOLERANCIA_DEFECTO = 0.25
+UMBRAL_ABSOLUTO_MS = 0.05
+MIN_MUESTRA_P95 = 50
+MAX_SEGUNDOS_OPERACION = 10.0
+MIN_REPETICIONES = 5
+RONDAS_DEFECTO = 1
+RONDAS_COMPARAR = 3
+MIN_RONDAS_BASE = 5
+
+TERMINOS_BUSQUEDA = ["croq", "cerveza", "tinto reserva", "café con", "ibérico", "sin resultados"]
+
+
+@dataclass
+class Operacion:
+    """Operación medida: ``preparar`` y ``limpiar`` quedan fuera del tiempo"""
+
+    nombre: str
+    ejecutar: Callable[[Any], Any]
+    preparar: Optional[Callable[[], Any]] = None
+    limpiar: Optional[Callable[[Any], None]] = None
+    repeticiones: int = 200
+
+
+@dataclass
+class ResultadoOperacion:
+    nombre: str
+    tiempos_ms: List[float] = field(default_factory=list)
+    errores: int = 0
+    ultimo_error: str = ""
+
+    def resumen(self) -> Dict[str, Any]:
+        tiempos = sorted(self.tiempos_ms)
+        n = len(tiempos)
+        total_s = sum(tiempos) / 1000.0
+        datos = {"n": n, "errores": self.errores}
+        if n:
+            datos.update(
+                {
+                    "p50_ms": round(percentil(tiempos, 0.50), 4),
+                    "p95_ms": round(percentil(tiempos, 0.95), 4),
+                    "p99_ms": round(percentil(tiempos, 0.99), 4),
+                    "max_ms": round(tiempos[-1], 4),
+                    "media_ms": round(total_s * 1000.0 / n, 4),
+                    "ops_s": round(n / total_s, 1) if total_s else None,
+                }
+            )
+        if self.ultimo_error:
+            datos["ultimo_error"] = self.ultimo_error
+        return datos
+
+
+def percentil(ordenados: List[float], q: float) -> float:
+    """Percentil por rango más cercano sobre una lista ya ordenada"""
+    return ordenados[max(0, min(len(ordenados) - 1, math.ceil(q * len(ordenados)) - 1))]
+
+
+def combinar_rondas(rondas: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Resumen de una operación medida en varias rondas: medianas y banda"""
+    validas = [r for r in rondas if r.get("n")]
+    datos: Dict[str, Any] = {
+        "n": sum(r["n"] for r in rondas),
+        "errores": sum(r["errores"] for r in rondas),
+        "rondas": len(rondas),
+    }
+    errores = [r["ultimo_error"] for r in rondas if r.get("ultimo_error")]
+    if errores:
+        datos["ultimo_error"] = errores[-1]
+    if not validas:
+        return datos
+
+    # n por ronda: el criterio de muestra mínima para p95 se evalúa por ronda
+    datos["n_ronda"] = min(r["n"] for r in validas)
+    for clave in ("p50_ms", "p95_ms", "p99_ms", "max_ms", "media_ms", "ops_s"):
+        valores = sorted(r[clave] for r in validas if r.get(clave) is not None)
+        if valores:
+            datos[clave] = round(valores[(len(valores) - 1) // 2], 4)
+    for clave in ("p50_ms", "p95_ms"):
+        valores = [r[clave] for r in validas]
+        datos[clave.replace("_ms", "_min_ms")] = round(min(valores), 4)
+        datos[clave.replace("_ms", "_max_ms")] = round(max(valores), 4)
+    return datos
+
+
+# ========================================
+# DATASETS
+# ========================================
+
+
+def preparar_dataset(escala: str, semilla: int, directorio: str) -> str:
+    """Ruta del dataset en caché para hoy, generándolo si no existe"""
+    from generar_dataset_sintetico import generar_dataset
+
+    os.makedirs(directorio, exist_ok=True)
+    hoy = date.today()
+    ruta = os.path.join(directorio, f"hefest_{escala}_s{semilla}_{hoy:%Y%m%d}.db")
+    if not os.path.exists(ruta):
+        temporal = ruta + ".tmp"
+        generar_dataset(
+            temporal,
+            escala=escala,
+            semilla=semilla,
+            hasta=datetime.combine(hoy, datetime.min.time()).replace(hour=21, minute=30),
+            sobrescribir=True,
+            progreso=lambda m: print(f"   {m}"),
+        )
+        os.replace(temporal, ruta)
+    return ruta
+
+
+def filas_por_tabla(ruta: str) -> Dict[str, int]:
+    conn = sqlite3.connect(f"file:{ruta}?mode=ro", uri=True)
+    try:
+        tablas = [r[0] for r in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'"
+        )]
+        return {t: conn.execute(f"SELECT COUNT(*) FROM [{t}]").fetchone()[0] for t in sorted(tablas)}
+    finally:
+        conn.close()
+
+
+# ========================================
+# OPERACIONES
+# ========================================
+
+
+def construir_operaciones(db_path: str, semilla: int) -> List[Operacion]:
+    """Operaciones críticas sobre servicios conectados a ``db_path``"""
+    from data.db_manager import DatabaseManager
+    from services.hospederia_service import HospederiaService
+    from services.inventario_service_real import InventarioService
+    from services.tpv_service import TPVService
+    from ui.modules.tpv_module.components.reservas_agenda.reserva_service import ReservaService
+    from utils.real_data_manager import RealDataManager
+
+    rng = random.Random(semilla)
+    db = DatabaseManager(db_path)
+    tpv = TPVService(db)
+    inventario = InventarioService(db)
+    reservas = ReservaService(db_path)
+    hospederia = HospederiaService(db)
+    datos_reales = RealDataManager(db)
+
+    productos = [p.id for p in tpv.get_todos_productos()]
+    mesas = [m.id for m in tpv.get_mesas()]
+    libres = [m.id for m in tpv.get_mesas() if m.estado == "libre"]
+    manana = date.today() + timedelta(days=1)
+
+    def mesa_libre() -> int:
+        # Rotar por las mesas libres: cada comanda de prueba ocupa una
+        mesa = libres.pop(0)
+        libres.append(mesa)
+        return mesa
+
+    def preparar_comanda() -> int:
+        mesa = mesa_libre()
+        for producto in rng.sample(productos, 3):
+            tpv.add_producto_comanda(mesa, producto, rng.randint(1, 3))
+        return tpv.get_comanda_activa(mesa).id
+
+    def liberar_por_comanda(comanda_id: int):
+        comanda = tpv.get_comanda_por_id(comanda_id)
+        if comanda:
+            tpv.liberar_mesa(comanda.mesa_id)
+
+    def preparar_linea():
+        return mesa_libre(), rng.choice(productos)
+
+    def limpiar_linea(argumentos):
+        tpv.liberar_mesa(argumentos[0])
+
+    def crear_reserva(_):
+        return reservas.crear_reserva(
+            rng.choice(mesas), "Cliente Benchmark",
+            datetime.combine(manana, datetime.min.time()).replace(hour=rng.choice([13, 14, 20, 21])),
+            120, "+34 600000000", 2, "",
+        )
+
+    def paginar_proveedores(_):
+        pagina = inventario.get_proveedores_pagina()
+        if pagina.cursor_siguiente:
+            inventario.get_proveedores_pagina(pagina.cursor_siguiente)
+
+    def cargar_hospederia(_):
+        hospederia.get_rooms()
+        hospederia.get_reservations()
+        hospederia.get_estadisticas_ocupacion()
+
+    termino = lambda: rng.choice(TERMINOS_BUSQUEDA)  # noqa: E731
+
+    return [
+        # TPV
+        Operacion("tpv.cargar_datos", lambda _: TPVService(db), repeticiones=10),
+        Operacion("tpv.anadir_linea", lambda a: tpv.add_producto_comanda(*a),
+                  preparar_linea, limpiar_linea, repeticiones=500),
+        Operacion("tpv.pagar_comanda", tpv.pagar_comanda,
+                  preparar_comanda, liberar_por_comanda, repeticiones=200),
+        Operacion("tpv.buscar_producto", tpv.get_productos, termino, repeticiones=200),
+        Operacion("tpv.reserva_solapada",
+                  lambda m: tpv.reserva_solapada(m, manana, datetime.min.time().replace(hour=21), 120),
+                  lambda: rng.choice(mesas), repeticiones=500),
+        # Inventario
+        Operacion("inventario.buscar_producto", inventario.get_productos, termino, repeticiones=100),
+        Operacion("inventario.cargar_productos", lambda _: inventario.get_productos(), repeticiones=10),
+        Operacion("inventario.estadisticas", lambda _: inventario.get_estadisticas_inventario(), repeticiones=20),
+        Operacion("inventario.paginas_proveedores", paginar_proveedores, repeticiones=100),
+        # Reservas de mesa
+        Operacion("reservas.activas_por_mesa", lambda _: reservas.obtener_reservas_activas_por_mesa(),
+                  repeticiones=50),
+        Operacion("reservas.por_fecha", lambda _: reservas.obtener_reservas_por_fecha(
+            datetime.combine(manana, datetime.min.time())), repeticiones=50),
+        Operacion("reservas.crear", crear_reserva,
+                  limpiar=lambda r: reservas.cancelar_reserva(r.id), repeticiones=100),
+        # Hospedería
+        Operacion("hospederia.cargar_datos", cargar_hospederia, repeticiones=200),
+        # Dashboard
+        Operacion("dashboard.snapshot", lambda _: datos_reales._get_real_metrics_formatted(), repeticiones=20),
+        Operacion("db.metricas_admin", lambda _: db.get_admin_metrics(), repeticiones=20),
+        Operacion("db.metricas_inventario", lambda _: db.get_inventory_metrics(), repeticiones=20),
+        Operacion("db.metricas_hospederia", lambda _: db.get_hospitality_metrics(), repeticiones=20),
+    ]
+
+
+def medir(operacion: Operacion, factor: float, max_segundos: float) -> ResultadoOperacion:
+    resultado = ResultadoOperacion(operacion.nombre)
+    repeticiones = max(MIN_REPETICIONES, int(operacion.repeticiones * factor))
+    limite = time.perf_counter() + max_segundos
+
+    # Calentamiento (cachés de SQLite y de los servicios), no se mide
+    _ejecutar_una(operacion, resultado, medir_tiempo=False)
+    resultado.errores = 0
+
+    for i in range(repeticiones):
+        _ejecutar_una(operacion, resultado)
+        if i + 1 >= MIN_REPETICIONES and time.perf_counter() > limite:
+            break
+    return resultado
+
+
+def _ejecutar_una(operacion: Operacion, resultado: ResultadoOperacion, medir_tiempo: bool = True):
+    argumento = operacion.preparar() if operacion.preparar else None
+    inicio = time.perf_counter()
+    try:
+        valor = operacion.ejecutar(argumento)
+    except Exception as e:
+        resultado.errores += 1
+        resultado.ultimo_error = f"{type(e).__name__}: {e}"
+        return
+    duracion = (time.perf_counter() - inicio) * 1000.0
+    if medir_tiempo:
+        resultado.tiempos_ms.append(duracion)
+    if operacion.limpiar:
+        operacion.limpiar(valor if operacion.preparar is None else argumento)
+
+
+def ejecutar_escala(escala: str, args) -> Dict[str, Any]:
+    print(f"\n📦 Escala {escala}")
+    origen = preparar_dataset(escala, args.semilla, args.datasets)
+    if args.rondas <= 1:
+        return ejecutar_ronda(origen, args)
+
+    rondas = []
+    for ronda in range(args.rondas):
+        print(f"   🔁 Ronda {ronda + 1}/{args.rondas}")
+        rondas.append(ejecutar_ronda(origen, args))
+    nombres = list(dict.fromkeys(n for r in rondas for n in r["operaciones"]))
+    operaciones = {
+        nombre: combinar_rondas([r["operaciones"][nombre] for r in rondas if nombre in r["operaciones"]])
+        for nombre in nombres
+    }
+    print(f"   Mediana de {args.rondas} rondas (banda p50 mín–máx):")
+    for nombre, resumen in operaciones.items():
+        if "p50_ms" in resumen:
+            print(f"   {nombre:<32} p50 {resumen['p50_ms']:>9.3f} ms  "
+                  f"[{resumen['p50_min_ms']:.3f} – {resumen['p50_max_ms']:.3f}]")
+    return {
+        "dataset": rondas[0]["dataset"],
+        "preparacion_servicios_s": sorted(r["preparacion_servicios_s"] for r in rondas)[(len(rondas) - 1) // 2],
+        "operaciones": operaciones,
+    }
+
+
+def ejecutar_ronda(origen: str, args) -> Dict[str, Any]:
+    with tempfile.TemporaryDirectory() as tmp:
+        copia = os.path.join(tmp, "hefest.db")
+        shutil.copy(origen, copia)
+        filas = filas_por_tabla(copia)
+        print(f"   {filas.get('comandas', 0):,} comandas, {filas.get('productos', 0):,} productos, "
+              f"{filas.get('mesas', 0):,} mesas")
+
+        inicio = time.perf_counter()
+        operaciones = construir_operaciones(copia, args.semilla)
+        preparacion_s = time.perf_counter() - inicio
+
+        resultados = {}
+        for operacion in operaciones:
+            if args.filtro and args.filtro not in operacion.nombre:
+                continue
+            resumen = medir(operacion, args.factor, args.max_segundos).resumen()
+            resultados[operacion.nombre] = resumen
+            if resumen["n"]:
+                print(f"   {operacion.nombre:<32} p50 {resumen['p50_ms']:>9.3f} ms  "
+                      f"p95 {resumen['p95_ms']:>9.3f} ms  {resumen['ops_s'] or 0:>9.1f} op/s"
+                      f"{'  ⚠️ ' + str(resumen['errores']) + ' errores' if resumen['errores'] else ''}")
+            else:
+                print(f"   {operacion.nombre:<32} ❌ {resumen.get('ultimo_error', 'sin mediciones')}")
+    return {"dataset": filas, "preparacion_servicios_s": round(preparacion_s, 3), "operaciones": resultados}
+
+
+# ========================================
+# COMPARACIÓN CON LA BASE
+# ========================================
+
+
+def comparar(base: Dict[str, Any], actual: Dict[str, Any], tolerancia: float) -> List[str]:
+    """Imprime la comparación y devuelve las regresiones (escala/operación)"""
+    regresiones = []
+    print(f"\n📊 Comparación con la base ({base.get('meta', {}).get('fecha', '?')}), "
+          f"tolerancia {tolerancia:.0%}")
+    for escala, datos in actual.get("resultados", {}).items():
+        base_escala = base.get("resultados", {}).get(escala)
+        if not base_escala:
+            print(f"   {escala}: sin base")
+            continue
+        print(f"   {escala}:")
+        for nombre, medida in datos["operaciones"].items():
+            previa = base_escala["operaciones"].get(nombre)
+            if not previa or "p50_ms" not in previa:
+                print(f"      🆕 {nombre}")
+                continue
+            if "p50_ms" not in medida:
+                print(f"      ❌ {nombre}: sin mediciones")
+                regresiones.append(f"{escala}/{nombre}")
+                continue
+            peor = []
+            # La cola es más ruidosa: p95 solo con muestra suficiente y margen doble
+            criterios = [("p50_ms", tolerancia)]
+            muestra = min(previa.get("n_ronda", previa["n"]), medida.get("n_ronda", medida["n"]))
+            if muestra >= MIN_MUESTRA_P95:
+                criterios.append(("p95_ms", 2 * tolerancia))
+            for clave, margen in criterios:
+                # Techo de la banda de la base frente a la mejor ronda actual
+                # (sin banda, una sola ronda: el propio valor)
+                techo = previa.get(clave.replace("_ms", "_max_ms"), previa[clave])
+                ahora = medida.get(clave.replace("_ms", "_min_ms"), medida[clave])
+                if ahora > techo * (1 + margen) and ahora - techo > UMBRAL_ABSOLUTO_MS:
+                    peor.append(clave[:3])
+            cambio = (medida["p50_ms"] / previa["p50_ms"] - 1) if previa["p50_ms"] else 0.0
+            marca = "❌" if peor else ("🚀" if cambio < -tolerancia else "✅")
+            detalle = f" ({', '.join(peor)} empeora)" if peor else ""
+            print(f"      {marca} {nombre:<32} p50 {previa['p50_ms']:.3f} → {medida['p50_ms']:.3f} ms "
+                  f"({cambio:+.0%}){detalle}")
+            if peor:
+                regresiones.append(f"{escala}/{nombre}")
+    return regresiones
+
+
+def metadatos() -> Dict[str, Any]:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=RAIZ, capture_output=True, text=True, timeout=10
+        ).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        commit = ""
+    return {
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "plataforma": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark de servicios de Hefest")
+    parser.add_argument("--escalas", default=ESCALAS_DEFECTO, help="pequeno,mediano,grande")
+    parser.add_argument("--semilla", type=int, default=42)
+    parser.add_argument("--datasets", default=DIRECTORIO_DATASETS, help="Caché de datasets generados")
+    parser.add_argument("--factor", type=float, default=1.0, help="Multiplicador de repeticiones")
+    parser.add_argument("--rondas", type=int,
+                        help=f"Repeticiones de toda la batería (defecto {RONDAS_DEFECTO}, "
+                             f"{RONDAS_COMPARAR} con --comparar; al menos {MIN_RONDAS_BASE} con --guardar-base)")
+    parser.add_argument("--max-segundos", type=float, default=MAX_SEGUNDOS_OPERACION,
+                        help="Tiempo máximo por operación")
+    parser.add_argument("--filtro", help="Solo operaciones cuyo nombre contenga este texto")
+    parser.add_argument("--salida", help="Guardar los resultados en JSON")
+    parser.add_argument("--base", default=RUTA_BASE, help="JSON de referencia para comparar")
+    parser.add_argument("--comparar", action="store_true", help="Comparar con --base al terminar")
+    parser.add_argument("--guardar-base", action="store_true", help="Escribir los resultados en --base")
+    parser.add_argument("--solo-comparar", metavar="JSON", help="Comparar un JSON ya medido con --base")
+    parser.add_argument("--tolerancia", type=float, default=TOLERANCIA_DEFECTO)
+    args = parser.parse_args()
+    if args.rondas is None:
+        if args.guardar_base:
+            args.rondas = MIN_RONDAS_BASE
+        else:
+            args.rondas = RONDAS_COMPARAR if args.comparar else RONDAS_DEFECTO
+    elif args.guardar_base and args.rondas < MIN_RONDAS_BASE:
+        parser.error(f"--guardar-base necesita al menos {MIN_RONDAS_BASE} rondas")
+
+    if args.solo_comparar:
+        with open(args.solo_comparar, encoding="utf-8") as f:
+            actual = json.load(f)
+    else:
+        # RealDataManager y los buses de eventos son QObject
+        from PyQt6.QtCore import QCoreApplication
+
+        _app = QCoreApplication.instance() or QCoreApplication(sys.argv[:1])  # noqa: F841
+        actual = {"meta": metadatos(), "resultados": {}}
+        for escala in [e.strip() for e in args.escalas.split(",") if e.strip()]:
+            actual["resultados"][escala] = ejecutar_escala(escala, args)
+        actual["meta"]["factor_repeticiones"] = args.factor
+        actual["meta"]["rondas"] = args.rondas
+
+        for ruta in filter(None, [args.salida, args.base if args.guardar_base else None]):
+            os.makedirs(os.path.dirname(os.path.abspath(ruta)), exist_ok=True)
+            with open(ruta, "w", encoding="utf-8") as f:
+                json.dump(actual, f, ensure_ascii=False, indent=2)
+            print(f"\n💾 Resultados guardados en {ruta}")
+
+    if args.comparar or args.solo_comparar:
+        if not os.path.exists(args.base):
+            print(f"\n⚠️ No existe la base {args.base} (usar --guardar-base)")
+            return 0
+        with open(args.base, encoding="utf-8") as f:
+            base = json.load(f)
+        regresiones = comparar(base, actual, args.tolerancia)
+        if regresiones:
+            print(f"\n❌ {len(regresiones)} regresiones: {', '.join(regresiones)}")
+            return 1
+        print("\n✅ Sin regresiones")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,488 @@
+#!/usr/bin/env python3
+"""
+Prueba de resistencia (soak) de la interfaz de Hefest para detectar fugas.
+
+Simula un turno completo en modo headless sobre una copia del dataset:
+en cada ciclo cambia de módulo con ``MainWindow.show_module``, refresca
+el grid de mesas del TPV (por el bus de eventos, como lo hace la
+aplicación, y con ``sync_reservas``) y crea, edita y cancela una reserva.
+
+Cada ``--intervalo`` segundos toma una instantánea de:
+
+- ``tracemalloc`` (con trazas de ``--profundidad`` marcos)
+- objetos vivos del recolector de basura agrupados por tipo
+- ``QObject`` vivos con envoltorio Python y widgets de ``QApplication``
+- receptores conectados a las señales de la ventana y de los buses
+  globales (ver ``contar_conexiones`` en test_interfaz_rendimiento.py)
+- memoria residente del proceso
+
+Tras ``--calentamiento`` ciclos (cachés de módulos llenas, imports hechos)
+se fija la línea base. El informe final muestra la pendiente por ciclo de
+cada serie, los tipos que más crecen y los puntos de asignación que más
+memoria han acumulado respecto a la línea base, con su traza.
+
+Uso (desde la raíz del proyecto):
+
+    python scripts/testing/test_sesion_fugas.py --duracion 240
+    python scripts/testing/test_sesion_fugas.py --ciclos 50 --intervalo 10 --salida fugas.json
+
+Devuelve código 1 si alguna serie crece de forma sostenida por encima de
+``CRECIMIENTO_MAXIMO_POR_CICLO``.
+"""
+
+import argparse
+import gc
+import json
+import linecache
+import os
+import random
+import shutil
+import sys
+import time
+import tracemalloc
+from collections import Counter
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+# La plataforma y el precalentamiento se fijan antes de importar Qt y la aplicación
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+os.environ.setdefault("HEFEST_PRECALENTAR", "0")
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path[:0] = [
+    RAIZ,
+    os.path.join(RAIZ, "src"),
+    os.path.join(RAIZ, "scripts", "migration"),
+    os.path.join(RAIZ, "scripts", "testing"),
+]
+
+from PyQt6.QtCore import QObject, qInstallMessageHandler  # noqa: E402
+from PyQt6.QtTest import QTest  # noqa: E402
+from PyQt6.QtWidgets import QApplication  # noqa: E402
+
+from test_interfaz_rendimiento import (  # noqa: E402
+    _registrar_aviso_qt,
+    contar_conexiones,
+    preparar_base_datos,
+    vaciar_eventos,
+)
+from test_servicios_benchmark import metadatos  # noqa: E402
+
+ESCALA_DEFECTO = "mediano"
+DURACION_DEFECTO_MIN = 60.0
+INTERVALO_DEFECTO_S = 60.0
+CALENTAMIENTO_DEFECTO = 3
+PROFUNDIDAD_DEFECTO = 10
+TOP_DEFECTO = 10
+MIN_MUESTRAS = 6
+
+# Módulos que recorre cada ciclo (en este orden)
+MODULOS_CICLO = ["dashboard", "tpv", "hospederia", "inventario", "reportes", "configuracion", "audit"]
+HORAS_RESERVA = [13, 14, 15, 20, 21, 22]
+
+# Pendiente máxima tolerada por ciclo tras el calentamiento
+CRECIMIENTO_MAXIMO_POR_CICLO: Dict[str, float] = {
+    "memoria_trazada_kb": 64.0,
+    "qobjects": 0.5,
+    "widgets": 0.5,
+    "conexiones": 0.5,
+}
+
+# Buses de eventos globales (módulo, atributo). Se importan con y sin el
+# prefijo ``src.``, así que puede haber dos instancias de cada uno
+BUSES_GLOBALES = [
+    ("ui.modules.tpv_module.mesa_event_bus", "mesa_event_bus"),
+    ("ui.modules.tpv_module.event_bus", "reserva_event_bus"),
+]
+
+# Marcos que no interesan en el informe de asignaciones
+FILTROS_TRACEMALLOC = [
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+]
+
+
+# ========================================
+# INSTANTÁNEAS
+# ========================================
+
+
+@dataclass
+class Muestra:
+    """Valores de una instantánea (sin la de tracemalloc, que se guarda aparte)"""
+
+    ciclo: int
+    segundos: float
+    memoria_trazada_kb: float
+    rss_mb: Optional[float]
+    qobjects: int
+    widgets: int
+    conexiones: Optional[int]
+    objetos_gc: int
+
+
+def _objetos_por_tipo() -> Counter:
+    return Counter(type(o).__qualname__ for o in gc.get_objects())
+
+
+def _qobjects_vivos() -> int:
+    """QObject con envoltorio Python cuyo objeto C++ sigue existiendo"""
+    vivos = 0
+    for obj in gc.get_objects():
+        if isinstance(obj, QObject):
+            try:
+                obj.objectName()
+            except RuntimeError:
+                continue
+            vivos += 1
+    return vivos
+
+
+def _rss_mb() -> Optional[float]:
+    from ui.windows.module_cache import current_rss_bytes
+
+    rss = current_rss_bytes()
+    return None if rss is None else round(rss / 1024 / 1024, 1)
+
+
+def buses_globales() -> List[QObject]:
+    """Instancias cargadas de los buses globales (con y sin prefijo ``src.``)"""
+    buses = []
+    for modulo, atributo in BUSES_GLOBALES:
+        for prefijo in ("", "src."):
+            cargado = sys.modules.get(prefijo + modulo)
+            if cargado is not None and getattr(cargado, atributo, None) is not None:
+                buses.append(getattr(cargado, atributo))
+    return buses
+
+
+def tomar_muestra(ciclo: int, inicio: float, raices: List[QObject]):
+    """Devuelve la muestra, los objetos por tipo y la instantánea de tracemalloc"""
+    vaciar_eventos()
+    gc.collect()
+    actual, _pico = tracemalloc.get_traced_memory()
+    tipos = _objetos_por_tipo()
+    muestra = Muestra(
+        ciclo=ciclo,
+        segundos=round(time.perf_counter() - inicio, 1),
+        memoria_trazada_kb=round(actual / 1024, 1),
+        rss_mb=_rss_mb(),
+        qobjects=_qobjects_vivos(),
+        widgets=len(QApplication.allWidgets()),
+        conexiones=contar_conexiones(raices),
+        objetos_gc=sum(tipos.values()),
+    )
+    instantanea = tracemalloc.take_snapshot().filter_traces(FILTROS_TRACEMALLOC)
+    return muestra, tipos, instantanea
+
+
+def pendiente(xs: List[float], ys: List[float]) -> Optional[float]:
+    """Pendiente por mínimos cuadrados (None si no hay datos suficientes)"""
+    pares = [(x, y) for x, y in zip(xs, ys) if y is not None]
+    if len(pares) < 2:
+        return None
+    n = len(pares)
+    media_x = sum(x for x, _ in pares) / n
+    media_y = sum(y for _, y in pares) / n
+    varianza = sum((x - media_x) ** 2 for x, _ in pares)
+    if not varianza:
+        return None
+    return sum((x - media_x) * (y - media_y) for x, y in pares) / varianza
+
+
+def _sitio(traza: tracemalloc.Traceback) -> List[str]:
+    """Traza legible, del marco más antiguo al más reciente (el que asigna)"""
+    lineas = []
+    for marco in traza:
+        fichero = os.path.relpath(marco.filename, RAIZ) if marco.filename.startswith(RAIZ) else marco.filename
+        codigo = linecache.getline(marco.filename, marco.lineno).strip()
+        lineas.append(f"{fichero}:{marco.lineno}  {codigo}")
+    return lineas
+
+
+def sitios_de_crecimiento(base: tracemalloc.Snapshot, final: tracemalloc.Snapshot, top: int) -> List[Dict[str, Any]]:
+    estadisticas = final.compare_to(base, "traceback")
+    crecen = [e for e in estadisticas if e.size_diff > 0]
+    crecen.sort(key=lambda e: e.size_diff, reverse=True)
+    return [
+        {
+            "kb": round(e.size_diff / 1024, 1),
+            "bloques": e.count_diff,
+            "traza": _sitio(e.traceback),
+        }
+        for e in crecen[:top]
+    ]
+
+
+def tipos_de_crecimiento(base: Counter, final: Counter, top: int) -> List[Dict[str, Any]]:
+    diferencia = [(tipo, final[tipo] - base.get(tipo, 0)) for tipo in final]
+    diferencia = [d for d in diferencia if d[1] > 0]
+    diferencia.sort(key=lambda d: d[1], reverse=True)
+    return [{"tipo": tipo, "objetos": n, "total": final[tipo]} for tipo, n in diferencia[:top]]
+
+
+# ========================================
+# CICLO DE TURNO
+# ========================================
+
+
+@dataclass
+class Turno:
+    """Estado de la sesión simulada"""
+
+    ventana: Any
+    reservas: Any
+    rng: random.Random
+    ciclos: int = 0
+    errores: Counter = field(default_factory=Counter)
+
+    def _tpv(self):
+        widget = self.ventana.module_widgets.get("tpv")
+        return widget if widget is not None and hasattr(widget, "mesas_area") else None
+
+    def cambiar_modulos(self):
+        for module_id in MODULOS_CICLO:
+            self.ventana.show_module(module_id)
+            vaciar_eventos()
+
+    def refrescar_grid(self):
+        from ui.modules.tpv_module.mesa_event_bus import mesa_event_bus
+
+        self.ventana.show_module("tpv")
+        vaciar_eventos()
+        tpv = self._tpv()
+        if tpv is None:
+            raise RuntimeError("el módulo TPV no tiene área de mesas")
+        # Mismo camino que tras crear o eliminar una mesa
+        mesa_event_bus.mesas_actualizadas.emit(tpv.tpv_service.get_mesas())
+        vaciar_eventos()
+        tpv.mesas_area.sync_reservas(self.reservas)
+        vaciar_eventos()
+
+    def editar_reserva(self):
+        from services.audit_service import AuditService
+
+        tpv = self._tpv()
+        mesas = tpv.tpv_service.get_mesas() if tpv else []
+        if not mesas:
+            raise RuntimeError("no hay mesas para reservar")
+        mesa = self.rng.choice(mesas)
+        dia = datetime.now().date() + timedelta(days=self.rng.randint(1, 30))
+        fecha_hora = datetime.combine(dia, datetime.min.time()).replace(hour=self.rng.choice(HORAS_RESERVA))
+        reserva = self.reservas.crear_reserva(
+            mesa.id, f"Cliente soak {self.ciclos}", fecha_hora, 90, "+34 600000000", self.rng.randint(2, 6), ""
+        )
+        AuditService.log("Reserva creada", details={"reserva_id": reserva.id})
+        self.reservas.editar_reserva(reserva.id, {"personas": self.rng.randint(2, 8), "notas": "editada"})
+        AuditService.log("Reserva editada", details={"reserva_id": reserva.id})
+        if tpv:
+            tpv.mesas_area.sync_reservas(self.reservas)
+            vaciar_eventos()
+        self.reservas.cancelar_reserva(reserva.id)
+        AuditService.log("Reserva cancelada", details={"reserva_id": reserva.id})
+
+    def ciclo(self):
+        for paso in (self.cambiar_modulos, self.refrescar_grid, self.editar_reserva):
+            try:
+                paso()
+            except Exception as e:
+                self.errores[f"{paso.__name__}: {type(e).__name__}: {e}"] += 1
+        self.ciclos += 1
+
+
+# ========================================
+# INFORME
+# ========================================
+
+
+SERIES = ("memoria_trazada_kb", "rss_mb", "qobjects", "widgets", "conexiones", "objetos_gc")
+
+
+def analizar(muestras: List[Muestra]) -> Dict[str, Any]:
+    """Pendiente por ciclo de cada serie y crecimiento total desde la línea base
+
+    ``pendiente_final`` se calcula sobre la segunda mitad de las muestras:
+    un escalón al principio (cachés que terminan de llenarse) no es una
+    fuga; lo que sigue creciendo al final del turno sí.
+    """
+    ciclos = [m.ciclo for m in muestras]
+    mitad = len(muestras) // 2
+    analisis = {}
+    for serie in SERIES:
+        valores = [getattr(m, serie) for m in muestras]
+        p = pendiente(ciclos, valores)
+        p_final = pendiente(ciclos[mitad:], valores[mitad:])
+        total = None if valores[0] is None or valores[-1] is None else round(valores[-1] - valores[0], 1)
+        analisis[serie] = {
+            "pendiente_por_ciclo": None if p is None else round(p, 3),
+            "pendiente_final": None if p_final is None else round(p_final, 3),
+            "total": total,
+        }
+    return analisis
+
+
+def comprobar_crecimiento(analisis: Dict[str, Any], muestras: List[Muestra]) -> List[str]:
+    if len(muestras) < MIN_MUESTRAS:
+        return []
+    fallos = []
+    for serie, maximo in CRECIMIENTO_MAXIMO_POR_CICLO.items():
+        datos = analisis[serie]
+        p = datos["pendiente_final"]
+        # Sostenido: sigue creciendo en la segunda mitad y hay crecimiento neto
+        if p is not None and p > maximo and (datos["total"] or 0) > 0:
+            fallos.append(f"{serie} crece {p:g} por ciclo al final del turno (total {datos['total']:g})")
+    return fallos
+
+
+def imprimir_muestra(m: Muestra):
+    conexiones = "-" if m.conexiones is None else m.conexiones
+    rss = "-" if m.rss_mb is None else f"{m.rss_mb:.1f}"
+    print(
+        f"{m.ciclo:>6} {m.segundos:>8.0f} {m.memoria_trazada_kb / 1024:>10.1f} {rss:>8} "
+        f"{m.qobjects:>8} {m.widgets:>8} {conexiones:>8} {m.objetos_gc:>10}"
+    )
+
+
+def imprimir_informe(analisis, tipos, sitios, fallos, errores: Counter):
+    def formato(p):
+        return "-" if p is None else f"{p:+.3f}"
+
+    print(f"\n{'Pendiente por ciclo':<23} {'todo':>10} {'2ª mitad':>10}   total")
+    for serie, datos in analisis.items():
+        print(
+            f"   {serie:<20} {formato(datos['pendiente_por_ciclo']):>10} "
+            f"{formato(datos['pendiente_final']):>10}   {datos['total']}"
+        )
+    if tipos:
+        print("\nTipos con más objetos nuevos:")
+        for t in tipos:
+            print(f"   {t['tipo']:<40} +{t['objetos']:<8} (vivos {t['total']})")
+    if sitios:
+        print("\nPuntos de asignación que más crecen:")
+        for s in sitios:
+            print(f"   +{s['kb']:.1f} KB en {s['bloques']:+d} bloques")
+            for linea in s["traza"]:
+                print(f"      {linea}")
+    if errores:
+        print("\nErrores durante los ciclos:")
+        for error, n in errores.most_common():
+            print(f"   {n:>5} × {error}")
+    for fallo in fallos:
+        print(f"❌ {fallo}")
+
+
+# ========================================
+# PRINCIPAL
+# ========================================
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Prueba de resistencia de la interfaz de Hefest (detección de fugas)")
+    parser.add_argument("--escala", default=ESCALA_DEFECTO, help="Escala del dataset")
+    parser.add_argument("--semilla", type=int, default=42)
+    parser.add_argument("--duracion", type=float, default=DURACION_DEFECTO_MIN, help="Minutos de turno simulado")
+    parser.add_argument("--ciclos", type=int, help="Número de ciclos (tiene prioridad sobre --duracion)")
+    parser.add_argument("--intervalo", type=float, default=INTERVALO_DEFECTO_S, help="Segundos entre instantáneas")
+    parser.add_argument("--calentamiento", type=int, default=CALENTAMIENTO_DEFECTO,
+                        help="Ciclos antes de fijar la línea base")
+    parser.add_argument("--profundidad", type=int, default=PROFUNDIDAD_DEFECTO, help="Marcos por traza de tracemalloc")
+    parser.add_argument("--top", type=int, default=TOP_DEFECTO, help="Sitios y tipos a mostrar")
+    parser.add_argument("--salida", help="Fichero JSON con las muestras y el informe")
+    args = parser.parse_args()
+
+    import logging
+
+    logging.basicConfig(level=logging.ERROR)
+
+    db_path = preparar_base_datos(args.escala, args.semilla)
+    os.environ["HEFEST_DB_PATH"] = db_path
+    app = QApplication.instance() or QApplication(sys.argv[:1])  # noqa: F841
+    qInstallMessageHandler(_registrar_aviso_qt)
+
+    from services.auth_service import get_auth_service
+    from ui.modules.tpv_module.components.reservas_agenda.reserva_service import ReservaService
+    from ui.windows.hefest_main_window import MainWindow
+
+    auth = get_auth_service()
+    if not auth.login(1, "1234"):
+        print("❌ No se pudo iniciar sesión como administrador en el dataset")
+        return 1
+
+    tracemalloc.start(args.profundidad)
+    ventana = MainWindow(auth_service=auth)
+    QTest.qWait(700)
+    turno = Turno(ventana, ReservaService(db_path), random.Random(args.semilla))
+
+    print(f"Soak headless ({os.environ['QT_QPA_PLATFORM']}), dataset {args.escala}: calentando {args.calentamiento} ciclos")
+    for _ in range(args.calentamiento):
+        turno.ciclo()
+    raices = [ventana] + buses_globales()
+    # La primera pasada de las sondas crea envoltorios y descriptores de sip
+    # que no deben contar como crecimiento: se descarta
+    tomar_muestra(0, time.perf_counter(), raices)
+
+    inicio = time.perf_counter()
+    limite = inicio + args.duracion * 60
+    base, tipos_base, instantanea_base = tomar_muestra(0, inicio, raices)
+    muestras = [base]
+    print(f"{'ciclo':>6} {'seg':>8} {'traz. MB':>10} {'RSS MB':>8} {'qobjects':>8} {'widgets':>8} {'conex.':>8} {'objetos':>10}")
+    imprimir_muestra(base)
+
+    ciclo = 0
+    siguiente = inicio + args.intervalo
+    instantanea_final, tipos_final = instantanea_base, tipos_base
+    try:
+        while (ciclo < args.ciclos) if args.ciclos else (time.perf_counter() < limite):
+            turno.ciclo()
+            ciclo += 1
+            ultimo = (ciclo == args.ciclos) if args.ciclos else (time.perf_counter() >= limite)
+            if time.perf_counter() >= siguiente or ultimo:
+                muestra, tipos_final, instantanea_final = tomar_muestra(ciclo, inicio, raices)
+                muestras.append(muestra)
+                imprimir_muestra(muestra)
+                siguiente = time.perf_counter() + args.intervalo
+    except KeyboardInterrupt:
+        print("Interrumpido: informe con las muestras tomadas")
+        if muestras[-1].ciclo != ciclo:
+            muestra, tipos_final, instantanea_final = tomar_muestra(ciclo, inicio, raices)
+            muestras.append(muestra)
+
+    analisis = analizar(muestras)
+    tipos = tipos_de_crecimiento(tipos_base, tipos_final, args.top)
+    sitios = sitios_de_crecimiento(instantanea_base, instantanea_final, args.top)
+    fallos = comprobar_crecimiento(analisis, muestras)
+    imprimir_informe(analisis, tipos, sitios, fallos, turno.errores)
+    tracemalloc.stop()
+
+    if args.salida:
+        informe = {
+            "metadatos": metadatos(),
+            "escala": args.escala,
+            "ciclos": ciclo,
+            "muestras": [asdict(m) for m in muestras],
+            "analisis": analisis,
+            "tipos": tipos,
+            "sitios": sitios,
+            "errores": dict(turno.errores),
+            "incumplimientos": fallos,
+        }
+        with open(args.salida, "w", encoding="utf-8") as f:
+            json.dump(informe, f, ensure_ascii=False, indent=2)
+        print(f"Resultados guardados en {args.salida}")
+
+    ventana.close()
+    shutil.rmtree(os.path.dirname(db_path), ignore_errors=True)
+    if len(muestras) < MIN_MUESTRAS:
+        print(f"⚠️ Solo {len(muestras)} muestras: sin datos suficientes para juzgar el crecimiento")
+        return 0
+    if fallos:
+        return 1
+    print("✅ Sin crecimiento sostenido")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
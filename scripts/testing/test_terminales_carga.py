@@ -0,0 +1,647 @@
+#!/usr/bin/env python3
+"""
+Simulador de carga de un servicio de cenas con varios terminales.
+
+Cada terminal virtual (un proceso o un hilo) usa directamente
+``TPVService`` y ``ReservaService`` sobre la misma base de datos en
+fichero, como lo harían varios TPV de sala contra un servidor local:
+
+- abre mesas de su sección, añade líneas y cambia comandas de mesa
+- toma y cancela reservas (comprobando antes el solapamiento)
+- cobra: el cobro descuenta ingredientes por escandallo y libera la mesa
+- cada ``--intervalo-dashboard`` segundos consulta las métricas del
+  dashboard, como el temporizador de RealDataManager
+
+Se informa de operaciones por segundo (media y sostenida, el percentil 5
+por segundo), latencias p50/p95/p99 por operación, reintentos por
+``database is locked`` (con espera exponencial y jitter, además del
+``timeout`` de 5 s de sqlite3) y los bloqueos que los servicios
+capturan y solo registran en el log. El desfase del journal se muestrea
+durante la carga: en modo WAL, las páginas pendientes de checkpoint y el
+coste del checkpoint final; en modo rollback, la fracción del tiempo con
+el journal en disco (transacción de escritura en curso).
+
+Se trabaja sobre una copia de un dataset sintético
+(scripts/migration/generar_dataset_sintetico.py) a la que se añaden
+escandallos para la carta del servicio.
+
+Uso (desde la raíz del proyecto):
+
+    python scripts/testing/test_terminales_carga.py
+    python scripts/testing/test_terminales_carga.py --terminales 12 --duracion 120 --journal wal
+    python scripts/testing/test_terminales_carga.py --modo hilos --escala mediano --salida carga.json
+    python scripts/testing/test_terminales_carga.py --modo hilos --cola-escritura
+
+Devuelve código 1 si alguna operación se pierde tras agotar los
+reintentos.
+"""
+
+import argparse
+import json
+import logging
+import math
+import multiprocessing
+import os
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter, defaultdict
+from dataclasses import asdict, dataclass
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path[:0] = [
+    RAIZ,
+    os.path.join(RAIZ, "src"),
+    os.path.join(RAIZ, "scripts", "migration"),
+    os.path.join(RAIZ, "scripts", "testing"),
+]
+
+from test_servicios_benchmark import DIRECTORIO_DATASETS, metadatos, percentil, preparar_dataset  # noqa: E402
+
+TERMINALES_DEFECTO = 6
+DURACION_DEFECTO_S = 60.0
+INTERVALO_DASHBOARD_S = 30.0
+PAUSA_DEFECTO_MS = 20.0
+MAX_REINTENTOS = 8
+ESPERA_BASE_S = 0.01
+ESPERA_MAXIMA_S = 0.5
+INTERVALO_MUESTREO_S = 0.1
+
+PLATOS_CARTA = 200
+HORAS_RESERVA = [13, 14, 15, 20, 21, 22]
+
+# Peso relativo de cada acción cuando es posible
+PESOS = {
+    "abrir_mesa": 3.0,
+    "anadir_linea": 10.0,
+    "mover_mesa": 0.4,
+    "reservar": 1.0,
+    "cancelar_reserva": 0.3,
+    "pagar": 2.0,
+}
+
+
+@dataclass
+class ConfigCarga:
+    db_path: str
+    terminales: int
+    duracion_s: float
+    semilla: int
+    pausa_ms: float
+    intervalo_dashboard_s: float
+    max_reintentos: int
+    carta: List[int]
+    cola_escritura: bool = False
+
+
+def es_bloqueo(error: Any) -> bool:
+    mensaje = str(error).lower()
+    return "database is locked" in mensaje or "database is busy" in mensaje
+
+
+class ContadorBloqueos(logging.Handler):
+    """Cuenta, por hilo, los bloqueos que los servicios capturan y solo registran"""
+
+    def __init__(self):
+        super().__init__(logging.WARNING)
+        self.por_hilo: Counter = Counter()
+
+    def emit(self, record: logging.LogRecord):
+        if es_bloqueo(record.getMessage()):
+            self.por_hilo[record.thread] += 1
+
+
+_contador_bloqueos: Optional[ContadorBloqueos] = None
+
+
+def instalar_contador_bloqueos() -> ContadorBloqueos:
+    """Sustituye los handlers del log raíz: los servicios registran en cada operación"""
+    global _contador_bloqueos
+    if _contador_bloqueos is None:
+        _contador_bloqueos = ContadorBloqueos()
+        raiz = logging.getLogger()
+        for handler in list(raiz.handlers):
+            raiz.removeHandler(handler)
+        raiz.addHandler(_contador_bloqueos)
+        raiz.setLevel(logging.WARNING)
+    return _contador_bloqueos
+
+
+# ========================================
+# TERMINAL VIRTUAL
+# ========================================
+
+
+class Terminal:
+    """Un TPV de sala con su sección de mesas y sus propios servicios"""
+
+    def __init__(self, indice: int, config: ConfigCarga):
+        from data.db_manager import DatabaseManager
+        from services.tpv_service import TPVService
+        from ui.modules.tpv_module.components.reservas_agenda.reserva_service import ReservaService
+        from utils.real_data_manager import RealDataManager
+
+        self.indice = indice
+        self.config = config
+        self.rng = random.Random(config.semilla * 1000 + indice)
+        self.db = DatabaseManager(config.db_path)
+        self.tpv = TPVService(self.db)
+        self.reservas = ReservaService(config.db_path)
+        self.datos = RealDataManager(self.db)
+
+        libres = sorted(m.id for m in self.tpv.get_mesas() if m.estado == "libre")
+        self.seccion = libres[indice :: config.terminales]
+        self.libres = list(self.seccion)
+        self.abiertas: List[int] = []
+        self.reservas_tomadas: List[int] = []
+
+        # (instante de fin en epoch, operación, latencia ms)
+        self.registro: List[Tuple[float, str, float]] = []
+        self.errores: Counter = Counter()
+        self.ultimo_error: Dict[str, str] = {}
+        self.reintentos = 0
+        self.espera_bloqueo_ms = 0.0
+
+    # ----- acciones -----
+
+    def _persistir_estado(self, mesa_id: int):
+        mesa = self.tpv.get_mesa_por_id(mesa_id)
+        if mesa:
+            self.tpv.update_mesa(mesa)
+
+    def abrir_mesa(self):
+        mesa_id = self.libres[self.rng.randrange(len(self.libres))]
+        self.tpv.crear_comanda(mesa_id)
+        self._persistir_estado(mesa_id)
+        self.libres.remove(mesa_id)
+        self.abiertas.append(mesa_id)
+
+    def anadir_linea(self):
+        mesa_id = self.rng.choice(self.abiertas)
+        self.tpv.add_producto_comanda(mesa_id, self.rng.choice(self.config.carta), self.rng.randint(1, 3))
+
+    def mover_mesa(self):
+        origen = self.rng.choice(self.abiertas)
+        destino = self.libres[self.rng.randrange(len(self.libres))]
+        comanda = self.tpv.get_comanda_activa(origen)
+        nueva = self.tpv.crear_comanda(destino)
+        for linea in comanda.lineas:
+            self.tpv.agregar_producto_a_comanda(
+                nueva.id, linea.producto_id, linea.producto_nombre, linea.precio_unidad, linea.cantidad
+            )
+        self.tpv.liberar_mesa(origen)
+        self._persistir_estado(destino)
+        self._persistir_estado(origen)
+        self.abiertas[self.abiertas.index(origen)] = destino
+        self.libres[self.libres.index(destino)] = origen
+
+    def reservar(self):
+        mesa_id = self.rng.choice(self.seccion)
+        dia = date.today() + timedelta(days=self.rng.randint(1, 30))
+        fecha_hora = datetime.combine(dia, datetime.min.time()).replace(hour=self.rng.choice(HORAS_RESERVA))
+        if self.tpv.reserva_solapada(mesa_id, dia, fecha_hora.time(), 120):
+            return
+        reserva = self.reservas.crear_reserva(
+            mesa_id, f"Cliente T{self.indice}", fecha_hora, 120, "+34 600000000", self.rng.randint(2, 6), ""
+        )
+        self.reservas_tomadas.append(reserva.id)
+
+    def cancelar_reserva(self):
+        reserva_id = self.reservas_tomadas[-1]
+        self.reservas.cancelar_reserva(reserva_id)
+        self.reservas_tomadas.pop()
+
+    def pagar(self):
+        mesa_id = self.rng.choice(self.abiertas)
+        comanda = self.tpv.get_comanda_activa(mesa_id)
+        if comanda.estado != "pagada":
+            self.tpv.pagar_comanda(comanda.id)
+        self.tpv.liberar_mesa(mesa_id)
+        self._persistir_estado(mesa_id)
+        self.abiertas.remove(mesa_id)
+        self.libres.append(mesa_id)
+
+    def consultar_dashboard(self):
+        self.datos._get_real_metrics_formatted()
+
+    def _acciones_posibles(self) -> Dict[str, float]:
+        posibles = {"reservar": PESOS["reservar"]}
+        if self.libres:
+            # Con la sala vacía se abren más mesas; llena, se cobra más
+            posibles["abrir_mesa"] = PESOS["abrir_mesa"] * (len(self.libres) / max(1, len(self.seccion)) + 0.2)
+        if self.abiertas:
+            posibles["anadir_linea"] = PESOS["anadir_linea"]
+            posibles["pagar"] = PESOS["pagar"] * (len(self.abiertas) / max(1, len(self.seccion)) + 0.2)
+            if self.libres:
+                posibles["mover_mesa"] = PESOS["mover_mesa"]
+        if self.reservas_tomadas:
+            posibles["cancelar_reserva"] = PESOS["cancelar_reserva"]
+        return posibles
+
+    # ----- ejecución -----
+
+    def medir(self, nombre: str, accion: Callable[[], Any]):
+        """Ejecuta la acción reintentando los bloqueos de SQLite y registra su latencia"""
+        inicio = time.perf_counter()
+        for intento in range(self.config.max_reintentos + 1):
+            try:
+                accion()
+                break
+            except sqlite3.OperationalError as e:
+                if not es_bloqueo(e) or intento == self.config.max_reintentos:
+                    self.errores[nombre] += 1
+                    self.ultimo_error[nombre] = str(e)
+                    break
+                self.reintentos += 1
+                espera = min(ESPERA_MAXIMA_S, ESPERA_BASE_S * 2**intento) * self.rng.uniform(0.5, 1.5)
+                time.sleep(espera)
+                self.espera_bloqueo_ms += espera * 1000.0
+            except Exception as e:
+                self.errores[nombre] += 1
+                self.ultimo_error[nombre] = f"{type(e).__name__}: {e}"
+                break
+        self.registro.append((time.time(), nombre, (time.perf_counter() - inicio) * 1000.0))
+
+    def ejecutar(self, hasta: float):
+        proximo_dashboard = time.time() + self.rng.uniform(0, self.config.intervalo_dashboard_s)
+        pausa_s = self.config.pausa_ms / 1000.0
+        while time.time() < hasta:
+            if time.time() >= proximo_dashboard:
+                self.medir("dashboard", self.consultar_dashboard)
+                proximo_dashboard += self.config.intervalo_dashboard_s
+                continue
+            posibles = self._acciones_posibles()
+            nombre = self.rng.choices(list(posibles), weights=list(posibles.values()))[0]
+            self.medir(nombre, getattr(self, nombre))
+            if pausa_s:
+                # Tiempo del camarero entre pulsaciones
+                time.sleep(self.rng.expovariate(1.0 / pausa_s))
+
+    def resultado(self, bloqueos_registrados: int) -> Dict[str, Any]:
+        return {
+            "terminal": self.indice,
+            "mesas": len(self.seccion),
+            "registro": self.registro,
+            "errores": dict(self.errores),
+            "ultimo_error": self.ultimo_error,
+            "reintentos": self.reintentos,
+            "espera_bloqueo_ms": round(self.espera_bloqueo_ms, 1),
+            "bloqueos_registrados": bloqueos_registrados,
+        }
+
+
+def ejecutar_terminal(indice: int, config: ConfigCarga, listos, arranque, resultados, crear_app: bool):
+    """Punto de entrada de cada terminal (proceso o hilo)"""
+    contador = instalar_contador_bloqueos()
+    if crear_app:
+        # RealDataManager y los buses de eventos son QObject
+        from PyQt6.QtCore import QCoreApplication
+
+        _app = QCoreApplication.instance() or QCoreApplication(sys.argv[:1])  # noqa: F841
+    cola = None
+    if config.cola_escritura:
+        # Una por proceso; en modo hilos la comparten todos los terminales
+        from data.write_queue import iniciar_cola_escritura
+
+        cola = iniciar_cola_escritura(config.db_path)
+    try:
+        terminal = Terminal(indice, config)
+    except Exception as e:
+        listos.put((indice, f"{type(e).__name__}: {e}"))
+        return
+    listos.put((indice, None))
+    arranque.wait()
+    terminal.ejecutar(time.time() + config.duracion_s)
+    resultado = terminal.resultado(contador.por_hilo[threading.get_ident()])
+    if cola is not None and crear_app:
+        cola.detener()
+        resultado["cola_escritura"] = cola.estadisticas()
+    resultados.put(resultado)
+
+
+# ========================================
+# JOURNAL
+# ========================================
+
+
+class MonitorJournal(threading.Thread):
+    """Muestrea el fichero de journal (WAL o rollback) durante la carga"""
+
+    def __init__(self, db_path: str):
+        super().__init__(daemon=True, name="MonitorJournal")
+        self.db_path = db_path
+        conn = sqlite3.connect(db_path)
+        self.modo = conn.execute("PRAGMA journal_mode").fetchone()[0].lower()
+        self.tamano_pagina = conn.execute("PRAGMA page_size").fetchone()[0]
+        conn.close()
+        self.muestras: List[int] = []
+        self._parar = threading.Event()
+
+    def run(self):
+        sufijo = "-wal" if self.modo == "wal" else "-journal"
+        while not self._parar.wait(INTERVALO_MUESTREO_S):
+            try:
+                self.muestras.append(os.path.getsize(self.db_path + sufijo))
+            except OSError:
+                self.muestras.append(-1)  # sin journal en disco
+
+    def detener(self) -> Dict[str, Any]:
+        self._parar.set()
+        self.join()
+        presentes = [m for m in self.muestras if m >= 0]
+        datos: Dict[str, Any] = {"modo": self.modo, "muestras": len(self.muestras)}
+        if self.modo == "wal":
+            # Cabecera de 32 bytes y 24 por trama además de la página
+            tramas = [max(0, (m - 32) // (self.tamano_pagina + 24)) for m in presentes]
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            inicio = time.perf_counter()
+            bloqueado, log, movidas = conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchone()
+            conn.close()
+            datos.update(
+                {
+                    "wal_max_kb": round(max(presentes, default=0) / 1024, 1),
+                    "wal_medio_kb": round(sum(presentes) / max(1, len(presentes)) / 1024, 1),
+                    "paginas_pendientes_max": max(tramas, default=0),
+                    "paginas_pendientes_media": round(sum(tramas) / max(1, len(tramas)), 1),
+                    "checkpoint_final_ms": round((time.perf_counter() - inicio) * 1000.0, 1),
+                    "checkpoint_final": {"bloqueado": bloqueado, "tramas": log, "movidas": movidas},
+                }
+            )
+        else:
+            datos.update(
+                {
+                    "fraccion_con_journal": round(len(presentes) / max(1, len(self.muestras)), 3),
+                    "journal_max_kb": round(max(presentes, default=0) / 1024, 1),
+                }
+            )
+        return datos
+
+
+# ========================================
+# PREPARACIÓN
+# ========================================
+
+
+def preparar_base_datos(escala: str, semilla: int, journal: str) -> str:
+    origen = preparar_dataset(escala, semilla, DIRECTORIO_DATASETS)
+    destino = os.path.join(tempfile.mkdtemp(prefix="hefest_carga_"), "hefest.db")
+    shutil.copyfile(origen, destino)
+    if journal != "actual":
+        conn = sqlite3.connect(destino)
+        conn.execute(f"PRAGMA journal_mode={journal}")
+        conn.close()
+    return destino
+
+
+def preparar_carta(db_path: str, semilla: int) -> List[int]:
+    """Carta del servicio con escandallos: cobrar descuenta ingredientes"""
+    from data.db_manager import DatabaseManager
+    from services.escandallo_service import ComponenteReceta, EscandalloService
+
+    rng = random.Random(semilla)
+    db = DatabaseManager(db_path)
+    productos = [r[0] for r in db.query("SELECT id FROM productos WHERE precio > 0 ORDER BY id")]
+    carta = productos[:PLATOS_CARTA]
+    ingredientes = productos[PLATOS_CARTA:] or carta
+    escandallos = EscandalloService(db)
+    for producto_id in carta:
+        componentes = [
+            ComponenteReceta(ingrediente, round(rng.uniform(0.05, 0.5), 3))
+            for ingrediente in rng.sample(ingredientes, min(len(ingredientes), rng.randint(2, 4)))
+            if ingrediente != producto_id
+        ]
+        escandallos.definir_receta(producto_id, componentes)
+    return carta
+
+
+# ========================================
+# INFORME
+# ========================================
+
+
+def resumir(resultados: List[Dict[str, Any]], duracion_s: float) -> Dict[str, Any]:
+    por_operacion: Dict[str, List[float]] = defaultdict(list)
+    por_segundo: Counter = Counter()
+    instantes = [fin for r in resultados for fin, _, _ in r["registro"]]
+    origen = min(instantes, default=0.0)
+    for r in resultados:
+        for fin, nombre, ms in r["registro"]:
+            por_operacion[nombre].append(ms)
+            por_segundo[int(fin - origen)] += 1
+
+    errores: Counter = Counter()
+    for r in resultados:
+        errores.update(r["errores"])
+
+    operaciones = {}
+    for nombre, tiempos in sorted(por_operacion.items()):
+        tiempos.sort()
+        operaciones[nombre] = {
+            "n": len(tiempos),
+            "errores": errores.get(nombre, 0),
+            "p50_ms": round(percentil(tiempos, 0.50), 3),
+            "p95_ms": round(percentil(tiempos, 0.95), 3),
+            "p99_ms": round(percentil(tiempos, 0.99), 3),
+            "max_ms": round(tiempos[-1], 3),
+        }
+
+    todos = sorted(ms for tiempos in por_operacion.values() for ms in tiempos)
+    # El primer y el último segundo están incompletos
+    segundos = [por_segundo.get(s, 0) for s in range(1, max(1, math.floor(duracion_s)) - 1)]
+    total = len(todos)
+    return {
+        "operaciones_totales": total,
+        "ops_s_media": round(total / duracion_s, 1) if duracion_s else None,
+        "ops_s_sostenidas_p5": percentil(sorted(segundos), 0.05) if segundos else None,
+        "p95_ms": round(percentil(todos, 0.95), 3) if todos else None,
+        "p99_ms": round(percentil(todos, 0.99), 3) if todos else None,
+        "reintentos_bloqueo": sum(r["reintentos"] for r in resultados),
+        "espera_bloqueo_ms": round(sum(r["espera_bloqueo_ms"] for r in resultados), 1),
+        "bloqueos_registrados": sum(r["bloqueos_registrados"] for r in resultados),
+        "operaciones_perdidas": sum(errores.values()),
+        "operaciones": operaciones,
+        "ops_por_segundo": segundos,
+        "ultimos_errores": {k: v for r in resultados for k, v in r["ultimo_error"].items()},
+        "cola_escritura": resumir_colas([r["cola_escritura"] for r in resultados if "cola_escritura" in r]),
+    }
+
+
+def resumir_colas(colas: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Agregado de las colas de escritura (una por proceso)"""
+    if not colas:
+        return None
+    operaciones = sum(c["operaciones"] for c in colas)
+    lotes = sum(c["lotes"] for c in colas)
+    return {
+        "colas": len(colas),
+        "operaciones": operaciones,
+        "lotes": lotes,
+        "operaciones_por_lote": round(operaciones / lotes, 2) if lotes else 0.0,
+        "reintentos": sum(c["reintentos"] for c in colas),
+        "lotes_fallidos": sum(c["lotes_fallidos"] for c in colas),
+        "profundidad_max": max(c["profundidad_max"] for c in colas),
+        "commit_p95_ms": max(c["commit_p95_ms"] for c in colas),
+        "commit_max_ms": max(c["commit_max_ms"] for c in colas),
+    }
+
+
+def imprimir(resumen: Dict[str, Any], journal: Dict[str, Any]):
+    print(f"\n{'operación':<18} {'n':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9} {'errores':>8}")
+    for nombre, datos in resumen["operaciones"].items():
+        print(
+            f"{nombre:<18} {datos['n']:>7} {datos['p50_ms']:>9.2f} {datos['p95_ms']:>9.2f} "
+            f"{datos['p99_ms']:>9.2f} {datos['max_ms']:>9.1f} {datos['errores']:>8}"
+        )
+    print(
+        f"\nOperaciones: {resumen['operaciones_totales']:,} | {resumen['ops_s_media']} op/s de media, "
+        f"{resumen['ops_s_sostenidas_p5']} op/s sostenidas (p5 por segundo)"
+    )
+    print(f"Latencia global: p95 {resumen['p95_ms']} ms, p99 {resumen['p99_ms']} ms")
+    print(
+        f"Bloqueos: {resumen['reintentos_bloqueo']} reintentos ({resumen['espera_bloqueo_ms']} ms en espera), "
+        f"{resumen['bloqueos_registrados']} capturados por los servicios"
+    )
+    if journal["modo"] == "wal":
+        print(
+            f"Journal WAL: máx {journal['wal_max_kb']} KB ({journal['paginas_pendientes_max']} páginas pendientes), "
+            f"checkpoint final {journal['checkpoint_final_ms']} ms"
+        )
+    else:
+        print(
+            f"Journal {journal['modo']}: presente el {journal['fraccion_con_journal']:.0%} del tiempo, "
+            f"máx {journal['journal_max_kb']} KB"
+        )
+    cola = resumen.get("cola_escritura")
+    if cola:
+        print(
+            f"Cola de escritura ({cola['colas']}): {cola['operaciones_por_lote']} operaciones por commit, "
+            f"commit p95 {cola['commit_p95_ms']} ms (máx {cola['commit_max_ms']}), "
+            f"profundidad máx {cola['profundidad_max']}, {cola['reintentos']} reintentos, "
+            f"{cola['lotes_fallidos']} lotes fallidos"
+        )
+    for nombre, error in resumen["ultimos_errores"].items():
+        print(f"   ⚠️ {nombre}: {error}")
+
+
+# ========================================
+# PRINCIPAL
+# ========================================
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Simulador de carga multi-terminal de Hefest")
+    parser.add_argument("--terminales", type=int, default=TERMINALES_DEFECTO)
+    parser.add_argument("--modo", choices=["procesos", "hilos"], default="procesos")
+    parser.add_argument("--duracion", type=float, default=DURACION_DEFECTO_S, help="Segundos de servicio")
+    parser.add_argument("--escala", default="pequeno", help="Escala del dataset sintético")
+    parser.add_argument("--semilla", type=int, default=42)
+    parser.add_argument("--journal", choices=["actual", "wal", "delete"], default="actual",
+                        help="Modo de journal de la copia de trabajo")
+    parser.add_argument("--pausa-ms", type=float, default=PAUSA_DEFECTO_MS,
+                        help="Pausa media entre acciones de cada terminal (0 = sin pausa)")
+    parser.add_argument("--intervalo-dashboard", type=float, default=INTERVALO_DASHBOARD_S)
+    parser.add_argument("--max-reintentos", type=int, default=MAX_REINTENTOS)
+    parser.add_argument("--cola-escritura", action="store_true",
+                        help="Escrituras por el hilo escritor con group commit (data/write_queue.py)")
+    parser.add_argument("--salida", help="Fichero JSON con los resultados")
+    args = parser.parse_args()
+
+    instalar_contador_bloqueos()
+    db_path = preparar_base_datos(args.escala, args.semilla, args.journal)
+    config = ConfigCarga(
+        db_path=db_path,
+        terminales=args.terminales,
+        duracion_s=args.duracion,
+        semilla=args.semilla,
+        pausa_ms=args.pausa_ms,
+        intervalo_dashboard_s=args.intervalo_dashboard,
+        max_reintentos=args.max_reintentos,
+        carta=preparar_carta(db_path, args.semilla),
+        cola_escritura=args.cola_escritura,
+    )
+
+    if args.modo == "procesos":
+        contexto = multiprocessing.get_context("spawn")
+        listos, resultados, arranque = contexto.Queue(), contexto.Queue(), contexto.Event()
+        trabajadores = [
+            contexto.Process(target=ejecutar_terminal, args=(i, config, listos, arranque, resultados, True))
+            for i in range(args.terminales)
+        ]
+    else:
+        import queue
+
+        from PyQt6.QtCore import QCoreApplication
+
+        _app = QCoreApplication.instance() or QCoreApplication(sys.argv[:1])  # noqa: F841
+        listos, resultados, arranque = queue.Queue(), queue.Queue(), threading.Event()
+        trabajadores = [
+            threading.Thread(target=ejecutar_terminal, args=(i, config, listos, arranque, resultados, False),
+                             name=f"Terminal-{i}", daemon=True)
+            for i in range(args.terminales)
+        ]
+
+    print(f"Servicio simulado: {args.terminales} terminales ({args.modo}), {args.duracion:.0f} s, "
+          f"dataset {args.escala}, {len(config.carta)} platos con escandallo")
+    for trabajador in trabajadores:
+        trabajador.start()
+    fallidos = []
+    for _ in trabajadores:
+        indice, error = listos.get()
+        if error:
+            fallidos.append(f"terminal {indice}: {error}")
+    if fallidos:
+        print("❌ No arrancaron todos los terminales:\n   " + "\n   ".join(fallidos))
+        arranque.set()
+        return 1
+
+    monitor = MonitorJournal(db_path)
+    monitor.start()
+    inicio = time.perf_counter()
+    arranque.set()
+    datos_terminales = [resultados.get() for _ in trabajadores]
+    duracion = time.perf_counter() - inicio
+    for trabajador in trabajadores:
+        trabajador.join()
+    journal = monitor.detener()
+    if args.cola_escritura and args.modo == "hilos":
+        from data.write_queue import get_cola_escritura
+
+        cola = get_cola_escritura(db_path)
+        if cola is not None:
+            cola.detener()
+            datos_terminales[0]["cola_escritura"] = cola.estadisticas()
+
+    resumen = resumir(datos_terminales, duracion)
+    imprimir(resumen, journal)
+
+    if args.salida:
+        informe = {
+            "meta": metadatos(),
+            "config": {k: v for k, v in asdict(config).items() if k not in ("carta", "db_path")}
+            | {"modo": args.modo, "escala": args.escala},
+            "resumen": resumen,
+            "journal": journal,
+            "terminales": [
+                {k: v for k, v in t.items() if k != "registro"} | {"operaciones": len(t["registro"])}
+                for t in sorted(datos_terminales, key=lambda t: t["terminal"])
+            ],
+        }
+        with open(args.salida, "w", encoding="utf-8") as f:
+            json.dump(informe, f, ensure_ascii=False, indent=2)
+        print(f"\nResultados guardados en {args.salida}")
+
+    shutil.rmtree(os.path.dirname(db_path), ignore_errors=True)
+    if resumen["operaciones_perdidas"]:
+        print(f"❌ {resumen['operaciones_perdidas']} operaciones perdidas tras agotar los reintentos")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -7,45 +7,39 @@ Este módulo inicializa los componentes principales y lanza la interfaz gráfica
 
 import sys
 import logging
-from PyQt6.QtWidgets import QApplication, QDialog, QInputDialog, QLineEdit, QMessageBox
-from PyQt6.QtCore import Qt
-from PyQt6.QtGui import QFont
 
-# Configuración avanzada de logging global
-import os
-from logging.handlers import RotatingFileHandler
+# Línea de tiempo del arranque: debe importarse antes que el resto
+from utils.startup_timeline import get_startup_timeline
 
-LOG_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'logs')
-os.makedirs(LOG_DIR, exist_ok=True)
-LOG_FILE = os.path.join(LOG_DIR, 'hefest_app.log')
+startup_timeline = get_startup_timeline()
+startup_timeline.instrumentar_importaciones()
 
-# Formato detallado para consola y archivo
-LOG_FORMAT = "%(asctime)s | %(levelname)s | %(name)s | %(message)s"
+with startup_timeline.fase("importacion_qt"):
+    from PyQt6.QtWidgets import QApplication, QDialog, QInputDialog, QLineEdit, QMessageBox
+    from PyQt6.QtCore import Qt
+    from PyQt6.QtGui import QFont
 
-# Handler de archivo rotativo (5MB, 3 backups)
-file_handler = RotatingFileHandler(LOG_FILE, maxBytes=5*1024*1024, backupCount=3, encoding='utf-8')
-file_handler.setLevel(logging.DEBUG)
-file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+# Logging asíncrono con niveles por módulo (config/*.json, ver utils/logging_setup.py)
+with startup_timeline.fase("configuracion_logging"):
+    from utils.logging_setup import configurar_logging
 
-# Handler de consola
-console_handler = logging.StreamHandler()
-console_handler.setLevel(logging.DEBUG)
-console_handler.setFormatter(logging.Formatter(LOG_FORMAT))
-
-# Configuración global
-logging.basicConfig(level=logging.DEBUG, handlers=[file_handler, console_handler])
-logger = logging.getLogger(__name__)
-
-# Asegurar propagación y nivel DEBUG para todos los loggers
-logging.captureWarnings(True)
+    logging_config = configurar_logging()
+    logger = logging.getLogger(__name__)
 
 # Importar componentes necesarios
-from data.db_manager import DatabaseManager
-from ui.windows.hefest_main_window import MainWindow
-from utils.modern_styles import ModernStyles
+with startup_timeline.fase("importacion_componentes"):
+    from data.backup_manager import iniciar_backups_programados
+    from data.db_manager import DatabaseManager
+    from data.maintenance import iniciar_mantenimiento_programado
+    from data.write_queue import iniciar_cola_escritura
+    from ui.windows.hefest_main_window import MainWindow
+    from utils.modern_styles import ModernStyles
 
-from services.auth_service import get_auth_service
-from services.audit_service import AuditService
+    from services.auth_service import get_auth_service
+    from services.audit_service import AuditService
+    from utils.change_poller import iniciar_sondeo_cambios
+    from utils.event_loop_watchdog import get_event_loop_watchdog
+    from utils.metrics_endpoint import instrument_event_bus, start_metrics_endpoint_from_env
 
 
 class Hefest:
@@ -56,22 +50,55 @@ class Hefest:
         logger.info("Iniciando Hefest v1.0")
 
         # Inicializar la aplicación Qt
-        self.app = QApplication(sys.argv)
-        self.app.setApplicationName("Hefest")
-        self.app.setApplicationVersion("1.0.0")
+        with startup_timeline.fase("qapplication"):
+            self.app = QApplication(sys.argv)
+            self.app.setApplicationName("Hefest")
+            self.app.setApplicationVersion("1.0.0")
         # Configurar el estilo
-        self._setup_style()
+        with startup_timeline.fase("estilos"):
+            self._setup_style()
 
         # Inicializar componentes
-        self.db = DatabaseManager()
+        with startup_timeline.fase("base_de_datos"):
+            self.db = DatabaseManager()
+            # Un hilo escritor con group commit y reintentos ante bloqueos (data/write_queue.py)
+            self.escritura = iniciar_cola_escritura(self.db.db_path)
+            # Copias en caliente cada database.backup_interval (data/backup_manager.py)
+            self.backups = iniciar_backups_programados(self.db.db_path)
+            # ANALYZE/optimize, vacuum incremental y checkpoint en ventanas de ocio (data/maintenance.py)
+            self.mantenimiento = iniciar_mantenimiento_programado(self.db.db_path)
+            # Cambios de cualquier terminal -> señales por tabla (utils/change_poller.py)
+            self.cambios = iniciar_sondeo_cambios(self.db.db_path)
         # Inicializar servicio de autenticación
-        self.auth_service = get_auth_service()
-        # Logging inicial
-        AuditService.log("Sistema iniciado", details={"version": "1.0.0"})
+        with startup_timeline.fase("autenticacion"):
+            self.auth_service = get_auth_service()
+            # Logging inicial
+            AuditService.log("Sistema iniciado", details={"version": "1.0.0"})
+
+        with startup_timeline.fase("diagnostico"):
+            # Vigilante de bloqueos de la interfaz
+            self.watchdog = get_event_loop_watchdog()
+            self.watchdog.start(parent=self.app)
+
+            # Endpoint local de métricas (opcional, HEFEST_METRICS_PORT)
+            self.metrics_endpoint = start_metrics_endpoint_from_env(self.db.db_path)
+            if self.metrics_endpoint:
+                self._setup_gui_metrics()
 
         # Ventana principal (se creará después del login)
         self.main_window = None
 
+    def _setup_gui_metrics(self):
+        """Difusión de los event bus"""
+        from ui.modules.tpv_module.mesa_event_bus import mesa_event_bus
+        # Los diálogos de reservas importan el bus con el prefijo src.
+        from src.ui.modules.tpv_module.event_bus import reserva_event_bus
+
+        instrument_event_bus("mesas", mesa_event_bus)
+        instrument_event_bus("reservas", reserva_event_bus)
+        if self.cambios:
+            instrument_event_bus("cambios", self.cambios)
+
     def _setup_style(self):
         """Configura el estilo visual moderno de la aplicación"""
         # Configurar fuente
@@ -118,6 +145,7 @@ class Hefest:
         from ui.windows.authentication_dialog import LoginDialog
 
         login_dialog = LoginDialog()
+        startup_timeline.marcar("login_visible")
         result = login_dialog.exec()
 
         if result == QDialog.DialogCode.Accepted:
@@ -176,7 +204,8 @@ class Hefest:
         """Inicializa la ventana principal"""
         if not self.main_window:
             # Pasar la instancia de AuthService a MainWindow
-            self.main_window = MainWindow(auth_service=self.auth_service)
+            with startup_timeline.fase("ventana_principal"):
+                self.main_window = MainWindow(auth_service=self.auth_service)
             # Configuración adicional para mantener la ventana activa
             self.main_window.setAttribute(Qt.WidgetAttribute.WA_DeleteOnClose, False)
             self.app.setActiveWindow(self.main_window)
@@ -191,8 +220,21 @@ class Hefest:
 
     def run(self):
         """Ejecuta la aplicación"""
-        if self.show_login():
-            return self.app.exec()
+        # El tiempo en los diálogos de login no cuenta para el arranque
+        with startup_timeline.fase("login", espera_usuario=True):
+            login_ok = self.show_login()
+        if login_ok:
+            codigo = self.app.exec()
+            if self.cambios:
+                self.cambios.stop()
+            if self.backups:
+                self.backups.detener()
+            if self.escritura:
+                # Confirma lo que quede en la cola antes del mantenimiento de cierre
+                self.escritura.detener()
+            if self.mantenimiento:
+                self.mantenimiento.ejecutar_al_cierre()
+            return codigo
         else:
             return 1  # Código de error si el login fue cancelado
 
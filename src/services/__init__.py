@@ -1,8 +1,33 @@
 # Archivo para hacer que el directorio sea un paquete Python
 # Servicios de negocio para la aplicación Hefest
 
-from .hospederia_service import HospederiaService
-from .tpv_service import TPVService
-from .inventario_service_real import InventarioService
+# Importación diferida: ``from services.auth_service import ...`` no debe
+# cargar todos los servicios (ni numpy) durante el arranque
+_LAZY_EXPORTS = {
+    "HospederiaService": ".hospederia_service",
+    "TPVService": ".tpv_service",
+    "InventarioService": ".inventario_service_real",
+    "ImportExportService": ".import_export_service",
+    "EscandalloService": ".escandallo_service",
+    "ReposicionService": ".reposicion_service",
+}
 
-__all__ = ["HospederiaService", "TPVService", "InventarioService"]
+
+def __getattr__(name):
+    if name in _LAZY_EXPORTS:
+        import importlib
+
+        value = getattr(importlib.import_module(_LAZY_EXPORTS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+__all__ = [
+    "HospederiaService",
+    "TPVService",
+    "InventarioService",
+    "ImportExportService",
+    "EscandalloService",
+    "ReposicionService",
+]
@@ -91,6 +91,8 @@ class AlertasService:
         self.alertas_cache = []
         self.contadores_departamento = {}
         self.logger = logging.getLogger(__name__)
+        # Planificador de reposición (se crea al primer uso y conserva su caché)
+        self._reposicion = None
 
     from services.inventario_service_real import Producto
     from typing import Any
@@ -127,6 +129,68 @@ class AlertasService:
             self.logger.error(f"Error registrando alertas de inventario: {e}")
             return []
 
+    def registrar_sugerencias_reposicion(
+        self, sugerencias: list, plazo_entrega_dias: float = 3.0
+    ) -> list[AlertaCentralizada]:
+        """Convierte sugerencias del planificador de reposición a alertas centralizadas"""
+        alertas_centralizadas = []
+
+        try:
+            for sugerencia in sugerencias:
+                cobertura = sugerencia.dias_cobertura
+                # Si el stock no llega al plazo de entrega, la rotura es inminente
+                urgente = cobertura is not None and cobertura < plazo_entrega_dias
+                texto_cobertura = (
+                    f"{cobertura:.1f} días" if cobertura is not None else "sin consumo"
+                )
+                alertas_centralizadas.append(
+                    AlertaCentralizada(
+                        id=f"repo_{sugerencia.id}",
+                        departamento=TipoDepartamento.INVENTARIO,
+                        tipo="reposicion",
+                        prioridad="alta" if urgente else "media",
+                        titulo=sugerencia.nombre,
+                        mensaje=(
+                            f"Stock: {sugerencia.stock_actual:g} / Punto de pedido: "
+                            f"{sugerencia.punto_pedido:g} · Cobertura: {texto_cobertura} · "
+                            f"Pedir {sugerencia.cantidad_sugerida}"
+                        ),
+                        fecha_creacion=datetime.now(),
+                        datos_contexto={
+                            "producto_id": sugerencia.id,
+                            "producto_nombre": sugerencia.nombre,
+                            "proveedor_id": sugerencia.proveedor_id,
+                            "punto_pedido": sugerencia.punto_pedido,
+                            "cantidad_sugerida": sugerencia.cantidad_sugerida,
+                            "dias_cobertura": cobertura,
+                        },
+                        acciones_disponibles=["Generar Pedido", "Ver Producto"],
+                    )
+                )
+
+            self.logger.info(
+                f"Registradas {len(alertas_centralizadas)} alertas de reposición"
+            )
+            return alertas_centralizadas
+
+        except Exception as e:
+            self.logger.error(f"Error registrando alertas de reposición: {e}")
+            return []
+
+    def _get_alertas_reposicion(self, db_manager, excluir: set) -> list[AlertaCentralizada]:
+        """Alertas del planificador para productos que no estén ya en ``excluir``"""
+        from services.reposicion_service import ReposicionService
+
+        if self._reposicion is None:
+            self._reposicion = ReposicionService(db_manager)
+
+        sugerencias = [
+            s for s in self._reposicion.get_sugerencias() if s.id not in excluir
+        ]
+        return self.registrar_sugerencias_reposicion(
+            sugerencias, self._reposicion.plazo_entrega_dias
+        )
+
     def get_alertas_dashboard(self) -> dict[str, Any]:
         """Obtiene resumen de alertas para el dashboard"""
         try:
@@ -145,6 +209,15 @@ class AlertasService:
                 self.logger.error(f"Error obteniendo alertas de inventario: {e}")
                 alertas_centralizadas = []
 
+            # Productos que llegarán al punto de pedido según su consumo real
+            try:
+                ya_alertados = {
+                    (a.datos_contexto or {}).get("producto_id") for a in alertas_centralizadas
+                }
+                alertas_centralizadas += self._get_alertas_reposicion(db_manager, ya_alertados)
+            except Exception as e:
+                self.logger.error(f"Error obteniendo alertas de reposición: {e}")
+
             # Generar resumen
             total_alertas = len(alertas_centralizadas)
             alertas_por_prioridad = {}
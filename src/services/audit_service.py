@@ -3,18 +3,26 @@ Servicio de auditoría para el sistema Hefest.
 Registra y permite consultar acciones realizadas por los usuarios.
 """
 
+from collections import deque
 from datetime import datetime
-from typing import Optional, Dict, Any, List
+from itertools import count
+from typing import Optional, Dict, Any, Deque, List, Tuple
 from core.hefest_data_models import User
 import logging
 
 from .base_service import BaseService
+from data.pagination import Pagina, paginar_secuencia, TAMANO_PAGINA_DEFECTO
 
 logger = logging.getLogger(__name__)
 
 
+# Registros que se conservan en memoria; los más antiguos se descartan
+MAX_LOGS_MEMORIA = 5000
+
+
 class AuditService:
-    _logs: List[Dict[str, Any]] = []
+    _logs: Deque[Dict[str, Any]] = deque(maxlen=MAX_LOGS_MEMORIA)
+    _secuencia = count(1)
 
     @classmethod
     def log(
@@ -25,6 +33,7 @@ class AuditService:
     ):
         """Registra una acción en el sistema de auditoría"""
         entry = {
+            "id": next(cls._secuencia),
             "timestamp": datetime.now(),
             "action": action,
             "user": user.name if user else "Sistema",
@@ -42,6 +51,19 @@ class AuditService:
         """Obtiene los registros más recientes"""
         return sorted(cls._logs, key=lambda x: x["timestamp"], reverse=True)[:limit]
 
+    @classmethod
+    def get_logs_page(
+        cls, cursor: Optional[Tuple] = None, limit: int = TAMANO_PAGINA_DEFECTO
+    ) -> Pagina:
+        """Obtiene una página de registros, del más reciente al más antiguo"""
+        return paginar_secuencia(
+            cls._logs,
+            lambda x: (x["timestamp"], x["id"]),
+            cursor,
+            limit,
+            descendente=True,
+        )
+
     @classmethod
     def log_access_denied(cls, user: Optional[User], module_id: str):
         """Registra un evento de acceso denegado"""
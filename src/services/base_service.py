@@ -9,6 +9,8 @@ import logging
 from typing import Optional, Dict, Any
 from abc import ABC, abstractmethod
 
+from utils.tracing import trazar_metodos
+
 logger = logging.getLogger(__name__)
 
 
@@ -21,8 +23,13 @@ class BaseService(ABC):
     - Logging estandarizado
     - Manejo de errores base
     - Patrones de inicialización
+    - Trazado de los métodos públicos (ver utils/tracing.py)
     """
 
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        trazar_metodos(cls, "servicio")
+
     def __init__(self, db_manager=None):
         """
         Inicialización base para todos los servicios.
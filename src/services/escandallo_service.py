@@ -0,0 +1,410 @@
+"""
+Servicio de escandallos (recetas) para Hefest.
+
+Relaciona cada producto vendido con los ingredientes que consume, admitiendo
+sub-recetas anidadas (una salsa que a su vez lleva otros ingredientes). Las
+recetas se explotan una sola vez en una matriz de consumo plana
+{producto_vendido: {ingrediente: cantidad}} que se mantiene en caché hasta
+que se modifica alguna receta.
+
+Al cobrar comandas, el consumo de todas sus líneas se agrega y se aplica en
+una única transacción: un UPDATE de stock y un INSERT en movimientos_stock
+por ingrediente afectado, ambos con ``executemany``.
+
+El stock se lleva en unidades enteras (columnas INTEGER). Las fracciones de
+receta (0,25 kg de harina por pizza) se acumulan por ingrediente en
+``consumo_fraccionado`` y solo se descuentan del stock cuando completan una
+unidad, así no se pierde consumo ni se escriben decimales en el stock.
+
+Si la transacción falla se lanza :class:`ConsumoStockError`: quien cobra
+decide (el TPV no marca la comanda como pagada y el cobro puede reintentarse).
+"""
+
+import logging
+import math
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from .base_service import BaseService
+
+logger = logging.getLogger(__name__)
+
+MatrizConsumo = Dict[int, Dict[int, float]]
+
+TIPO_MOVIMIENTO_VENTA = "venta"
+
+
+class ConsumoStockError(Exception):
+    """No se pudo aplicar el consumo de ingredientes sobre el stock"""
+
+
+@dataclass
+class ComponenteReceta:
+    """Línea de un escandallo: cantidad de un componente por unidad vendida"""
+
+    componente_id: int
+    cantidad: float
+
+
+@dataclass
+class ResultadoDescuento:
+    """Resumen de la aplicación de consumos sobre el stock"""
+
+    comandas: int = 0
+    ingredientes: int = 0
+    movimientos: int = 0
+    segundos: float = 0.0
+
+
+class EscandalloService(BaseService):
+    """Motor de recetas y descuento de stock por ventas"""
+
+    def __init__(self, db_manager=None):
+        super().__init__(db_manager)
+        self._matriz: Optional[MatrizConsumo] = None
+        self._columna_stock_actual = False
+        self._ensure_schema()
+
+    def get_service_name(self) -> str:
+        """Retorna el nombre de este servicio"""
+        return "EscandalloService"
+
+    def _ensure_schema(self):
+        """Crea la tabla de escandallos si no existe"""
+        if not self.db_manager:
+            return
+
+        try:
+            with self.db_manager._get_connection() as conn:
+                conn.execute(
+                    """CREATE TABLE IF NOT EXISTS escandallos (
+                        id INTEGER PRIMARY KEY,
+                        producto_id INTEGER NOT NULL,
+                        componente_id INTEGER NOT NULL,
+                        cantidad REAL NOT NULL,
+                        UNIQUE (producto_id, componente_id),
+                        FOREIGN KEY (producto_id) REFERENCES productos (id),
+                        FOREIGN KEY (componente_id) REFERENCES productos (id)
+                    )"""
+                )
+                # Consumo acumulado por debajo de una unidad de stock, por ingrediente
+                conn.execute(
+                    """CREATE TABLE IF NOT EXISTS consumo_fraccionado (
+                        producto_id INTEGER PRIMARY KEY,
+                        resto REAL NOT NULL DEFAULT 0,
+                        FOREIGN KEY (producto_id) REFERENCES productos (id)
+                    )"""
+                )
+                conn.commit()
+                columnas = {row[1] for row in conn.execute("PRAGMA table_info(productos)")}
+                # Algunas bases de datos mantienen además la columna stock_actual
+                self._columna_stock_actual = "stock_actual" in columnas
+        except Exception as e:
+            self.handle_db_error(e, "inicializar escandallos")
+
+    # ========================================
+    # DEFINICIÓN DE RECETAS
+    # ========================================
+
+    def definir_receta(
+        self, producto_id: int, componentes: Iterable[ComponenteReceta]
+    ) -> bool:
+        """
+        Sustituye la receta de un producto.
+
+        Args:
+            producto_id: Producto vendido (o sub-receta)
+            componentes: Ingredientes o sub-recetas con su cantidad por unidad
+
+        Returns:
+            bool: True si se guardó la receta
+        """
+        # Un mismo componente repetido se agrupa en una sola línea
+        agrupados: Dict[int, float] = defaultdict(float)
+        for componente in componentes:
+            agrupados[componente.componente_id] += componente.cantidad
+        componentes = [ComponenteReceta(cid, cantidad) for cid, cantidad in agrupados.items()]
+
+        for componente in componentes:
+            if componente.cantidad <= 0:
+                raise ValueError(
+                    f"Cantidad inválida para el componente {componente.componente_id}"
+                )
+            if componente.componente_id == producto_id:
+                raise ValueError("Un producto no puede ser componente de sí mismo")
+
+        if not self.require_database("definir receta"):
+            return False
+
+        recetas = self._cargar_recetas()
+        recetas[producto_id] = [(c.componente_id, c.cantidad) for c in componentes]
+        # Validar ciclos antes de persistir
+        self._explotar(recetas)
+
+        try:
+            with self.db_manager._get_connection() as conn:
+                conn.execute("DELETE FROM escandallos WHERE producto_id = ?", (producto_id,))
+                conn.executemany(
+                    "INSERT INTO escandallos (producto_id, componente_id, cantidad) VALUES (?, ?, ?)",
+                    [(producto_id, c.componente_id, c.cantidad) for c in componentes],
+                )
+                conn.commit()
+        except Exception as e:
+            self.handle_db_error(e, "definir receta")
+            return False
+
+        self.invalidar_cache()
+        self.log_operation(
+            "Receta definida", {"producto_id": producto_id, "componentes": len(componentes)}
+        )
+        return True
+
+    def get_receta(self, producto_id: int) -> List[ComponenteReceta]:
+        """Receta directa (sin explotar) de un producto"""
+        return [
+            ComponenteReceta(componente_id, cantidad)
+            for componente_id, cantidad in self._cargar_recetas().get(producto_id, [])
+        ]
+
+    def invalidar_cache(self):
+        """Descarta la matriz de consumo (se recalcula en el siguiente uso)"""
+        self._matriz = None
+
+    # ========================================
+    # MATRIZ DE CONSUMO
+    # ========================================
+
+    def _cargar_recetas(self) -> Dict[int, List[Tuple[int, float]]]:
+        recetas: Dict[int, List[Tuple[int, float]]] = defaultdict(list)
+        if not self.db_manager:
+            return recetas
+
+        try:
+            for row in self.db_manager.query(
+                "SELECT producto_id, componente_id, cantidad FROM escandallos"
+            ):
+                recetas[row[0]].append((row[1], row[2]))
+        except Exception as e:
+            self.handle_db_error(e, "cargar escandallos")
+        return recetas
+
+    @staticmethod
+    def _explotar(recetas: Dict[int, List[Tuple[int, float]]]) -> MatrizConsumo:
+        """
+        Aplana las recetas hasta ingredientes hoja.
+
+        Cada sub-receta se explota una sola vez (memoización), de modo que el
+        coste es lineal en el número de líneas de escandallo.
+        """
+        matriz: MatrizConsumo = {}
+        en_curso: Set[int] = set()
+
+        def explotar(producto_id: int) -> Dict[int, float]:
+            if producto_id in matriz:
+                return matriz[producto_id]
+            if producto_id in en_curso:
+                raise ValueError(f"Receta circular en el producto {producto_id}")
+
+            componentes = recetas.get(producto_id)
+            if not componentes:
+                # Sin receta: el producto se descuenta a sí mismo (p. ej. un refresco)
+                return {producto_id: 1.0}
+
+            en_curso.add(producto_id)
+            plano: Dict[int, float] = defaultdict(float)
+            for componente_id, cantidad in componentes:
+                for ingrediente_id, por_unidad in explotar(componente_id).items():
+                    plano[ingrediente_id] += cantidad * por_unidad
+            en_curso.discard(producto_id)
+
+            matriz[producto_id] = dict(plano)
+            return matriz[producto_id]
+
+        for producto_id in list(recetas):
+            explotar(producto_id)
+        return matriz
+
+    def get_matriz_consumo(self) -> MatrizConsumo:
+        """Matriz plana {producto: {ingrediente: cantidad por unidad}} (en caché)"""
+        if self._matriz is None:
+            self._matriz = self._explotar(self._cargar_recetas())
+            logger.debug(f"Matriz de consumo calculada para {len(self._matriz)} productos")
+        return self._matriz
+
+    def calcular_consumo(self, ventas: Iterable[Tuple[int, float]]) -> Dict[int, float]:
+        """
+        Consumo total de ingredientes para un conjunto de ventas.
+
+        Args:
+            ventas: Pares (producto_id, unidades vendidas)
+
+        Returns:
+            Dict {ingrediente_id: cantidad consumida}
+        """
+        # Agregar primero por producto: cada fila de la matriz se recorre una vez
+        unidades: Dict[int, float] = defaultdict(float)
+        for producto_id, cantidad in ventas:
+            unidades[producto_id] += cantidad
+
+        matriz = self.get_matriz_consumo()
+        consumo: Dict[int, float] = defaultdict(float)
+        for producto_id, cantidad in unidades.items():
+            fila = matriz.get(producto_id)
+            if fila is None:
+                consumo[producto_id] += cantidad
+                continue
+            for ingrediente_id, por_unidad in fila.items():
+                consumo[ingrediente_id] += cantidad * por_unidad
+        return dict(consumo)
+
+    # ========================================
+    # DESCUENTO DE STOCK
+    # ========================================
+
+    def descontar_comandas(
+        self, comandas: Iterable, usuario_id: Optional[int] = None
+    ) -> ResultadoDescuento:
+        """
+        Descuenta del stock los ingredientes de una o varias comandas cobradas.
+
+        Todas las comandas se agregan en un único consumo y se aplican en una
+        sola transacción, por lo que un servicio completo (cientos de
+        comandas) cuesta lo mismo que unas pocas escrituras.
+
+        Args:
+            comandas: Objetos con ``id`` y ``lineas`` (producto_id, cantidad)
+            usuario_id: Usuario que registra el movimiento
+
+        Returns:
+            ResultadoDescuento con los ingredientes y movimientos aplicados
+
+        Raises:
+            ConsumoStockError: Si la transacción de stock no se pudo confirmar
+        """
+        inicio = datetime.now()
+        comandas = list(comandas)
+        resultado = ResultadoDescuento(comandas=len(comandas))
+        if not comandas or not self.require_database("descontar stock"):
+            return resultado
+
+        consumo = self.calcular_consumo(
+            (linea.producto_id, linea.cantidad)
+            for comanda in comandas
+            for linea in comanda.lineas
+        )
+        if len(comandas) == 1:
+            observaciones = f"Venta comanda #{comandas[0].id}"
+        else:
+            observaciones = f"Venta de {len(comandas)} comandas"
+
+        resultado.ingredientes = len(consumo)
+        resultado.movimientos = self.aplicar_consumo(consumo, observaciones, usuario_id)
+        resultado.segundos = (datetime.now() - inicio).total_seconds()
+        return resultado
+
+    def aplicar_consumo(
+        self,
+        consumo: Dict[int, float],
+        observaciones: str,
+        usuario_id: Optional[int] = None,
+    ) -> int:
+        """
+        Aplica un consumo agregado sobre productos y movimientos_stock.
+
+        Cada cantidad se suma al resto fraccionado del ingrediente; se
+        descuentan las unidades enteras y el nuevo resto queda guardado en la
+        misma transacción. Stock y resto se escriben como incrementos
+        (``stock = stock - ?``), nunca como valores absolutos leídos antes.
+
+        Returns:
+            int: Número de movimientos registrados
+
+        Raises:
+            ConsumoStockError: Si la transacción no se pudo confirmar
+        """
+        if not consumo or not self.require_database("aplicar consumo"):
+            return 0
+
+        fecha = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        ids = list(consumo)
+
+        def aplicar(conn):
+            # transaccion() abre con BEGIN IMMEDIATE (cola o conexión directa): nadie escribe
+            # entre esta lectura y los UPDATE, así que los valores anotados en
+            # movimientos_stock son los reales
+            stock_actual: Dict[int, int] = {}
+            restos: Dict[int, float] = {}
+            # Lectura en bloques para no superar el límite de parámetros de SQLite
+            for i in range(0, len(ids), 500):
+                bloque = ids[i : i + 500]
+                marcadores = ", ".join("?" for _ in bloque)
+                for row in conn.execute(
+                    f"""SELECT p.id, COALESCE(p.stock, 0), COALESCE(f.resto, 0)
+                        FROM productos p
+                        LEFT JOIN consumo_fraccionado f ON f.producto_id = p.id
+                        WHERE p.id IN ({marcadores})""",
+                    bloque,
+                ):
+                    stock_actual[row[0]] = row[1]
+                    restos[row[0]] = row[2]
+
+            actualizaciones = []
+            movimientos = []
+            nuevos_restos = []
+            for producto_id, cantidad in consumo.items():
+                if producto_id not in stock_actual:
+                    logger.warning(f"Ingrediente {producto_id} no existe en productos")
+                    continue
+                # Redondeo para no arrastrar ruido de coma flotante al resto
+                acumulado = round(restos[producto_id] + cantidad, 6)
+                unidades = math.floor(acumulado)
+                # Incremento del resto: lo consumido menos las unidades descontadas
+                nuevos_restos.append((producto_id, round(cantidad - unidades, 6)))
+                if not unidades:
+                    continue
+                anterior = stock_actual[producto_id]
+                nuevo = anterior - unidades
+                actualizaciones.append((unidades, producto_id))
+                movimientos.append(
+                    (producto_id, TIPO_MOVIMIENTO_VENTA, unidades, anterior, nuevo,
+                     fecha, observaciones, usuario_id)
+                )
+
+            if self._columna_stock_actual:
+                # stock_actual se mantiene alineado con stock (fuente de verdad);
+                # en un UPDATE la expresión ve el stock previo
+                sql_stock = (
+                    "UPDATE productos SET stock = COALESCE(stock, 0) - ?, "
+                    "stock_actual = COALESCE(stock, 0) - ? WHERE id = ?"
+                )
+                actualizaciones = [(unidades, unidades, pid) for unidades, pid in actualizaciones]
+            else:
+                sql_stock = "UPDATE productos SET stock = COALESCE(stock, 0) - ? WHERE id = ?"
+
+            conn.executemany(sql_stock, actualizaciones)
+            conn.executemany(
+                """INSERT INTO movimientos_stock
+                   (producto_id, tipo, cantidad, stock_anterior, stock_nuevo,
+                    fecha, observaciones, usuario_id)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+                movimientos,
+            )
+            conn.executemany(
+                """INSERT INTO consumo_fraccionado (producto_id, resto) VALUES (?, ?)
+                   ON CONFLICT (producto_id) DO UPDATE SET resto = ROUND(resto + excluded.resto, 6)""",
+                nuevos_restos,
+            )
+            return movimientos
+
+        try:
+            movimientos = self.db_manager.transaccion(aplicar)
+        except Exception as e:
+            self.handle_db_error(e, "aplicar consumo de stock")
+            raise ConsumoStockError(f"No se pudo descontar el stock ({observaciones}): {e}") from e
+
+        self.log_operation(
+            "Consumo aplicado", {"ingredientes": len(movimientos), "origen": observaciones}
+        )
+        return len(movimientos)
@@ -3,11 +3,12 @@ Servicio de gestión de habitaciones y reservas.
 """
 
 import logging
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 from dataclasses import dataclass
 from datetime import datetime, date
 
 from .base_service import BaseService
+from data.pagination import Pagina, paginar_secuencia, TAMANO_PAGINA_DEFECTO
 
 logger = logging.getLogger(__name__)
 
@@ -177,6 +178,17 @@ class HospederiaService(BaseService):
         ]
         return reservations
 
+    def get_reservations_page(
+        self, cursor: Optional[Tuple] = None, limit: int = TAMANO_PAGINA_DEFECTO
+    ) -> Pagina:
+        """Obtiene una página de reservas ordenadas por fecha de entrada"""
+        return paginar_secuencia(
+            self.get_reservations(),
+            lambda r: (r["check_in_date"], r["id"]),
+            cursor,
+            limit,
+        )
+
     def create_reservation(self, reservation_data: Dict) -> bool:
         """Crea una nueva reserva"""
         try:
@@ -0,0 +1,627 @@
+"""
+Servicio de importación/exportación masiva para Hefest.
+
+Exporta tablas completas a CSV, XLSX o JSON Lines leyendo el cursor por
+bloques (memoria constante) e importa ficheros grandes mediante
+``executemany`` en transacciones por lotes, deduplicando por nombre
+normalizado (sin acentos ni mayúsculas).
+"""
+
+import csv
+import json
+import logging
+import os
+from dataclasses import dataclass, field, asdict
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from .base_service import BaseService
+from utils.text_normalization import normalizar_texto
+
+try:
+    import openpyxl
+
+    HAS_OPENPYXL = True
+except ImportError:
+    HAS_OPENPYXL = False
+
+logger = logging.getLogger(__name__)
+
+ProgressCallback = Callable[[int, int], None]
+
+FORMATOS_SOPORTADOS = {
+    ".csv": "csv",
+    ".jsonl": "jsonl",
+    ".ndjson": "jsonl",
+    ".xlsx": "xlsx",
+}
+
+# Cabeceras alternativas aceptadas al importar (p. ej. exportaciones antiguas)
+ALIAS_COLUMNAS = {
+    "stock_min": "stock_minimo",
+    "stock_actual": "stock",
+    "fecha_creacion": "fecha_registro",
+    "proveedor": "proveedor_id",
+}
+
+
+def _clave_nombre(fila: Dict[str, Any]) -> Optional[str]:
+    """Clave de deduplicación basada en el nombre normalizado"""
+    return normalizar_texto(fila.get("nombre")) or None
+
+
+def _clave_cliente(fila: Dict[str, Any]) -> Optional[str]:
+    """Clave de deduplicación de clientes: DNI si existe, si no nombre completo"""
+    dni = str(fila.get("dni") or "").strip().upper()
+    if dni:
+        return f"dni:{dni}"
+    nombre = normalizar_texto(f"{fila.get('nombre') or ''} {fila.get('apellidos') or ''}")
+    return f"nombre:{nombre}" if nombre else None
+
+
+def _a_entero(valor) -> Optional[int]:
+    if valor is None or valor == "":
+        return None
+    return int(float(str(valor).replace(",", ".")))
+
+
+def _a_decimal(valor) -> Optional[float]:
+    if valor is None or valor == "":
+        return None
+    return float(str(valor).replace(",", "."))
+
+
+def _a_booleano(valor) -> int:
+    if isinstance(valor, str):
+        return 0 if normalizar_texto(valor) in ("0", "false", "no", "inactivo") else 1
+    return 1 if valor is None or bool(valor) else 0
+
+
+@dataclass(frozen=True)
+class EntidadTransferencia:
+    """Describe cómo exportar e importar una tabla"""
+
+    tabla: str
+    columnas: Tuple[str, ...]
+    consulta_exportacion: str
+    clave: Optional[Callable[[Dict[str, Any]], Optional[str]]] = None
+    columnas_clave: Tuple[str, ...] = ("nombre",)
+    tipos: Dict[str, Callable[[Any], Any]] = field(default_factory=dict)
+    valores_insercion: Dict[str, Callable[[], Any]] = field(default_factory=dict)
+    # Asignación añadida al UPDATE ("columna = valor"); se omite si el fichero trae la columna
+    actualizacion_extra: str = ""
+    # Filas a exportar, si la consulta no recorre toda la tabla (progreso)
+    consulta_total: Optional[str] = None
+
+    @property
+    def importable(self) -> bool:
+        return self.clave is not None
+
+
+ENTIDADES: Dict[str, EntidadTransferencia] = {
+    "productos": EntidadTransferencia(
+        tabla="productos",
+        columnas=("id", "nombre", "categoria", "precio", "stock", "stock_minimo", "proveedor_id"),
+        consulta_exportacion="""
+            SELECT id, nombre, categoria, precio, stock, stock_minimo, proveedor_id
+            FROM productos ORDER BY id
+        """,
+        clave=_clave_nombre,
+        tipos={
+            "precio": _a_decimal,
+            "stock": _a_entero,
+            "stock_minimo": _a_entero,
+            "proveedor_id": _a_entero,
+        },
+        valores_insercion={
+            "categoria": lambda: "General",
+            "precio": lambda: 0.0,
+            "stock": lambda: 0,
+            "stock_minimo": lambda: 5,
+        },
+    ),
+    "proveedores": EntidadTransferencia(
+        tabla="proveedores",
+        columnas=(
+            "id", "nombre", "contacto", "telefono", "email",
+            "direccion", "categoria", "fecha_registro", "activo", "notas",
+        ),
+        consulta_exportacion="""
+            SELECT id, nombre, contacto, telefono, email, direccion,
+                   categoria, fecha_registro, activo, notas
+            FROM proveedores ORDER BY id
+        """,
+        clave=_clave_nombre,
+        tipos={"activo": _a_booleano},
+        valores_insercion={
+            "categoria": lambda: "General",
+            "fecha_registro": lambda: datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "activo": lambda: 1,
+        },
+        # Igual que crear_proveedor: importar un proveedor inactivo lo reactiva,
+        # salvo que el fichero indique su estado (p. ej. una exportación previa)
+        actualizacion_extra="activo = 1",
+    ),
+    "clientes": EntidadTransferencia(
+        tabla="clientes",
+        columnas=("id", "nombre", "apellidos", "dni", "telefono", "email"),
+        consulta_exportacion="""
+            SELECT id, nombre, apellidos, dni, telefono, email
+            FROM clientes ORDER BY id
+        """,
+        clave=_clave_cliente,
+        columnas_clave=("nombre", "apellidos", "dni"),
+    ),
+    # Entidades solo de exportación (informes)
+    "comandas": EntidadTransferencia(
+        tabla="comandas",
+        columnas=("id", "mesa_id", "mesa_numero", "empleado_id", "fecha_hora", "estado", "total"),
+        consulta_exportacion="""
+            SELECT c.id, c.mesa_id, m.numero, c.empleado_id, c.fecha_hora, c.estado, c.total
+            FROM comandas c LEFT JOIN mesas m ON m.id = c.mesa_id
+            ORDER BY c.id
+        """,
+    ),
+    "reservas": EntidadTransferencia(
+        tabla="reservas",
+        columnas=(
+            "id", "mesa_id", "cliente", "fecha_hora", "duracion_min",
+            "estado", "personas", "telefono", "notas",
+        ),
+        consulta_exportacion="""
+            SELECT id, mesa_id, cliente, fecha_hora, duracion_min,
+                   estado, personas, telefono, notas
+            FROM reservas WHERE mesa_id IS NOT NULL ORDER BY id
+        """,
+        consulta_total="SELECT COUNT(*) FROM reservas WHERE mesa_id IS NOT NULL",
+    ),
+    # Estancias: las reservas de hospedería comparten tabla con las de mesa
+    "reservas_hospederia": EntidadTransferencia(
+        tabla="reservas",
+        columnas=(
+            "id", "cliente_id", "cliente_nombre", "cliente_apellidos", "cliente_dni",
+            "fecha_entrada", "fecha_salida", "estado",
+        ),
+        consulta_exportacion="""
+            SELECT r.id, r.cliente_id, c.nombre, c.apellidos, c.dni,
+                   r.fecha_entrada, r.fecha_salida, r.estado
+            FROM reservas r LEFT JOIN clientes c ON c.id = r.cliente_id
+            WHERE r.fecha_entrada IS NOT NULL
+            ORDER BY r.id
+        """,
+        consulta_total="SELECT COUNT(*) FROM reservas WHERE fecha_entrada IS NOT NULL",
+    ),
+}
+
+
+@dataclass
+class ResultadoTransferencia:
+    """Resumen de una operación de importación o exportación"""
+
+    entidad: str
+    ruta: str
+    formato: str
+    filas: int = 0
+    insertadas: int = 0
+    actualizadas: int = 0
+    duplicadas: int = 0
+    descartadas: int = 0
+    segundos: float = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class ImportExportService(BaseService):
+    """Motor de importación/exportación masiva por streaming"""
+
+    CHUNK_EXPORTACION = 2000
+    CHUNK_IMPORTACION = 5000
+
+    def get_service_name(self) -> str:
+        """Retorna el nombre de este servicio"""
+        return "ImportExportService"
+
+    # ========================================
+    # UTILIDADES
+    # ========================================
+
+    @staticmethod
+    def detectar_formato(ruta: str, formato: Optional[str] = None) -> str:
+        """Determina el formato a partir del parámetro o de la extensión"""
+        if formato:
+            formato = formato.lower().lstrip(".")
+            if formato in FORMATOS_SOPORTADOS.values():
+                return formato
+            raise ValueError(f"Formato no soportado: {formato}")
+
+        extension = os.path.splitext(ruta)[1].lower()
+        if extension not in FORMATOS_SOPORTADOS:
+            raise ValueError(
+                f"Extensión no soportada: '{extension}'. Use .csv, .xlsx o .jsonl"
+            )
+        return FORMATOS_SOPORTADOS[extension]
+
+    @staticmethod
+    def _get_entidad(entidad: str) -> EntidadTransferencia:
+        if entidad not in ENTIDADES:
+            raise ValueError(f"Entidad desconocida: {entidad}")
+        return ENTIDADES[entidad]
+
+    @staticmethod
+    def _requerir_openpyxl():
+        if not HAS_OPENPYXL:
+            raise ValueError(
+                "El formato XLSX requiere openpyxl (pip install openpyxl)"
+            )
+
+    # ========================================
+    # EXPORTACIÓN
+    # ========================================
+
+    def exportar(
+        self,
+        entidad: str,
+        ruta: str,
+        formato: Optional[str] = None,
+        progress_callback: Optional[ProgressCallback] = None,
+    ) -> ResultadoTransferencia:
+        """
+        Exporta una entidad completa a fichero leyendo el cursor por bloques.
+
+        Args:
+            entidad: Clave de ENTIDADES (productos, proveedores, clientes...)
+            ruta: Ruta del fichero de destino
+            formato: csv, xlsx o jsonl (por defecto según la extensión)
+            progress_callback: Función (procesadas, total) llamada por bloque
+
+        Returns:
+            ResultadoTransferencia con el número de filas escritas
+        """
+        if not self.require_database("exportación masiva"):
+            raise ValueError("Sin conexión a base de datos")
+        spec = self._get_entidad(entidad)
+        formato = self.detectar_formato(ruta, formato)
+        if formato == "xlsx":
+            self._requerir_openpyxl()
+
+        inicio = datetime.now()
+        resultado = ResultadoTransferencia(entidad, ruta, formato)
+
+        with self.db_manager._get_connection() as conn:
+            total = conn.execute(spec.consulta_total or f"SELECT COUNT(*) FROM {spec.tabla}").fetchone()[0]
+            cursor = conn.execute(spec.consulta_exportacion)
+            bloques = self._leer_bloques(cursor)
+
+            escritor = {
+                "csv": self._escribir_csv,
+                "jsonl": self._escribir_jsonl,
+                "xlsx": self._escribir_xlsx,
+            }[formato]
+
+            for escritas in escritor(ruta, spec.columnas, bloques):
+                resultado.filas = escritas
+                if progress_callback:
+                    progress_callback(escritas, total)
+
+        resultado.segundos = (datetime.now() - inicio).total_seconds()
+        self.log_operation(f"Exportación de {entidad} completada", resultado.to_dict())
+        return resultado
+
+    def _leer_bloques(self, cursor) -> Iterator[List[Tuple]]:
+        """Itera el cursor en bloques de tamaño fijo"""
+        while True:
+            filas = cursor.fetchmany(self.CHUNK_EXPORTACION)
+            if not filas:
+                break
+            yield [tuple(fila) for fila in filas]
+
+    @staticmethod
+    def _escribir_csv(ruta, columnas, bloques) -> Iterator[int]:
+        escritas = 0
+        with open(ruta, "w", newline="", encoding="utf-8-sig") as f:
+            writer = csv.writer(f)
+            writer.writerow(columnas)
+            for bloque in bloques:
+                writer.writerows(bloque)
+                escritas += len(bloque)
+                yield escritas
+        if escritas == 0:
+            yield 0
+
+    @staticmethod
+    def _escribir_jsonl(ruta, columnas, bloques) -> Iterator[int]:
+        escritas = 0
+        with open(ruta, "w", encoding="utf-8") as f:
+            for bloque in bloques:
+                f.writelines(
+                    json.dumps(dict(zip(columnas, fila)), ensure_ascii=False, default=str)
+                    + "\n"
+                    for fila in bloque
+                )
+                escritas += len(bloque)
+                yield escritas
+        if escritas == 0:
+            yield 0
+
+    @staticmethod
+    def _escribir_xlsx(ruta, columnas, bloques) -> Iterator[int]:
+        # write_only vuelca las filas a disco según se añaden
+        libro = openpyxl.Workbook(write_only=True)
+        hoja = libro.create_sheet()
+        hoja.append(list(columnas))
+        escritas = 0
+        for bloque in bloques:
+            for fila in bloque:
+                hoja.append(list(fila))
+            escritas += len(bloque)
+            yield escritas
+        libro.save(ruta)
+        if escritas == 0:
+            yield 0
+
+    # ========================================
+    # IMPORTACIÓN
+    # ========================================
+
+    def importar(
+        self,
+        entidad: str,
+        ruta: str,
+        formato: Optional[str] = None,
+        progress_callback: Optional[ProgressCallback] = None,
+    ) -> ResultadoTransferencia:
+        """
+        Importa un fichero haciendo UPSERT por lotes con deduplicación.
+
+        Las filas cuya clave normalizada ya existe en la tabla actualizan el
+        registro existente; el resto se insertan. Si la clave aparece antes
+        en el mismo fichero (en cualquier lote) la fila cuenta como duplicada
+        y gana la última. Cada lote se aplica con ``executemany`` en una
+        única transacción, con las columnas presentes en sus filas.
+
+        Args:
+            entidad: productos, proveedores o clientes
+            ruta: Fichero de origen (.csv, .xlsx o .jsonl)
+            formato: Formato explícito (por defecto según la extensión)
+            progress_callback: Función (procesadas, total) llamada por lote
+
+        Returns:
+            ResultadoTransferencia con inserciones, actualizaciones y descartes
+        """
+        if not self.require_database("importación masiva"):
+            raise ValueError("Sin conexión a base de datos")
+        spec = self._get_entidad(entidad)
+        if not spec.importable:
+            raise ValueError(f"La entidad '{entidad}' es solo de exportación")
+        formato = self.detectar_formato(ruta, formato)
+        if formato == "xlsx":
+            self._requerir_openpyxl()
+
+        inicio = datetime.now()
+        resultado = ResultadoTransferencia(entidad, ruta, formato)
+        total, filas = self._abrir_lector(ruta, formato)
+
+        with self.db_manager._get_connection() as conn:
+            existentes = self._cargar_claves(conn, spec)
+            vistas: Set[str] = set()
+            sentencias: Dict[Tuple[str, ...], Dict[str, Any]] = {}
+
+            for lote in self._agrupar(filas, self.CHUNK_IMPORTACION):
+                self._aplicar_lote(conn, spec, lote, existentes, vistas, sentencias, resultado)
+                conn.commit()
+                if progress_callback:
+                    progress_callback(resultado.filas, max(total, resultado.filas))
+
+        resultado.segundos = (datetime.now() - inicio).total_seconds()
+        self.log_operation(f"Importación de {entidad} completada", resultado.to_dict())
+        return resultado
+
+    def _cargar_claves(self, conn, spec: EntidadTransferencia) -> Dict[str, int]:
+        """Carga {clave_normalizada: id} de los registros existentes"""
+        columnas = ", ".join(spec.columnas_clave)
+        cursor = conn.execute(f"SELECT id, {columnas} FROM {spec.tabla} ORDER BY id")
+        existentes: Dict[str, int] = {}
+        for fila in cursor:
+            clave = spec.clave(dict(zip(spec.columnas_clave, tuple(fila)[1:])))
+            if clave:
+                existentes[clave] = fila[0]
+        return existentes
+
+    def _aplicar_lote(
+        self,
+        conn,
+        spec: EntidadTransferencia,
+        lote: List[Dict[str, Any]],
+        existentes: Dict[str, int],
+        vistas: Set[str],
+        sentencias: Dict[Tuple[str, ...], Dict[str, Any]],
+        resultado: ResultadoTransferencia,
+    ):
+        """Deduplica un lote y lo aplica con dos executemany (UPDATE + INSERT)"""
+        pendientes: Dict[str, Dict[str, Any]] = {}
+        for fila in lote:
+            resultado.filas += 1
+            datos = self._convertir_fila(spec, fila)
+            clave = spec.clave(datos) if datos is not None else None
+            if clave is None:
+                resultado.descartadas += 1
+                continue
+            if clave in pendientes or clave in vistas:
+                resultado.duplicadas += 1
+            pendientes[clave] = datos
+
+        if not pendientes:
+            return
+
+        # Columnas presentes en alguna fila del lote (JSONL no tiene cabecera fija);
+        # las que falten en una fila van a NULL: el UPDATE conserva el valor actual
+        presentes = set().union(*pendientes.values())
+        columnas = tuple(c for c in spec.columnas if c != "id" and c in presentes)
+        if columnas not in sentencias:
+            sentencias[columnas] = self._construir_sentencias(spec, list(columnas))
+        sentencia = sentencias[columnas]
+
+        actualizaciones = []
+        inserciones = []
+        for clave, datos in pendientes.items():
+            valores = [datos.get(c) for c in columnas]
+            if clave in existentes:
+                actualizaciones.append((*valores, existentes[clave]))
+                # Una clave ya vista en otro lote es duplicada, no una actualización más
+                if clave not in vistas:
+                    resultado.actualizadas += 1
+            else:
+                inserciones.append(
+                    tuple(
+                        datos.get(c) if datos.get(c) is not None
+                        else (defecto() if defecto else None)
+                        for c, defecto in sentencia["insercion"]
+                    )
+                )
+        vistas.update(pendientes)
+
+        if actualizaciones:
+            conn.executemany(sentencia["update"], actualizaciones)
+
+        if inserciones:
+            ultimo_id = conn.execute(
+                f"SELECT COALESCE(MAX(id), 0) FROM {spec.tabla}"
+            ).fetchone()[0]
+            conn.executemany(sentencia["insert"], inserciones)
+            resultado.insertadas += len(inserciones)
+            # Registrar los ids nuevos para deduplicar lotes posteriores
+            cursor = conn.execute(
+                f"SELECT id, {', '.join(spec.columnas_clave)} FROM {spec.tabla} WHERE id > ?",
+                (ultimo_id,),
+            )
+            for fila in cursor:
+                clave = spec.clave(dict(zip(spec.columnas_clave, tuple(fila)[1:])))
+                if clave:
+                    existentes[clave] = fila[0]
+
+    @staticmethod
+    def _construir_sentencias(spec: EntidadTransferencia, columnas: List[str]) -> Dict[str, Any]:
+        """Genera las sentencias UPDATE/INSERT para las columnas del fichero"""
+        set_clause = ", ".join(f"{c} = COALESCE(?, {c})" for c in columnas)
+        # SQLite aplica la última asignación de una columna repetida en el SET:
+        # el valor fijo pisaría el del fichero
+        if spec.actualizacion_extra and spec.actualizacion_extra.split("=")[0].strip() not in columnas:
+            set_clause += f", {spec.actualizacion_extra}"
+
+        columnas_insert = columnas + [c for c in spec.valores_insercion if c not in columnas]
+        insert_sql = (
+            f"INSERT INTO {spec.tabla} ({', '.join(columnas_insert)}) "
+            f"VALUES ({', '.join('?' * len(columnas_insert))})"
+        )
+        return {
+            "columnas": columnas,
+            "insercion": [(c, spec.valores_insercion.get(c)) for c in columnas_insert],
+            "update": f"UPDATE {spec.tabla} SET {set_clause} WHERE id = ?",
+            "insert": insert_sql,
+        }
+
+    @staticmethod
+    def _convertir_fila(spec: EntidadTransferencia, fila: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Mapea cabeceras, convierte tipos y valida una fila del fichero"""
+        datos: Dict[str, Any] = {}
+        for columna, valor in fila.items():
+            if columna not in spec.columnas:
+                continue
+            if isinstance(valor, str):
+                valor = valor.strip()
+            try:
+                conversor = spec.tipos.get(columna)
+                datos[columna] = conversor(valor) if conversor else (valor or None)
+            except (TypeError, ValueError):
+                return None
+
+        nombre = datos.get("nombre")
+        if not nombre or not str(nombre).strip():
+            return None
+        datos["nombre"] = " ".join(str(nombre).split())
+        return datos
+
+    @staticmethod
+    def _agrupar(filas: Iterable[Dict[str, Any]], tamano: int) -> Iterator[List[Dict[str, Any]]]:
+        lote: List[Dict[str, Any]] = []
+        for fila in filas:
+            lote.append(fila)
+            if len(lote) >= tamano:
+                yield lote
+                lote = []
+        if lote:
+            yield lote
+
+    # ========================================
+    # LECTORES
+    # ========================================
+
+    @staticmethod
+    def _normalizar_cabecera(cabecera) -> str:
+        columna = normalizar_texto(cabecera).rstrip(".").replace(" ", "_")
+        return ALIAS_COLUMNAS.get(columna, columna)
+
+    def _abrir_lector(self, ruta: str, formato: str) -> Tuple[int, Iterator[Dict[str, Any]]]:
+        """Devuelve (total_estimado, iterador de filas como dict)"""
+        if formato == "xlsx":
+            return self._leer_xlsx(ruta)
+
+        total = self._contar_lineas(ruta)
+        if formato == "csv":
+            return max(total - 1, 0), self._leer_csv(ruta)
+        return total, self._leer_jsonl(ruta)
+
+    @staticmethod
+    def _contar_lineas(ruta: str) -> int:
+        """Cuenta líneas leyendo en bloques binarios (sin cargar el fichero)"""
+        lineas = 0
+        with open(ruta, "rb") as f:
+            for bloque in iter(lambda: f.read(1 << 20), b""):
+                lineas += bloque.count(b"\n")
+        return lineas
+
+    def _leer_csv(self, ruta: str) -> Iterator[Dict[str, Any]]:
+        with open(ruta, newline="", encoding="utf-8-sig") as f:
+            muestra = f.read(4096)
+            f.seek(0)
+            try:
+                dialecto = csv.Sniffer().sniff(muestra, delimiters=",;\t")
+            except csv.Error:
+                dialecto = csv.excel
+            reader = csv.reader(f, dialecto)
+            cabeceras = [self._normalizar_cabecera(c) for c in next(reader, [])]
+            for fila in reader:
+                if any(fila):
+                    yield dict(zip(cabeceras, fila))
+
+    def _leer_jsonl(self, ruta: str) -> Iterator[Dict[str, Any]]:
+        with open(ruta, encoding="utf-8") as f:
+            for linea in f:
+                linea = linea.strip()
+                if not linea:
+                    continue
+                try:
+                    objeto = json.loads(linea)
+                except json.JSONDecodeError:
+                    logger.warning(f"Línea JSON inválida ignorada en {ruta}")
+                    continue
+                if isinstance(objeto, dict):
+                    yield {self._normalizar_cabecera(k): v for k, v in objeto.items()}
+
+    def _leer_xlsx(self, ruta: str) -> Tuple[int, Iterator[Dict[str, Any]]]:
+        libro = openpyxl.load_workbook(ruta, read_only=True, data_only=True)
+        hoja = libro.active
+        total = max((hoja.max_row or 1) - 1, 0)
+
+        def filas() -> Iterator[Dict[str, Any]]:
+            try:
+                iterador = hoja.iter_rows(values_only=True)
+                cabeceras = [self._normalizar_cabecera(c) for c in next(iterador, ())]
+                for fila in iterador:
+                    if fila and any(v is not None for v in fila):
+                        yield dict(zip(cabeceras, fila))
+            finally:
+                libro.close()
+
+        return total, filas()
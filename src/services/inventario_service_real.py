@@ -13,6 +13,7 @@ from datetime import datetime, date
 from enum import Enum
 
 from .base_service import BaseService
+from data.pagination import Pagina, TAMANO_PAGINA_DEFECTO
 
 logger = logging.getLogger(__name__)
 
@@ -44,6 +45,20 @@ class InventarioService(BaseService):
     def __init__(self, db_manager=None):
         super().__init__(db_manager)
         self.logger.info("InventarioService inicializado con base de datos real" if db_manager else "InventarioService inicializado sin base de datos")
+        self._ensure_indices()
+
+    def _ensure_indices(self):
+        """Índices que cubren la clave de orden de los listados paginados"""
+        if not self.db_manager:
+            return
+        try:
+            self.db_manager.execute(
+                "CREATE INDEX IF NOT EXISTS idx_proveedores_activo_orden "
+                "ON proveedores(activo, categoria, nombre, id)"
+            )
+        except Exception as e:
+            # Bases de datos sin la columna categoria (migración pendiente)
+            logger.warning(f"No se pudo crear el índice de proveedores: {e}")
 
     def get_service_name(self) -> str:
         """Retorna el nombre de este servicio"""
@@ -428,6 +443,26 @@ class InventarioService(BaseService):
     # MÉTODOS PARA GESTIÓN DE PROVEEDORES CON SOPORTE DE CATEGORÍAS
     # ========================================
 
+    # Consulta base de proveedores activos (sin ORDER BY, ver get_proveedores_pagina).
+    # Los campos de texto libre llegan ya recortados; nombre y categoría se
+    # devuelven tal cual porque forman la clave de orden del índice.
+    _SQL_PROVEEDORES = """
+        SELECT
+            id,
+            nombre,
+            TRIM(COALESCE(contacto, '')) AS contacto,
+            TRIM(COALESCE(telefono, '')) AS telefono,
+            TRIM(COALESCE(email, '')) AS email,
+            TRIM(COALESCE(direccion, '')) AS direccion,
+            categoria,
+            fecha_registro,
+            activo,
+            TRIM(COALESCE(notas, '')) AS notas
+        FROM proveedores
+        WHERE activo = 1
+    """
+    ORDEN_PROVEEDORES = ("categoria", "nombre", "id")
+
     def get_proveedores(self) -> List[Dict[str, Any]]:
         """Obtener lista de proveedores desde la tabla proveedores con soporte de categorías"""
         if not self.db_manager:
@@ -436,77 +471,14 @@ class InventarioService(BaseService):
 
         try:
             # Obtener proveedores de la tabla proveedores real
-            query = """
-                SELECT
-                    id,
-                    nombre,
-                    contacto,
-                    telefono,
-                    email,
-                    direccion,
-                    categoria,
-                    fecha_registro,
-                    activo,
-                    notas
-                FROM proveedores
-                WHERE activo = 1
-                ORDER BY categoria, nombre
-            """
+            query = self._SQL_PROVEEDORES + " ORDER BY categoria, nombre, id"
             rows = self.db_manager.query(query)
 
             if not rows:
                 logger.info("No se encontraron proveedores en la base de datos")
                 return []
 
-            proveedores = []
-            for row in rows:
-                try:
-                    if hasattr(row, 'keys'):
-                        proveedor_dict = dict(row)
-                    else:
-                        # Convertir tupla/lista a diccionario
-                        proveedor_dict = {
-                            'id': row[0] if len(row) > 0 else None,
-                            'nombre': row[1] if len(row) > 1 else '',
-                            'contacto': row[2] if len(row) > 2 else '',
-                            'telefono': row[3] if len(row) > 3 else '',
-                            'email': row[4] if len(row) > 4 else '',
-                            'direccion': row[5] if len(row) > 5 else '',
-                            'categoria': row[6] if len(row) > 6 else 'General',
-                            'fecha_registro': row[7] if len(row) > 7 else '',
-                            'activo': row[8] if len(row) > 8 else True,
-                            'notas': row[9] if len(row) > 9 else ''
-                        }
-
-                    # Validar datos básicos
-                    proveedor_id = proveedor_dict.get('id')
-                    nombre = proveedor_dict.get('nombre', '')
-                    nombre = nombre.strip() if nombre else ''
-
-                    if proveedor_id and nombre:
-                        contacto = proveedor_dict.get('contacto', '') or ''
-                        telefono = proveedor_dict.get('telefono', '') or ''
-                        email = proveedor_dict.get('email', '') or ''
-                        direccion = proveedor_dict.get('direccion', '') or ''
-                        categoria = proveedor_dict.get('categoria', 'General') or 'General'
-                        notas = proveedor_dict.get('notas', '') or ''
-
-                        proveedores.append({
-                            'id': proveedor_id,
-                            'nombre': nombre,
-                            'contacto': contacto.strip() if contacto else '',
-                            'telefono': telefono.strip() if telefono else '',
-                            'email': email.strip() if email else '',
-                            'direccion': direccion.strip() if direccion else '',
-                            'categoria': categoria.strip() if categoria else 'General',
-                            'fecha_creacion': proveedor_dict.get('fecha_registro', ''),
-                            'activo': bool(proveedor_dict.get('activo', True)),
-                            'notas': notas.strip() if notas else ''
-                        })
-
-                except Exception as e:
-                    logger.error(f"Error procesando proveedor: {e}")
-                    continue
+            proveedores = [p for p in map(self._procesar_proveedor, rows) if p]
 
             logger.info(f"Obtenidos {len(proveedores)} proveedores de la base de datos")
             return proveedores
@@ -520,6 +492,76 @@ class InventarioService(BaseService):
                 {"id": 3, "nombre": "Suministros Locales", "contacto": "pedidos@suministros.com", "telefono": "555-123-456", "categoria": "Comida"}
             ]
 
+    def get_proveedores_pagina(
+        self, cursor: Optional[Tuple] = None, limite: int = TAMANO_PAGINA_DEFECTO
+    ) -> Pagina:
+        """
+        Obtener una página de proveedores activos ordenados por categoría y nombre.
+
+        Args:
+            cursor: ``cursor_siguiente`` de la página anterior (None para la primera)
+            limite: Número de proveedores por página
+
+        Returns:
+            Pagina con los proveedores en el mismo formato que get_proveedores
+        """
+        if not self.db_manager:
+            logger.warning("Sin conexión a base de datos, retornando página vacía")
+            return Pagina()
+
+        try:
+            pagina = self.db_manager.query_page(
+                self._SQL_PROVEEDORES, self.ORDEN_PROVEEDORES, cursor, limite
+            )
+            return Pagina(
+                [p for p in map(self._procesar_proveedor, pagina.items) if p],
+                pagina.cursor_siguiente,
+            )
+        except Exception as e:
+            logger.error(f"Error obteniendo página de proveedores: {e}")
+            return Pagina()
+
+    def contar_proveedores(self) -> Dict[str, int]:
+        """Contar proveedores activos e inactivos sin cargarlos"""
+        if not self.db_manager:
+            return {"total": 0, "activos": 0, "inactivos": 0}
+
+        try:
+            row = self.db_manager.query(
+                "SELECT COUNT(*), COALESCE(SUM(activo = 1), 0) FROM proveedores"
+            )[0]
+            total, activos = row[0], row[1]
+            return {"total": total, "activos": activos, "inactivos": total - activos}
+        except Exception as e:
+            logger.error(f"Error contando proveedores: {e}")
+            return {"total": 0, "activos": 0, "inactivos": 0}
+
+    @staticmethod
+    def _procesar_proveedor(row) -> Optional[Dict[str, Any]]:
+        """Convertir una fila de _SQL_PROVEEDORES al diccionario usado por la UI"""
+        try:
+            nombre = (row['nombre'] or '').strip()
+            if not (row['id'] and nombre):
+                return None
+
+            categoria = (row['categoria'] or '').strip()
+            return {
+                'id': row['id'],
+                'nombre': nombre,
+                'contacto': row['contacto'],
+                'telefono': row['telefono'],
+                'email': row['email'],
+                'direccion': row['direccion'],
+                'categoria': categoria or 'General',
+                'fecha_creacion': row['fecha_registro'] or '',
+                'activo': bool(row['activo']),
+                'notas': row['notas']
+            }
+
+        except Exception as e:
+            logger.error(f"Error procesando proveedor: {e}")
+            return None
+
     def crear_categoria(self, nombre: str, descripcion: str = "") -> bool:
         """
         Crear una nueva categoría en la tabla categorias. Si existe una inactiva, la reactiva.
@@ -0,0 +1,535 @@
+"""
+Planificador de reposición de inventario para Hefest.
+
+Calcula, para todo el catálogo a la vez, el consumo diario medio, su
+variabilidad y el punto de pedido de cada producto a partir del histórico
+de movimientos_stock, en lugar de comparar el stock con un mínimo fijo.
+
+El histórico se reduce en SQL a la suma y la suma de cuadrados del consumo
+diario de cada producto (los días sin movimiento cuentan como cero), y a
+partir de ahí todo el catálogo se calcula en una sola pasada vectorial con
+NumPy.
+
+Los momentos de la ventana se guardan en ``reposicion_consumo`` junto con
+la ventana y el último id de movimiento incorporados
+(``reposicion_consumo_estado``). El histórico completo solo se recorre la
+primera vez; después se suman los movimientos con id mayor y se restan los
+días que salen de la ventana, así que abrir la aplicación cuesta leer una
+fila por producto. El plan se guarda en caché hasta que llegan movimientos
+o cambia algún producto (marca de agua de cambios_log).
+"""
+
+import logging
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from data.change_log import ultimo_seq
+
+from .base_service import BaseService
+
+logger = logging.getLogger(__name__)
+
+# Tipos de movimiento que representan consumo (salidas de stock)
+TIPOS_CONSUMO = ("venta", "salida", "consumo", "merma")
+
+# Factor z del nivel de servicio (probabilidad de no romper stock)
+NIVELES_SERVICIO = {0.90: 1.2816, 0.95: 1.6449, 0.975: 1.96, 0.99: 2.3263}
+
+
+@dataclass
+class SugerenciaReposicion:
+    """Sugerencia de pedido para un producto"""
+
+    id: int
+    nombre: str
+    proveedor_id: Optional[int]
+    stock_actual: float
+    stock_minimo: float
+    consumo_diario: float
+    desviacion_diaria: float
+    punto_pedido: float
+    cantidad_sugerida: int
+    dias_cobertura: Optional[float]
+
+
+@dataclass
+class PedidoBorrador:
+    """Pedido de compra propuesto para un proveedor"""
+
+    proveedor_id: Optional[int]
+    proveedor_nombre: str
+    lineas: List[SugerenciaReposicion] = field(default_factory=list)
+
+    @property
+    def total_unidades(self) -> int:
+        return sum(linea.cantidad_sugerida for linea in self.lineas)
+
+
+@dataclass
+class PlanReposicion:
+    """Resultado completo de una ejecución del planificador"""
+
+    generado: datetime
+    productos_analizados: int
+    sugerencias: List[SugerenciaReposicion]
+    pedidos: List[PedidoBorrador]
+    segundos: float = 0.0
+
+
+class ReposicionService(BaseService):
+    """Planificador vectorial de puntos de pedido y pedidos borrador"""
+
+    def __init__(
+        self,
+        db_manager=None,
+        dias_historia: int = 365,
+        plazo_entrega_dias: float = 3.0,
+        periodo_revision_dias: float = 7.0,
+        nivel_servicio: float = 0.95,
+    ):
+        """
+        Args:
+            db_manager: Gestor de base de datos
+            dias_historia: Días de histórico a considerar
+            plazo_entrega_dias: Plazo de entrega por defecto de los proveedores
+            periodo_revision_dias: Días que debe cubrir cada pedido
+            nivel_servicio: Probabilidad objetivo de no romper stock
+        """
+        super().__init__(db_manager)
+        if nivel_servicio not in NIVELES_SERVICIO:
+            raise ValueError(
+                f"Nivel de servicio no soportado: {nivel_servicio}. "
+                f"Use uno de {sorted(NIVELES_SERVICIO)}"
+            )
+        self.dias_historia = dias_historia
+        self.plazo_entrega_dias = plazo_entrega_dias
+        self.periodo_revision_dias = periodo_revision_dias
+        self.factor_servicio = NIVELES_SERVICIO[nivel_servicio]
+        # Plazos específicos {proveedor_id: días}
+        self.plazos_proveedor: Dict[int, float] = {}
+
+        # Momentos del consumo diario por producto {producto_id: Σx} y {producto_id: Σx²}
+        self._suma: Dict[int, float] = {}
+        self._suma_cuadrados: Dict[int, float] = {}
+        # Primer día con movimientos de cada producto (ordinal): longitud de su historia
+        self._primer_dia: Dict[int, int] = {}
+        # Ventana y último id de movimiento cargados en memoria (inicio ISO, id)
+        self._consumo_estado: Optional[Tuple[str, int]] = None
+
+        self._cache_firma: Optional[Tuple] = None
+        self._cache_plan: Optional[PlanReposicion] = None
+        self._ensure_schema()
+
+    def get_service_name(self) -> str:
+        """Retorna el nombre de este servicio"""
+        return "ReposicionService"
+
+    def _ensure_schema(self):
+        """Índice por producto y día, y tablas de momentos persistidos"""
+        if not self.db_manager:
+            return
+        try:
+            self.db_manager.execute(
+                "CREATE INDEX IF NOT EXISTS idx_movimientos_producto_fecha "
+                "ON movimientos_stock(producto_id, fecha)"
+            )
+            self.db_manager.execute(
+                """CREATE TABLE IF NOT EXISTS reposicion_consumo (
+                    producto_id INTEGER PRIMARY KEY,
+                    suma REAL NOT NULL DEFAULT 0,
+                    suma_cuadrados REAL NOT NULL DEFAULT 0,
+                    primer_dia TEXT
+                )"""
+            )
+            self.db_manager.execute(
+                """CREATE TABLE IF NOT EXISTS reposicion_consumo_estado (
+                    id INTEGER PRIMARY KEY CHECK (id = 1),
+                    desde TEXT NOT NULL,
+                    dias_historia INTEGER NOT NULL,
+                    ultimo_id INTEGER NOT NULL
+                )"""
+            )
+        except Exception as e:
+            logger.warning(f"No se pudo preparar el esquema de reposición: {e}")
+
+    # ========================================
+    # CACHÉ
+    # ========================================
+
+    def invalidar_cache(self):
+        """Fuerza a recalcular el plan y a releer los momentos en el siguiente cálculo"""
+        self._consumo_estado = None
+        self._cache_firma = None
+        self._cache_plan = None
+
+    # ========================================
+    # CÁLCULO
+    # ========================================
+
+    def get_plan(self, forzar: bool = False) -> Optional[PlanReposicion]:
+        """
+        Calcula (o devuelve de caché) el plan de reposición del catálogo.
+
+        Args:
+            forzar: Recalcular aunque no haya movimientos nuevos
+
+        Returns:
+            PlanReposicion o None si no hay base de datos
+        """
+        if not self.require_database("planificar reposición"):
+            return None
+
+        if forzar:
+            self.invalidar_cache()
+
+        try:
+            with self.db_manager._get_connection() as conn:
+                inicio = datetime.now()
+                self._actualizar_consumo(conn)
+                # Solo marcas de agua (MAX sobre la clave primaria): sin recorrer tablas
+                firma = self._consumo_estado + (ultimo_seq(conn),)
+                if self._cache_plan is not None and firma == self._cache_firma:
+                    return self._cache_plan
+
+                productos = self._leer_productos(conn)
+                proveedores = self._leer_proveedores(conn)
+        except Exception as e:
+            return self.handle_db_error(e, "planificar reposición")
+
+        plan = self._calcular(productos, self._momentos(productos["ids"]), proveedores)
+        plan.segundos = (datetime.now() - inicio).total_seconds()
+
+        self._cache_firma = firma
+        self._cache_plan = plan
+        self.log_operation(
+            "Plan de reposición calculado",
+            {
+                "productos": plan.productos_analizados,
+                "sugerencias": len(plan.sugerencias),
+                "pedidos": len(plan.pedidos),
+                "segundos": round(plan.segundos, 3),
+            },
+        )
+        return plan
+
+    def get_sugerencias(self) -> List[SugerenciaReposicion]:
+        plan = self.get_plan()
+        return plan.sugerencias if plan else []
+
+    def get_pedidos_borrador(self) -> List[PedidoBorrador]:
+        plan = self.get_plan()
+        return plan.pedidos if plan else []
+
+    def _leer_productos(self, conn) -> Dict[str, np.ndarray]:
+        filas = conn.execute(
+            """SELECT id, nombre, COALESCE(stock, 0), COALESCE(stock_minimo, 0), proveedor_id
+               FROM productos ORDER BY id"""
+        ).fetchall()
+        return {
+            "ids": np.fromiter((f[0] for f in filas), dtype=np.int64, count=len(filas)),
+            "nombres": [f[1] for f in filas],
+            "stock": np.fromiter((f[2] for f in filas), dtype=np.float64, count=len(filas)),
+            "minimo": np.fromiter((f[3] for f in filas), dtype=np.float64, count=len(filas)),
+            "proveedor": [f[4] for f in filas],
+        }
+
+    def _actualizar_consumo(self, conn):
+        """
+        Mantiene en memoria Σx, Σx² y el primer día de cada producto.
+
+        Si la ventana y el último id de movimientos no han cambiado desde la
+        última carga no se hace nada (una lectura de MAX(id)). Si cambiaron,
+        se pone al día ``reposicion_consumo`` en una transacción de escritura
+        y se releen solo los productos afectados (todos si hubo que
+        reconstruir o si otro proceso avanzó la tabla entretanto).
+        """
+        hoy = datetime.now().date()
+        desde = (hoy - timedelta(days=self.dias_historia - 1)).isoformat()
+        ultimo_id = conn.execute(
+            "SELECT COALESCE(MAX(id), 0) FROM movimientos_stock"
+        ).fetchone()[0]
+        if self._consumo_estado == (desde, ultimo_id):
+            return
+
+        previo, estado, tocados = self.db_manager.transaccion(
+            lambda c: self._sincronizar_momentos(c, desde)
+        )
+        if tocados is None or previo != self._consumo_estado:
+            self._cargar_momentos(conn)
+        elif tocados:
+            self._cargar_momentos(conn, sorted(tocados))
+        self._consumo_estado = estado
+
+    def _sincronizar_momentos(self, conn, desde: str):
+        """
+        Lleva ``reposicion_consumo`` a la ventana que empieza en ``desde``.
+
+        Corre dentro de ``transaccion`` (BEGIN IMMEDIATE, puede repetirse):
+        MAX(id) y el estado se leen ya con el bloqueo de escritura, así que
+        dos procesos no suman el mismo rango de movimientos. Se
+        reconstruye todo si no hay estado, cambió la longitud de la ventana,
+        el reloj retrocedió, la ventana saltó entera o desaparecieron
+        movimientos (MAX(id) menor que el registrado: movimientos_stock se
+        trata como un diario de solo inserción).
+
+        Returns:
+            (estado previo, estado nuevo, ids tocados o None si se reconstruyó)
+        """
+        ultimo_id = conn.execute(
+            "SELECT COALESCE(MAX(id), 0) FROM movimientos_stock"
+        ).fetchone()[0]
+        fila = conn.execute(
+            "SELECT desde, dias_historia, ultimo_id FROM reposicion_consumo_estado WHERE id = 1"
+        ).fetchone()
+        previo = (fila[0], fila[2]) if fila else None
+
+        if (
+            fila is None
+            or fila[1] != self.dias_historia
+            or fila[0] > desde
+            or ultimo_id < fila[2]
+            or (date.fromisoformat(desde) - date.fromisoformat(fila[0])).days >= self.dias_historia
+        ):
+            self._reconstruir_momentos(conn, desde)
+            tocados = None
+        else:
+            tocados = set()
+            if ultimo_id > fila[2]:
+                tocados |= self._acumular_nuevos(conn, fila[2], desde)
+            if fila[0] < desde:
+                tocados |= self._descontar_caducados(conn, fila[0], desde, fila[2])
+
+        conn.execute(
+            """INSERT OR REPLACE INTO reposicion_consumo_estado (id, desde, dias_historia, ultimo_id)
+               VALUES (1, ?, ?, ?)""",
+            (desde, self.dias_historia, ultimo_id),
+        )
+        return previo, (desde, ultimo_id), tocados
+
+    def _reconstruir_momentos(self, conn, desde: str):
+        """Recorre todo el histórico de la ventana (solo la primera vez)"""
+        marcadores = ", ".join("?" for _ in TIPOS_CONSUMO)
+        conn.execute("DELETE FROM reposicion_consumo")
+        conn.execute(
+            f"""INSERT INTO reposicion_consumo (producto_id, suma, suma_cuadrados)
+                SELECT producto_id, TOTAL(q), TOTAL(q * q)
+                FROM (
+                    SELECT producto_id, TOTAL(ABS(cantidad)) AS q
+                    FROM movimientos_stock
+                    WHERE fecha >= ? AND tipo IN ({marcadores})
+                    GROUP BY producto_id, date(fecha)
+                )
+                GROUP BY producto_id""",
+            (desde, *TIPOS_CONSUMO),
+        )
+        # La historia de un producto empieza con su primer movimiento de cualquier tipo
+        self._registrar_primer_dia(
+            conn,
+            "SELECT producto_id, date(MIN(fecha)) FROM movimientos_stock GROUP BY producto_id",
+            (),
+        )
+
+    def _acumular_nuevos(self, conn, id_anterior: int, desde: str) -> Set[int]:
+        """
+        Incorpora a los momentos los movimientos con id > id_anterior.
+
+        Una sola agregación devuelve, por cada (producto, día) con movimientos
+        nuevos, el total del día y la parte nueva: Σx suma la parte nueva y
+        Σx² se corrige con total² - (total - nuevo)². NOT INDEXED obliga a
+        recorrer solo el rango de rowid nuevo: si no, SQLite prefiere
+        recorrer entero el índice (producto_id, fecha) para agrupar.
+        """
+        marcadores = ", ".join("?" for _ in TIPOS_CONSUMO)
+        filas = conn.execute(
+            f"""SELECT n.producto_id,
+                       TOTAL(ABS(m.cantidad)) AS total_dia,
+                       TOTAL(CASE WHEN m.id > ? THEN ABS(m.cantidad) END) AS incremento
+                FROM (
+                    SELECT DISTINCT producto_id, date(fecha) AS dia
+                    FROM movimientos_stock NOT INDEXED
+                    WHERE id > ? AND fecha >= ? AND tipo IN ({marcadores})
+                ) AS n
+                JOIN movimientos_stock m
+                  ON m.producto_id = n.producto_id
+                 AND m.fecha >= n.dia AND m.fecha < date(n.dia, '+1 day')
+                WHERE m.tipo IN ({marcadores})
+                GROUP BY n.producto_id, n.dia""",
+            (id_anterior, id_anterior, desde, *TIPOS_CONSUMO, *TIPOS_CONSUMO),
+        ).fetchall()
+
+        deltas: Dict[int, List[float]] = {}
+        for producto_id, total_dia, incremento in filas:
+            previo = total_dia - incremento
+            delta = deltas.setdefault(producto_id, [0.0, 0.0])
+            delta[0] += incremento
+            delta[1] += total_dia * total_dia - previo * previo
+        self._aplicar_deltas(conn, deltas)
+
+        tocados = set(deltas)
+        tocados |= self._registrar_primer_dia(
+            conn,
+            """SELECT producto_id, date(MIN(fecha)) FROM movimientos_stock NOT INDEXED
+               WHERE id > ? GROUP BY producto_id""",
+            (id_anterior,),
+        )
+        return tocados
+
+    def _descontar_caducados(self, conn, desde_anterior: str, desde: str, id_anterior: int) -> Set[int]:
+        """Resta los días [desde_anterior, desde) que han salido de la ventana"""
+        marcadores = ", ".join("?" for _ in TIPOS_CONSUMO)
+        # Un salto por producto en el índice (producto_id, fecha)
+        filas = conn.execute(
+            f"""SELECT producto_id, TOTAL(q), TOTAL(q * q)
+                FROM (
+                    SELECT m.producto_id, TOTAL(ABS(m.cantidad)) AS q
+                    FROM reposicion_consumo r
+                    JOIN movimientos_stock m
+                      ON m.producto_id = r.producto_id
+                     AND m.fecha >= ? AND m.fecha < ?
+                    WHERE m.id <= ? AND m.tipo IN ({marcadores})
+                    GROUP BY m.producto_id, date(m.fecha)
+                )
+                GROUP BY producto_id""",
+            (desde_anterior, desde, id_anterior, *TIPOS_CONSUMO),
+        ).fetchall()
+        deltas = {producto_id: [-suma, -suma_cuadrados] for producto_id, suma, suma_cuadrados in filas}
+        self._aplicar_deltas(conn, deltas)
+        return set(deltas)
+
+    @staticmethod
+    def _aplicar_deltas(conn, deltas: Dict[int, List[float]]):
+        conn.executemany(
+            """INSERT INTO reposicion_consumo (producto_id, suma, suma_cuadrados) VALUES (?, ?, ?)
+               ON CONFLICT (producto_id) DO UPDATE SET
+                   suma = suma + excluded.suma,
+                   suma_cuadrados = suma_cuadrados + excluded.suma_cuadrados""",
+            [(producto_id, suma, cuadrados) for producto_id, (suma, cuadrados) in deltas.items()],
+        )
+
+    @staticmethod
+    def _registrar_primer_dia(conn, sql: str, params: Tuple) -> Set[int]:
+        """Guarda el primer día con movimientos (se conserva el más antiguo)"""
+        filas = conn.execute(sql, params).fetchall()
+        conn.executemany(
+            """INSERT INTO reposicion_consumo (producto_id, primer_dia) VALUES (?, ?)
+               ON CONFLICT (producto_id) DO UPDATE SET
+                   primer_dia = MIN(COALESCE(primer_dia, excluded.primer_dia), excluded.primer_dia)""",
+            filas,
+        )
+        return {fila[0] for fila in filas}
+
+    def _cargar_momentos(self, conn, ids: Optional[List[int]] = None):
+        """Copia a memoria los momentos persistidos (todos o los de ``ids``)"""
+        sql = "SELECT producto_id, suma, suma_cuadrados, primer_dia FROM reposicion_consumo"
+        if ids is None:
+            self._suma, self._suma_cuadrados, self._primer_dia = {}, {}, {}
+            bloques = [None]
+        else:
+            bloques = [ids[i : i + 500] for i in range(0, len(ids), 500)]
+
+        for bloque in bloques:
+            if bloque is None:
+                filas = conn.execute(sql)
+            else:
+                marcadores = ", ".join("?" for _ in bloque)
+                filas = conn.execute(f"{sql} WHERE producto_id IN ({marcadores})", bloque)
+            for producto_id, suma, suma_cuadrados, primer_dia in filas:
+                self._suma[producto_id] = suma
+                self._suma_cuadrados[producto_id] = suma_cuadrados
+                if primer_dia:
+                    self._primer_dia[producto_id] = date.fromisoformat(primer_dia).toordinal()
+
+    def _momentos(self, ids: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Σx, Σx² y días de historia (como mucho ``dias_historia``) alineados con ``ids``"""
+        lista = ids.tolist()
+        suma = np.fromiter((self._suma.get(i, 0.0) for i in lista), dtype=np.float64, count=len(ids))
+        suma_cuadrados = np.fromiter(
+            (self._suma_cuadrados.get(i, 0.0) for i in lista), dtype=np.float64, count=len(ids)
+        )
+        hoy = datetime.now().date().toordinal()
+        primer_dia = np.fromiter(
+            (self._primer_dia.get(i, hoy - self.dias_historia + 1) for i in lista),
+            dtype=np.float64, count=len(ids),
+        )
+        dias = np.clip(hoy - primer_dia + 1, 1, self.dias_historia)
+        return suma, suma_cuadrados, dias
+
+    def _leer_proveedores(self, conn) -> Dict[int, str]:
+        return {row[0]: row[1] for row in conn.execute("SELECT id, nombre FROM proveedores")}
+
+    def _calcular(
+        self,
+        productos: Dict[str, np.ndarray],
+        consumo: Tuple[np.ndarray, np.ndarray, np.ndarray],
+        proveedores: Dict[int, str],
+    ) -> PlanReposicion:
+        """Puntos de pedido y cantidades para todo el catálogo en una pasada"""
+        n = len(productos["ids"])
+        generado = datetime.now()
+        if n == 0:
+            return PlanReposicion(generado, 0, [], [])
+
+        # Cada producto con su propia historia: uno dado de alta hace un mes no
+        # reparte su consumo entre los 365 días de la ventana
+        suma, suma_cuadrados, dias = consumo
+        media = suma / dias
+        # Varianza muestral a partir de los momentos: (Σx² - (Σx)²/n) / (n - 1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            varianza = np.where(
+                dias > 1, (suma_cuadrados - suma * suma / dias) / (dias - 1), 0.0
+            )
+        desviacion = np.sqrt(np.clip(varianza, 0, None))
+
+        plazo = np.full(n, self.plazo_entrega_dias)
+        if self.plazos_proveedor:
+            for i, proveedor_id in enumerate(productos["proveedor"]):
+                if proveedor_id in self.plazos_proveedor:
+                    plazo[i] = self.plazos_proveedor[proveedor_id]
+
+        # Stock de seguridad para la variabilidad durante el plazo de entrega
+        seguridad = self.factor_servicio * desviacion * np.sqrt(plazo)
+        punto_pedido = np.maximum(media * plazo + seguridad, productos["minimo"])
+        objetivo = media * (plazo + self.periodo_revision_dias) + seguridad
+        objetivo = np.maximum(objetivo, punto_pedido)
+
+        stock = productos["stock"]
+        necesita = (stock <= punto_pedido) & (objetivo > stock)
+        cantidad = np.where(necesita, np.ceil(objetivo - stock), 0).astype(np.int64)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            cobertura = np.where(media > 0, stock / media, np.inf)
+
+        sugerencias = []
+        for i in np.flatnonzero(cantidad > 0):
+            sugerencias.append(
+                SugerenciaReposicion(
+                    id=int(productos["ids"][i]),
+                    nombre=productos["nombres"][i],
+                    proveedor_id=productos["proveedor"][i],
+                    stock_actual=float(stock[i]),
+                    stock_minimo=float(productos["minimo"][i]),
+                    consumo_diario=round(float(media[i]), 3),
+                    desviacion_diaria=round(float(desviacion[i]), 3),
+                    punto_pedido=round(float(punto_pedido[i]), 2),
+                    cantidad_sugerida=int(cantidad[i]),
+                    dias_cobertura=None if np.isinf(cobertura[i]) else round(float(cobertura[i]), 1),
+                )
+            )
+        # Lo más urgente primero
+        sugerencias.sort(
+            key=lambda s: s.dias_cobertura if s.dias_cobertura is not None else float("inf")
+        )
+
+        pedidos: Dict[Optional[int], PedidoBorrador] = {}
+        for sugerencia in sugerencias:
+            pedido = pedidos.get(sugerencia.proveedor_id)
+            if pedido is None:
+                nombre = proveedores.get(sugerencia.proveedor_id, "Sin proveedor")
+                pedido = pedidos[sugerencia.proveedor_id] = PedidoBorrador(
+                    sugerencia.proveedor_id, nombre
+                )
+            pedido.lineas.append(sugerencia)
+
+        return PlanReposicion(generado, n, sugerencias, list(pedidos.values()))
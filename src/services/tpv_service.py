@@ -5,12 +5,15 @@
 # Servicio de gestión del Terminal Punto de Venta (TPV).
 
 import logging
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Set
 from dataclasses import dataclass
 from datetime import datetime, date, time, timedelta
 
 from .base_service import BaseService
+from .escandallo_service import EscandalloService
 from core.hefest_data_models import Reserva
+from data.time_keys import rango_dia
+from utils.logging_setup import log_limitado
 
 logger = logging.getLogger(__name__)
 
@@ -187,13 +190,18 @@ class TPVService(BaseService):
                 if mesa.id == mesa_actualizada.id:
                     self._mesas_cache[idx] = mesa_actualizada
                     break
-            print(f"[DEBUG TPVService] _mesas_cache al emitir: {[m.id for m in self._mesas_cache]}")
-            import traceback
-            print(f"[DEBUG TPVService] update_mesa: stack trace before emit:\n{''.join(traceback.format_stack(limit=5))}")
             # Emisión global: mesa individual y lista completa
             mesa_event_bus.mesa_actualizada.emit(mesa_actualizada)
             mesa_event_bus.mesas_actualizadas.emit(self._mesas_cache.copy())
-            print(f"[DEBUG TPVService] update_mesa: emitido mesas_actualizadas con {len(self._mesas_cache)} mesas")
+            log_limitado(
+                logger,
+                logging.DEBUG,
+                "TPVService.update_mesa",
+                "update_mesa: mesa %s actualizada, emitidas %d mesas",
+                mesa_actualizada.id,
+                len(self._mesas_cache),
+                intervalo_s=5.0,
+            )
             return True
         except Exception as e:
             logger.error(f"Error actualizando mesa: {e}")
@@ -207,13 +215,32 @@ class TPVService(BaseService):
         self._productos_cache = []
         self._comandas_cache = {}  # {mesa_id: Comanda}
         self._next_comanda_id = 1  # ID para comandas
+        # Recetas para descontar ingredientes al cobrar
+        self._escandallos = EscandalloService(db_manager) if db_manager else None
 
+        self._ensure_indices()
         self._load_datos()
 
     def get_service_name(self) -> str:
         """Retorna el nombre de este servicio"""
         return "TPVService"
 
+    def _ensure_indices(self):
+        """Índices de la carga inicial: comandas abiertas y sus líneas"""
+        if not self.db_manager:
+            return
+        try:
+            # Sin ellos, cada comanda abierta recorre todo el histórico de líneas
+            self.db_manager.execute(
+                "CREATE INDEX IF NOT EXISTS idx_comanda_detalles_comanda "
+                "ON comanda_detalles(comanda_id)"
+            )
+            self.db_manager.execute(
+                "CREATE INDEX IF NOT EXISTS idx_comandas_estado ON comandas(estado)"
+            )
+        except Exception as e:
+            logger.warning(f"No se pudieron crear los índices del TPV: {e}")
+
     def _load_datos(self):
         """Carga los datos desde la base de datos o crea datos de prueba"""
         data_loaded = False
@@ -330,46 +357,222 @@ class TPVService(BaseService):
             """)
             self._comandas_cache = {}
             for row in result:
-                comanda_id = row[0]
-                mesa_id = row[1]
-
-                # Cargar detalles de la comanda
-                detalles = self.db_manager.query("""
-                    SELECT producto_id, cantidad, precio_unidad
-                    FROM comanda_detalles
-                    WHERE comanda_id = ?
-                """, (comanda_id,))
-                lineas = []
-                for detalle in detalles:
-                    # Buscar nombre del producto con type guard
-                    producto = next((p for p in self._productos_cache if p.id == detalle[0]), None)
-                    if producto and hasattr(producto, 'nombre'):
-                        nombre_producto = producto.nombre
-                    else:
-                        nombre_producto = f"Producto {detalle[0]}"
-
-                    linea = LineaComanda(
-                        producto_id=detalle[0],
-                        producto_nombre=nombre_producto,
-                        precio_unidad=detalle[2],
-                        cantidad=detalle[1]
-                    )
-                    lineas.append(linea)
-
-                comanda = Comanda(
-                    id=comanda_id,
-                    mesa_id=mesa_id,
-                    fecha_apertura=datetime.fromisoformat(row[3]) if row[3] else datetime.now(),
-                    fecha_cierre=None,
-                    estado=row[4] or "abierta",
-                    lineas=lineas
-                )
-                self._comandas_cache[mesa_id] = comanda
+                self._comandas_cache[row[1]] = self._comanda_desde_fila(row)
             self.logger.info(f"Cargadas {len(self._comandas_cache)} comandas activas desde la base de datos")
         except Exception as e:
             self.logger.error(f"Error cargando comandas: {e}")
             self._comandas_cache = {}
 
+    def _comanda_desde_fila(self, row) -> Comanda:
+        """Comanda (con sus líneas) a partir de una fila ``id, mesa_id, empleado_id, fecha_hora, estado, total``"""
+        comanda_id = row[0]
+        mesa_id = row[1]
+
+        # Cargar detalles de la comanda
+        detalles = self.db_manager.query("""
+            SELECT producto_id, cantidad, precio_unitario
+            FROM comanda_detalles
+            WHERE comanda_id = ?
+        """, (comanda_id,))
+        lineas = []
+        for detalle in detalles:
+            # Buscar nombre del producto con type guard
+            producto = next((p for p in self._productos_cache if p.id == detalle[0]), None)
+            if producto and hasattr(producto, 'nombre'):
+                nombre_producto = producto.nombre
+            else:
+                nombre_producto = f"Producto {detalle[0]}"
+
+            linea = LineaComanda(
+                producto_id=detalle[0],
+                producto_nombre=nombre_producto,
+                precio_unidad=detalle[2],
+                cantidad=detalle[1]
+            )
+            lineas.append(linea)
+
+        return Comanda(
+            id=comanda_id,
+            mesa_id=mesa_id,
+            fecha_apertura=datetime.fromisoformat(row[3]) if row[3] else datetime.now(),
+            fecha_cierre=None,
+            estado=row[4] or "abierta",
+            lineas=lineas
+        )
+
+    def recargar_desde_bd(self, tablas) -> Set[str]:
+        """
+        Recarga las cachés afectadas por cambios hechos fuera de este servicio
+        (otro terminal, un script), según las tablas del registro de cambios.
+
+        Las comandas abiertas en este terminal aún no se persisten: se
+        conservan las de las mesas que no tengan otra en la base de datos, y
+        esas mesas siguen ocupadas.
+
+        Returns:
+            Las cachés recargadas: ``mesas``, ``productos`` y/o ``comandas``
+        """
+        if not self.db_manager:
+            return set()
+        tablas = set(tablas)
+        recargadas = set()
+        if "productos" in tablas:
+            self._load_productos_from_db()
+            recargadas.add("productos")
+        if tablas & {"comandas", "comanda_detalles", "productos"}:
+            # Las líneas guardan el nombre del producto: también tras cambios en productos
+            locales = self._comandas_cache
+            self._load_comandas_from_db()
+            for mesa_id, comanda in locales.items():
+                # Solo las no persistidas: las demás ya vienen (o se cerraron) en la base
+                if comanda.id is None:
+                    self._comandas_cache.setdefault(mesa_id, comanda)
+            recargadas.add("comandas")
+        if "mesas" in tablas:
+            self._load_mesas_from_db()
+            for mesa in self._mesas_cache:
+                if mesa.id in self._comandas_cache and mesa.estado == "libre":
+                    mesa.estado = "ocupada"
+            recargadas.add("mesas")
+        return recargadas
+
+    def aplicar_cambios(self, filas: Dict[str, Set[int]]) -> Dict[str, Set[int]]:
+        """
+        Aplica fila a fila los cambios hechos fuera de este servicio, con los
+        ids del registro de cambios (``LoteCambios.filas``). Para un lote
+        ``completo`` usar :meth:`recargar_desde_bd`.
+
+        Las mesas se actualizan en su sitio (conservan alias, personas y
+        próxima reserva) y solo se releen las comandas tocadas.
+
+        Returns:
+            ``mesas``: mesas a repintar (datos o comanda cambiados);
+            ``mesas_altas_bajas``: mesas creadas o borradas;
+            ``productos``: productos releídos
+        """
+        resultado = {"mesas": set(), "mesas_altas_bajas": set(), "productos": set()}
+        if not self.db_manager:
+            return resultado
+        if filas.get("productos"):
+            resultado["productos"] = self._aplicar_productos(set(filas["productos"]))
+
+        comandas = set(filas.get("comandas", ()))
+        detalles = set(filas.get("comanda_detalles", ()))
+        if detalles:
+            marcas = ", ".join("?" * len(detalles))
+            filas_detalle = self.db_manager.query(
+                f"SELECT id, comanda_id FROM comanda_detalles WHERE id IN ({marcas})", tuple(detalles)
+            )
+            if len(filas_detalle) < len(detalles):
+                # Líneas borradas: ya no se sabe de qué comanda eran
+                comandas = None
+            else:
+                comandas.update(fila[1] for fila in filas_detalle)
+        if comandas is None:
+            antes = set(self._comandas_cache)
+            self.recargar_desde_bd({"comandas"})
+            resultado["mesas"] |= antes | set(self._comandas_cache)
+        elif comandas:
+            resultado["mesas"] |= self._aplicar_comandas(comandas)
+
+        if filas.get("mesas"):
+            cambiadas, altas_bajas = self._aplicar_mesas(set(filas["mesas"]))
+            resultado["mesas"] |= cambiadas
+            resultado["mesas_altas_bajas"] = altas_bajas
+        for mesa in self._mesas_cache:
+            if mesa.id in resultado["mesas"] and mesa.id in self._comandas_cache and mesa.estado == "libre":
+                mesa.estado = "ocupada"
+        return resultado
+
+    def _aplicar_productos(self, ids: Set[int]) -> Set[int]:
+        marcas = ", ".join("?" * len(ids))
+        result = self.db_manager.query(f"""
+            SELECT id, nombre, precio, categoria, stock_actual
+            FROM productos
+            WHERE id IN ({marcas}) AND precio IS NOT NULL AND precio > 0
+        """, tuple(ids))
+        nuevos = {
+            row[0]: Producto(
+                id=row[0],
+                nombre=row[1],
+                precio=row[2] or 0.0,
+                categoria=row[3] or "Sin categoría",
+                stock_actual=row[4] if row[4] is not None else None
+            )
+            for row in result
+        }
+        # Borrados (o sin precio) fuera; el resto se sustituye en su sitio
+        productos = []
+        for producto in self._productos_cache:
+            if producto.id not in ids:
+                productos.append(producto)
+            elif producto.id in nuevos:
+                productos.append(nuevos.pop(producto.id))
+        self._productos_cache = productos + list(nuevos.values())
+
+        # Las líneas guardan el nombre del producto
+        nombres = {p.id: p.nombre for p in self._productos_cache if p.id in ids}
+        for comanda in self._comandas_cache.values():
+            for linea in comanda.lineas:
+                if linea.producto_id in nombres:
+                    linea.producto_nombre = nombres[linea.producto_id]
+        return ids
+
+    def _aplicar_comandas(self, ids: Set[int]) -> Set[int]:
+        """Relee las comandas ``ids``; devuelve las mesas afectadas"""
+        mesas = set()
+        # Quitar primero las versiones en caché (pudieron cerrarse o cambiar de mesa)
+        for mesa_id, comanda in list(self._comandas_cache.items()):
+            if comanda.id in ids:
+                del self._comandas_cache[mesa_id]
+                mesas.add(mesa_id)
+        marcas = ", ".join("?" * len(ids))
+        result = self.db_manager.query(f"""
+            SELECT id, mesa_id, empleado_id, fecha_hora, estado, total
+            FROM comandas
+            WHERE id IN ({marcas}) AND estado IN ('abierta', 'en_proceso')
+        """, tuple(ids))
+        for row in result:
+            self._comandas_cache[row[1]] = self._comanda_desde_fila(row)
+            mesas.add(row[1])
+        return mesas
+
+    def _aplicar_mesas(self, ids: Set[int]):
+        """Relee las mesas ``ids``; devuelve (cambiadas, creadas o borradas)"""
+        marcas = ", ".join("?" * len(ids))
+        result = self.db_manager.query(
+            f"SELECT id, numero, zona, estado, capacidad FROM mesas WHERE id IN ({marcas})", tuple(ids)
+        )
+        por_id = {row[0]: row for row in result}
+        cambiadas, altas_bajas = set(), set()
+        conservadas = []
+        for mesa in self._mesas_cache:
+            if mesa.id not in ids:
+                conservadas.append(mesa)
+                continue
+            row = por_id.pop(mesa.id, None)
+            if row is None:
+                altas_bajas.add(mesa.id)
+                continue
+            # En su sitio: los datos temporales (alias, personas, reserva) se conservan
+            mesa.numero = row[1]
+            mesa.zona = row[2] or "Sin zona"
+            mesa.estado = row[3] or "libre"
+            mesa.capacidad = row[4] or 4
+            conservadas.append(mesa)
+            cambiadas.add(mesa.id)
+        for row in por_id.values():
+            conservadas.append(Mesa(
+                id=row[0],
+                numero=row[1],
+                zona=row[2] or "Sin zona",
+                estado=row[3] or "libre",
+                capacidad=row[4] or 4
+            ))
+            altas_bajas.add(row[0])
+        self._mesas_cache = conservadas
+        return cambiadas, altas_bajas
+
     def _load_datos_prueba(self):
         """Carga datos de prueba cuando no hay base de datos"""
         # Datos de prueba
@@ -735,20 +938,45 @@ class TPVService(BaseService):
         return True
 
     def pagar_comanda(self, comanda_id: int) -> bool:
-        """Procesa el pago de una comanda"""
-        comanda = self.get_comanda_por_id(comanda_id)
-        if not comanda:
-            return False
+        """Procesa el pago de una comanda y descuenta sus ingredientes del stock"""
+        return self.pagar_comandas([comanda_id]) == 1
 
-        # Marcar como pagada
-        comanda.estado = "pagada"
-        comanda.fecha_cierre = datetime.now()
+    def pagar_comandas(self, comanda_ids: List[int]) -> int:
+        """
+        Procesa el pago de varias comandas (p. ej. cierre de servicio).
 
-        # En una implementación real, persistiríamos en la BD y procesaríamos el pago
-        logger.info(f"Comanda {comanda_id} pagada por un total de {comanda.total}€")
+        El consumo de ingredientes de todas ellas se aplica en una única
+        escritura en movimientos_stock. Las comandas solo se marcan como
+        pagadas cuando esa escritura se confirma: si falla, siguen abiertas
+        y el cobro puede repetirse sin perder el consumo.
 
-        # Mantener la comanda en memoria hasta que se libere la mesa
-        return True
+        Returns:
+            int: Número de comandas marcadas como pagadas
+
+        Raises:
+            ValueError: Si algún id no corresponde a una comanda activa
+            ConsumoStockError: Si no se pudo descontar el stock
+        """
+        por_id = {c.id: c for c in self._comandas_cache.values()}
+        desconocidas = [comanda_id for comanda_id in comanda_ids if comanda_id not in por_id]
+        if desconocidas:
+            raise ValueError(f"No existen comandas activas con ID {desconocidas}")
+
+        comandas = [por_id[comanda_id] for comanda_id in dict.fromkeys(comanda_ids)]
+        # Las ya pagadas ya descontaron su consumo: no repetirlo
+        nuevas_pagadas = [c for c in comandas if c.estado != "pagada"]
+
+        if nuevas_pagadas and self._escandallos:
+            self._escandallos.descontar_comandas(nuevas_pagadas)
+
+        cierre = datetime.now()
+        for comanda in nuevas_pagadas:
+            comanda.estado = "pagada"
+            comanda.fecha_cierre = cierre
+            logger.info(f"Comanda {comanda.id} pagada por un total de {comanda.total}€")
+
+        # Mantener las comandas en memoria hasta que se libere la mesa
+        return len(comandas)
 
     def liberar_mesa(self, mesa_id: int) -> bool:
         """Libera una mesa y elimina su comanda"""
@@ -1059,8 +1287,8 @@ class TPVService(BaseService):
             query = "SELECT id, mesa_id, cliente, fecha_hora, duracion_min, estado, notas, telefono, personas FROM reservas WHERE mesa_id = ? AND estado = 'activa'"
             params: list[Any] = [mesa_id]
             if fecha:
-                query += " AND date(fecha_hora) = ?"
-                params.append(fecha.isoformat())
+                query += " AND fecha_hora_ts >= ? AND fecha_hora_ts < ?"
+                params.extend(rango_dia(fecha))
             rows = self.db_manager.query(query, tuple(params))
             reservas = [
                 Reserva(
@@ -1099,15 +1327,15 @@ class TPVService(BaseService):
         if not self.db_manager:
             return False
         try:
-            from datetime import datetime, timedelta
             hora_inicio_nueva = datetime.combine(fecha, hora)
             hora_fin_nueva = hora_inicio_nueva + timedelta(minutes=duracion_min)
             rows = self.db_manager.query(
-                "SELECT hora, duracion_min FROM reservas WHERE mesa_id = ? AND fecha = ? AND estado = 'activa'",
-                (mesa_id, fecha.isoformat())
+                "SELECT fecha_hora, duracion_min FROM reservas "
+                "WHERE mesa_id = ? AND estado = 'activa' AND fecha_hora_ts >= ? AND fecha_hora_ts < ?",
+                (mesa_id, *rango_dia(fecha))
             )
             for row in rows:
-                hora_existente = datetime.combine(fecha, datetime.strptime(row[0], "%H:%M:%S").time())
+                hora_existente = datetime.fromisoformat(row[0])
                 duracion_existente = row[1] if row[1] is not None else 120
                 hora_fin_existente = hora_existente + timedelta(minutes=duracion_existente)
                 # Solapamiento: inicio < fin_existente y fin > inicio_existente
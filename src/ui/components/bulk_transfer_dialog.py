@@ -0,0 +1,139 @@
+"""
+Diálogo de progreso para importaciones/exportaciones masivas.
+
+Ejecuta ImportExportService en un QThread para que la interfaz siga
+respondiendo mientras se procesan ficheros de cientos de miles de filas.
+"""
+
+import logging
+from typing import Optional
+
+from PyQt6.QtWidgets import QProgressDialog, QMessageBox, QWidget, QFileDialog
+from PyQt6.QtCore import Qt, QThread, pyqtSignal
+
+logger = logging.getLogger(__name__)
+
+FILTRO_FICHEROS = "CSV (*.csv);;Excel (*.xlsx);;JSON Lines (*.jsonl)"
+
+
+class BulkTransferWorker(QThread):
+    """Hilo que ejecuta una importación o exportación del servicio"""
+
+    progreso = pyqtSignal(int, int)  # (procesadas, total)
+    completado = pyqtSignal(object)  # ResultadoTransferencia
+    fallo = pyqtSignal(str)
+
+    def __init__(self, servicio, operacion: str, entidad: str, ruta: str, parent=None):
+        super().__init__(parent)
+        self.servicio = servicio
+        self.operacion = operacion
+        self.entidad = entidad
+        self.ruta = ruta
+
+    def run(self):
+        try:
+            if self.operacion == "importar":
+                metodo = self.servicio.importar
+            else:
+                metodo = self.servicio.exportar
+            resultado = metodo(
+                self.entidad, self.ruta, progress_callback=self.progreso.emit
+            )
+            self.completado.emit(resultado)
+        except Exception as e:
+            logger.error(f"Error en {self.operacion} de {self.entidad}: {e}")
+            self.fallo.emit(str(e))
+
+
+class BulkTransferDialog(QProgressDialog):
+    """Muestra el progreso de una transferencia masiva y su resumen final"""
+
+    transferencia_completada = pyqtSignal(object)
+
+    def __init__(self, servicio, operacion: str, entidad: str, ruta: str, parent=None):
+        titulo = "Importando" if operacion == "importar" else "Exportando"
+        super().__init__(f"{titulo} {entidad}...", "", 0, 0, parent)
+        self.setWindowTitle(f"{titulo} {entidad}")
+        self.setWindowModality(Qt.WindowModality.WindowModal)
+        self.setCancelButton(None)
+        self.setMinimumDuration(0)
+        self.setAutoClose(False)
+
+        self.operacion = operacion
+        self.worker = BulkTransferWorker(servicio, operacion, entidad, ruta, self)
+        self.worker.progreso.connect(self.actualizar_progreso)
+        self.worker.completado.connect(self.on_completado)
+        self.worker.fallo.connect(self.on_fallo)
+
+    def iniciar(self):
+        """Lanza el hilo y muestra el diálogo"""
+        self.show()
+        self.worker.start()
+
+    def actualizar_progreso(self, procesadas: int, total: int):
+        if total > 0:
+            self.setMaximum(total)
+            self.setValue(min(procesadas, total))
+        self.setLabelText(f"{procesadas:,} filas procesadas".replace(",", "."))
+
+    def on_completado(self, resultado):
+        self.close()
+        if self.operacion == "importar":
+            mensaje = (
+                f"Filas leídas: {resultado.filas}\n"
+                f"Insertadas: {resultado.insertadas}\n"
+                f"Actualizadas: {resultado.actualizadas}\n"
+                f"Duplicadas en fichero: {resultado.duplicadas}\n"
+                f"Descartadas: {resultado.descartadas}\n"
+                f"Tiempo: {resultado.segundos:.1f} s"
+            )
+        else:
+            mensaje = (
+                f"{resultado.filas} filas exportadas a:\n{resultado.ruta}\n"
+                f"Tiempo: {resultado.segundos:.1f} s"
+            )
+        QMessageBox.information(self.parentWidget(), "Transferencia completada", mensaje)
+        self.transferencia_completada.emit(resultado)
+
+    def on_fallo(self, mensaje: str):
+        self.close()
+        QMessageBox.warning(
+            self.parentWidget(), "Error", f"No se pudo completar la operación:\n{mensaje}"
+        )
+
+
+def iniciar_transferencia(
+    parent: QWidget,
+    servicio,
+    operacion: str,
+    entidad: str,
+    nombre_sugerido: str = "",
+) -> Optional[BulkTransferDialog]:
+    """
+    Pide el fichero al usuario y lanza la transferencia en segundo plano.
+
+    Args:
+        parent: Widget padre del diálogo
+        servicio: Instancia de ImportExportService
+        operacion: "importar" o "exportar"
+        entidad: Entidad del servicio (productos, proveedores, clientes...)
+        nombre_sugerido: Nombre de fichero propuesto al exportar
+
+    Returns:
+        El diálogo lanzado o None si el usuario canceló
+    """
+    if operacion == "importar":
+        ruta, _ = QFileDialog.getOpenFileName(
+            parent, f"Importar {entidad}", "", FILTRO_FICHEROS
+        )
+    else:
+        ruta, _ = QFileDialog.getSaveFileName(
+            parent, f"Exportar {entidad}", nombre_sugerido, FILTRO_FICHEROS
+        )
+
+    if not ruta:
+        return None
+
+    dialogo = BulkTransferDialog(servicio, operacion, entidad, ruta, parent)
+    dialogo.iniciar()
+    return dialogo
@@ -0,0 +1,231 @@
+"""
+Panel de diagnóstico de rendimiento.
+
+- Consultas SQL agregadas por huella y módulo llamante (ver
+  data/query_profiler.py); permite activar/desactivar el perfilador,
+  reiniciar las estadísticas y exportarlas a JSON.
+- Principales bloqueadores de la interfaz detectados por el vigilante del
+  bucle de eventos (ver utils/event_loop_watchdog.py).
+- Módulos en memoria y su coste estimado (ver ui/windows/module_cache.py).
+"""
+
+import logging
+from datetime import datetime
+
+from PyQt6.QtWidgets import (
+    QDialog,
+    QVBoxLayout,
+    QHBoxLayout,
+    QLabel,
+    QPushButton,
+    QTableWidget,
+    QTableWidgetItem,
+    QTabWidget,
+    QHeaderView,
+    QFileDialog,
+    QDoubleSpinBox,
+    QMessageBox,
+)
+from PyQt6.QtCore import Qt, QTimer
+
+from data.query_profiler import get_query_profiler
+from utils.event_loop_watchdog import get_event_loop_watchdog
+
+logger = logging.getLogger(__name__)
+
+COLUMNAS_CONSULTAS = [
+    ("Origen", "origen"),
+    ("Consulta", "huella"),
+    ("Llamadas", "llamadas"),
+    ("Total ms", "total_ms"),
+    ("Media ms", "media_ms"),
+    ("p95 ms", "p95_ms"),
+    ("Máx ms", "max_ms"),
+    ("Filas", "filas"),
+    ("Lentas", "lentas"),
+]
+
+COLUMNAS_ORIGEN = [
+    ("Origen", "origen"),
+    ("Llamadas", "llamadas"),
+    ("Total ms", "total_ms"),
+    ("Consultas distintas", "huellas"),
+]
+
+COLUMNAS_BLOQUEOS = [
+    ("Callback", "callback"),
+    ("Bloqueos", "bloqueos"),
+    ("Total ms", "total_ms"),
+    ("Media ms", "media_ms"),
+    ("Máx ms", "max_ms"),
+    ("Último", "ultimo"),
+    ("Punto caliente", "punto_caliente"),
+]
+
+COLUMNAS_MODULOS = [
+    ("Módulo", "modulo"),
+    ("Estado", "estado"),
+    ("Objetos Qt", "objetos_qt"),
+    ("Estimación MB", "estimacion_mb"),
+    ("Medición", "medicion"),
+    ("Último uso", "ultimo_uso"),
+    ("Construcciones", "construcciones"),
+]
+
+INTERVALO_REFRESCO_MS = 2000
+
+
+class DiagnosticsPanel(QDialog):
+    """Diálogo con las estadísticas del perfilador SQL y del vigilante de la interfaz"""
+
+    def __init__(self, parent=None, module_cache=None):
+        super().__init__(parent)
+        self.setWindowTitle("Diagnóstico de rendimiento")
+        self.resize(1100, 600)
+        self.profiler = get_query_profiler()
+        self.watchdog = get_event_loop_watchdog()
+        self.module_cache = module_cache
+
+        self.setup_ui()
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.refrescar)
+
+    def setup_ui(self):
+        layout = QVBoxLayout(self)
+
+        controles = QHBoxLayout()
+        self.estado_label = QLabel()
+        controles.addWidget(self.estado_label)
+        controles.addStretch()
+
+        controles.addWidget(QLabel("Umbral lentas (ms):"))
+        self.umbral_spin = QDoubleSpinBox()
+        self.umbral_spin.setRange(1, 60000)
+        self.umbral_spin.setValue(self.profiler.umbral_lenta_ms)
+        self.umbral_spin.valueChanged.connect(self.cambiar_umbral)
+        controles.addWidget(self.umbral_spin)
+
+        self.toggle_btn = QPushButton()
+        self.toggle_btn.clicked.connect(self.alternar)
+        controles.addWidget(self.toggle_btn)
+
+        reiniciar_btn = QPushButton("Reiniciar")
+        reiniciar_btn.clicked.connect(self.reiniciar)
+        controles.addWidget(reiniciar_btn)
+
+        exportar_btn = QPushButton("Exportar JSON")
+        exportar_btn.clicked.connect(self.exportar)
+        controles.addWidget(exportar_btn)
+        layout.addLayout(controles)
+
+        tabs = QTabWidget()
+        self.tabla_consultas = self._crear_tabla(COLUMNAS_CONSULTAS)
+        self.tabla_origen = self._crear_tabla(COLUMNAS_ORIGEN)
+        self.tabla_bloqueos = self._crear_tabla(COLUMNAS_BLOQUEOS)
+        tabs.addTab(self.tabla_consultas, "Consultas SQL")
+        tabs.addTab(self.tabla_origen, "SQL por origen")
+        tabs.addTab(self.tabla_bloqueos, "Bloqueos de la interfaz")
+        if self.module_cache is not None:
+            self.tabla_modulos = self._crear_tabla(COLUMNAS_MODULOS)
+            tabs.addTab(self.tabla_modulos, "Módulos en memoria")
+        layout.addWidget(tabs)
+
+        self.ruta_label = QLabel(f"Consultas lentas: {self.profiler.ruta_log_lentas}")
+        self.ruta_label.setTextInteractionFlags(Qt.TextInteractionFlag.TextSelectableByMouse)
+        layout.addWidget(self.ruta_label)
+
+    @staticmethod
+    def _crear_tabla(columnas) -> QTableWidget:
+        tabla = QTableWidget(0, len(columnas))
+        tabla.setHorizontalHeaderLabels([c[0] for c in columnas])
+        tabla.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        tabla.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
+        tabla.verticalHeader().setVisible(False)
+        cabecera = tabla.horizontalHeader()
+        cabecera.setSectionResizeMode(QHeaderView.ResizeMode.ResizeToContents)
+        cabecera.setStretchLastSection(False)
+        return tabla
+
+    @staticmethod
+    def _rellenar(tabla: QTableWidget, columnas, filas):
+        tabla.setSortingEnabled(False)
+        tabla.setRowCount(len(filas))
+        for fila, datos in enumerate(filas):
+            for col, (_, clave) in enumerate(columnas):
+                valor = datos.get(clave, "")
+                item = QTableWidgetItem()
+                if isinstance(valor, (int, float)):
+                    # Ordenación numérica al pulsar la cabecera
+                    item.setData(Qt.ItemDataRole.DisplayRole, round(valor, 3))
+                else:
+                    item.setText(str(valor))
+                    item.setToolTip(str(valor))
+                tabla.setItem(fila, col, item)
+        tabla.setSortingEnabled(True)
+
+    # ========================================
+    # ACCIONES
+    # ========================================
+
+    def refrescar(self):
+        snapshot = self.profiler.snapshot()
+        estado = "activo" if snapshot["activo"] else "inactivo"
+        self.estado_label.setText(
+            f"Perfilador {estado} · {snapshot['llamadas']} consultas · "
+            f"{snapshot['total_ms']:.1f} ms"
+        )
+        self.toggle_btn.setText("Desactivar" if snapshot["activo"] else "Activar")
+        self._rellenar(self.tabla_consultas, COLUMNAS_CONSULTAS, snapshot["consultas"])
+        self._rellenar(self.tabla_origen, COLUMNAS_ORIGEN, snapshot["por_origen"])
+
+        bloqueadores = self.watchdog.get_top_bloqueadores()
+        self._rellenar(self.tabla_bloqueos, COLUMNAS_BLOQUEOS, bloqueadores)
+        # La pila de ejemplo se muestra al pasar el ratón sobre el callback
+        for fila in range(self.tabla_bloqueos.rowCount()):
+            item = self.tabla_bloqueos.item(fila, 0)
+            datos = next(b for b in bloqueadores if b["callback"] == item.text())
+            item.setToolTip("\n".join(datos["pila"]))
+
+        if self.module_cache is not None:
+            self._rellenar(self.tabla_modulos, COLUMNAS_MODULOS, self.module_cache.get_report())
+            resumen = self.module_cache.get_summary()
+            presupuesto = f"/{resumen['presupuesto_mb']:.0f}" if resumen["presupuesto_mb"] else ""
+            self.estado_label.setText(
+                f"{self.estado_label.text()} · Módulos {resumen['modulos']}/{resumen['max_modulos']}, "
+                f"~{resumen['estimacion_mb']:.1f}{presupuesto} MB, {resumen['expulsiones']} expulsiones"
+            )
+
+    def alternar(self):
+        if self.profiler.activo:
+            self.profiler.desactivar()
+        else:
+            self.profiler.activar(self.umbral_spin.value())
+        self.refrescar()
+
+    def cambiar_umbral(self, valor: float):
+        self.profiler.umbral_lenta_ms = valor
+
+    def reiniciar(self):
+        self.profiler.reiniciar()
+        self.watchdog.limpiar()
+        self.refrescar()
+
+    def exportar(self):
+        nombre = f"perfil_sql_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+        ruta, _ = QFileDialog.getSaveFileName(self, "Exportar perfil SQL", nombre, "JSON (*.json)")
+        if not ruta:
+            return
+        try:
+            self.profiler.exportar_json(ruta)
+        except Exception as e:
+            logger.error(f"Error exportando perfil SQL: {e}")
+            QMessageBox.critical(self, "Error", f"No se pudo exportar el perfil:\n{e}")
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.refrescar()
+        self.timer.start(INTERVALO_REFRESCO_MS)
+
+    def closeEvent(self, event):
+        self.timer.stop()
+        super().closeEvent(event)
@@ -0,0 +1,438 @@
+"""
+Modelo de tabla con carga incremental (scroll infinito) para Hefest.
+
+Pide las filas a una función de paginación keyset (ver data/pagination.py)
+a medida que la vista se acerca al final, usando el mecanismo estándar de
+Qt canFetchMore/fetchMore. Abrir un listado con cientos de miles de filas
+solo cuesta la primera página.
+
+IndexedFilterProxyModel filtra esas filas con un índice de prefijos que se
+construye a medida que llegan las páginas (ver utils/search_index.py). Al
+buscar u ordenar por cabecera se completa la carga en segundo plano, por
+lotes entre eventos (``cargar_todo_async``): el resultado cubre todo el
+listado sin congelar la interfaz mientras llegan las páginas.
+"""
+
+import logging
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+from PyQt6.QtCore import QAbstractProxyModel, QAbstractTableModel, QModelIndex, QObject, Qt, QTimer, pyqtSignal
+from PyQt6.QtGui import QColor
+
+from data.pagination import Pagina, TAMANO_PAGINA_DEFECTO
+from utils.search_index import IndiceBusqueda
+
+logger = logging.getLogger(__name__)
+
+# (cursor, limite) -> Pagina
+CargadorPagina = Callable[[Optional[Tuple], int], Pagina]
+# (clave_columna, item) -> color de fondo o None
+EstiloCelda = Callable[[str, Dict[str, Any]], Optional[QColor]]
+
+# Filas por lote de la carga en segundo plano: un lote por vuelta del bucle de
+# eventos (indexar cuesta ~60 us por fila: unos 15 ms por lote)
+TAMANO_LOTE_FONDO = 250
+# Con orden de cabecera, cada cuánto se reordena mientras llegan lotes
+INTERVALO_REORDEN_MS = 300
+
+
+class PaginatedTableModel(QAbstractTableModel):
+    """Modelo de tabla que carga páginas bajo demanda"""
+
+    carga_completa = pyqtSignal()  # cargar_todo_async terminó: no quedan páginas
+
+    def __init__(
+        self,
+        columnas: Sequence[Tuple[str, str]],
+        cargar_pagina: CargadorPagina,
+        tamano_pagina: int = TAMANO_PAGINA_DEFECTO,
+        estilo_celda: Optional[EstiloCelda] = None,
+        parent=None,
+    ):
+        """
+        Args:
+            columnas: Lista de (cabecera, clave del diccionario de cada fila)
+            cargar_pagina: Función que devuelve la página que sigue a un cursor
+            tamano_pagina: Filas por página
+            estilo_celda: Función opcional para el color de fondo de cada celda
+        """
+        super().__init__(parent)
+        self.columnas = list(columnas)
+        self.cargar_pagina = cargar_pagina
+        self.tamano_pagina = tamano_pagina
+        self.estilo_celda = estilo_celda
+
+        self._items: List[Dict[str, Any]] = []
+        self._cursor: Optional[Tuple] = None
+        self._hay_mas = True
+
+        # Carga en segundo plano: un lote por disparo; hijo del modelo, muere con él
+        self._tamano_lote_fondo = TAMANO_LOTE_FONDO
+        self._cargando = False
+        self._timer_carga = QTimer(self)
+        self._timer_carga.setSingleShot(True)
+        self._timer_carga.setInterval(0)
+        self._timer_carga.timeout.connect(self._cargar_lote)
+
+    # ========================================
+    # API QAbstractTableModel
+    # ========================================
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._items)
+
+    def columnCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.columnas)
+
+    def data(self, index: QModelIndex, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+
+        item = self._items[index.row()]
+        clave = self.columnas[index.column()][1]
+
+        if role == Qt.ItemDataRole.DisplayRole:
+            valor = item.get(clave, "")
+            return "" if valor is None else str(valor)
+        if role == Qt.ItemDataRole.BackgroundRole and self.estilo_celda:
+            return self.estilo_celda(clave, item)
+        if role == Qt.ItemDataRole.UserRole:
+            return item
+        return None
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if (
+            role == Qt.ItemDataRole.DisplayRole
+            and orientation == Qt.Orientation.Horizontal
+            and 0 <= section < len(self.columnas)
+        ):
+            return self.columnas[section][0]
+        return None
+
+    def canFetchMore(self, parent=QModelIndex()) -> bool:
+        return not parent.isValid() and self._hay_mas
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or not self._hay_mas:
+            return
+
+        try:
+            pagina = self.cargar_pagina(self._cursor, self.tamano_pagina)
+        except Exception as e:
+            logger.error(f"Error cargando página: {e}")
+            self._hay_mas = False
+            return
+
+        self._cursor = pagina.cursor_siguiente
+        self._hay_mas = pagina.hay_mas
+        if not pagina.items:
+            return
+
+        inicio = len(self._items)
+        self.beginInsertRows(QModelIndex(), inicio, inicio + len(pagina.items) - 1)
+        self._items.extend(pagina.items)
+        self.endInsertRows()
+
+    # ========================================
+    # UTILIDADES
+    # ========================================
+
+    def recargar(self):
+        """Descarta las filas cargadas y vuelve a pedir la primera página"""
+        # Una carga en segundo plano pendiente seguiría desde el cursor antiguo
+        self._timer_carga.stop()
+        self._cargando = False
+        self.beginResetModel()
+        self._items = []
+        self._cursor = None
+        self._hay_mas = True
+        self.endResetModel()
+        self.fetchMore()
+
+    def _cargar_paginas(self, tamano_lote: int):
+        # Lotes grandes: menos consultas y menos notificaciones de filas insertadas
+        tamano_pagina = self.tamano_pagina
+        self.tamano_pagina = max(tamano_pagina, tamano_lote)
+        try:
+            self.fetchMore()
+        finally:
+            self.tamano_pagina = tamano_pagina
+
+    def cargar_todo(self, tamano_lote: int = 5000):
+        """Carga todas las páginas restantes de una vez (bloquea; para scripts y exportaciones)"""
+        while self._hay_mas:
+            self._cargar_paginas(tamano_lote)
+
+    def cargar_todo_async(self, tamano_lote: int = TAMANO_LOTE_FONDO):
+        """
+        Carga las páginas restantes por lotes, uno por vuelta del bucle de
+        eventos, para no bloquear la interfaz. Emite ``carga_completa`` al final.
+        """
+        self._tamano_lote_fondo = tamano_lote
+        if self._hay_mas and not self._cargando:
+            self._cargando = True
+            self._timer_carga.start()
+
+    @property
+    def cargando(self) -> bool:
+        """Hay una carga en segundo plano en curso"""
+        return self._cargando
+
+    def _cargar_lote(self):
+        self._cargar_paginas(self._tamano_lote_fondo)
+        if self._hay_mas:
+            self._timer_carga.start()
+        else:
+            self._cargando = False
+            self.carga_completa.emit()
+
+    def item(self, row: int) -> Optional[Dict[str, Any]]:
+        """Diccionario de la fila indicada del modelo"""
+        if 0 <= row < len(self._items):
+            return self._items[row]
+        return None
+
+    @property
+    def items(self) -> List[Dict[str, Any]]:
+        return self._items
+
+
+def _clave_orden(valor: Any) -> Tuple:
+    """Clave de ordenación por cabecera: números antes que textos y vacíos al final"""
+    if valor is None or valor == "":
+        return (2, "")
+    if isinstance(valor, (int, float)) and not isinstance(valor, bool):
+        return (0, valor)
+    return (1, str(valor).lower())
+
+
+class IndexedFilterProxyModel(QAbstractProxyModel):
+    """
+    Proxy de filtrado y ordenación para PaginatedTableModel.
+
+    Las filas visibles son una lista de filas de la fuente: el conjunto que
+    devuelve el IndiceBusqueda para la consulta, ordenado con ``sorted`` por
+    la columna de cabecera. Cambiar la consulta o el orden no pasa por
+    ``filterAcceptsRow``/``lessThan`` fila a fila (una llamada Python por
+    fila en cada pulsación): solo se intersecan conjuntos y se ordena la
+    lista de coincidencias.
+
+    Con una búsqueda activa o un orden de cabecera, el modelo fuente se carga
+    entero en segundo plano (``cargar_todo_async``) y el resultado se
+    completa a medida que se indexan los lotes.
+    """
+
+    def __init__(self, campos: Sequence[str], parent=None):
+        """
+        Args:
+            campos: Claves de los diccionarios de fila incluidas en la búsqueda
+        """
+        super().__init__(parent)
+        self.indice = IndiceBusqueda(campos)
+        self._consulta = ""
+        self._coincidencias: Optional[Set[int]] = None
+        self._columna_orden = -1
+        self._orden = Qt.SortOrder.AscendingOrder
+        # Filas de la fuente visibles y en orden; None: todas, en el orden de la fuente
+        self._filas: Optional[List[int]] = None
+        self._posiciones: Optional[Dict[int, int]] = None
+        self._insertando = False
+        # Claves de orden precalculadas por columna, alineadas con las filas de la fuente
+        self._claves_orden: Dict[int, List[Tuple]] = {}
+        # Mientras llegan lotes con orden de cabecera: reordenar a intervalos, no por lote
+        self._timer_reorden = QTimer(self)
+        self._timer_reorden.setSingleShot(True)
+        self._timer_reorden.setInterval(INTERVALO_REORDEN_MS)
+        self._timer_reorden.timeout.connect(self._aplicar_filas)
+
+    def setSourceModel(self, model: PaginatedTableModel):
+        anterior = self.sourceModel()
+        if anterior is not None:
+            anterior.rowsAboutToBeInserted.disconnect(self._antes_de_insertar)
+            anterior.rowsInserted.disconnect(self._filas_insertadas)
+            anterior.modelAboutToBeReset.disconnect(self.beginResetModel)
+            anterior.modelReset.disconnect(self._fuente_reiniciada)
+            anterior.carga_completa.disconnect(self._carga_completa)
+
+        self.beginResetModel()
+        super().setSourceModel(model)
+        model.rowsAboutToBeInserted.connect(self._antes_de_insertar)
+        model.rowsInserted.connect(self._filas_insertadas)
+        model.modelAboutToBeReset.connect(self.beginResetModel)
+        model.modelReset.connect(self._fuente_reiniciada)
+        model.carga_completa.connect(self._carga_completa)
+        self._reindexar()
+        self.endResetModel()
+
+    # ========================================
+    # API QAbstractProxyModel
+    # ========================================
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        if parent.isValid() or self.sourceModel() is None:
+            return 0
+        return self.sourceModel().rowCount() if self._filas is None else len(self._filas)
+
+    def columnCount(self, parent=QModelIndex()) -> int:
+        if parent.isValid() or self.sourceModel() is None:
+            return 0
+        return self.sourceModel().columnCount()
+
+    def index(self, row: int, column: int, parent=QModelIndex()) -> QModelIndex:
+        if parent.isValid() or not (0 <= row < self.rowCount() and 0 <= column < self.columnCount()):
+            return QModelIndex()
+        return self.createIndex(row, column)
+
+    def parent(self, index=None):
+        # Sin argumento es QObject.parent(); con índice, tabla plana
+        if index is None:
+            return QObject.parent(self)
+        return QModelIndex()
+
+    def mapToSource(self, proxy_index: QModelIndex) -> QModelIndex:
+        if not proxy_index.isValid() or self.sourceModel() is None:
+            return QModelIndex()
+        fila = proxy_index.row() if self._filas is None else self._filas[proxy_index.row()]
+        return self.sourceModel().index(fila, proxy_index.column())
+
+    def mapFromSource(self, source_index: QModelIndex) -> QModelIndex:
+        if not source_index.isValid():
+            return QModelIndex()
+        if self._filas is None:
+            return self.index(source_index.row(), source_index.column())
+        if self._posiciones is None:
+            self._posiciones = {fila: posicion for posicion, fila in enumerate(self._filas)}
+        posicion = self._posiciones.get(source_index.row())
+        return QModelIndex() if posicion is None else self.index(posicion, source_index.column())
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if orientation == Qt.Orientation.Horizontal and self.sourceModel() is not None:
+            return self.sourceModel().headerData(section, orientation, role)
+        if role == Qt.ItemDataRole.DisplayRole:
+            return section + 1
+        return None
+
+    # ========================================
+    # BÚSQUEDA Y ORDEN
+    # ========================================
+
+    def set_consulta(self, consulta: str):
+        """Aplica el texto de búsqueda sobre el listado completo"""
+        self._consulta = consulta
+        if consulta.strip():
+            self._completar_fuente()
+        self._coincidencias = self.indice.buscar(consulta)
+        self._aplicar_filas()
+
+    def sort(self, column: int, order=Qt.SortOrder.AscendingOrder):
+        self._columna_orden = column
+        self._orden = order
+        if column >= 0:
+            self._completar_fuente()
+        self._aplicar_filas()
+
+    def sortColumn(self) -> int:
+        return self._columna_orden
+
+    def sortOrder(self) -> Qt.SortOrder:
+        return self._orden
+
+    def _requiere_todo(self) -> bool:
+        return bool(self._consulta.strip()) or self._columna_orden >= 0
+
+    def _completar_fuente(self):
+        modelo = self.sourceModel()
+        if modelo is not None and modelo.canFetchMore():
+            modelo.cargar_todo_async()
+
+    def _calcular_filas(self) -> Optional[List[int]]:
+        modelo = self.sourceModel()
+        if modelo is None or (self._coincidencias is None and self._columna_orden < 0):
+            return None
+        filas = range(len(modelo.items)) if self._coincidencias is None else self._coincidencias
+        if self._columna_orden < 0:
+            return sorted(filas)
+        return sorted(
+            filas,
+            key=self._claves_columna(self._columna_orden).__getitem__,
+            reverse=self._orden == Qt.SortOrder.DescendingOrder,
+        )
+
+    def _claves_columna(self, columna: int) -> List[Tuple]:
+        """Clave de orden de cada fila de la fuente para ``columna`` (se calcula una vez)"""
+        modelo = self.sourceModel()
+        claves = self._claves_orden.setdefault(columna, [])
+        if len(claves) < len(modelo.items):
+            campo = modelo.columnas[columna][1]
+            claves.extend(_clave_orden(item.get(campo)) for item in modelo.items[len(claves) :])
+        return claves
+
+    def _aplicar_filas(self):
+        """Sustituye la lista de filas visibles conservando selección y actual"""
+        self._timer_reorden.stop()
+        nuevas = self._calcular_filas()
+        self.layoutAboutToBeChanged.emit()
+        persistentes = self.persistentIndexList()
+        origen = [self.mapToSource(indice) for indice in persistentes]
+        self._filas = nuevas
+        self._posiciones = None
+        self.changePersistentIndexList(persistentes, [self.mapFromSource(indice) for indice in origen])
+        self.layoutChanged.emit()
+
+    # ========================================
+    # SINCRONIZACIÓN CON LA FUENTE
+    # ========================================
+
+    def _antes_de_insertar(self, parent: QModelIndex, first: int, last: int):
+        # Sin filtro ni orden las filas nuevas son las mismas en el proxy
+        self._insertando = self._filas is None
+        if self._insertando:
+            self.beginInsertRows(QModelIndex(), first, last)
+
+    def _filas_insertadas(self, parent: QModelIndex, first: int, last: int):
+        modelo = self.sourceModel()
+        self.indice.agregar_varios(modelo.items[first : last + 1], inicio=first)
+        if self._insertando:
+            self._insertando = False
+            self.endInsertRows()
+            return
+
+        if self._coincidencias is not None:
+            self._coincidencias = self.indice.buscar(self._consulta)
+        if self._columna_orden >= 0:
+            if modelo.cargando:
+                # Reordenar todo en cada lote sería cuadrático: a intervalos y al terminar
+                if not self._timer_reorden.isActive():
+                    self._timer_reorden.start()
+            else:
+                self._aplicar_filas()
+            return
+        # Solo filtro: las coincidencias nuevas van detrás de las que ya había
+        nuevas = [fila for fila in range(first, last + 1) if fila in self._coincidencias]
+        if nuevas:
+            inicio = len(self._filas)
+            self.beginInsertRows(QModelIndex(), inicio, inicio + len(nuevas) - 1)
+            self._filas.extend(nuevas)
+            self._posiciones = None
+            self.endInsertRows()
+
+    def _carga_completa(self):
+        if self._timer_reorden.isActive():
+            self._aplicar_filas()
+
+    def _fuente_reiniciada(self):
+        self._reindexar()
+        self.endResetModel()
+        if self._requiere_todo():
+            self._completar_fuente()
+
+    def _reindexar(self):
+        self._timer_reorden.stop()
+        self._claves_orden.clear()
+        self.indice.limpiar()
+        modelo = self.sourceModel()
+        if modelo is not None:
+            self.indice.agregar_varios(modelo.items)
+        self._coincidencias = self.indice.buscar(self._consulta)
+        self._filas = self._calcular_filas()
+        self._posiciones = None
@@ -0,0 +1,82 @@
+"""
+Diálogo con el resultado de una captura de perfilado (ver utils/profiling.py).
+
+Muestra las funciones con más tiempo acumulado y las rutas de los ficheros
+.pstats y .collapsed generados en logs/.
+"""
+
+from PyQt6.QtWidgets import (
+    QDialog,
+    QVBoxLayout,
+    QHBoxLayout,
+    QLabel,
+    QPushButton,
+    QTableWidget,
+    QTableWidgetItem,
+    QHeaderView,
+    QApplication,
+)
+from PyQt6.QtCore import Qt
+
+from utils.profiling import InformePerfil
+
+COLUMNAS_FUNCIONES = [
+    ("Función", "funcion"),
+    ("Llamadas", "llamadas"),
+    ("Acumulado ms", "acumulado_ms"),
+    ("Propio ms", "propio_ms"),
+    ("Por llamada ms", "por_llamada_ms"),
+]
+
+
+class ProfileReportDialog(QDialog):
+    """Top de funciones por tiempo acumulado de una captura de cProfile"""
+
+    def __init__(self, informe: InformePerfil, parent=None):
+        super().__init__(parent)
+        self.informe = informe
+        self.setWindowTitle(f"Perfil: {informe.etiqueta}")
+        self.resize(1000, 600)
+        self.setup_ui()
+
+    def setup_ui(self):
+        layout = QVBoxLayout(self)
+
+        resumen = QLabel(
+            f"Duración: {self.informe.duracion_s * 1000:.0f} ms\n"
+            f"Estadísticas: {self.informe.ruta_pstats}\n"
+            f"Pilas colapsadas (flamegraph): {self.informe.ruta_colapsado}"
+        )
+        resumen.setTextInteractionFlags(Qt.TextInteractionFlag.TextSelectableByMouse)
+        layout.addWidget(resumen)
+
+        tabla = QTableWidget(len(self.informe.funciones), len(COLUMNAS_FUNCIONES))
+        tabla.setHorizontalHeaderLabels([titulo for titulo, _ in COLUMNAS_FUNCIONES])
+        tabla.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        tabla.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
+        tabla.verticalHeader().setVisible(False)
+        tabla.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        for fila, datos in enumerate(self.informe.funciones):
+            for col, (_, clave) in enumerate(COLUMNAS_FUNCIONES):
+                valor = datos[clave]
+                item = QTableWidgetItem()
+                if isinstance(valor, (int, float)):
+                    item.setData(Qt.ItemDataRole.DisplayRole, valor)
+                else:
+                    item.setText(valor)
+                    item.setToolTip(valor)
+                tabla.setItem(fila, col, item)
+        tabla.setSortingEnabled(True)
+        layout.addWidget(tabla)
+
+        botones = QHBoxLayout()
+        copiar_btn = QPushButton("Copiar ruta .pstats")
+        copiar_btn.clicked.connect(
+            lambda: QApplication.clipboard().setText(str(self.informe.ruta_pstats))
+        )
+        cerrar_btn = QPushButton("Cerrar")
+        cerrar_btn.clicked.connect(self.accept)
+        botones.addWidget(copiar_btn)
+        botones.addStretch()
+        botones.addWidget(cerrar_btn)
+        layout.addLayout(botones)
@@ -2,18 +2,26 @@
 
 from .module_base_interface import BaseModule
 
-# from .hospederia_module import HospederiaTab  # Comentado temporalmente
-from .tpv_module.tpv_module import TPVModule
+# Los módulos se importan al primer acceso: importar un submódulo cualquiera
+# (p. ej. el dashboard) no debe arrastrar el TPV, el inventario, etc.
+# Ver ui/windows/module_loader.py
+_LAZY_EXPORTS = {
+    "TPVModule": (".tpv_module.tpv_module", "TPVModule"),
+    "InventarioTab": (".inventario_module", "InventarioModulePro"),  # Usar versión profesional
+    "ConfiguracionModule": (".configuracion_module", "ConfiguracionModule"),
+}
 
 
-from .inventario_module import (
-    InventarioModulePro as InventarioTab,
-)  # Usar versión profesional
+def __getattr__(name):
+    if name in _LAZY_EXPORTS:
+        import importlib
 
-# from .user_management_module import UserManagementModule  # Comentado temporalmente
-from .configuracion_module import ConfiguracionModule
+        module_name, attr = _LAZY_EXPORTS[name]
+        value = getattr(importlib.import_module(module_name, __name__), attr)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-# from .reportes_module import ReportesModule
 
 __all__ = [
     "BaseModule",
@@ -5,6 +5,8 @@ y ajustes específicos para cada módulo.
 """
 
 import logging
+from pathlib import Path
+
 from PyQt6.QtWidgets import (
     QWidget,
     QVBoxLayout,
@@ -30,14 +32,18 @@ from PyQt6.QtWidgets import (
     QTableWidgetItem,
     QHeaderView,
 )
-from PyQt6.QtCore import Qt, pyqtSignal
+from PyQt6.QtCore import Qt, QTimer, pyqtSignal
 from PyQt6.QtGui import QFont, QPixmap, QColor, QColor
 
+from data.backup_manager import get_backup_manager
 from ui.modules.module_base_interface import BaseModule
 from utils.application_config_manager import ConfigManager
 
 logger = logging.getLogger(__name__)
 
+# Frecuencia del combo -> intervalo del gestor de copias (segundos)
+FRECUENCIAS_BACKUP = {"Diario": 86400, "Semanal": 7 * 86400, "Mensual": 30 * 86400}
+
 
 class ConfiguracionModule(BaseModule):
     """Módulo de configuración del sistema"""
@@ -48,6 +54,9 @@ class ConfiguracionModule(BaseModule):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.config_manager = ConfigManager()
+        self.backup_manager = get_backup_manager()
+        self._backup_manual_en_curso = False
+        self._restauracion_en_curso = False
         self.setup_ui()
         self.cargar_configuracion()
 
@@ -624,21 +633,25 @@ class ConfiguracionModule(BaseModule):
         backup_layout = QFormLayout(backup_group)
 
         self.backup_enabled = QCheckBox("Habilitar respaldos automáticos")
-        self.backup_enabled.setChecked(True)
+        self.backup_enabled.setChecked(bool(self.backup_manager.config.get("backup_enabled", True)))
         backup_layout.addRow("Estado:", self.backup_enabled)
 
         self.backup_frequency = QComboBox()
-        self.backup_frequency.addItems(["Diario", "Semanal", "Mensual"])
+        self.backup_frequency.addItems(list(FRECUENCIAS_BACKUP))
+        # La frecuencia más cercana al intervalo con el que trabaja el gestor
+        self.backup_frequency.setCurrentText(
+            min(FRECUENCIAS_BACKUP, key=lambda f: abs(FRECUENCIAS_BACKUP[f] - self.backup_manager.intervalo_s))
+        )
         backup_layout.addRow("Frecuencia:", self.backup_frequency)
 
         self.backup_retention = QSpinBox()
         self.backup_retention.setRange(1, 365)
-        self.backup_retention.setValue(30)
+        self.backup_retention.setValue(self.backup_manager.retencion_dias)
         self.backup_retention.setSuffix(" días")
         backup_layout.addRow("Retención:", self.backup_retention)
 
         # Selector de carpeta de respaldo
-        self.backup_path = QLineEdit()
+        self.backup_path = QLineEdit(str(self.backup_manager.directorio))
         backup_browse_btn = QPushButton("📁 Examinar")
         backup_browse_btn.clicked.connect(self.seleccionar_backup_path)
 
@@ -689,25 +702,43 @@ class ConfiguracionModule(BaseModule):
         )
         restaurar_btn.clicked.connect(self.restaurar_backup)
 
+        verificar_backup_btn = QPushButton("🔍 Verificar Último")
+        verificar_backup_btn.clicked.connect(self.verificar_ultimo_backup)
+
         button_layout.addWidget(crear_backup_btn)
         button_layout.addWidget(restaurar_btn)
+        button_layout.addWidget(verificar_backup_btn)
         button_layout.addStretch()
 
         actions_layout.addLayout(button_layout)
 
+        # Progreso de la copia en curso (la copia se hace en segundo plano)
+        self.backup_progress = QProgressBar()
+        self.backup_progress.setRange(0, 100)
+        self.backup_progress.setVisible(False)
+        actions_layout.addWidget(self.backup_progress)
+
         # Información del último respaldo
         info_layout = QFormLayout()
 
-        ultimo_backup_label = QLabel("Hace 2 días - Exitoso")
-        ultimo_backup_label.setStyleSheet("color: #059669; font-weight: bold;")
-        info_layout.addRow("Último respaldo:", ultimo_backup_label)
+        self.ultimo_backup_label = QLabel("Sin respaldos")
+        info_layout.addRow("Último respaldo:", self.ultimo_backup_label)
+
+        self.tamano_backup_label = QLabel("-")
+        info_layout.addRow("Tamaño:", self.tamano_backup_label)
 
-        tamaño_backup_label = QLabel("2.5 MB")
-        info_layout.addRow("Tamaño:", tamaño_backup_label)
+        self.proximo_backup_label = QLabel("-")
+        info_layout.addRow("Próximo respaldo:", self.proximo_backup_label)
 
         actions_layout.addLayout(info_layout)
         layout.addWidget(actions_group)
 
+        self._backup_timer = QTimer(self)
+        self._backup_timer.setInterval(500)
+        self._backup_timer.timeout.connect(self.actualizar_estado_backup)
+        self._backup_timer.start()
+        self.actualizar_estado_backup()
+
         layout.addStretch()
         self.tabs.addTab(tab, "💾 Respaldo")
 
@@ -788,9 +819,14 @@ class ConfiguracionModule(BaseModule):
                 # Configuración de respaldo
                 "backup_enabled": self.backup_enabled.isChecked(),
                 "backup_frequency": self.backup_frequency.currentText(),
+                "backup_interval": FRECUENCIAS_BACKUP[self.backup_frequency.currentText()],
                 "backup_retention": self.backup_retention.value(),
                 "backup_path": self.backup_path.text(),
             }
+            self.backup_manager.retencion_dias = self.backup_retention.value()
+            self.backup_manager.cambiar_intervalo(FRECUENCIAS_BACKUP[self.backup_frequency.currentText()])
+            if self.backup_path.text():
+                self.backup_manager.directorio = Path(self.backup_path.text())
 
             for key, value in config.items():
                 self.config_manager.set_config(key, value)
@@ -876,28 +912,94 @@ class ConfiguracionModule(BaseModule):
         )
         logger.info("Integridad de base de datos verificada")
 
-    def crear_backup(self):
-        """Crea un respaldo manual de la base de datos"""
-        try:
-            QMessageBox.information(
-                self,
-                "Respaldo Creado",
-                "Respaldo creado exitosamente en la carpeta configurada.",
+    def actualizar_estado_backup(self):
+        """Refleja en la pestaña el estado del gestor de copias (progreso y última copia)"""
+        estado = self.backup_manager.estado()
+        self.backup_progress.setVisible(estado.en_curso)
+        if estado.en_curso:
+            self.backup_progress.setValue(int(estado.progreso * 100))
+            self.backup_progress.setFormat(
+                f"Copiando %p% ({estado.reinicios} reinicios)" if estado.reinicios else "Copiando %p%"
             )
-            logger.info("Respaldo manual creado")
-        except Exception as e:
-            logger.error(f"Error al crear respaldo: {e}")
-            QMessageBox.critical(
-                self, "Error", f"Error al crear el respaldo:\n{str(e)}"
+
+        if estado.ultimo_error and not estado.en_curso:
+            self.ultimo_backup_label.setText(f"Error: {estado.ultimo_error}")
+            self.ultimo_backup_label.setStyleSheet("color: #dc2626; font-weight: bold;")
+        elif estado.ultimo:
+            ultimo = estado.ultimo
+            self.ultimo_backup_label.setText(
+                f"{ultimo.fecha:%d/%m/%Y %H:%M} - {'Verificado' if ultimo.integridad == 'ok' else ultimo.integridad}"
             )
+            self.ultimo_backup_label.setStyleSheet("color: #059669; font-weight: bold;")
+            self.tamano_backup_label.setText(
+                f"{ultimo.bytes / 1024 / 1024:.1f} MB"
+                + (f" (base de {ultimo.bytes_bd / 1024 / 1024:.1f} MB)" if ultimo.comprimido else "")
+            )
+        self.proximo_backup_label.setText(
+            f"{estado.proximo:%d/%m/%Y %H:%M}" if estado.programado and estado.proximo else "No programado"
+        )
+
+        if self._backup_manual_en_curso and not estado.en_curso:
+            self._backup_manual_en_curso = False
+            if estado.ultimo_error:
+                QMessageBox.critical(
+                    self, "Error", f"Error al crear el respaldo:\n{estado.ultimo_error}"
+                )
+            else:
+                QMessageBox.information(
+                    self,
+                    "Respaldo Creado",
+                    f"Respaldo creado y verificado:\n{estado.ultimo.ruta}",
+                )
+
+        if self._restauracion_en_curso and not estado.restaurando:
+            self._restauracion_en_curso = False
+            if estado.error_restauracion:
+                QMessageBox.critical(
+                    self, "Error", f"Error al restaurar el respaldo:\n{estado.error_restauracion}"
+                )
+            else:
+                QMessageBox.information(
+                    self,
+                    "Restauración Completa",
+                    "Base de datos restaurada correctamente.\n"
+                    f"Copia de la base anterior: {estado.previa_restauracion.ruta}",
+                )
+                logger.info("Base de datos restaurada")
+
+    def crear_backup(self):
+        """Crea un respaldo manual de la base de datos (en segundo plano)"""
+        estado = self.backup_manager.estado()
+        if estado.en_curso or estado.restaurando:
+            QMessageBox.information(self, "Respaldo", "Ya hay un respaldo o una restauración en curso.")
+            return
+        self._backup_manual_en_curso = True
+        self.backup_manager.crear_backup_async("manual")
+        logger.info("Respaldo manual iniciado")
+
+    def verificar_ultimo_backup(self):
+        """Comprueba la integridad del último respaldo"""
+        ultimo = self.backup_manager.estado().ultimo
+        if ultimo is None:
+            QMessageBox.information(self, "Verificación", "No hay respaldos que verificar.")
+            return
+        if self.backup_manager.verificar_backup(ultimo.ruta):
+            QMessageBox.information(self, "Verificación", f"El respaldo es correcto:\n{ultimo.ruta}")
+        else:
+            QMessageBox.critical(self, "Verificación", f"El respaldo está dañado:\n{ultimo.ruta}")
 
     def restaurar_backup(self):
-        """Restaura la base de datos desde un respaldo"""
+        """Restaura la base de datos desde un respaldo (en segundo plano)"""
+        estado = self.backup_manager.estado()
+        if estado.en_curso or estado.restaurando:
+            QMessageBox.information(self, "Restauración", "Ya hay un respaldo o una restauración en curso.")
+            return
+
         file_path, _ = QFileDialog.getOpenFileName(
             self,
             "Seleccionar Archivo de Respaldo",
-            "",
-            "Archivos de Respaldo (*.db *.backup);;Todos los Archivos (*)",
+            str(self.backup_manager.directorio),
+            "Archivos de Respaldo (*.db.gz *.db *.backup);;Todos los Archivos (*)",
         )
 
         if file_path:
@@ -910,15 +1012,8 @@ class ConfiguracionModule(BaseModule):
             )
 
             if reply == QMessageBox.StandardButton.Yes:
-                try:
-                    QMessageBox.information(
-                        self,
-                        "Restauración Completa",
-                        "Base de datos restaurada correctamente.",
-                    )
-                    logger.info(f"Base de datos restaurada desde: {file_path}")
-                except Exception as e:
-                    logger.error(f"Error al restaurar respaldo: {e}")
-                    QMessageBox.critical(
-                        self, "Error", f"Error al restaurar el respaldo:\n{str(e)}"
-                    )
+                # Verificación, copia previa y volcado en un hilo; el resultado
+                # lo muestra actualizar_estado_backup
+                self._restauracion_en_curso = True
+                self.backup_manager.restaurar_async(file_path)
+                logger.info(f"Restauración iniciada desde: {file_path}")
@@ -70,6 +70,10 @@ from PyQt6.QtWidgets import (
 from PyQt6.QtCore import Qt, pyqtSignal, QTimer
 from PyQt6.QtGui import QFont, QColor
 
+from services.import_export_service import ImportExportService
+from ui.components.bulk_transfer_dialog import iniciar_transferencia
+from utils.change_poller import get_change_poller
+
 # Importar diálogos profesionales
 from ..dialogs.product_dialogs_pro import (
     NewProductDialog,
@@ -102,10 +106,15 @@ class ProductsManagerWidget(QWidget):
         self.load_products()
         self.load_categories()
 
-        # Timer para actualización automática
+        # Actualización automática: al cambiar productos si hay sondeo de cambios,
+        # si no cada minuto
         self.refresh_timer = QTimer()
         self.refresh_timer.timeout.connect(self.refresh_data)
-        self.refresh_timer.start(60000)  # Actualizar cada minuto
+        self._poller = get_change_poller()
+        if self._poller.activo:
+            self._poller.tabla_cambiada.connect(self._on_tabla_cambiada)
+        else:
+            self.refresh_timer.start(60000)
 
         logger.info("ProductsManagerWidget inicializado correctamente")
 
@@ -150,10 +159,14 @@ class ProductsManagerWidget(QWidget):
         self.add_product_btn = QPushButton("➕ Nuevo Producto")
         self.add_product_btn.clicked.connect(self.add_product)
 
+        self.import_btn = QPushButton("📥 Importar")
+        self.import_btn.clicked.connect(self.import_products)
+
         self.export_btn = QPushButton("📊 Exportar")
         self.export_btn.clicked.connect(self.export_to_csv)
 
         layout.addWidget(self.add_product_btn)
+        layout.addWidget(self.import_btn)
         layout.addWidget(self.export_btn)
 
         return header
@@ -614,47 +627,41 @@ class ProductsManagerWidget(QWidget):
             )
 
     def export_to_csv(self):
-        """Exportar productos a CSV"""
+        """Exportar productos (CSV, XLSX o JSON Lines) en segundo plano"""
         try:
-            file_path, _ = QFileDialog.getSaveFileName(
+            iniciar_transferencia(
                 self,
-                "Exportar Productos",
+                ImportExportService(self.inventario_service.db_manager),
+                "exportar",
+                "productos",
                 f"productos_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-                "CSV Files (*.csv)",
             )
 
-            if file_path:
-                import csv
-
-                with open(file_path, "w", newline="", encoding="utf-8") as file:
-                    writer = csv.writer(file)
-
-                    # Header
-                    writer.writerow(
-                        ["ID", "Nombre", "Categoría", "Precio", "Stock", "Stock Mínimo"]
-                    )
-
-                    # Datos
-                    for producto in self.productos_cache:
-                        writer.writerow(
-                            [
-                                producto.id,
-                                producto.nombre,
-                                producto.categoria,
-                                producto.precio,
-                                producto.stock_actual,
-                                producto.stock_minimo,
-                            ]
-                        )
-
-                QMessageBox.information(
-                    self, "Éxito", f"Productos exportados a:\n{file_path}"
-                )
-
         except Exception as e:
             logger.error(f"Error exportando productos: {e}")
             QMessageBox.warning(self, "Error", f"Error exportando productos: {str(e)}")
 
+    def import_products(self):
+        """Importar productos desde fichero con deduplicación por nombre"""
+        try:
+            dialogo = iniciar_transferencia(
+                self,
+                ImportExportService(self.inventario_service.db_manager),
+                "importar",
+                "productos",
+            )
+            if dialogo:
+                dialogo.transferencia_completada.connect(self.on_import_completed)
+
+        except Exception as e:
+            logger.error(f"Error importando productos: {e}")
+            QMessageBox.warning(self, "Error", f"Error importando productos: {str(e)}")
+
+    def on_import_completed(self, _resultado):
+        """Recargar la tabla tras una importación masiva"""
+        self.refresh_data()
+        self.producto_actualizado.emit()
+
     def refresh_data(self):
         """Actualizar datos automáticamente"""
         try:
@@ -665,11 +672,19 @@ class ProductsManagerWidget(QWidget):
         except Exception as e:
             logger.error(f"Error en actualización automática: {e}")
 
+    def _on_tabla_cambiada(self, tabla: str, ids: list):
+        if tabla == "productos":
+            self.refresh_data()
+
     def cleanup(self):
         """Limpiar recursos"""
         try:
             if hasattr(self, "refresh_timer"):
                 self.refresh_timer.stop()
+            try:
+                self._poller.tabla_cambiada.disconnect(self._on_tabla_cambiada)
+            except (TypeError, RuntimeError):
+                pass
 
         except Exception as e:
             logger.error(f"Error en cleanup: {e}")
@@ -18,6 +18,8 @@ from PyQt6.QtWidgets import (
     QFrame,
     QTableWidget,
     QTableWidgetItem,
+    QTableView,
+    QAbstractItemView,
     QHeaderView,
     QLineEdit,
     QComboBox,
@@ -32,8 +34,45 @@ from PyQt6.QtWidgets import (
 from PyQt6.QtCore import Qt, pyqtSignal
 from PyQt6.QtGui import QFont, QColor
 
+from services.import_export_service import ImportExportService
+from ui.components.bulk_transfer_dialog import iniciar_transferencia
+from ui.components.paginated_table_model import (
+    PaginatedTableModel,
+    IndexedFilterProxyModel,
+)
+
 logger = logging.getLogger(__name__)
 
+COLUMNAS_PROVEEDORES = [
+    ("ID", "id"),
+    ("Nombre", "nombre"),
+    ("Contacto", "contacto"),
+    ("Teléfono", "telefono"),
+    ("Email", "email"),
+    ("Dirección", "direccion"),
+    ("Categoría", "categoria"),
+    ("Estado", "estado"),
+]
+
+# Campos incluidos en la búsqueda: Nombre, Contacto, Teléfono, Email
+CAMPOS_BUSQUEDA = ["nombre", "contacto", "telefono", "email"]
+
+COLORES_CATEGORIA = {
+    "Bebidas": QColor("#e3f2fd"),
+    "Comida": QColor("#f3e5f5"),
+    "Limpieza": QColor("#e8f5e8"),
+    "Servicios": QColor("#fff3e0"),
+}
+
+
+def _estilo_celda_proveedor(clave: str, proveedor: Dict[str, Any]) -> Optional[QColor]:
+    """Color de fondo de las columnas de categoría y estado"""
+    if clave == "categoria":
+        return COLORES_CATEGORIA.get(proveedor.get("categoria"), QColor("#f5f5f5"))
+    if clave == "estado":
+        return QColor("#d4edda") if proveedor.get("activo", True) else QColor("#f8d7da")
+    return None
+
 
 class SupplierManagerWidget(QWidget):
     """
@@ -49,8 +88,6 @@ class SupplierManagerWidget(QWidget):
         super().__init__(parent)
 
         self.inventario_service = inventario_service
-        self.proveedores_cache = []
-
         self.init_ui()
         self.load_suppliers()
 
@@ -128,33 +165,40 @@ class SupplierManagerWidget(QWidget):
         self.delete_btn.clicked.connect(self.delete_selected_supplier)
         self.delete_btn.setEnabled(False)
 
+        self.import_btn = QPushButton("📥 Importar")
+        self.import_btn.clicked.connect(self.import_suppliers)
+
+        self.export_btn = QPushButton("📊 Exportar")
+        self.export_btn.clicked.connect(self.export_suppliers)
+
         layout.addWidget(self.add_btn)
         layout.addWidget(self.edit_btn)
         layout.addWidget(self.delete_btn)
+        layout.addWidget(self.import_btn)
+        layout.addWidget(self.export_btn)
 
         return panel
 
-    def create_suppliers_table(self) -> QTableWidget:
-        """Crear la tabla de proveedores"""
-        table = QTableWidget()
-        table.setObjectName("SuppliersTable")        # Configurar columnas
-        headers = [
-            "ID",
-            "Nombre",
-            "Contacto",
-            "Teléfono",
-            "Email",
-            "Dirección",
-            "Categoría",
-            "Estado",
-        ]
-        table.setColumnCount(len(headers))
-        table.setHorizontalHeaderLabels(headers)
+    def create_suppliers_table(self) -> QTableView:
+        """Crear la tabla de proveedores (carga por páginas al hacer scroll)"""
+        self.suppliers_model = PaginatedTableModel(
+            COLUMNAS_PROVEEDORES,
+            self._cargar_pagina_proveedores,
+            estilo_celda=_estilo_celda_proveedor,
+            parent=self,
+        )
+        self.suppliers_proxy = IndexedFilterProxyModel(CAMPOS_BUSQUEDA, self)
+        self.suppliers_proxy.setSourceModel(self.suppliers_model)
+
+        table = QTableView()
+        table.setObjectName("SuppliersTable")
+        table.setModel(self.suppliers_proxy)
 
         # Configurar tabla
-        table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
+        table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
         table.setAlternatingRowColors(True)
-        table.setSortingEnabled(True)
+        table.verticalHeader().setVisible(False)
 
         # Ajustar columnas
         header = table.horizontalHeader()
@@ -171,10 +215,13 @@ class SupplierManagerWidget(QWidget):
             header.resizeSection(6, 100)
             header.setSectionResizeMode(7, QHeaderView.ResizeMode.Fixed)  # Estado
             header.resizeSection(7, 80)
+            # Sin orden de cabecera hasta que el usuario lo pida: se respeta el del servicio
+            header.setSortIndicator(-1, Qt.SortOrder.AscendingOrder)
+        table.setSortingEnabled(True)
 
         # Conectar señales
-        table.itemSelectionChanged.connect(self.on_supplier_selected)
-        table.itemDoubleClicked.connect(self.edit_selected_supplier)
+        table.selectionModel().selectionChanged.connect(self.on_supplier_selected)
+        table.doubleClicked.connect(self.edit_selected_supplier)
 
         return table
 
@@ -200,10 +247,9 @@ class SupplierManagerWidget(QWidget):
         return panel
 
     def load_suppliers(self):
-        """Cargar proveedores desde el servicio"""
+        """Cargar proveedores desde el servicio (primera página)"""
         try:
-            self.proveedores_cache = self.inventario_service.get_proveedores()
-            self.update_suppliers_table()
+            self.suppliers_model.recargar()
             self.update_statistics()
 
         except Exception as e:
@@ -212,114 +258,58 @@ class SupplierManagerWidget(QWidget):
                 self, "Error", f"No se pudieron cargar los proveedores: {str(e)}"
             )
 
-    def update_suppliers_table(self):
-        """Actualizar la tabla de proveedores"""
-        try:
-            self.suppliers_table.setRowCount(len(self.proveedores_cache))
+    def _cargar_pagina_proveedores(self, cursor, limite):
+        """Adaptar las filas del servicio al formato de la tabla"""
+        pagina = self.inventario_service.get_proveedores_pagina(cursor, limite)
+        for proveedor in pagina.items:
+            proveedor["categoria"] = proveedor.get("categoria") or "General"
+            proveedor["estado"] = "Activo" if proveedor.get("activo", True) else "Inactivo"
+        return pagina
 
-            for row, proveedor in enumerate(self.proveedores_cache):
-                # ID
-                self.suppliers_table.setItem(
-                    row, 0, QTableWidgetItem(str(proveedor.get("id", "")))
-                )
-
-                # Nombre
-                self.suppliers_table.setItem(
-                    row, 1, QTableWidgetItem(proveedor.get("nombre", ""))
-                )
-
-                # Contacto
-                self.suppliers_table.setItem(
-                    row, 2, QTableWidgetItem(proveedor.get("contacto", ""))
-                )
-
-                # Teléfono
-                self.suppliers_table.setItem(
-                    row, 3, QTableWidgetItem(proveedor.get("telefono", ""))
-                )
-
-                # Email
-                self.suppliers_table.setItem(
-                    row, 4, QTableWidgetItem(proveedor.get("email", ""))
-                )                # Dirección
-                self.suppliers_table.setItem(
-                    row, 5, QTableWidgetItem(proveedor.get("direccion", ""))
-                )
-
-                # Categoría
-                categoria = proveedor.get("categoria", "General")
-                categoria_item = QTableWidgetItem(categoria or "General")
-                # Colorear según la categoría
-                if categoria == "Bebidas":
-                    categoria_item.setBackground(QColor("#e3f2fd"))
-                elif categoria == "Comida":
-                    categoria_item.setBackground(QColor("#f3e5f5"))
-                elif categoria == "Limpieza":
-                    categoria_item.setBackground(QColor("#e8f5e8"))
-                elif categoria == "Servicios":
-                    categoria_item.setBackground(QColor("#fff3e0"))
-                else:  # General y otros
-                    categoria_item.setBackground(QColor("#f5f5f5"))
-                self.suppliers_table.setItem(row, 6, categoria_item)
-
-                # Estado
-                activo = proveedor.get("activo", True)
-                estado_text = "Activo" if activo else "Inactivo"
-                item = QTableWidgetItem(estado_text)
-                if activo:
-                    item.setBackground(QColor("#d4edda"))
-                else:
-                    item.setBackground(QColor("#f8d7da"))
-                self.suppliers_table.setItem(row, 7, item)
-
-        except Exception as e:
-            logger.error(f"Error actualizando tabla de proveedores: {e}")
+    @property
+    def proveedores_cache(self) -> List[Dict[str, Any]]:
+        """Proveedores cargados hasta el momento en la tabla"""
+        return self.suppliers_model.items
 
     def update_statistics(self):
         """Actualizar estadísticas"""
         try:
-            total = len(self.proveedores_cache)
-            active = sum(1 for p in self.proveedores_cache if p.get("activo", True))
-            inactive = total - active
+            conteo = self.inventario_service.contar_proveedores()
 
-            self.total_suppliers_label.setText(f"Total: {total}")
-            self.active_suppliers_label.setText(f"Activos: {active}")
-            self.inactive_suppliers_label.setText(f"Inactivos: {inactive}")
+            self.total_suppliers_label.setText(f"Total: {conteo['total']}")
+            self.active_suppliers_label.setText(f"Activos: {conteo['activos']}")
+            self.inactive_suppliers_label.setText(f"Inactivos: {conteo['inactivos']}")
 
         except Exception as e:
             logger.error(f"Error actualizando estadísticas: {e}")
 
     def filter_suppliers(self, text: str):
-        """Filtrar proveedores por texto"""
+        """Filtrar proveedores por texto (prefijos de palabra, sin acentos)"""
         try:
-            for row in range(self.suppliers_table.rowCount()):
-                show_row = False
-
-                # Buscar en nombre, contacto, teléfono y email
-                for col in [1, 2, 3, 4]:  # Nombre, Contacto, Teléfono, Email
-                    item = self.suppliers_table.item(row, col)
-                    if item and text.lower() in item.text().lower():
-                        show_row = True
-                        break
-
-                self.suppliers_table.setRowHidden(row, not show_row)
+            self.suppliers_proxy.set_consulta(text)
 
         except Exception as e:
             logger.error(f"Error filtrando proveedores: {e}")
 
+    def _get_selected_supplier(self) -> Optional[Dict[str, Any]]:
+        """Proveedor de la fila seleccionada (independiente del orden de la vista)"""
+        selection = self.suppliers_table.selectionModel()
+        rows = selection.selectedRows() if selection else []
+        if not rows:
+            return None
+        source_index = self.suppliers_proxy.mapToSource(rows[0])
+        return self.suppliers_model.item(source_index.row())
+
     def on_supplier_selected(self):
         """Manejar selección de proveedor"""
-        selected_rows = set(item.row() for item in self.suppliers_table.selectedItems())
-        has_selection = bool(selected_rows)
+        proveedor = self._get_selected_supplier()
+        has_selection = proveedor is not None
 
         self.edit_btn.setEnabled(has_selection)
         self.delete_btn.setEnabled(has_selection)
 
         if has_selection:
-            row = next(iter(selected_rows))
-            if row < len(self.proveedores_cache):
-                proveedor = self.proveedores_cache[row]
-                self.proveedor_seleccionado.emit(proveedor)
+            self.proveedor_seleccionado.emit(proveedor)
 
     def add_supplier(self):
         """Agregar nuevo proveedor"""
@@ -331,15 +321,8 @@ class SupplierManagerWidget(QWidget):
     def edit_selected_supplier(self):
         """Editar proveedor seleccionado"""
         try:
-            selected_rows = set(
-                item.row() for item in self.suppliers_table.selectedItems()
-            )
-            if not selected_rows:
-                return
-
-            row = next(iter(selected_rows))
-            if row < len(self.proveedores_cache):
-                proveedor = self.proveedores_cache[row]
+            proveedor = self._get_selected_supplier()
+            if proveedor:
                 dialog = SupplierDialog(self.inventario_service, self, proveedor)
                 if dialog.exec() == QDialog.DialogCode.Accepted:
                     self.load_suppliers()
@@ -354,16 +337,8 @@ class SupplierManagerWidget(QWidget):
     def delete_selected_supplier(self):
         """Eliminar proveedor seleccionado"""
         try:
-            selected_rows = set(
-                item.row() for item in self.suppliers_table.selectedItems()
-            )
-            if not selected_rows:
-                return
-
-            row = next(iter(selected_rows))
-            if row < len(self.proveedores_cache):
-                proveedor = self.proveedores_cache[row]
-
+            proveedor = self._get_selected_supplier()
+            if proveedor:
                 # Confirmar eliminación
                 reply = QMessageBox.question(
                     self,
@@ -390,6 +365,46 @@ class SupplierManagerWidget(QWidget):
                 self, "Error", f"No se pudo eliminar el proveedor: {str(e)}"
             )
 
+    def import_suppliers(self):
+        """Importar proveedores desde fichero con deduplicación por nombre"""
+        try:
+            dialogo = iniciar_transferencia(
+                self,
+                ImportExportService(self.inventario_service.db_manager),
+                "importar",
+                "proveedores",
+            )
+            if dialogo:
+                dialogo.transferencia_completada.connect(self.on_import_completed)
+
+        except Exception as e:
+            logger.error(f"Error importando proveedores: {e}")
+            QMessageBox.warning(
+                self, "Error", f"Error importando proveedores: {str(e)}"
+            )
+
+    def export_suppliers(self):
+        """Exportar proveedores (CSV, XLSX o JSON Lines) en segundo plano"""
+        try:
+            iniciar_transferencia(
+                self,
+                ImportExportService(self.inventario_service.db_manager),
+                "exportar",
+                "proveedores",
+                f"proveedores_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
+            )
+
+        except Exception as e:
+            logger.error(f"Error exportando proveedores: {e}")
+            QMessageBox.warning(
+                self, "Error", f"Error exportando proveedores: {str(e)}"
+            )
+
+    def on_import_completed(self, _resultado):
+        """Recargar la tabla tras una importación masiva"""
+        self.load_suppliers()
+        self.proveedor_actualizado.emit()
+
     def apply_styles(self):
         """Aplicar estilos al widget"""
         self.setStyleSheet(
@@ -49,6 +49,7 @@ class ReportesModule(BaseModule):
 
     def __init__(self, parent=None):
         super().__init__(parent)
+        self._import_export = None  # ImportExportService, se crea en la primera exportación
         self.setup_ui()
         self.cargar_datos_iniciales()
 
@@ -578,31 +579,36 @@ class ReportesModule(BaseModule):
         pass
 
     def exportar_reporte(self):
-        """Exporta el reporte actual"""
+        """Exporta los datos del reporte actual en segundo plano"""
         tab_actual = self.tabs.currentIndex()
         nombres_tabs = ["Dashboard", "Ventas", "Hospedería", "Inventario", "Financiero"]
+        # Entidad de origen de cada pestaña
+        entidades_tabs = ["comandas", "comandas", "reservas_hospederia", "productos", "comandas"]
+
+        try:
+            from ui.components.bulk_transfer_dialog import iniciar_transferencia
+
+            iniciar_transferencia(
+                self,
+                self._servicio_exportacion(),
+                "exportar",
+                entidades_tabs[tab_actual],
+                f"reporte_{nombres_tabs[tab_actual].lower()}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
+            )
+        except Exception as e:
+            logger.error(f"Error al exportar reporte: {e}")
+            QMessageBox.critical(
+                self, "Error", f"Error al exportar el reporte:\n{str(e)}"
+            )
 
-        file_path, _ = QFileDialog.getSaveFileName(
-            self,
-            f"Exportar Reporte - {nombres_tabs[tab_actual]}",
-            f"reporte_{nombres_tabs[tab_actual].lower()}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf",
-            "PDF Files (*.pdf);;Excel Files (*.xlsx);;CSV Files (*.csv)",
-        )
+    def _servicio_exportacion(self):
+        """Servicio de exportación compartido por todas las exportaciones del módulo"""
+        if self._import_export is None:
+            from data.db_manager import DatabaseManager
+            from services.import_export_service import ImportExportService
 
-        if file_path:
-            try:
-                # Simular exportación
-                QMessageBox.information(
-                    self,
-                    "Exportación Completada",
-                    f"Reporte exportado exitosamente a:\n{file_path}",
-                )
-                logger.info(f"Reporte exportado a: {file_path}")
-            except Exception as e:
-                logger.error(f"Error al exportar reporte: {e}")
-                QMessageBox.critical(
-                    self, "Error", f"Error al exportar el reporte:\n{str(e)}"
-                )
+            self._import_export = ImportExportService(DatabaseManager())
+        return self._import_export
 
     def cargar_datos_iniciales(self):
         """Carga los datos iniciales para los reportes"""
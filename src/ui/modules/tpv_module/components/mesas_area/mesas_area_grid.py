@@ -6,6 +6,8 @@ Lógica y helpers para el grid de mesas y renderizado de widgets
 from PyQt6.QtWidgets import QGridLayout, QWidget, QLabel, QFrame, QVBoxLayout
 from PyQt6.QtCore import Qt
 
+from utils.tracing import traza, trazar
+
 def create_scroll_area(instance, layout):
     from PyQt6.QtWidgets import QScrollArea, QWidget, QGridLayout
     from PyQt6.QtCore import Qt
@@ -27,6 +29,7 @@ def create_scroll_area(instance, layout):
     instance.scroll_area = scroll_area
     return scroll_area
 
+@trazar("ui")
 def populate_grid(instance):
     from ...widgets.mesa_widget_simple import MesaWidget
     from .mesas_area_utils import restaurar_datos_temporales, calcular_columnas_optimas
@@ -51,6 +54,7 @@ def populate_grid(instance):
         first_row = max(0, scroll.value() // row_height - 1)
         last_row = min(instance._total_rows, (scroll.value() + viewport_height) // row_height + 2)
         return set(range(first_row, last_row))
+    @trazar("ui", "populate_grid.lazy_load_rows")
     def lazy_load_rows():
         visible_rows = get_visible_rows()
         for row in visible_rows:
@@ -69,13 +73,20 @@ def populate_grid(instance):
                 instance.mesa_widgets.append(mesa_widget)
                 instance.mesas_layout.addWidget(mesa_widget, row, col)
             instance._lazy_loaded_rows.add(row)
-    # Conectar el evento de scroll para lazy loading
-    from PyQt6.QtCore import QTimer
+    # Conectar el evento de scroll para lazy loading (una sola conexión viva:
+    # cada repoblado sustituye el manejador anterior en lugar de acumularlo)
     def on_scroll():
         QTimer.singleShot(10, lazy_load_rows)
     scroll = instance.scroll_area.verticalScrollBar()
     if scroll:
+        anterior = getattr(instance, "_grid_scroll_handler", None)
+        if anterior is not None:
+            try:
+                scroll.valueChanged.disconnect(anterior)
+            except (TypeError, RuntimeError):
+                pass
         scroll.valueChanged.connect(on_scroll)
+        instance._grid_scroll_handler = on_scroll
     lazy_load_rows()
 
 # Métodos para conectar en la instancia (por ejemplo, en la clase del área de mesas)
@@ -83,7 +94,8 @@ def add_mesa_grid_callbacks_to_instance(instance):
     def _on_reservar_mesa(mesa):
         try:
             from src.ui.modules.tpv_module.dialogs.reserva_dialog import ReservaDialog
-            dialog = ReservaDialog(instance, mesa)
+            with traza("dialogo.ReservaDialog", "ui", mesa=mesa.numero):
+                dialog = ReservaDialog(instance, mesa)
             dialog.exec()
         except Exception as e:
             import logging
@@ -101,7 +113,8 @@ def add_mesa_grid_callbacks_to_instance(instance):
                     layout = QVBoxLayout(self)
                     self.tpv_widget = TPVAvanzado(mesa, parent=self)
                     layout.addWidget(self.tpv_widget)
-            dialog = TPVDialog(mesa, instance)
+            with traza("dialogo.TPVDialog", "ui", mesa=mesa.numero):
+                dialog = TPVDialog(mesa, instance)
             dialog.exec()
         except Exception as e:
             import logging
@@ -581,6 +581,13 @@ class FiltersSectionUltraPremium(QFrame):
         if hasattr(self.instance, '_on_zone_changed'):
             self.instance._on_zone_changed(selected_zona)
 
+    def cleanup(self) -> None:
+        """Desconecta el filtro del bus global de mesas"""
+        try:
+            mesa_event_bus.zonas_actualizadas.disconnect(self.update_zonas_chips)
+        except (TypeError, RuntimeError):
+            pass
+
     def update_zonas_chips(self) -> None:
         # Elimina los chips actuales
         for i in reversed(range(self.chips_zonas_layout.count())):
@@ -3,6 +3,7 @@ mesas_area_main.py
 Clase principal MesasArea (coordinador) y punto de entrada del área modularizada
 """
 
+import copy
 import logging
 from typing import List, Optional, Callable, Dict
 from PyQt6.QtWidgets import QFrame, QVBoxLayout
@@ -157,6 +158,30 @@ class MesasArea(QFrame):
         populate_grid(self)
         update_stats_from_mesas(self)
 
+    def actualizar_mesas(self, mesas: List[Mesa]):
+        """
+        Repinta solo los widgets de ``mesas`` (ya presentes en el área). Si
+        cambia qué mesas pasan los filtros, o alguna es nueva, rehace la rejilla.
+        """
+        por_id = {m.id: m for m in mesas}
+        if not por_id:
+            return
+        if not por_id.keys() <= {m.id for m in self.mesas}:
+            self.set_mesas(self.tpv_service.get_mesas() if self.tpv_service else self.mesas)
+            return
+        self.mesas = [por_id.get(m.id, m) for m in self.mesas]
+        restaurar_datos_temporales(self, mesas)
+        visibles = [m.id for m in getattr(self, 'filtered_mesas', [])]
+        self.update_filtered_mesas()
+        if [m.id for m in self.filtered_mesas] != visibles:
+            populate_grid(self)
+        else:
+            # Los widgets se crean por filas visibles: los que no existen aún nacerán al día
+            for w in self.mesa_widgets:
+                if w.mesa.id in por_id:
+                    w.update_mesa(por_id[w.mesa.id])
+        update_stats_from_mesas(self)
+
     def set_reserva_service(self, reserva_service):
         self.reserva_service = reserva_service
 
@@ -293,12 +318,12 @@ class MesasArea(QFrame):
         super().resizeEvent(event)
         if not hasattr(self, 'filtered_mesas') or not self.filtered_mesas:
             return
-        if hasattr(self, '_resize_timer'):
-            self._resize_timer.stop()
-        from PyQt6.QtCore import QTimer
-        self._resize_timer = QTimer()
-        self._resize_timer.timeout.connect(lambda: populate_grid(self))
-        self._resize_timer.setSingleShot(True)
+        # Un único temporizador hijo: muere con el área y no dispara sobre un widget destruido
+        if not hasattr(self, '_resize_timer'):
+            from PyQt6.QtCore import QTimer
+            self._resize_timer = QTimer(self)
+            self._resize_timer.setSingleShot(True)
+            self._resize_timer.timeout.connect(lambda: populate_grid(self))
         self._resize_timer.start(150)
 
     def _on_zone_changed(self, zone: str):
@@ -319,6 +344,31 @@ class MesasArea(QFrame):
         self.update_filtered_mesas()
         populate_grid(self)
 
+    def get_view_state(self) -> Dict:
+        """Estado de vista que conserva la caché de módulos al expulsar el TPV"""
+        return {
+            "datos_temporales": copy.deepcopy(self._datos_temporales),
+            "zona": self.current_zone_filter,
+            "estado": self.current_status_filter,
+            "busqueda": self.search_input.text() if hasattr(self, 'search_input') else "",
+        }
+
+    def restore_view_state(self, estado: Dict):
+        """Restaura el estado capturado por get_view_state"""
+        self._datos_temporales = estado.get("datos_temporales", {})
+        self.current_zone_filter = estado.get("zona", "Todas")
+        if hasattr(self, 'zone_combo') and self.zone_combo.findText(self.current_zone_filter) >= 0:
+            self.zone_combo.blockSignals(True)
+            self.zone_combo.setCurrentText(self.current_zone_filter)
+            self.zone_combo.blockSignals(False)
+        if hasattr(self, 'search_input'):
+            self.search_input.blockSignals(True)
+            self.search_input.setText(estado.get("busqueda", ""))
+            self.search_input.blockSignals(False)
+        restaurar_datos_temporales(self, self.mesas)
+        # Sincroniza chips de estado, filtra y repinta
+        self._on_status_changed(estado.get("estado", "Todos"))
+
     def set_search_input(self, widget):
         self.search_input = widget
 
@@ -137,9 +137,9 @@ def create_subcontenedor_metric_cards(instance: Any) -> Any:
             from .mesas_area_stats import update_ultra_premium_stats
             update_ultra_premium_stats(instance)
     refresh_btn.clicked.connect(do_refresh)  # type: ignore[reportUnknownMemberType]
-    # Timer auto
+    # Timer auto (hijo del área: se destruye con ella y no dispara sobre un objeto borrado)
     if not hasattr(instance, '_kpi_auto_refresh_timer'):
-        instance._kpi_auto_refresh_timer = QTimer()
+        instance._kpi_auto_refresh_timer = QTimer(instance)
         instance._kpi_auto_refresh_timer.setInterval(10000)  # 10s
         instance._kpi_auto_refresh_timer.timeout.connect(do_refresh)  # type: ignore[reportUnknownMemberType]
         instance._kpi_auto_refresh_timer.start()
@@ -3,9 +3,14 @@ Servicio centralizado para gestión de reservas con persistencia en SQLite.
 """
 import sqlite3
 from datetime import datetime
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from core.hefest_data_models import Reserva
+from data.change_log import asegurar_cdc
+from data.pagination import Pagina, paginar_consulta, TAMANO_PAGINA_DEFECTO
+from data.time_keys import asegurar_claves_tiempo, rango_dia
+from utils.tracing import trazar_clase
 
+@trazar_clase("servicio")
 class ReservaService:
     def editar_reserva(self, reserva_id: int, datos: dict) -> bool:
         """Actualiza los datos de una reserva existente. Solo permite editar si la reserva está activa o futura."""
@@ -60,7 +65,10 @@ class ReservaService:
                     personas INTEGER
                 )
             ''')
+            c.execute('CREATE INDEX IF NOT EXISTS idx_reservas_estado_fecha ON reservas(estado, fecha_hora, id)')
             conn.commit()
+            asegurar_claves_tiempo(conn)
+            asegurar_cdc(conn)
 
     def crear_reserva(self, mesa_id: int, cliente: str, fecha_hora: datetime, duracion_min: int, telefono: Optional[str] = None, personas: Optional[int] = None, notas: Optional[str] = None) -> Reserva:
         with sqlite3.connect(self.db_path) as conn:
@@ -111,11 +119,34 @@ class ReservaService:
             ) for row in rows
         ]
 
+    def obtener_reservas_activas_pagina(self, cursor: Optional[Tuple] = None, limite: int = TAMANO_PAGINA_DEFECTO) -> Pagina:
+        """Página de reservas activas ordenadas por fecha_hora (paginación keyset)."""
+        with sqlite3.connect(self.db_path) as conn:
+            pagina = paginar_consulta(
+                conn,
+                'SELECT id, mesa_id, cliente, fecha_hora, duracion_min, estado, notas, telefono, personas FROM reservas WHERE estado = ?',
+                ("fecha_hora", "id"),
+                cursor,
+                limite,
+                params=("activa",),
+            )
+        return pagina.map(lambda row: Reserva(
+            id=row[0],
+            mesa_id=row[1],
+            cliente_nombre=row[2],
+            cliente_telefono=row[7],
+            fecha_reserva=datetime.fromisoformat(row[3]).date(),
+            hora_reserva=datetime.fromisoformat(row[3]).strftime('%H:%M'),
+            numero_personas=row[8] if row[8] is not None else 1,
+            estado="confirmada",
+            notas=row[6]
+        ))
+
     def obtener_reservas_por_fecha(self, fecha: datetime) -> List[Reserva]:
-        fecha_str = fecha.date().isoformat()
+        inicio, fin = rango_dia(fecha.date())
         with sqlite3.connect(self.db_path) as conn:
             c = conn.cursor()
-            c.execute('SELECT id, mesa_id, cliente, fecha_hora, duracion_min, estado, notas, telefono, personas FROM reservas WHERE date(fecha_hora) = ? AND estado = ?', (fecha_str, "activa"))
+            c.execute('SELECT id, mesa_id, cliente, fecha_hora, duracion_min, estado, notas, telefono, personas FROM reservas WHERE estado = ? AND fecha_hora_ts >= ? AND fecha_hora_ts < ?', ("activa", inicio, fin))
             rows = c.fetchall()
         return [
             Reserva(
@@ -63,8 +63,9 @@ class ReservasAgendaView(QWidget):
         # Suscribirse a eventos globales de reservas
         try:
             from src.ui.modules.tpv_module.event_bus import reserva_event_bus
-            reserva_event_bus.reserva_cancelada.connect(lambda reserva: self.load_reservas())
-            reserva_event_bus.reserva_creada.connect(lambda reserva: self.load_reservas())
+            # Métodos ligados (no lambdas): PyQt desconecta solo al destruirse la vista
+            reserva_event_bus.reserva_cancelada.connect(self._on_reserva_evento)
+            reserva_event_bus.reserva_creada.connect(self._on_reserva_evento)
         except ImportError:
             pass  # Si no existe el event_bus, ignorar
         layout = QVBoxLayout(self)
@@ -139,6 +140,21 @@ class ReservasAgendaView(QWidget):
             except Exception as e:
                 QMessageBox.critical(self, "Error", f"No se pudo crear la reserva: {e}")
 
+    def _on_reserva_evento(self, reserva: Any = None) -> None:
+        self.load_reservas()
+
+    def cleanup(self) -> None:
+        """Desconecta la vista del bus global de reservas"""
+        try:
+            from src.ui.modules.tpv_module.event_bus import reserva_event_bus
+        except ImportError:
+            return
+        for senal in (reserva_event_bus.reserva_cancelada, reserva_event_bus.reserva_creada):
+            try:
+                senal.disconnect(self._on_reserva_evento)
+            except (TypeError, RuntimeError):
+                pass
+
     def load_reservas(self) -> None:
         from .reserva_list_item_widget import ReservaListItemWidget
         self.list_widget.clear()
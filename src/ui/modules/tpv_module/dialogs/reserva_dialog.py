@@ -1,3 +1,4 @@
+import logging
 from typing import Optional
 from PyQt6.QtWidgets import (
     QDialog, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QSpinBox,
@@ -12,6 +13,8 @@ from services.tpv_service import Mesa
 from core.hefest_data_models import Reserva
 from src.ui.modules.tpv_module.event_bus import reserva_event_bus
 
+logger = logging.getLogger(__name__)
+
 class ReservaDialog(QDialog):
     reserva_editada = pyqtSignal(object)
     reserva_cancelada = pyqtSignal(object)
@@ -591,13 +594,13 @@ class ReservaDialog(QDialog):
                         self.hora_feedback_label.setStyleSheet("color: #1976d2; font-size: 15px; font-weight: bold;")
                     QTimer.singleShot(1200, reset_feedback_style)
                 except Exception as e:
-                    print(f"[ReservaDialog] Error al sugerir próxima hora libre: {e}")
+                    logger.warning(f"Error al sugerir próxima hora libre: {e}")
                     icono = "⚠️"
                     texto = f"{icono} Error al ajustar la próxima hora libre."
                     self.hora_feedback_label.setText(texto)
                     self.hora_feedback_label.setStyleSheet("color: #b71c1c; font-size: 13px; font-weight: bold;")
         else:
-            print("[ReservaDialog] self._proxima_hora_libre es None al sugerir hora.")
+            logger.debug("_proxima_hora_libre es None al sugerir hora")
             icono = "⚠️"
             texto = f"{icono} No se encontró una próxima hora libre para esta mesa."
             self.hora_feedback_label.setText(texto)
@@ -18,6 +18,7 @@ from ui.modules.module_base_interface import BaseModule
 from services.tpv_service import TPVService, Mesa, Producto, Comanda, LineaComanda
 from .components.reservas_agenda.reserva_service import ReservaService
 from .mesa_event_bus import mesa_event_bus
+from utils.change_poller import get_change_poller
 
 # Importar componentes refactorizados
 # TPVDashboard eliminado para evitar métricas duplicadas
@@ -69,6 +70,8 @@ class TPVModule(BaseModule):
         mesa_event_bus.mesa_creada.connect(self._on_mesa_creada)
         mesa_event_bus.mesa_eliminada.connect(self._on_mesa_eliminada)
         mesa_event_bus.alias_cambiado.connect(self._on_alias_cambiado)
+        # Cambios de otros terminales o scripts (data/change_log.py)
+        get_change_poller().cambios_detectados.connect(self._on_cambios_bd)
         # Forzar emisión de mesas tras conectar señales para asegurar que la UI reciba la lista inicial
         try:
             from services.tpv_service import TPVService
@@ -243,17 +246,21 @@ class TPVModule(BaseModule):
     def create_reservas_agenda_tab(self):
         """Crea la pestaña de agenda de reservas"""
         reservas_agenda_tab = ReservasAgendaTab(tpv_service=self.tpv_service)
+        self.reservas_agenda_tab = reservas_agenda_tab
         self.tab_widget.addTab(reservas_agenda_tab, "📅 Agenda Reservas")
         # --- Wiring de sincronización reactiva ---
         if hasattr(self, 'mesas_area'):
             try:
-                reserva_service = reservas_agenda_tab.agenda_view.reserva_service
-                reservas_agenda_tab.agenda_view.reserva_creada.connect(lambda: self.mesas_area.sync_reservas(reserva_service))
-                reservas_agenda_tab.agenda_view.reserva_cancelada.connect(lambda: self.mesas_area.sync_reservas(reserva_service))
+                reservas_agenda_tab.agenda_view.reserva_creada.connect(self._on_reservas_agenda_cambiadas)
+                reservas_agenda_tab.agenda_view.reserva_cancelada.connect(self._on_reservas_agenda_cambiadas)
             except Exception as e:
                 import logging
                 logging.getLogger(__name__).error(f"No se pudo conectar señales de reservas: {e}")
 
+    def _on_reservas_agenda_cambiadas(self):
+        """Sincroniza el grid de mesas tras crear o cancelar una reserva en la agenda"""
+        self.mesas_area.sync_reservas(self.reservas_agenda_tab.agenda_view.reserva_service)
+
     def create_venta_rapida_tab(self):
         """Crea la pestaña de venta rápida"""
         venta_widget = QWidget()
@@ -412,6 +419,38 @@ class TPVModule(BaseModule):
         except Exception as e:
             logger.error(f"Error procesando actualización de mesas: {e}")
 
+    def _on_cambios_bd(self, lote):
+        """Aplica solo las filas que cambiaron en la base de datos (otro terminal, un script)"""
+        try:
+            tablas = set(lote.tablas)
+            if lote.completo:
+                # Sin ids fiables (poda, demasiados cambios, copia restaurada): todo
+                recargadas = self.tpv_service.recargar_desde_bd(tablas)
+                if "productos" in recargadas:
+                    self.productos = self.tpv_service.get_productos()
+                if "mesas" in recargadas:
+                    mesa_event_bus.mesas_actualizadas.emit(self.tpv_service.get_mesas())
+                elif "reservas" in tablas and hasattr(self, 'mesas_area'):
+                    self.mesas_area.refresh_mesas()
+            else:
+                aplicados = self.tpv_service.aplicar_cambios(lote.filas)
+                if aplicados["productos"]:
+                    self.productos = self.tpv_service.get_productos()
+                if aplicados["mesas_altas_bajas"]:
+                    mesa_event_bus.mesas_actualizadas.emit(self.tpv_service.get_mesas())
+                elif "reservas" in tablas and hasattr(self, 'mesas_area'):
+                    self.mesas_area.refresh_mesas()
+                elif aplicados["mesas"]:
+                    mesas = [m for m in self.tpv_service.get_mesas() if m.id in aplicados["mesas"]]
+                    por_id = {m.id: m for m in mesas}
+                    self.mesas = [por_id.get(m.id, m) for m in self.mesas]
+                    if hasattr(self, 'mesas_area'):
+                        self.mesas_area.actualizar_mesas(mesas)
+            if "reservas" in tablas and hasattr(self, 'reservas_agenda_tab'):
+                self.reservas_agenda_tab.agenda_view.load_reservas()
+        except Exception as e:
+            logger.error(f"Error aplicando cambios de la base de datos: {e}")
+
     def _on_controller_error(self, error_message: str):
         """Callback cuando ocurre un error en el controlador"""
         logger.error(f"Error del controlador: {error_message}")
@@ -762,6 +801,27 @@ class TPVModule(BaseModule):
     def _on_alias_cambiado(self, mesa, nuevo_alias):
         pass
 
+    def cleanup(self):
+        """Desconecta el módulo y sus componentes de los buses de eventos globales"""
+        for senal, slot in [
+            (mesa_event_bus.mesa_actualizada, self._on_mesa_updated),
+            (mesa_event_bus.mesas_actualizadas, self._on_mesas_updated),
+            (mesa_event_bus.mesa_clicked, self._on_mesa_clicked),
+            (mesa_event_bus.mesa_creada, self._on_mesa_creada),
+            (mesa_event_bus.mesa_eliminada, self._on_mesa_eliminada),
+            (mesa_event_bus.alias_cambiado, self._on_alias_cambiado),
+            (get_change_poller().cambios_detectados, self._on_cambios_bd),
+        ]:
+            try:
+                senal.disconnect(slot)
+            except (TypeError, RuntimeError):
+                pass
+        from .components.mesas_area.mesas_area_header import FiltersSectionUltraPremium
+        for filtros in self.findChildren(FiltersSectionUltraPremium):
+            filtros.cleanup()
+        if hasattr(self, 'reservas_agenda_tab'):
+            self.reservas_agenda_tab.agenda_view.cleanup()
+
 if __name__ == "__main__":
     import sys
     from PyQt6.QtWidgets import QApplication
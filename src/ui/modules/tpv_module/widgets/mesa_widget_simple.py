@@ -14,6 +14,7 @@ import sys
 from services.tpv_service import Mesa
 from ..mesa_event_bus import mesa_event_bus
 from src.utils.modern_styles import ModernStyles
+from utils.tracing import traza
 
 
 
@@ -579,7 +580,8 @@ class MesaWidget(QFrame):
         try:
             from src.ui.modules.tpv_module.dialogs.reserva_dialog import ReservaDialog
             parent = self.window() if hasattr(self, 'window') else self.parent()
-            dialog = ReservaDialog(parent, self.mesa)
+            with traza("dialogo.ReservaDialog", "ui", mesa=self.mesa.numero):
+                dialog = ReservaDialog(parent, self.mesa)
             dialog.exec()
         except Exception as e:
             # Si no se puede abrir el diálogo directamente, emite señal para que el contenedor lo maneje
@@ -594,7 +596,8 @@ class MesaWidget(QFrame):
         try:
             from src.ui.modules.tpv_module.dialogs.mesa_dialog import MesaDialog
             parent = self.window() if hasattr(self, 'window') else self.parent()
-            dialog = MesaDialog(self.mesa, parent)
+            with traza("dialogo.MesaDialog", "ui", mesa=self.mesa.numero):
+                dialog = MesaDialog(self.mesa, parent)
             dialog.exec()
         except Exception as e:
             import logging
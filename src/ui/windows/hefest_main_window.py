@@ -19,18 +19,15 @@ from PyQt6.QtWidgets import (
     QScrollArea,  # <-- Añadido
     QFileDialog,
     QApplication,
+    QInputDialog,
 )
 from PyQt6.QtCore import Qt, pyqtSignal, QTimer, QDateTime, QFile, QPropertyAnimation
 from PyQt6.QtGui import QCloseEvent, QAction, QPalette, QColor, QIcon
 
 from src.__version__ import __version__
 from ..components.main_navigation_sidebar import ModernSidebar
-from ..modules.module_base_interface import BaseModule
-
-# === SISTEMA VISUAL V3 ULTRA-MODERNO ===
-from ..modules.dashboard_admin_v3.ultra_modern_admin_dashboard import (
-    UltraModernAdminDashboard,
-)
+from .module_loader import ModuleLoader
+from .module_cache import ModuleCache, current_rss_bytes
 
 from utils.qt_css_compat import purge_modern_css_from_widget_tree
 
@@ -42,9 +39,22 @@ from data.db_manager import DatabaseManager
 
 # Importar decorador de roles
 from utils.decorators import require_role
+from utils import tracing
+from utils.profiling import get_sesion_perfilado, perfilar_llamada
+from utils.startup_timeline import get_startup_timeline
 
 logger = logging.getLogger(__name__)
 
+MENU_MODULES = [
+    "dashboard",
+    "hospederia",
+    "tpv",
+    "advanced_tpv",
+    "inventario",
+    "reportes",
+    "configuracion",
+]
+
 
 class MainWindow(QMainWindow):
     """Ventana principal moderna con sidebar animado y efectos visuales"""
@@ -67,7 +77,9 @@ class MainWindow(QMainWindow):
 
         # Variables de estado
         self.current_module = None
-        self.module_widgets = {}
+        # Caché LRU de módulos con presupuesto de memoria (ver module_cache.py)
+        self.module_widgets = ModuleCache()
+        self.module_loader = ModuleLoader(self)
         self._module_scroll_positions = {}  # Guardar posición de scroll por módulo
         # Mapping de módulos a roles requeridos
         self.module_permissions = {
@@ -102,7 +114,12 @@ class MainWindow(QMainWindow):
             return
 
         logger.info("Usuario autenticado, cargando dashboard inicial...")
-        self.show_module("dashboard")
+        startup_timeline = get_startup_timeline()
+        with startup_timeline.fase("modulo_inicial"):
+            self.show_module("dashboard")
+        startup_timeline.marcar("primer_modulo")
+        startup_timeline.finalizar()
+        self.prewarm_modules()
 
     def check_module_permission(self, module_id):
         """Verifica si el usuario tiene permisos para acceder al módulo"""
@@ -266,15 +283,7 @@ class MainWindow(QMainWindow):
         modules_menu = QMenu("Módulos", self)
         menu_bar.addMenu(modules_menu)
         # Agregar acciones para cada módulo
-        for module_id in [
-            "dashboard",
-            "hospederia",
-            "tpv",
-            "advanced_tpv",
-            "inventario",
-            "reportes",
-            "configuracion",
-        ]:
+        for module_id in MENU_MODULES:
             action = QAction(module_id.capitalize().replace("_", " "), self)
             action.setProperty("module_id", module_id)
             action.triggered.connect(self.module_action_triggered)
@@ -288,6 +297,32 @@ class MainWindow(QMainWindow):
         about_action.triggered.connect(self.show_about_dialog)
         help_menu.addAction(about_action)
 
+        # Diagnóstico de rendimiento: SQL y bloqueos de la interfaz (solo administradores)
+        diagnostics_action = QAction("Diagnóstico de rendimiento", self)
+        diagnostics_action.setShortcut("Ctrl+Shift+D")
+        diagnostics_action.triggered.connect(self.show_diagnostics_panel)
+        help_menu.addAction(diagnostics_action)
+
+        # Trazado de rendimiento (exporta a logs/ al desactivarlo)
+        self.tracing_action = QAction("Trazado de rendimiento", self)
+        self.tracing_action.setCheckable(True)
+        self.tracing_action.setChecked(tracing.esta_activo())
+        self.tracing_action.setShortcut("Ctrl+Shift+T")
+        self.tracing_action.triggered.connect(self.toggle_tracing)
+        help_menu.addAction(self.tracing_action)
+
+        # Perfilado con cProfile: sesión en caliente o apertura de un módulo
+        self.profiling_action = QAction("Perfilado (cProfile)", self)
+        self.profiling_action.setCheckable(True)
+        self.profiling_action.setShortcut("Ctrl+Shift+P")
+        self.profiling_action.triggered.connect(self.toggle_profiling)
+        help_menu.addAction(self.profiling_action)
+
+        profile_module_action = QAction("Perfilar apertura de módulo...", self)
+        profile_module_action.setShortcut("Ctrl+Shift+M")
+        profile_module_action.triggered.connect(self.profile_module_creation)
+        help_menu.addAction(profile_module_action)
+
     def module_action_triggered(self):
         """Maneja la activación de acciones de módulo desde el menú"""
         action = self.sender()
@@ -297,6 +332,10 @@ class MainWindow(QMainWindow):
 
     def show_module(self, module_id):
         """Muestra el módulo especificado si el usuario tiene permisos"""
+        with tracing.traza("MainWindow.show_module", "ui", modulo=module_id):
+            self._show_module(module_id)
+
+    def _show_module(self, module_id):
         # Guardar posición de scroll del módulo actual
         if self.current_module is not None:
             vbar = self.scroll_area.verticalScrollBar()
@@ -325,6 +364,7 @@ class MainWindow(QMainWindow):
         self.module_layout.addWidget(widget)
         previous_module = self.current_module
         self.current_module = module_id
+        self.module_widgets.set_active(module_id)
         self.module_changed.emit(module_id)
         vbar = self.scroll_area.verticalScrollBar()
         # Restaurar posición previa si existe y es otro módulo
@@ -342,18 +382,25 @@ class MainWindow(QMainWindow):
 
     def create_module_widget(self, module_id):
         """Crea un widget para el módulo especificado"""
+        with tracing.traza("MainWindow.create_module_widget", "ui", modulo=module_id):
+            return self._create_module_widget(module_id)
+
+    def _create_module_widget(self, module_id):
         try:
             module_class = self.get_module_class(module_id)
 
             if module_class:
+                rss_antes = current_rss_bytes()
                 # Pasar auth_service y db_manager específicamente al dashboard
                 if module_id == "dashboard":
                     widget = module_class(
                         auth_service=self.auth_service, db_manager=self.db_manager
                     )
-                    return widget
                 else:
-                    return module_class()
+                    widget = module_class()
+                if rss_antes is not None:
+                    self.module_widgets.note_build_rss(module_id, current_rss_bytes() - rss_antes)
+                return widget
             else:
                 logger.error(f"Clase del módulo {module_id} no encontrada.")
                 return self.create_permission_denied_widget(module_id)
@@ -362,34 +409,22 @@ class MainWindow(QMainWindow):
             return self.create_permission_denied_widget(module_id)
 
     def get_module_class(self, module_id):
-        """Obtiene la clase del módulo correspondiente al module_id"""
-        module_classes = {
-            # === SISTEMA VISUAL V3 ULTRA-MODERNO ===
-            "dashboard": UltraModernAdminDashboard,  # NUEVO: Dashboard V3 Ultra-Moderno
-            # Otros módulos (usar sistema antiguo temporalmente)
-            "tpv": "ui.modules.tpv_module.tpv_module.TPVModule",
-            "advanced_tpv": "ui.modules.tpv_module.components.tpv_avanzado.TPVAvanzado",
-            "hospederia": "ui.modules.hospederia_module.HospederiaModule",
-            "inventario": "ui.modules.inventario_module.InventarioModulePro",
-            "audit": "ui.modules.audit_module.AuditModule",
-            "users": "ui.modules.user_management_module.UserManagementModule",
-            "user_management": "ui.modules.user_management_module.UserManagementModule",
-            "configuracion": "ui.modules.configuracion_module.ConfiguracionModule",
-            "reportes": "ui.modules.reportes_module.ReportesModule",
-        }
-
-        if module_id in module_classes:
-            class_path = module_classes[module_id]
-            if isinstance(class_path, str):
-                # Importar la clase dinámicamente
-                module_name, class_name = class_path.rsplit(".", 1)
-                module = __import__(module_name, fromlist=[class_name])
-                return getattr(module, class_name)
-            else:
-                return class_path
-        else:
-            logger.warning(f"Módulo no encontrado para ID: {module_id}")
-            return None
+        """Obtiene la clase del módulo correspondiente al module_id (carga diferida)"""
+        return self.module_loader.get_module_class(module_id)
+
+    def prewarm_modules(self):
+        """Precalienta en ocioso los módulos accesibles para el rol del usuario"""
+        accesibles = [
+            module_id
+            for module_id, required_role in self.module_permissions.items()
+            if self.auth_service.has_permission(required_role)
+        ]
+        self.module_loader.prewarm(accesibles, build=self._prebuild_module)
+
+    def _prebuild_module(self, module_id):
+        if module_id in self.module_widgets:
+            return
+        self.module_widgets[module_id] = self.create_module_widget(module_id)
 
     def handle_logout(self):
         """Maneja el cierre de sesión"""
@@ -433,8 +468,108 @@ class MainWindow(QMainWindow):
             f"Hefest v{__version__}\nSistema Integral de Hostelería\n\nDesarrollado para la gestión integral de hoteles y restaurantes"
         )
         msg.setIcon(QMessageBox.Icon.Information)
+
+        # Línea de tiempo del arranque (fases e importaciones más costosas)
+        startup_timeline = get_startup_timeline()
+        if startup_timeline.finalizado:
+            informe = startup_timeline.informe
+            msg.setInformativeText(
+                f"Arranque: {informe['tiempo_hasta_interactivo_ms']:.0f} ms hasta interactivo "
+                f"(presupuesto {informe['presupuesto_ms']:.0f} ms)"
+            )
+            msg.setDetailedText(startup_timeline.resumen_texto())
         msg.exec()
 
+    @require_role(Role.ADMIN)
+    def show_diagnostics_panel(self, checked=False):
+        """Muestra el panel de diagnóstico de rendimiento"""
+        from ..components.diagnostics_panel import DiagnosticsPanel
+
+        if getattr(self, "_diagnostics_panel", None) is None:
+            self._diagnostics_panel = DiagnosticsPanel(self, module_cache=self.module_widgets)
+        self._diagnostics_panel.show()
+        self._diagnostics_panel.raise_()
+
+    @require_role(Role.ADMIN)
+    def toggle_tracing(self, checked=False):
+        """Activa el trazado o, si estaba activo, lo detiene y exporta la traza"""
+        if not tracing.esta_activo():
+            tracing.limpiar()
+            tracing.activar()
+            self.tracing_action.setChecked(True)
+            self.status_bar.showMessage("Trazado de rendimiento activado", 5000)
+            return
+
+        tracing.desactivar()
+        self.tracing_action.setChecked(False)
+        logs_dir = os.path.join(os.path.dirname(__file__), "..", "..", "..", "logs")
+        nombre = f"trace_{QDateTime.currentDateTime().toString('yyyyMMdd_hhmmss')}.json"
+        try:
+            ruta = tracing.exportar_chrome_trace(os.path.join(os.path.abspath(logs_dir), nombre))
+            logger.info(f"Traza exportada a {ruta}")
+            self.status_bar.showMessage(f"Traza exportada a {ruta}", 10000)
+        except Exception as e:
+            logger.error(f"Error exportando traza: {e}")
+            QMessageBox.warning(self, "Trazado", f"No se pudo exportar la traza:\n{e}")
+
+    @require_role(Role.ADMIN)
+    def toggle_profiling(self, checked=False):
+        """Inicia una sesión de cProfile o, si estaba activa, la detiene y muestra el informe"""
+        sesion = get_sesion_perfilado()
+        if not sesion.activa:
+            sesion.iniciar()
+            self.profiling_action.setChecked(True)
+            self.status_bar.showMessage("Perfilado activado (Ctrl+Shift+P para detener)", 5000)
+            return
+
+        self.profiling_action.setChecked(False)
+        try:
+            informe = sesion.detener()
+        except Exception as e:
+            logger.error(f"Error guardando el perfil: {e}")
+            QMessageBox.warning(self, "Perfilado", f"No se pudo guardar el perfil:\n{e}")
+            return
+        self.show_profile_report(informe)
+
+    @require_role(Role.ADMIN)
+    def profile_module_creation(self, checked=False):
+        """Perfila una única llamada a create_module_widget del módulo elegido"""
+        if get_sesion_perfilado().activa:
+            QMessageBox.information(
+                self, "Perfilado", "Detén antes la sesión de perfilado en curso."
+            )
+            return
+
+        actual = MENU_MODULES.index(self.current_module) if self.current_module in MENU_MODULES else 0
+        module_id, ok = QInputDialog.getItem(
+            self, "Perfilar módulo", "Módulo a crear:", MENU_MODULES, actual, False
+        )
+        if not ok:
+            return
+
+        try:
+            widget, informe = perfilar_llamada(
+                self.create_module_widget, module_id, etiqueta=f"modulo_{module_id}"
+            )
+        except Exception as e:
+            logger.error(f"Error perfilando el módulo {module_id}: {e}")
+            QMessageBox.warning(self, "Perfilado", f"No se pudo perfilar el módulo:\n{e}")
+            return
+
+        # Reutilizar la instancia si el módulo aún no estaba creado
+        if module_id not in self.module_widgets:
+            self.module_widgets[module_id] = widget
+        else:
+            widget.deleteLater()
+        self.show_profile_report(informe)
+
+    def show_profile_report(self, informe):
+        """Muestra el top de funciones de una captura de perfilado"""
+        from ..components.profile_report_dialog import ProfileReportDialog
+
+        self.status_bar.showMessage(f"Perfil guardado en {informe.ruta_pstats}", 10000)
+        ProfileReportDialog(informe, self).exec()
+
     def keyPressEvent(self, event):
         super().keyPressEvent(event)
         # Atajos de scroll para el área principal
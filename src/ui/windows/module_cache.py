@@ -0,0 +1,335 @@
+"""
+Caché LRU de los widgets de módulo de la ventana principal.
+
+Sustituye al diccionario ``MainWindow.module_widgets``: mantiene vivos como
+mucho ``HEFEST_MODULOS_MAX`` módulos y, opcionalmente, no más de
+``HEFEST_MODULOS_MEMORIA_MB`` estimados. Al superar el presupuesto se
+expulsa el módulo usado hace más tiempo (nunca el visible).
+
+Antes de expulsar un módulo se guarda su estado de vista ligero y se
+restaura al reconstruirlo:
+
+- pestaña seleccionada de cada QTabWidget
+- filtros: texto de QLineEdit, índice de QComboBox, QCheckBox marcados
+- ``_datos_temporales`` de cualquier widget del árbol
+- lo que devuelva ``get_view_state()`` en los widgets que lo implementen
+  (se restaura con ``restore_view_state(estado)``)
+
+La posición de scroll ya la conserva MainWindow por módulo.
+
+La memoria de cada módulo se estima con el incremento de RSS medido al
+construirlo (psutil o /proc) y, si no se puede medir, por el número de
+objetos Qt del árbol.
+"""
+
+import copy
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+
+from PyQt6.QtCore import QObject, QTimer
+from PyQt6.QtWidgets import QCheckBox, QComboBox, QLineEdit, QTabWidget, QWidget
+
+try:
+    import psutil
+
+    HAS_PSUTIL = True
+except ImportError:
+    HAS_PSUTIL = False
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_MODULES = 5
+# Coste medio aproximado de un objeto Qt con su envoltorio Python y estilo
+KB_PER_QT_OBJECT = 6.0
+
+
+def current_rss_bytes() -> Optional[int]:
+    """Memoria residente del proceso, o None si no se puede medir"""
+    if HAS_PSUTIL:
+        return psutil.Process().memory_info().rss
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def _env_number(nombre: str, defecto: float) -> float:
+    valor = os.environ.get(nombre)
+    try:
+        return float(valor) if valor else defecto
+    except ValueError:
+        logger.warning(f"{nombre} no válido: {valor}")
+        return defecto
+
+
+# ========================================
+# ESTADO DE VISTA
+# ========================================
+
+
+def _keyed_children(widget: QWidget, tipo: type) -> Dict[str, QObject]:
+    """Hijos de un tipo con clave estable: objectName o posición en el árbol"""
+    hijos = {}
+    posiciones: Dict[str, int] = {}
+    for hijo in widget.findChildren(tipo):
+        clase = type(hijo).__name__
+        posicion = posiciones.get(clase, 0)
+        posiciones[clase] = posicion + 1
+        nombre = hijo.objectName()
+        hijos.setdefault(f"{clase}:{nombre}" if nombre else f"{clase}#{posicion}", hijo)
+    return hijos
+
+
+def capture_view_state(widget: QWidget) -> Dict[str, Any]:
+    """Captura el estado de vista ligero de un módulo"""
+    estado: Dict[str, Any] = {"pestanas": {}, "textos": {}, "combos": {}, "casillas": {}, "objetos": {}}
+
+    for clave, tab in _keyed_children(widget, QTabWidget).items():
+        estado["pestanas"][clave] = tab.currentIndex()
+    for clave, edit in _keyed_children(widget, QLineEdit).items():
+        if edit.echoMode() == QLineEdit.EchoMode.Normal and not edit.isReadOnly() and edit.text():
+            estado["textos"][clave] = edit.text()
+    for clave, combo in _keyed_children(widget, QComboBox).items():
+        estado["combos"][clave] = combo.currentIndex()
+    for clave, check in _keyed_children(widget, QCheckBox).items():
+        estado["casillas"][clave] = check.isChecked()
+
+    objetos = {"": widget}
+    objetos.update(_keyed_children(widget, QWidget))
+    for clave, obj in objetos.items():
+        try:
+            if callable(getattr(obj, "get_view_state", None)):
+                estado["objetos"][clave] = {"vista": obj.get_view_state()}
+            elif getattr(obj, "_datos_temporales", None):
+                estado["objetos"][clave] = {"_datos_temporales": copy.deepcopy(obj._datos_temporales)}
+        except Exception as e:
+            logger.debug(f"No se pudo capturar el estado de {clave}: {e}")
+    return estado
+
+
+def restore_view_state(widget: QWidget, estado: Dict[str, Any]):
+    """Restaura sobre un módulo recién construido el estado capturado"""
+    for clave, tab in _keyed_children(widget, QTabWidget).items():
+        indice = estado["pestanas"].get(clave)
+        if indice is not None and 0 <= indice < tab.count():
+            tab.setCurrentIndex(indice)
+    for clave, combo in _keyed_children(widget, QComboBox).items():
+        indice = estado["combos"].get(clave)
+        if indice is not None and 0 <= indice < combo.count():
+            combo.setCurrentIndex(indice)
+    for clave, check in _keyed_children(widget, QCheckBox).items():
+        if clave in estado["casillas"]:
+            check.setChecked(estado["casillas"][clave])
+    # Los textos al final: suelen disparar el filtrado con el resto ya aplicado
+    for clave, edit in _keyed_children(widget, QLineEdit).items():
+        if clave in estado["textos"]:
+            edit.setText(estado["textos"][clave])
+
+    objetos = {"": widget}
+    objetos.update(_keyed_children(widget, QWidget))
+    for clave, guardado in estado["objetos"].items():
+        obj = objetos.get(clave)
+        if obj is None:
+            continue
+        try:
+            if "vista" in guardado and callable(getattr(obj, "restore_view_state", None)):
+                obj.restore_view_state(guardado["vista"])
+            elif "_datos_temporales" in guardado and hasattr(obj, "_datos_temporales"):
+                obj._datos_temporales = guardado["_datos_temporales"]
+        except Exception as e:
+            logger.warning(f"No se pudo restaurar el estado de {clave}: {e}")
+
+
+# ========================================
+# CACHÉ LRU
+# ========================================
+
+
+class _Entry:
+    __slots__ = ("widget", "objetos_qt", "rss_bytes", "ultimo_uso", "construcciones")
+
+    def __init__(self, widget: QWidget, rss_bytes: Optional[int], construcciones: int):
+        self.widget = widget
+        self.objetos_qt = len(widget.findChildren(QObject)) + 1
+        self.rss_bytes = rss_bytes
+        self.ultimo_uso = time.time()
+        self.construcciones = construcciones
+
+    @property
+    def estimacion_mb(self) -> float:
+        if self.rss_bytes:
+            return self.rss_bytes / (1024 * 1024)
+        return self.objetos_qt * KB_PER_QT_OBJECT / 1024
+
+
+class ModuleCache:
+    """Widgets de módulo por module_id con expulsión LRU por número o memoria"""
+
+    def __init__(
+        self,
+        max_modules: Optional[int] = None,
+        memory_budget_mb: Optional[float] = None,
+        on_evict: Optional[Callable[[str], None]] = None,
+    ):
+        self.max_modules = max(1, int(max_modules or _env_number("HEFEST_MODULOS_MAX", DEFAULT_MAX_MODULES)))
+        self.memory_budget_mb = (
+            memory_budget_mb if memory_budget_mb is not None else _env_number("HEFEST_MODULOS_MEMORIA_MB", 0)
+        )
+        self.on_evict = on_evict
+        self.active: Optional[str] = None
+        self.evictions = 0
+
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._states: Dict[str, Dict[str, Any]] = {}
+        self._pending_rss: Dict[str, int] = {}
+        self._builds: Dict[str, int] = {}
+
+    # Interfaz de diccionario usada por MainWindow
+    def __contains__(self, module_id) -> bool:
+        return module_id in self._entries
+
+    def __getitem__(self, module_id: str) -> QWidget:
+        entry = self._entries[module_id]
+        entry.ultimo_uso = time.time()
+        self._entries.move_to_end(module_id)
+        return entry.widget
+
+    def __setitem__(self, module_id: str, widget: QWidget):
+        anterior = self._entries.pop(module_id, None)
+        if anterior is not None and anterior.widget is not widget:
+            self._dispose(anterior.widget)
+
+        self._builds[module_id] = self._builds.get(module_id, 0) + 1
+        self._entries[module_id] = _Entry(widget, self._pending_rss.pop(module_id, None), self._builds[module_id])
+
+        estado = self._states.pop(module_id, None)
+        if estado is not None:
+            try:
+                restore_view_state(widget, estado)
+                logger.debug(f"Estado de vista restaurado en {module_id}")
+            except Exception as e:
+                logger.warning(f"Error restaurando el estado de {module_id}: {e}")
+        self.enforce_budget(protect=module_id)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __iter__(self):
+        return iter(list(self._entries))
+
+    def get(self, module_id: str, default=None):
+        return self[module_id] if module_id in self._entries else default
+
+    def items(self):
+        return [(module_id, entry.widget) for module_id, entry in self._entries.items()]
+
+    # ========================================
+    # PRESUPUESTO
+    # ========================================
+
+    def note_build_rss(self, module_id: str, rss_delta: Optional[int]):
+        """Anota el incremento de RSS medido al construir el widget del módulo"""
+        if rss_delta is not None and rss_delta > 0:
+            self._pending_rss[module_id] = rss_delta
+
+    def set_active(self, module_id: str):
+        self.active = module_id
+        if module_id in self._entries:
+            self[module_id]
+        self.enforce_budget()
+
+    @property
+    def estimated_mb(self) -> float:
+        return sum(entry.estimacion_mb for entry in self._entries.values())
+
+    def _over_budget(self) -> bool:
+        if len(self._entries) > self.max_modules:
+            return True
+        return bool(self.memory_budget_mb) and self.estimated_mb > self.memory_budget_mb
+
+    def enforce_budget(self, protect: Optional[str] = None):
+        """Expulsa módulos, del menos al más reciente, hasta cumplir el presupuesto"""
+        while self._over_budget():
+            candidato = next(
+                (m for m in self._entries if m not in (self.active, protect)),
+                None,
+            )
+            if candidato is None:
+                return
+            self.evict(candidato)
+
+    def evict(self, module_id: str):
+        entry = self._entries.pop(module_id)
+        try:
+            self._states[module_id] = capture_view_state(entry.widget)
+        except Exception as e:
+            logger.warning(f"No se pudo capturar el estado de {module_id}: {e}")
+        self._dispose(entry.widget)
+        self.evictions += 1
+        logger.info(
+            f"Módulo {module_id} expulsado de memoria (~{entry.estimacion_mb:.1f} MB, "
+            f"{entry.objetos_qt} objetos Qt)"
+        )
+        if self.on_evict:
+            self.on_evict(module_id)
+
+    @staticmethod
+    def _dispose(widget: QWidget):
+        # Los temporizadores de un módulo oculto siguen consultando la BD
+        for timer in widget.findChildren(QTimer):
+            timer.stop()
+        # Conexiones a buses globales: sin esto el módulo destruido sigue vivo en Python
+        cleanup = getattr(widget, "cleanup", None)
+        if callable(cleanup):
+            try:
+                cleanup()
+            except Exception as e:
+                logger.warning(f"Error liberando {type(widget).__name__}: {e}")
+        widget.setParent(None)
+        widget.deleteLater()
+
+    # ========================================
+    # DIAGNÓSTICO
+    # ========================================
+
+    def get_report(self) -> List[Dict[str, Any]]:
+        """Estado de cada módulo en memoria o expulsado, para el panel de diagnóstico"""
+        filas = []
+        for module_id, entry in reversed(self._entries.items()):
+            filas.append(
+                {
+                    "modulo": module_id,
+                    "estado": "visible" if module_id == self.active else "en caché",
+                    "objetos_qt": entry.objetos_qt,
+                    "estimacion_mb": round(entry.estimacion_mb, 2),
+                    "medicion": "RSS" if entry.rss_bytes else "objetos",
+                    "ultimo_uso": time.strftime("%H:%M:%S", time.localtime(entry.ultimo_uso)),
+                    "construcciones": entry.construcciones,
+                }
+            )
+        for module_id in self._states:
+            filas.append(
+                {
+                    "modulo": module_id,
+                    "estado": "expulsado",
+                    "objetos_qt": 0,
+                    "estimacion_mb": 0.0,
+                    "medicion": "",
+                    "ultimo_uso": "",
+                    "construcciones": self._builds.get(module_id, 0),
+                }
+            )
+        return filas
+
+    def get_summary(self) -> Dict[str, Any]:
+        return {
+            "modulos": len(self._entries),
+            "max_modulos": self.max_modules,
+            "estimacion_mb": round(self.estimated_mb, 1),
+            "presupuesto_mb": self.memory_budget_mb,
+            "expulsiones": self.evictions,
+        }
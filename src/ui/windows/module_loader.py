@@ -0,0 +1,222 @@
+"""
+Carga diferida y precalentamiento de los módulos de la ventana principal.
+
+Al arrancar no se importa ningún módulo de la interfaz: el módulo de
+inicio (dashboard) se importa al mostrarse. Tras el login, mientras el
+bucle de eventos está ocioso, se importan en segundo plano los módulos a
+los que tiene acceso el rol del usuario y, opcionalmente, se construyen sus
+widgets (por defecto solo el TPV), para que el primer cambio de pantalla
+sea inmediato.
+
+Cada paso del precalentamiento hace una sola importación o construcción y
+cede el control al bucle de eventos; si el usuario ha tocado el teclado o
+el ratón hace poco, el paso se aplaza.
+
+Variables de entorno:
+
+- ``HEFEST_PRECALENTAR=0`` desactiva el precalentamiento
+- ``HEFEST_PRECONSTRUIR=tpv,hospederia`` módulos cuyo widget se construye
+  por adelantado (vacío para solo importar)
+"""
+
+import importlib
+import logging
+import os
+import time
+from collections import deque
+from typing import Callable, Dict, Iterable, Optional
+
+from PyQt6.QtCore import QEvent, QObject, QTimer, pyqtSignal
+from PyQt6.QtWidgets import QApplication
+
+from utils import tracing
+
+logger = logging.getLogger(__name__)
+
+MODULE_CLASSES = {
+    # === SISTEMA VISUAL V3 ULTRA-MODERNO ===
+    "dashboard": "ui.modules.dashboard_admin_v3.ultra_modern_admin_dashboard.UltraModernAdminDashboard",
+    # Otros módulos (usar sistema antiguo temporalmente)
+    "tpv": "ui.modules.tpv_module.tpv_module.TPVModule",
+    "advanced_tpv": "ui.modules.tpv_module.components.tpv_avanzado.TPVAvanzado",
+    "hospederia": "ui.modules.hospederia_module.HospederiaModule",
+    "inventario": "ui.modules.inventario_module.InventarioModulePro",
+    "audit": "ui.modules.audit_module.AuditModule",
+    "users": "ui.modules.user_management_module.UserManagementModule",
+    "user_management": "ui.modules.user_management_module.UserManagementModule",
+    "configuracion": "ui.modules.configuracion_module.ConfiguracionModule",
+    "reportes": "ui.modules.reportes_module.ReportesModule",
+}
+
+# Orden de precalentamiento: primero lo que antes se abre en un turno
+PREWARM_ORDER = [
+    "tpv",
+    "hospederia",
+    "inventario",
+    "advanced_tpv",
+    "reportes",
+    "configuracion",
+    "users",
+    "audit",
+]
+
+DEFAULT_PREBUILD = ("tpv",)
+
+# Margen sin entrada de usuario antes de dar un paso de precalentamiento
+IDLE_INPUT_MS = 400
+RETRY_MS = 250
+
+_INPUT_EVENTS = {
+    QEvent.Type.KeyPress,
+    QEvent.Type.MouseButtonPress,
+    QEvent.Type.MouseButtonDblClick,
+    QEvent.Type.Wheel,
+    QEvent.Type.TouchBegin,
+}
+
+
+def _env_prebuild() -> tuple:
+    valor = os.environ.get("HEFEST_PRECONSTRUIR")
+    if valor is None:
+        return DEFAULT_PREBUILD
+    return tuple(m.strip() for m in valor.split(",") if m.strip())
+
+
+class ModuleLoader(QObject):
+    """Importa las clases de módulo bajo demanda y las precalienta en ocioso"""
+
+    module_imported = pyqtSignal(str, float)  # module_id, ms
+    prewarm_finished = pyqtSignal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._classes: Dict[str, type] = {}
+        self.import_times_ms: Dict[str, float] = {}
+        self._queue: deque = deque()
+        self._build: Optional[Callable[[str], None]] = None
+        self._last_input = 0.0
+        self._filter_installed = False
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self._step)
+
+    # ========================================
+    # CARGA BAJO DEMANDA
+    # ========================================
+
+    def get_module_class(self, module_id: str) -> Optional[type]:
+        """Devuelve la clase del módulo, importándola la primera vez"""
+        cls = self._classes.get(module_id)
+        if cls is not None:
+            return cls
+
+        class_path = MODULE_CLASSES.get(module_id)
+        if class_path is None:
+            logger.warning(f"Módulo no encontrado para ID: {module_id}")
+            return None
+
+        module_name, class_name = class_path.rsplit(".", 1)
+        inicio = time.perf_counter()
+        with tracing.traza("ModuleLoader.import", "ui", modulo=module_id):
+            module = importlib.import_module(module_name)
+        ms = (time.perf_counter() - inicio) * 1000.0
+        cls = getattr(module, class_name)
+
+        self._classes[module_id] = cls
+        self.import_times_ms[module_id] = ms
+        logger.debug(f"Módulo {module_id} importado en {ms:.0f} ms")
+        self.module_imported.emit(module_id, ms)
+        return cls
+
+    def is_imported(self, module_id: str) -> bool:
+        return module_id in self._classes
+
+    # ========================================
+    # PRECALENTAMIENTO EN OCIOSO
+    # ========================================
+
+    def prewarm(
+        self,
+        module_ids: Iterable[str],
+        build: Optional[Callable[[str], None]] = None,
+        prebuild: Optional[Iterable[str]] = None,
+    ):
+        """Encola la importación (y construcción opcional) de los módulos dados
+
+        Args:
+            module_ids: Módulos accesibles para el usuario, en cualquier orden
+            build: Callback que construye y guarda el widget de un módulo
+            prebuild: Módulos a construir por adelantado (por defecto
+                ``HEFEST_PRECONSTRUIR`` o ``DEFAULT_PREBUILD``)
+        """
+        if os.environ.get("HEFEST_PRECALENTAR", "1").lower() in ("0", "false", "no"):
+            return
+
+        accesibles = set(module_ids)
+        prebuild = set(_env_prebuild() if prebuild is None else prebuild)
+        self._build = build
+        self._queue.clear()
+        for module_id in PREWARM_ORDER:
+            if module_id not in accesibles:
+                continue
+            if not self.is_imported(module_id):
+                self._queue.append(("import", module_id))
+            if build is not None and module_id in prebuild:
+                self._queue.append(("build", module_id))
+
+        if not self._queue:
+            return
+        logger.info(f"Precalentando {len(self._queue)} pasos de módulos en segundo plano")
+        self._install_input_filter()
+        self._timer.start(RETRY_MS)
+
+    def cancel(self):
+        self._queue.clear()
+        self._timer.stop()
+        self._remove_input_filter()
+
+    def _step(self):
+        if not self._queue:
+            self._remove_input_filter()
+            self.prewarm_finished.emit()
+            return
+
+        # Ceder ante la interacción reciente del usuario
+        if (time.monotonic() - self._last_input) * 1000.0 < IDLE_INPUT_MS:
+            self._timer.start(RETRY_MS)
+            return
+
+        action, module_id = self._queue.popleft()
+        try:
+            if action == "import":
+                self.get_module_class(module_id)
+            else:
+                with tracing.traza("ModuleLoader.build", "ui", modulo=module_id):
+                    self._build(module_id)
+        except Exception as e:
+            logger.warning(f"Precalentamiento de {module_id} ({action}) fallido: {e}")
+
+        # Intervalo 0: se ejecuta cuando la cola de eventos queda vacía
+        self._timer.start(0)
+
+    # ========================================
+    # DETECCIÓN DE ENTRADA DEL USUARIO
+    # ========================================
+
+    def _install_input_filter(self):
+        app = QApplication.instance()
+        if app is not None and not self._filter_installed:
+            app.installEventFilter(self)
+            self._filter_installed = True
+
+    def _remove_input_filter(self):
+        app = QApplication.instance()
+        if app is not None and self._filter_installed:
+            app.removeEventFilter(self)
+            self._filter_installed = False
+
+    def eventFilter(self, obj, event):
+        if event.type() in _INPUT_EVENTS:
+            self._last_input = time.monotonic()
+        return False
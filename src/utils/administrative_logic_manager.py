@@ -8,6 +8,7 @@ from typing import Dict, Any, Tuple, Optional
 from datetime import datetime, timedelta
 import logging
 from data.db_manager import DatabaseManager
+from data.time_keys import clave_dia, clave_dia_servicio, dia_servicio
 
 logger = logging.getLogger(__name__)
 
@@ -271,14 +272,14 @@ class AdministrativeLogicManager:
         alerts = []
 
         try:
-            today = datetime.now().strftime("%Y-%m-%d")
+            today = clave_dia_servicio()
 
             # Obtener ventas del día
             ventas_hoy = self.db_manager.query(
                 """
                 SELECT SUM(total) as total_ventas, COUNT(*) as num_comandas
                 FROM comandas
-                WHERE DATE(fecha_hora) = ?
+                WHERE dia_servicio = ?
                 AND estado = 'completada'
             """,
                 (today,),
@@ -422,14 +423,14 @@ class AdministrativeLogicManager:
         alerts = []
 
         try:
-            today = datetime.now().strftime("%Y-%m-%d")
+            today = clave_dia_servicio()
 
             # Clientes del día
             clientes_hoy = self.db_manager.query(
                 """
                 SELECT COUNT(DISTINCT mesa_id) as clientes_unicos
                 FROM comandas
-                WHERE DATE(fecha_hora) = ?
+                WHERE dia_servicio = ?
             """,
                 (today,),
             )
@@ -565,13 +566,13 @@ class AdministrativeLogicManager:
     def _get_ventas_diarias_real(self) -> Dict[str, Any]:
         """Obtener ventas reales del día actual"""
         try:
-            today = datetime.now().strftime("%Y-%m-%d")
+            today = dia_servicio()
             query = """
                 SELECT COALESCE(SUM(total), 0) as ventas_total, COUNT(*) as num_comandas
                 FROM comandas
-                WHERE DATE(fecha_hora) = ? AND estado IN ('completada', 'pagada')
+                WHERE dia_servicio = ? AND estado IN ('completada', 'pagada')
             """
-            result = self.db_manager.query(query, (today,))
+            result = self.db_manager.query(query, (clave_dia(today),))
 
             if result:
                 # Usar acceso directo por índice para sqlite3.Row
@@ -586,7 +587,7 @@ class AdministrativeLogicManager:
                     "unit": "€",
                     "icon": "💰" if ventas_total > 0 else "💸",
                     "has_real_data": True,
-                    "real_data": {"num_comandas": num_comandas, "fecha": today},
+                    "real_data": {"num_comandas": num_comandas, "fecha": today.isoformat()},
                 }
             else:
                 return self._get_no_data_metric("Ventas", "€0.00", "€", "💸")
@@ -616,12 +617,13 @@ class AdministrativeLogicManager:
         """Obtener número real de clientes activos hoy"""
         try:
             today = datetime.now().strftime("%Y-%m-%d")
+            tomorrow = (datetime.now() + timedelta(days=1)).strftime("%Y-%m-%d")
 
             # Contar clientes únicos con reservas activas (las comandas no tienen cliente_id directo)
             query_reservas = """
                 SELECT COUNT(DISTINCT cliente_id) as clientes_reservas
                 FROM reservas
-                WHERE estado = 'activa' AND DATE(fecha_entrada) <= ? AND DATE(fecha_salida) >= ?
+                WHERE estado = 'activa' AND fecha_entrada < ? AND fecha_salida >= ?
             """
 
             # Contar total de clientes registrados como métrica base
@@ -630,7 +632,7 @@ class AdministrativeLogicManager:
                 FROM clientes
             """
 
-            result_reservas = self.db_manager.query(query_reservas, (today, today))
+            result_reservas = self.db_manager.query(query_reservas, (tomorrow, today))
             result_total = self.db_manager.query(query_total_clientes)
 
             clientes_reservas = result_reservas[0][0] if result_reservas else 0
@@ -725,7 +727,7 @@ class AdministrativeLogicManager:
     def _get_eficiencia_operacional_real(self) -> Dict[str, Any]:
         """Obtener eficiencia operacional real"""
         try:
-            today = datetime.now().strftime("%Y-%m-%d")
+            today = clave_dia_servicio()
 
             # Calcular eficiencia basada en comandas completadas vs iniciadas
             query = """
@@ -733,7 +735,8 @@ class AdministrativeLogicManager:
                     COUNT(*) as total_comandas,
                     COUNT(CASE WHEN estado = 'completada' THEN 1 END) as completadas,
                     COUNT(CASE WHEN estado = 'cancelada' THEN 1 END) as canceladas
-                FROM comandas                WHERE DATE(fecha_hora) = ?
+                FROM comandas
+                WHERE dia_servicio = ?
             """
 
             result = self.db_manager.query(query, (today,))
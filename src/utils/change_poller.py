@@ -0,0 +1,173 @@
+"""
+Sondeo del registro de cambios (data/change_log.py) para refrescar la interfaz.
+
+Un QTimer en el hilo GUI consulta cada ``intervalo_ms`` ``PRAGMA
+data_version`` sobre una conexión propia y persistente: el valor solo
+cambia cuando otra conexión (otro terminal, un script o la propia
+aplicación, que abre una conexión por operación) confirma una
+transacción, así que un sondeo sin cambios cuesta microsegundos y no lee
+ninguna tabla. Si cambió, se leen las filas de ``cambios_log`` posteriores
+al último ``seq`` visto y se emite, por tabla, :attr:`ChangePoller.tabla_cambiada`
+con los ids tocados. Una lista vacía significa "recargar todo" (demasiados
+cambios, la poda se llevó alguno o se restauró una copia).
+
+Los cambios que escribe este mismo proceso (marcados con
+:data:`data.change_log.ORIGEN_LOCAL`) no se emiten: quien los hizo ya ha
+actualizado su pantalla.
+
+Las pantallas se conectan a la señal de la tabla que muestran y recargan
+solo eso, en lugar de temporizadores a ciegas.
+"""
+
+import logging
+import os
+import sqlite3
+import time
+from typing import Optional
+
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+
+from data.change_log import ORIGEN_LOCAL, LoteCambios, leer_cambios, ultimo_seq
+
+logger = logging.getLogger(__name__)
+
+INTERVALO_DEFECTO_MS = 500
+
+
+class ChangePoller(QObject):
+    """Event bus de cambios en la base de datos, alimentado por sondeo"""
+
+    tabla_cambiada = pyqtSignal(str, list)  # Tabla y ids de fila (vacía: recargar todo)
+    cambios_detectados = pyqtSignal(object)  # LoteCambios completo de un sondeo
+
+    def __init__(
+        self,
+        db_path: Optional[str] = None,
+        intervalo_ms: int = INTERVALO_DEFECTO_MS,
+        incluir_propios: bool = False,
+        parent=None,
+    ):
+        super().__init__(parent)
+        self.db_path = db_path
+        self.intervalo_ms = intervalo_ms
+        self.incluir_propios = incluir_propios
+
+        self._conn: Optional[sqlite3.Connection] = None
+        self._timer: Optional[QTimer] = None
+        self._version_datos: Optional[int] = None
+        self._ultimo_seq = 0
+
+        self.sondeos = 0
+        self.lotes = 0
+        self.ultimo_sondeo_ms = 0.0
+
+    # ========================================
+    # CICLO DE VIDA
+    # ========================================
+
+    @property
+    def activo(self) -> bool:
+        return self._timer is not None
+
+    def start(self):
+        """Empieza a sondear desde el estado actual (llamar desde el hilo GUI)"""
+        if self._timer is not None:
+            return
+        if self.db_path is None:
+            from data.db_manager import DatabaseManager
+
+            self.db_path = DatabaseManager().db_path
+        try:
+            # Autocommit: cada lectura ve lo último confirmado y no retiene el WAL
+            self._conn = sqlite3.connect(self.db_path, timeout=0.1, isolation_level=None)
+            self._ultimo_seq = ultimo_seq(self._conn)
+            self._version_datos = self._leer_version()
+        except sqlite3.Error as e:
+            logger.warning(f"Sondeo de cambios no disponible: {e}")
+            self._cerrar_conexion()
+            return
+        self._timer = QTimer(self)
+        self._timer.timeout.connect(self.sondear)
+        self._timer.start(self.intervalo_ms)
+        logger.info(f"Sondeo de cambios activo cada {self.intervalo_ms} ms (seq {self._ultimo_seq})")
+
+    def stop(self):
+        if self._timer is not None:
+            self._timer.stop()
+            self._timer = None
+        self._cerrar_conexion()
+
+    def _cerrar_conexion(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    # ========================================
+    # SONDEO
+    # ========================================
+
+    def _leer_version(self) -> int:
+        return self._conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def sondear(self) -> Optional[LoteCambios]:
+        """Un sondeo: emite y devuelve el lote si hubo cambios"""
+        if self._conn is None:
+            return None
+        inicio = time.perf_counter()
+        self.sondeos += 1
+        try:
+            version = self._leer_version()
+            if version == self._version_datos:
+                return None
+            lote = leer_cambios(
+                self._conn, self._ultimo_seq, ignorar_origen=None if self.incluir_propios else ORIGEN_LOCAL
+            )
+        except sqlite3.OperationalError as e:
+            # Bloqueado por una escritura larga (o sin registro todavía): siguiente tick
+            logger.debug(f"Sondeo de cambios omitido: {e}")
+            return None
+        finally:
+            self.ultimo_sondeo_ms = (time.perf_counter() - inicio) * 1000
+
+        self._version_datos = version
+        self._ultimo_seq = lote.hasta_seq
+        if not lote:
+            return None
+
+        self.lotes += 1
+        for tabla in lote.tablas:
+            ids = [] if lote.completo else sorted(lote.filas[tabla])
+            self.tabla_cambiada.emit(tabla, ids)
+        self.cambios_detectados.emit(lote)
+        return lote
+
+
+# ========================================
+# INSTANCIA GLOBAL
+# ========================================
+
+_change_poller: Optional[ChangePoller] = None
+
+
+def get_change_poller() -> ChangePoller:
+    """Instancia única del sondeo (se crea parada; ``activo`` indica si sondea)"""
+    global _change_poller
+    if _change_poller is None:
+        _change_poller = ChangePoller()
+    return _change_poller
+
+
+def iniciar_sondeo_cambios(db_path: Optional[str] = None) -> Optional[ChangePoller]:
+    """Arranca el sondeo (``HEFEST_CAMBIOS=0`` lo desactiva; ``HEFEST_CAMBIOS_MS`` fija el periodo)"""
+    if os.environ.get("HEFEST_CAMBIOS") == "0":
+        return None
+    try:
+        poller = get_change_poller()
+        if db_path and not poller.activo:
+            poller.db_path = db_path
+        poller.intervalo_ms = int(os.environ.get("HEFEST_CAMBIOS_MS", poller.intervalo_ms))
+        poller.start()
+        return poller if poller.activo else None
+    except Exception as e:
+        logger.error(f"No se pudo iniciar el sondeo de cambios: {e}")
+        return None
@@ -0,0 +1,263 @@
+"""
+Vigilante del bucle de eventos de la interfaz (Qt).
+
+Un QTimer de alta frecuencia en el hilo GUI actúa de latido. Un hilo
+muestreador comprueba cada pocos milisegundos cuánto hace del último
+latido: si supera el umbral, la interfaz está bloqueada y se captura la
+pila Python del hilo GUI con ``sys._current_frames()``.
+
+De cada pila se extrae:
+
+- el callback que el bucle de eventos estaba ejecutando (slot, timer...),
+  es decir, el primer marco por encima de la profundidad a la que corre el
+  propio latido, p. ej. ``HospitalityMetricCard.auto_refresh_data``
+- el punto caliente: el marco más interno del código de Hefest
+
+Cada congelación se agrega por callback en un informe de "principales
+bloqueadores" (número de bloqueos, tiempo total y máximo, pila de ejemplo).
+"""
+
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_RAIZ_PROYECTO = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+_DIRECTORIOS_PROPIOS = tuple(
+    os.path.join(_RAIZ_PROYECTO, d) + os.sep for d in ("src", "data")
+)
+_FICHERO_PROPIO = os.path.abspath(__file__)
+
+MAX_MARCOS_PILA = 25
+
+
+@dataclass
+class Bloqueador:
+    """Agregado de congelaciones atribuidas a un mismo callback"""
+
+    callback: str
+    bloqueos: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+    ultimo: Optional[datetime] = None
+    puntos_calientes: Counter = field(default_factory=Counter)
+    pila_ejemplo: List[str] = field(default_factory=list)
+
+    def to_dict(self) -> Dict:
+        punto = self.puntos_calientes.most_common(1)
+        return {
+            "callback": self.callback,
+            "bloqueos": self.bloqueos,
+            "total_ms": round(self.total_ms, 1),
+            "max_ms": round(self.max_ms, 1),
+            "media_ms": round(self.total_ms / self.bloqueos, 1) if self.bloqueos else 0.0,
+            "ultimo": self.ultimo.strftime("%H:%M:%S") if self.ultimo else "",
+            "punto_caliente": punto[0][0] if punto else "",
+            "pila": list(self.pila_ejemplo),
+        }
+
+
+def _describir_marco(marco) -> str:
+    codigo = marco.f_code
+    nombre = getattr(codigo, "co_qualname", codigo.co_name)
+    archivo = os.path.relpath(codigo.co_filename, _RAIZ_PROYECTO) if codigo.co_filename.startswith(_RAIZ_PROYECTO) else os.path.basename(codigo.co_filename)
+    return f"{nombre} ({archivo}:{marco.f_lineno})"
+
+
+def _es_propio(marco) -> bool:
+    archivo = marco.f_code.co_filename
+    return archivo.startswith(_DIRECTORIOS_PROPIOS) and archivo != _FICHERO_PROPIO
+
+
+class EventLoopWatchdog:
+    """Detecta bloqueos del hilo GUI y atribuye el tiempo al callback en curso"""
+
+    def __init__(
+        self,
+        umbral_ms: float = 250.0,
+        intervalo_sonda_ms: int = 50,
+        intervalo_muestreo_ms: int = 20,
+    ):
+        """
+        Args:
+            umbral_ms: Retraso del latido a partir del cual se considera bloqueo
+            intervalo_sonda_ms: Periodo del QTimer de latido
+            intervalo_muestreo_ms: Periodo del hilo muestreador
+        """
+        self.umbral = umbral_ms / 1000.0
+        self.intervalo_sonda = intervalo_sonda_ms / 1000.0
+        self.intervalo_muestreo = intervalo_muestreo_ms / 1000.0
+
+        self._bloqueadores: Dict[str, Bloqueador] = {}
+        self._lock = threading.Lock()
+        self._parar = threading.Event()
+        self._hilo: Optional[threading.Thread] = None
+        self._timer = None
+
+        # Estado compartido con el hilo GUI (asignaciones atómicas)
+        self._latido = time.perf_counter()
+        self._profundidad_base = 0
+        self._gui_tid: Optional[int] = None
+
+        # Episodio de bloqueo en curso (solo lo toca el hilo muestreador)
+        self._episodio_max = 0.0
+        self._episodio_callbacks: Counter = Counter()
+        self._episodio_calientes: Counter = Counter()
+        self._episodio_pila: List[str] = []
+
+        self._histograma_lag = None
+        try:
+            from utils.metrics_endpoint import CUBETAS_LAG_SEGUNDOS, get_metrics_registry
+
+            self._histograma_lag = get_metrics_registry().histogram(
+                "hefest_gui_event_loop_lag_seconds",
+                "Retraso del bucle de eventos de la interfaz",
+                CUBETAS_LAG_SEGUNDOS,
+            )
+        except Exception as e:
+            logger.debug(f"Histograma de latencia no disponible: {e}")
+
+    # ========================================
+    # CICLO DE VIDA
+    # ========================================
+
+    def start(self, parent=None):
+        """Arranca el latido (llamar desde el hilo GUI) y el muestreador"""
+        from PyQt6.QtCore import QTimer
+
+        if self._hilo is not None:
+            return
+        self._gui_tid = threading.get_ident()
+        self._latido = time.perf_counter()
+        self._timer = QTimer(parent)
+        self._timer.timeout.connect(self._tick)
+        self._timer.start(int(self.intervalo_sonda * 1000))
+
+        self._parar.clear()
+        self._hilo = threading.Thread(target=self._muestrear, name="hefest-watchdog", daemon=True)
+        self._hilo.start()
+        logger.info(f"Vigilante del bucle de eventos activo (umbral {self.umbral * 1000:.0f} ms)")
+
+    def stop(self):
+        self._parar.set()
+        if self._timer is not None:
+            self._timer.stop()
+            self._timer = None
+        if self._hilo is not None:
+            self._hilo.join(timeout=1.0)
+            self._hilo = None
+
+    # ========================================
+    # HILO GUI
+    # ========================================
+
+    def _tick(self):
+        ahora = time.perf_counter()
+        lag = max(0.0, ahora - self._latido - self.intervalo_sonda)
+        # Marcos por debajo del latido = profundidad a la que el bucle invoca callbacks
+        profundidad = 0
+        marco = sys._getframe(1)
+        while marco is not None:
+            profundidad += 1
+            marco = marco.f_back
+        self._profundidad_base = profundidad
+        self._latido = ahora
+        if self._histograma_lag is not None:
+            self._histograma_lag.observe(lag)
+
+    # ========================================
+    # HILO MUESTREADOR
+    # ========================================
+
+    def _muestrear(self):
+        en_bloqueo = False
+        while not self._parar.wait(self.intervalo_muestreo):
+            retraso = time.perf_counter() - self._latido - self.intervalo_sonda
+            if retraso >= self.umbral:
+                en_bloqueo = True
+                self._capturar(retraso)
+            elif en_bloqueo:
+                en_bloqueo = False
+                self._cerrar_episodio()
+
+    def _capturar(self, retraso: float):
+        marco = sys._current_frames().get(self._gui_tid)
+        if marco is None:
+            return
+
+        pila = []
+        while marco is not None:
+            pila.append(marco)
+            marco = marco.f_back
+        pila.reverse()  # del más externo al más interno
+
+        base = self._profundidad_base
+        callback = pila[base] if len(pila) > base else pila[-1]
+        caliente = next((m for m in reversed(pila) if _es_propio(m)), pila[-1])
+
+        self._episodio_max = max(self._episodio_max, retraso)
+        self._episodio_callbacks[_describir_marco(callback).split(" (", 1)[0]] += 1
+        self._episodio_calientes[_describir_marco(caliente)] += 1
+        if not self._episodio_pila:
+            self._episodio_pila = [_describir_marco(m) for m in pila[-MAX_MARCOS_PILA:]]
+
+    def _cerrar_episodio(self):
+        if not self._episodio_callbacks:
+            return
+        # El bloqueo dura al menos lo que se observó más un periodo de muestreo
+        duracion_ms = (self._episodio_max + self.intervalo_muestreo) * 1000.0
+        callback = self._episodio_callbacks.most_common(1)[0][0]
+
+        with self._lock:
+            bloqueador = self._bloqueadores.get(callback)
+            if bloqueador is None:
+                bloqueador = self._bloqueadores[callback] = Bloqueador(callback)
+            bloqueador.bloqueos += 1
+            bloqueador.total_ms += duracion_ms
+            bloqueador.max_ms = max(bloqueador.max_ms, duracion_ms)
+            bloqueador.ultimo = datetime.now()
+            bloqueador.puntos_calientes.update(self._episodio_calientes)
+            bloqueador.pila_ejemplo = self._episodio_pila
+
+        logger.warning(
+            f"Interfaz bloqueada {duracion_ms:.0f} ms en {callback} "
+            f"(punto caliente: {self._episodio_calientes.most_common(1)[0][0]})"
+        )
+
+        self._episodio_max = 0.0
+        self._episodio_callbacks = Counter()
+        self._episodio_calientes = Counter()
+        self._episodio_pila = []
+
+    # ========================================
+    # INFORMES
+    # ========================================
+
+    def get_top_bloqueadores(self, limite: int = 20) -> List[Dict]:
+        """Callbacks ordenados por tiempo total de bloqueo"""
+        with self._lock:
+            bloqueadores = [b.to_dict() for b in self._bloqueadores.values()]
+        bloqueadores.sort(key=lambda b: b["total_ms"], reverse=True)
+        return bloqueadores[:limite]
+
+    def limpiar(self):
+        with self._lock:
+            self._bloqueadores.clear()
+
+
+_watchdog: Optional[EventLoopWatchdog] = None
+
+
+def get_event_loop_watchdog() -> EventLoopWatchdog:
+    """Instancia única del vigilante"""
+    global _watchdog
+    if _watchdog is None:
+        _watchdog = EventLoopWatchdog()
+    return _watchdog
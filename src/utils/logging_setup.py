@@ -0,0 +1,260 @@
+"""
+Configuración del logging de Hefest.
+
+Todo el formateo y la E/S de los logs ocurre en un hilo escritor
+(``QueueListener``). El hilo que registra, normalmente el hilo GUI, solo
+fusiona el mensaje con sus argumentos y lo encola, sin esperar nunca: si
+la cola se llena, el registro se descarta y se cuenta.
+
+La configuración sale de config/default.json y del fichero del entorno
+(``HEFEST_ENV``: development/production; por defecto production en el
+ejecutable empaquetado y development en el resto), sección ``logging``:
+
+- ``level``: nivel raíz (production: WARNING)
+- ``modules``: niveles por logger, p. ej. ``{"data.db_manager": "INFO"}``
+- ``file`` / ``max_file_size`` / ``backup_count``: fichero rotativo
+- ``json_lines``: el fichero se escribe en JSON por líneas
+- ``console_enabled`` / ``file_enabled``
+
+``HEFEST_LOG_LEVEL`` fuerza el nivel raíz sin tocar la configuración.
+
+Para puntos calientes (métodos llamados muchas veces por segundo) usar
+``log_limitado``, que emite como mucho un mensaje por clave e intervalo y
+resume los suprimidos.
+"""
+
+import atexit
+import json
+import logging
+import os
+import queue
+import re
+import sys
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+RAIZ_PROYECTO = Path(__file__).resolve().parent.parent.parent
+DIRECTORIO_CONFIG = RAIZ_PROYECTO / "config"
+
+FORMATO_DEFECTO = "%(asctime)s | %(levelname)s | %(name)s | %(message)s"
+CAPACIDAD_COLA = 10000
+
+_listener: Optional[QueueListener] = None
+_handler_cola: Optional["HandlerColaNoBloqueante"] = None
+
+
+# ========================================
+# CONFIGURACIÓN
+# ========================================
+
+
+def entorno_actual() -> str:
+    entorno = os.environ.get("HEFEST_ENV")
+    if entorno:
+        return entorno.lower()
+    return "production" if getattr(sys, "frozen", False) else "development"
+
+
+def _leer_json(ruta: Path) -> Dict[str, Any]:
+    try:
+        with open(ruta, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def cargar_config_logging(entorno: Optional[str] = None) -> Dict[str, Any]:
+    """Sección ``logging`` de default.json sobrescrita por la del entorno"""
+    base = _leer_json(DIRECTORIO_CONFIG / "default.json")
+    especifica = _leer_json(DIRECTORIO_CONFIG / f"{entorno or entorno_actual()}.json")
+
+    config: Dict[str, Any] = {"level": base.get("app", {}).get("log_level", "INFO")}
+    for origen in (base.get("logging", {}), especifica.get("logging", {})):
+        for clave, valor in origen.items():
+            if clave == "modules":
+                config.setdefault("modules", {}).update(valor)
+            else:
+                config[clave] = valor
+    # default.json usa file_path; los entornos, file
+    config.setdefault("file", config.get("file_path", "logs/hefest.log"))
+
+    if os.environ.get("HEFEST_LOG_LEVEL"):
+        config["level"] = os.environ["HEFEST_LOG_LEVEL"]
+    return config
+
+
+def _tamano_bytes(valor: Any, defecto: int = 10 * 1024 * 1024) -> int:
+    if isinstance(valor, (int, float)):
+        return int(valor)
+    coincidencia = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([KMG]?)B?\s*", str(valor or ""), re.IGNORECASE)
+    if not coincidencia:
+        return defecto
+    numero, unidad = coincidencia.groups()
+    return int(float(numero) * {"": 1, "K": 1024, "M": 1024**2, "G": 1024**3}[unidad.upper()])
+
+
+def _nivel(valor: Any) -> int:
+    if isinstance(valor, int):
+        return valor
+    nivel = logging.getLevelName(str(valor).upper())
+    return nivel if isinstance(nivel, int) else logging.INFO
+
+
+# ========================================
+# HANDLERS Y FORMATOS
+# ========================================
+
+
+class HandlerColaNoBloqueante(QueueHandler):
+    """QueueHandler que no formatea en el hilo llamante ni espera si la cola está llena"""
+
+    def __init__(self, cola: queue.Queue):
+        super().__init__(cola)
+        self.descartados = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Solo se fija el mensaje (los argumentos podrían mutar después);
+        # el formato completo y las trazas se generan en el hilo escritor
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.descartados += 1
+
+
+class FormateadorJsonLineas(logging.Formatter):
+    """Un objeto JSON por línea, para ingestión por herramientas externas"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        datos = {
+            "ts": self.formatTime(record, "%Y-%m-%dT%H:%M:%S") + f".{int(record.msecs):03d}",
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+            "thread": record.threadName,
+            "where": f"{record.module}:{record.lineno}",
+        }
+        if record.exc_info:
+            datos["exc"] = self.formatException(record.exc_info)
+        return json.dumps(datos, ensure_ascii=False)
+
+
+def configurar_logging(entorno: Optional[str] = None) -> Dict[str, Any]:
+    """Instala el pipeline asíncrono en el logger raíz y devuelve la configuración usada"""
+    global _listener, _handler_cola
+
+    config = cargar_config_logging(entorno)
+    detener_logging()
+
+    destinos = []
+    formato = config.get("format", FORMATO_DEFECTO)
+    if config.get("file_enabled", True):
+        ruta = Path(config["file"])
+        if not ruta.is_absolute():
+            ruta = RAIZ_PROYECTO / ruta
+        ruta.parent.mkdir(parents=True, exist_ok=True)
+        archivo = RotatingFileHandler(
+            ruta,
+            maxBytes=_tamano_bytes(config.get("max_file_size")),
+            backupCount=int(config.get("backup_count", 5)),
+            encoding="utf-8",
+        )
+        archivo.setFormatter(
+            FormateadorJsonLineas() if config.get("json_lines") else logging.Formatter(formato)
+        )
+        destinos.append(archivo)
+    if config.get("console_enabled", True):
+        consola = logging.StreamHandler()
+        consola.setFormatter(logging.Formatter(formato))
+        destinos.append(consola)
+
+    _handler_cola = HandlerColaNoBloqueante(queue.Queue(CAPACIDAD_COLA))
+    _listener = QueueListener(_handler_cola.queue, *destinos, respect_handler_level=True)
+    _listener.start()
+
+    raiz = logging.getLogger()
+    for handler in list(raiz.handlers):
+        raiz.removeHandler(handler)
+    raiz.addHandler(_handler_cola)
+    raiz.setLevel(_nivel(config.get("level", "INFO")))
+    for nombre, nivel in config.get("modules", {}).items():
+        logging.getLogger(nombre).setLevel(_nivel(nivel))
+
+    logging.captureWarnings(True)
+    return config
+
+
+def detener_logging():
+    """Vacía la cola y detiene el hilo escritor (se llama también al salir)"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+
+def registros_descartados() -> int:
+    return _handler_cola.descartados if _handler_cola else 0
+
+
+atexit.register(detener_logging)
+
+
+# ========================================
+# LOGGING LIMITADO PARA PUNTOS CALIENTES
+# ========================================
+
+
+class _EstadoClave:
+    __slots__ = ("ultimo", "suprimidos")
+
+    def __init__(self):
+        self.ultimo = 0.0
+        self.suprimidos = 0
+
+
+_claves: Dict[str, _EstadoClave] = {}
+_lock_claves = threading.Lock()
+
+
+def log_limitado(
+    logger: logging.Logger,
+    nivel: int,
+    clave: str,
+    mensaje: str,
+    *args,
+    intervalo_s: float = 10.0,
+    **kwargs,
+) -> bool:
+    """Registra como mucho un mensaje por ``clave`` cada ``intervalo_s`` segundos
+
+    Si el nivel no está habilitado no cuesta más que una comprobación. Los
+    mensajes suprimidos se resumen en el siguiente que se emita. Devuelve
+    True si el mensaje se ha registrado.
+    """
+    if not logger.isEnabledFor(nivel):
+        return False
+    ahora = time.monotonic()
+    with _lock_claves:
+        estado = _claves.get(clave)
+        if estado is None:
+            estado = _claves[clave] = _EstadoClave()
+        if ahora - estado.ultimo < intervalo_s:
+            estado.suprimidos += 1
+            return False
+        suprimidos = estado.suprimidos
+        estado.ultimo = ahora
+        estado.suprimidos = 0
+    if suprimidos:
+        mensaje = f"{mensaje} ({suprimidos} similares suprimidos)"
+    # stacklevel=2: el registro apunta a quien llama, no a esta función
+    logger.log(nivel, mensaje, *args, stacklevel=2, **kwargs)
+    return True
@@ -0,0 +1,431 @@
+"""
+Endpoint local de métricas en formato Prometheus para Hefest
+==========================================================
+
+Servidor HTTP mínimo (solo localhost) que expone en ``/metrics`` contadores,
+gauges e histogramas en el formato de texto de Prometheus, para que un
+scraper del local pueda vigilar cada terminal con un simple GET:
+
+    curl http://127.0.0.1:9464/metrics
+
+El servidor corre en un hilo propio. Los valores que requieren cálculo
+(tamaño de la base de datos, comandas abiertas, latencias SQL) se obtienen
+en el momento del scrape desde ese hilo, por lo que no cuestan nada al hilo
+de la interfaz. Lo único que se ejecuta en el hilo GUI es el latido del
+vigilante del bucle de eventos (utils/event_loop_watchdog.py), que alimenta
+el histograma de latencia, y el contador de emisiones de los event bus.
+
+Se activa con la variable de entorno ``HEFEST_METRICS_PORT``.
+"""
+
+import logging
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+PUERTO_DEFECTO = 9464
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Cubetas (segundos) para latencias de la interfaz
+CUBETAS_LAG_SEGUNDOS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+# (nombre, tipo, ayuda, [(sufijo, etiquetas, valor)])
+FamiliaMetricas = Tuple[str, str, str, List[Tuple[str, Dict[str, str], float]]]
+Recolector = Callable[[], Iterable[FamiliaMetricas]]
+
+
+def _formatear_valor(valor: float) -> str:
+    if valor == float("inf"):
+        return "+Inf"
+    if isinstance(valor, int) or float(valor).is_integer():
+        return str(int(valor))
+    return repr(float(valor))
+
+
+def _formatear_etiquetas(etiquetas: Dict[str, str]) -> str:
+    if not etiquetas:
+        return ""
+    partes = []
+    for clave, valor in etiquetas.items():
+        valor = str(valor).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        partes.append(f'{clave}="{valor}"')
+    return "{" + ",".join(partes) + "}"
+
+
+# ========================================
+# TIPOS DE MÉTRICA
+# ========================================
+
+
+class _Metrica:
+    tipo = "untyped"
+
+    def __init__(self, nombre: str, ayuda: str, etiquetas: Sequence[str] = ()):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.etiquetas = tuple(etiquetas)
+        self._lock = threading.Lock()
+
+    def _clave(self, etiquetas: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(etiquetas.get(e, "")) for e in self.etiquetas)
+
+    def familia(self) -> FamiliaMetricas:
+        raise NotImplementedError
+
+
+class Counter(_Metrica):
+    """Contador monótono"""
+
+    tipo = "counter"
+
+    def __init__(self, nombre: str, ayuda: str, etiquetas: Sequence[str] = ()):
+        super().__init__(nombre, ayuda, etiquetas)
+        self._valores: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, cantidad: float = 1.0, **etiquetas):
+        clave = self._clave(etiquetas)
+        with self._lock:
+            self._valores[clave] = self._valores.get(clave, 0.0) + cantidad
+
+    def familia(self) -> FamiliaMetricas:
+        with self._lock:
+            valores = list(self._valores.items())
+        return (
+            self.nombre,
+            self.tipo,
+            self.ayuda,
+            [("_total", dict(zip(self.etiquetas, clave)), valor) for clave, valor in valores],
+        )
+
+
+class Gauge(_Metrica):
+    """Valor instantáneo"""
+
+    tipo = "gauge"
+
+    def __init__(self, nombre: str, ayuda: str, etiquetas: Sequence[str] = ()):
+        super().__init__(nombre, ayuda, etiquetas)
+        self._valores: Dict[Tuple[str, ...], float] = {}
+
+    def set(self, valor: float, **etiquetas):
+        with self._lock:
+            self._valores[self._clave(etiquetas)] = valor
+
+    def familia(self) -> FamiliaMetricas:
+        with self._lock:
+            valores = list(self._valores.items())
+        return (
+            self.nombre,
+            self.tipo,
+            self.ayuda,
+            [("", dict(zip(self.etiquetas, clave)), valor) for clave, valor in valores],
+        )
+
+
+class Histogram(_Metrica):
+    """Histograma con cubetas fijas"""
+
+    tipo = "histogram"
+
+    def __init__(
+        self,
+        nombre: str,
+        ayuda: str,
+        cubetas: Sequence[float],
+        etiquetas: Sequence[str] = (),
+    ):
+        super().__init__(nombre, ayuda, etiquetas)
+        self.cubetas = tuple(sorted(cubetas))
+        # clave -> [cuentas por cubeta (+Inf al final), suma]
+        self._series: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, valor: float, **etiquetas):
+        clave = self._clave(etiquetas)
+        with self._lock:
+            serie = self._series.get(clave)
+            if serie is None:
+                serie = self._series[clave] = [[0] * (len(self.cubetas) + 1), 0.0]
+            indice = len(self.cubetas)
+            for i, limite in enumerate(self.cubetas):
+                if valor <= limite:
+                    indice = i
+                    break
+            serie[0][indice] += 1
+            serie[1] += valor
+
+    def familia(self) -> FamiliaMetricas:
+        with self._lock:
+            series = [(clave, list(cuentas), suma) for clave, (cuentas, suma) in self._series.items()]
+        muestras = []
+        for clave, cuentas, suma in series:
+            etiquetas = dict(zip(self.etiquetas, clave))
+            muestras.extend(muestras_histograma(self.cubetas, cuentas, suma, etiquetas))
+        return self.nombre, self.tipo, self.ayuda, muestras
+
+
+def muestras_histograma(
+    cubetas: Sequence[float],
+    cuentas: Sequence[int],
+    suma: float,
+    etiquetas: Dict[str, str],
+) -> List[Tuple[str, Dict[str, str], float]]:
+    """Muestras _bucket/_sum/_count a partir de cuentas no acumuladas"""
+    muestras = []
+    acumulado = 0
+    for limite, cuenta in zip(list(cubetas) + [float("inf")], cuentas):
+        acumulado += cuenta
+        muestras.append(("_bucket", {**etiquetas, "le": _formatear_valor(limite)}, acumulado))
+    muestras.append(("_sum", etiquetas, suma))
+    muestras.append(("_count", etiquetas, acumulado))
+    return muestras
+
+
+# ========================================
+# REGISTRO
+# ========================================
+
+
+class MetricsRegistry:
+    """Conjunto de métricas y recolectores que se exponen en /metrics"""
+
+    def __init__(self):
+        self._metricas: Dict[str, _Metrica] = {}
+        self._recolectores: List[Recolector] = []
+        self._lock = threading.Lock()
+
+    def _registrar(self, metrica: _Metrica) -> _Metrica:
+        with self._lock:
+            existente = self._metricas.get(metrica.nombre)
+            if existente is not None:
+                return existente
+            self._metricas[metrica.nombre] = metrica
+            return metrica
+
+    def counter(self, nombre: str, ayuda: str, etiquetas: Sequence[str] = ()) -> Counter:
+        return self._registrar(Counter(nombre, ayuda, etiquetas))
+
+    def gauge(self, nombre: str, ayuda: str, etiquetas: Sequence[str] = ()) -> Gauge:
+        return self._registrar(Gauge(nombre, ayuda, etiquetas))
+
+    def histogram(
+        self, nombre: str, ayuda: str, cubetas: Sequence[float], etiquetas: Sequence[str] = ()
+    ) -> Histogram:
+        return self._registrar(Histogram(nombre, ayuda, cubetas, etiquetas))
+
+    def register_collector(self, recolector: Recolector):
+        """Función que se evalúa en cada scrape y devuelve familias de métricas"""
+        with self._lock:
+            self._recolectores.append(recolector)
+
+    def render(self) -> str:
+        """Texto en formato de exposición de Prometheus"""
+        with self._lock:
+            familias = [m.familia() for m in self._metricas.values()]
+            recolectores = list(self._recolectores)
+
+        for recolector in recolectores:
+            try:
+                familias.extend(recolector())
+            except Exception as e:
+                logger.warning(f"Error en recolector de métricas {recolector!r}: {e}")
+
+        lineas = []
+        for nombre, tipo, ayuda, muestras in familias:
+            lineas.append(f"# HELP {nombre} {ayuda}")
+            lineas.append(f"# TYPE {nombre} {tipo}")
+            for sufijo, etiquetas, valor in muestras:
+                lineas.append(
+                    f"{nombre}{sufijo}{_formatear_etiquetas(etiquetas)} {_formatear_valor(valor)}"
+                )
+        return "\n".join(lineas) + "\n"
+
+
+_registry: Optional[MetricsRegistry] = None
+
+
+def get_metrics_registry() -> MetricsRegistry:
+    """Registro global de métricas"""
+    global _registry
+    if _registry is None:
+        _registry = MetricsRegistry()
+    return _registry
+
+
+# ========================================
+# RECOLECTORES DE HEFEST
+# ========================================
+
+
+def query_latency_collector() -> Iterable[FamiliaMetricas]:
+    """Latencias SQL del perfilador de DatabaseManager, por tipo de sentencia"""
+    from data.query_profiler import CUBETAS_MS, get_query_profiler
+
+    cubetas = [c / 1000.0 for c in CUBETAS_MS]
+    muestras = []
+    for operacion, (cuentas, _, total_ms) in sorted(
+        get_query_profiler().get_histogramas_por_operacion().items()
+    ):
+        muestras.extend(
+            muestras_histograma(cubetas, cuentas, total_ms / 1000.0, {"operacion": operacion})
+        )
+    yield (
+        "hefest_db_query_duration_seconds",
+        "histogram",
+        "Latencia de las consultas de DatabaseManager",
+        muestras,
+    )
+
+
+def database_collector(db_path: str) -> Recolector:
+    """Tamaño de la base de datos y comandas abiertas"""
+
+    def recolectar() -> Iterable[FamiliaMetricas]:
+        tamano = 0
+        for sufijo in ("", "-wal"):
+            ruta = db_path + sufijo
+            if os.path.exists(ruta):
+                tamano += os.path.getsize(ruta)
+        yield ("hefest_database_size_bytes", "gauge", "Tamaño de la base de datos (incluido el WAL)", [("", {}, tamano)])
+
+        import sqlite3
+
+        # Conexión propia de solo lectura: el scrape no debe contar como consulta de la app
+        conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True, timeout=1.0)
+        try:
+            abiertas = conn.execute(
+                "SELECT COUNT(*) FROM comandas WHERE estado IN ('abierta', 'en_proceso')"
+            ).fetchone()[0]
+        finally:
+            conn.close()
+        yield ("hefest_comandas_abiertas", "gauge", "Comandas abiertas o en proceso", [("", {}, abiertas)])
+
+    return recolectar
+
+
+def instrument_event_bus(nombre: str, bus) -> None:
+    """
+    Expone la difusión (fan-out) de cada señal de un event bus.
+
+    Cuenta las emisiones con un slot ligero y publica el número de receptores
+    conectados a cada señal (sin contar el propio contador).
+    """
+    from PyQt6.QtCore import QObject, pyqtBoundSignal
+
+    registry = get_metrics_registry()
+    emisiones = registry.counter(
+        "hefest_event_bus_emissions", "Emisiones de señales de los event bus", ("bus", "senal")
+    )
+
+    senales = {}
+    propias = set(dir(type(bus))) - set(dir(QObject))  # sin destroyed, objectNameChanged...
+    for atributo in sorted(propias):
+        senal = getattr(bus, atributo, None)
+        if isinstance(senal, pyqtBoundSignal):
+            senal.connect(lambda *args, s=atributo: emisiones.inc(bus=nombre, senal=s))
+            senales[atributo] = senal
+
+    def recolectar() -> Iterable[FamiliaMetricas]:
+        muestras = []
+        for atributo, senal in senales.items():
+            receptores = bus.receivers(senal) - 1
+            muestras.append(("", {"bus": nombre, "senal": atributo}, receptores))
+        yield (
+            "hefest_event_bus_receivers",
+            "gauge",
+            "Receptores conectados a cada señal (difusión por emisión)",
+            muestras,
+        )
+
+    registry.register_collector(recolectar)
+
+
+# ========================================
+# SERVIDOR HTTP
+# ========================================
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    registry: MetricsRegistry = None  # asignado por MetricsEndpoint
+
+    def do_GET(self):
+        if self.path.split("?", 1)[0] not in ("/metrics", "/"):
+            self.send_error(404)
+            return
+        cuerpo = self.registry.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(cuerpo)))
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+    def log_message(self, format, *args):
+        logger.debug("metrics %s - %s", self.address_string(), format % args)
+
+
+class MetricsEndpoint:
+    """Servidor /metrics en un hilo de fondo"""
+
+    def __init__(
+        self,
+        port: int = PUERTO_DEFECTO,
+        host: str = "127.0.0.1",
+        registry: Optional[MetricsRegistry] = None,
+    ):
+        if host not in ("127.0.0.1", "localhost", "::1"):
+            raise ValueError("El endpoint de métricas solo puede escuchar en localhost")
+        self.host = host
+        self.port = port
+        self.registry = registry or get_metrics_registry()
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        if self._server is not None:
+            return
+        handler = type("MetricsHandler", (_MetricsHandler,), {"registry": self.registry})
+        self._server = ThreadingHTTPServer((self.host, self.port), handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name="hefest-metrics", daemon=True
+        )
+        self._thread.start()
+        logger.info(f"Endpoint de métricas en http://{self.host}:{self.port}/metrics")
+
+    def stop(self):
+        if self._server is None:
+            return
+        self._server.shutdown()
+        self._server.server_close()
+        self._server = None
+        self._thread = None
+        logger.info("Endpoint de métricas detenido")
+
+
+def start_metrics_endpoint_from_env(db_path: str) -> Optional[MetricsEndpoint]:
+    """
+    Arranca el endpoint si ``HEFEST_METRICS_PORT`` está definida.
+
+    Activa también el perfilador SQL, del que salen las latencias de consulta.
+    """
+    puerto = os.environ.get("HEFEST_METRICS_PORT")
+    if not puerto:
+        return None
+
+    try:
+        from data.query_profiler import get_query_profiler
+
+        get_query_profiler().activar()
+        registry = get_metrics_registry()
+        registry.register_collector(query_latency_collector)
+        registry.register_collector(database_collector(db_path))
+
+        endpoint = MetricsEndpoint(int(puerto))
+        endpoint.start()
+        return endpoint
+    except Exception as e:
+        logger.error(f"No se pudo iniciar el endpoint de métricas: {e}")
+        return None
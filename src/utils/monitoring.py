@@ -17,12 +17,14 @@ try:
 except ImportError:
     HAS_PSUTIL = False
 
+import os
 import time
 import json
 import logging
+from collections import deque
 from pathlib import Path
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional
+from typing import Deque, Dict, List, Any, Optional
 import threading
 from dataclasses import dataclass
 import sqlite3
@@ -49,19 +51,48 @@ class Metric:
 
 
 class MetricsCollector:
-    """Recolector de métricas del sistema."""
+    """Recolector de métricas del sistema.
 
-    def __init__(self, db_path: str = "data/metrics.db"):
+    Las métricas se acumulan en un buffer circular acotado (protegido por un
+    lock, ya que se añaden desde varios hilos) y se vuelcan a SQLite en una
+    única transacción. Un trabajo de retención resume los puntos crudos en
+    agregados de 1 minuto y 1 hora y elimina los datos antiguos.
+    """
+
+    # Resoluciones de los agregados (segundos) y longitud del prefijo ISO del bucket
+    ROLLUP_RESOLUTIONS = {60: 16, 3600: 13}
+
+    def __init__(
+        self,
+        db_path: str = "data/metrics.db",
+        buffer_size: int = 10000,
+        raw_retention_days: int = 7,
+        minute_retention_days: int = 90,
+        hour_retention_days: int = 730,
+    ):
         self.db_path = Path(db_path)
         self.db_path.parent.mkdir(exist_ok=True)
-        self.metrics_buffer = []
+        self.metrics_buffer: Deque[Metric] = deque(maxlen=buffer_size)
+        self.dropped_metrics = 0
+        self._buffer_lock = threading.Lock()
         self.collection_interval = 30  # segundos
+        self.retention_interval = 600  # segundos
+        self.raw_retention_days = raw_retention_days
+        self.minute_retention_days = minute_retention_days
+        self.hour_retention_days = hour_retention_days
         self.is_running = False
         self.collection_thread = None
+        self._stop_event = threading.Event()
+        self._last_retention = 0.0
+        self._last_cpu_sample: Optional[tuple] = None
 
         # Inicializar base de datos
         self._init_database()
 
+        # La primera lectura de cpu_percent(interval=None) solo fija la referencia
+        if HAS_PSUTIL:
+            psutil.cpu_percent(interval=None)
+
     def _init_database(self):
         """Inicializa la base de datos de métricas."""
         with sqlite3.connect(self.db_path) as conn:
@@ -85,12 +116,38 @@ class MetricsCollector:
             """
             )
 
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS metrics_rollup (
+                    name TEXT NOT NULL,
+                    resolution INTEGER NOT NULL,
+                    bucket TEXT NOT NULL,
+                    count INTEGER NOT NULL,
+                    sum REAL NOT NULL,
+                    min REAL NOT NULL,
+                    max REAL NOT NULL,
+                    PRIMARY KEY (name, resolution, bucket)
+                ) WITHOUT ROWID
+            """
+            )
+
+            # Último id de metrics ya incorporado a los agregados
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS metrics_meta (
+                    key TEXT PRIMARY KEY,
+                    value INTEGER NOT NULL
+                )
+            """
+            )
+
     def start_collection(self):
         """Inicia la recolección automática de métricas."""
         if self.is_running:
             return
 
         self.is_running = True
+        self._stop_event.clear()
         self.collection_thread = threading.Thread(
             target=self._collection_loop, daemon=True
         )
@@ -100,8 +157,10 @@ class MetricsCollector:
     def stop_collection(self):
         """Detiene la recolección de métricas."""
         self.is_running = False
+        self._stop_event.set()
         if self.collection_thread:
             self.collection_thread.join()
+        self._flush_metrics()
         logger.info("Recolección de métricas detenida")
 
     def _collection_loop(self):
@@ -111,36 +170,58 @@ class MetricsCollector:
                 self._collect_system_metrics()
                 self._collect_application_metrics()
                 self._flush_metrics()
-                time.sleep(self.collection_interval)
+                if time.monotonic() - self._last_retention >= self.retention_interval:
+                    self.run_retention()
+                self._stop_event.wait(self.collection_interval)
             except Exception as e:
                 logger.error(f"Error en recolección de métricas: {e}")
-                time.sleep(5)
+                self._stop_event.wait(5)
 
     def _collect_system_metrics(self):
         """Recolecta métricas del sistema."""
         now = datetime.now()
 
-        # CPU
-        cpu_percent = psutil.cpu_percent(interval=1)
-        self.add_metric("system.cpu.usage", cpu_percent, now)
+        # CPU (sin bloquear: porcentaje desde la lectura anterior)
+        cpu_percent = self._sample_cpu_percent()
+        if cpu_percent is not None:
+            self.add_metric("system.cpu.usage", cpu_percent, now)
+
+        if not HAS_PSUTIL:
+            return
 
         # Memoria
-        if HAS_PSUTIL:
-            memory = psutil.virtual_memory()
-            self.add_metric("system.memory.usage_percent", memory.percent, now)
-            self.add_metric("system.memory.available_gb", memory.available / 1024**3, now)
+        memory = psutil.virtual_memory()
+        self.add_metric("system.memory.usage_percent", memory.percent, now)
+        self.add_metric("system.memory.available_gb", memory.available / 1024**3, now)
 
         # Disco
-        if HAS_PSUTIL:
-            disk = psutil.disk_usage("/")
-            self.add_metric("system.disk.usage_percent", disk.percent, now)
-            self.add_metric("system.disk.free_gb", disk.free / 1024**3, now)
+        disk = psutil.disk_usage("/")
+        self.add_metric("system.disk.usage_percent", disk.percent, now)
+        self.add_metric("system.disk.free_gb", disk.free / 1024**3, now)
 
         # Red
+        net_io = psutil.net_io_counters()
+        self.add_metric("system.network.bytes_sent", net_io.bytes_sent, now)
+        self.add_metric("system.network.bytes_recv", net_io.bytes_recv, now)
+
+    def _sample_cpu_percent(self) -> Optional[float]:
+        """Uso de CPU desde la muestra anterior, sin esperar.
+
+        Sin psutil se usa el tiempo de CPU del propio proceso (no el del
+        sistema), normalizado por el número de núcleos.
+        """
         if HAS_PSUTIL:
-            net_io = psutil.net_io_counters()
-            self.add_metric("system.network.bytes_sent", net_io.bytes_sent, now)
-            self.add_metric("system.network.bytes_recv", net_io.bytes_recv, now)
+            return psutil.cpu_percent(interval=None)
+
+        sample = (time.monotonic(), time.process_time())
+        previous, self._last_cpu_sample = self._last_cpu_sample, sample
+        if previous is None:
+            return None
+        wall = sample[0] - previous[0]
+        if wall <= 0:
+            return None
+        cpus = os.cpu_count() or 1
+        return min(100.0, (sample[1] - previous[1]) / wall / cpus * 100.0)
 
     def _collect_application_metrics(self):
         """Recolecta métricas específicas de la aplicación."""
@@ -163,6 +244,9 @@ class MetricsCollector:
                 total_log_size = sum(f.stat().st_size for f in log_files)
                 self.add_metric("app.logs.total_size_mb", total_log_size / 1024**2, now)
 
+            # Buffer de métricas
+            self.add_metric("app.metrics.dropped", self.dropped_metrics, now)
+
         except Exception as e:
             logger.warning(f"Error recolectando métricas de aplicación: {e}")
 
@@ -173,39 +257,126 @@ class MetricsCollector:
         timestamp: Optional[datetime] = None,
         tags: Optional[Dict[str, str]] = None,
     ):
-        """Añade una métrica al buffer."""
+        """Añade una métrica al buffer (descarta la más antigua si está lleno)."""
         if timestamp is None:
             timestamp = datetime.now()
 
         metric = Metric(name, value, timestamp, tags)
-        self.metrics_buffer.append(metric)
+        with self._buffer_lock:
+            if len(self.metrics_buffer) == self.metrics_buffer.maxlen:
+                self.dropped_metrics += 1
+            self.metrics_buffer.append(metric)
 
     def _flush_metrics(self):
         """Guarda métricas del buffer a la base de datos."""
-        if not self.metrics_buffer:
-            return
+        with self._buffer_lock:
+            if not self.metrics_buffer:
+                return
+            pending = list(self.metrics_buffer)
+            self.metrics_buffer.clear()
+
+        rows = [
+            (
+                metric.name,
+                metric.value,
+                metric.timestamp.isoformat(),
+                json.dumps(metric.tags) if metric.tags else None,
+            )
+            for metric in pending
+        ]
 
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                for metric in self.metrics_buffer:
-                    conn.execute(
+            conn = sqlite3.connect(self.db_path)
+            try:
+                with conn:  # una sola transacción
+                    conn.executemany(
                         """
                         INSERT INTO metrics (name, value, timestamp, tags)
                         VALUES (?, ?, ?, ?)
                     """,
-                        (
-                            metric.name,
-                            metric.value,
-                            metric.timestamp.isoformat(),
-                            json.dumps(metric.tags) if metric.tags else None,
-                        ),
+                        rows,
                     )
+            finally:
+                conn.close()
 
-            logger.debug(f"Guardadas {len(self.metrics_buffer)} métricas")
-            self.metrics_buffer.clear()
+            logger.debug(f"Guardadas {len(rows)} métricas")
 
         except Exception as e:
             logger.error(f"Error guardando métricas: {e}")
+            # Devolver al buffer lo que quepa, por delante de las nuevas
+            with self._buffer_lock:
+                space = self.metrics_buffer.maxlen - len(self.metrics_buffer)
+                if space > 0:
+                    self.metrics_buffer.extendleft(reversed(pending[-space:]))
+                self.dropped_metrics += max(0, len(pending) - space)
+
+    def run_retention(self):
+        """Resume los puntos crudos en agregados y elimina los datos antiguos.
+
+        Los agregados se construyen por rango de id (no de fecha), por lo que
+        cada punto se incorpora exactamente una vez aunque llegue con retraso.
+        """
+        self._last_retention = time.monotonic()
+        now = datetime.now()
+
+        try:
+            conn = sqlite3.connect(self.db_path)
+            try:
+                with conn:
+                    last_id = self._get_rollup_watermark(conn)
+                    max_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM metrics").fetchone()[0]
+
+                    if max_id > last_id:
+                        for resolution, prefix in self.ROLLUP_RESOLUTIONS.items():
+                            conn.execute(
+                                f"""
+                                INSERT INTO metrics_rollup
+                                    (name, resolution, bucket, count, sum, min, max)
+                                SELECT name, ?, substr(timestamp, 1, {prefix}),
+                                       COUNT(*), SUM(value), MIN(value), MAX(value)
+                                FROM metrics
+                                WHERE id > ? AND id <= ?
+                                GROUP BY name, substr(timestamp, 1, {prefix})
+                                ON CONFLICT (name, resolution, bucket) DO UPDATE SET
+                                    count = count + excluded.count,
+                                    sum = sum + excluded.sum,
+                                    min = MIN(min, excluded.min),
+                                    max = MAX(max, excluded.max)
+                            """,
+                                (resolution, last_id, max_id),
+                            )
+                        conn.execute(
+                            "INSERT OR REPLACE INTO metrics_meta (key, value) VALUES ('rollup_last_id', ?)",
+                            (max_id,),
+                        )
+
+                    # Solo se borran puntos crudos ya resumidos
+                    raw_cutoff = (now - timedelta(days=self.raw_retention_days)).isoformat()
+                    deleted = conn.execute(
+                        "DELETE FROM metrics WHERE timestamp < ? AND id <= ?",
+                        (raw_cutoff, max_id),
+                    ).rowcount
+                    for resolution, days in ((60, self.minute_retention_days), (3600, self.hour_retention_days)):
+                        conn.execute(
+                            "DELETE FROM metrics_rollup WHERE resolution = ? AND bucket < ?",
+                            (resolution, (now - timedelta(days=days)).isoformat()),
+                        )
+            finally:
+                conn.close()
+
+            logger.debug(
+                f"Retención de métricas: agregados hasta id {max_id}, {deleted} puntos crudos eliminados"
+            )
+
+        except Exception as e:
+            logger.error(f"Error en la retención de métricas: {e}")
+
+    @staticmethod
+    def _get_rollup_watermark(conn) -> int:
+        row = conn.execute(
+            "SELECT value FROM metrics_meta WHERE key = 'rollup_last_id'"
+        ).fetchone()
+        return row[0] if row else 0
 
     def get_metrics(self, name: Optional[str] = None, hours: int = 24) -> List[Dict[str, Any]]:
         """Obtiene métricas de la base de datos."""
@@ -236,24 +407,49 @@ class MetricsCollector:
             return [dict(row) for row in cursor.fetchall()]
 
     def get_aggregated_metrics(self, name: str, hours: int = 24) -> Dict[str, float]:
-        """Obtiene métricas agregadas."""
+        """Obtiene métricas agregadas.
+
+        Ventanas cortas se calculan sobre los puntos crudos. Las largas usan
+        los agregados (1 minuto hasta su retención, 1 hora después) más los
+        puntos crudos aún no resumidos; el inicio de la ventana se redondea al
+        bucket correspondiente.
+        """
         since = datetime.now() - timedelta(hours=hours)
 
         with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.execute(
-                """
-                SELECT
-                    AVG(value) as avg_value,
-                    MIN(value) as min_value,
-                    MAX(value) as max_value,
-                    COUNT(*) as count
-                FROM metrics
-                WHERE name = ? AND timestamp >= ?
-            """,
-                (name, since.isoformat()),
-            )
+            if hours <= 6:
+                row = conn.execute(
+                    """
+                    SELECT
+                        AVG(value) as avg_value,
+                        MIN(value) as min_value,
+                        MAX(value) as max_value,
+                        COUNT(*) as count
+                    FROM metrics
+                    WHERE name = ? AND timestamp >= ?
+                """,
+                    (name, since.isoformat()),
+                ).fetchone()
+            else:
+                resolution = 60 if hours <= self.minute_retention_days * 24 else 3600
+                bucket = since.isoformat()[: self.ROLLUP_RESOLUTIONS[resolution]]
+                last_id = self._get_rollup_watermark(conn)
+                row = conn.execute(
+                    """
+                    SELECT SUM(s) / SUM(c), MIN(mn), MAX(mx), SUM(c)
+                    FROM (
+                        SELECT SUM(sum) AS s, MIN(min) AS mn, MAX(max) AS mx, SUM(count) AS c
+                        FROM metrics_rollup
+                        WHERE name = ? AND resolution = ? AND bucket >= ?
+                        UNION ALL
+                        SELECT SUM(value), MIN(value), MAX(value), COUNT(*)
+                        FROM metrics
+                        WHERE name = ? AND timestamp >= ? AND id > ?
+                    )
+                """,
+                    (name, resolution, bucket, name, bucket, last_id),
+                ).fetchone()
 
-            row = cursor.fetchone()
             return {
                 "average": row[0] or 0,
                 "minimum": row[1] or 0,
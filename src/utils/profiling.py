@@ -0,0 +1,213 @@
+"""
+Perfilado bajo demanda con cProfile.
+
+Dos formas de uso:
+
+- Sesión: ``get_sesion_perfilado().iniciar()`` / ``.detener()`` alrededor de
+  un rato de uso real de la aplicación.
+- Llamada única: ``perfilar_llamada(func, *args, etiqueta=...)`` perfila
+  exactamente una llamada (p. ej. ``MainWindow.create_module_widget``).
+
+Cada captura genera en logs/:
+
+- ``perfil_<etiqueta>_<fecha>.pstats``: abrir con ``python -m pstats`` o
+  snakeviz
+- ``perfil_<etiqueta>_<fecha>.collapsed``: pilas colapsadas
+  (``a;b;c <µs>``) para flamegraph.pl o https://www.speedscope.app
+
+cProfile no guarda pilas completas, solo aristas llamador→llamado; las pilas
+colapsadas se reconstruyen repartiendo el tiempo acumulado de cada función
+entre sus llamadores en proporción a lo que cada uno aportó (el mismo
+criterio que gprof2dot o flameprof).
+"""
+
+import cProfile
+import logging
+import os
+import pstats
+import re
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DIRECTORIO_LOGS = Path(__file__).resolve().parent.parent.parent / "logs"
+_RAIZ_PROYECTO = str(DIRECTORIO_LOGS.parent) + os.sep
+
+MAX_PROFUNDIDAD_PILA = 80
+LIMITE_TOP = 40
+
+
+@dataclass
+class InformePerfil:
+    """Resultado de una captura de perfilado"""
+
+    etiqueta: str
+    duracion_s: float
+    ruta_pstats: Path
+    ruta_colapsado: Path
+    funciones: List[Dict[str, Any]] = field(default_factory=list)
+
+
+def _nombre_funcion(clave: Tuple[str, int, str]) -> str:
+    archivo, linea, nombre = clave
+    if archivo == "~":
+        # Funciones C: "<built-in method time.sleep>"
+        return nombre.strip("<>")
+    if archivo.startswith(_RAIZ_PROYECTO):
+        archivo = archivo[len(_RAIZ_PROYECTO):]
+    else:
+        archivo = os.path.basename(archivo)
+    return f"{nombre} ({archivo}:{linea})"
+
+
+def _top_funciones(estadisticas: pstats.Stats, limite: int) -> List[Dict[str, Any]]:
+    """Funciones ordenadas por tiempo acumulado"""
+    filas = []
+    for clave, (_, llamadas, propio, acumulado, _) in estadisticas.stats.items():
+        filas.append(
+            {
+                "funcion": _nombre_funcion(clave),
+                "llamadas": llamadas,
+                "propio_ms": round(propio * 1000.0, 2),
+                "acumulado_ms": round(acumulado * 1000.0, 2),
+                "por_llamada_ms": round(acumulado * 1000.0 / llamadas, 3) if llamadas else 0.0,
+            }
+        )
+    filas.sort(key=lambda f: f["acumulado_ms"], reverse=True)
+    return filas[:limite]
+
+
+def pilas_colapsadas(estadisticas: pstats.Stats) -> Dict[str, float]:
+    """Reconstruye pilas colapsadas (pila -> segundos propios) desde el grafo de cProfile"""
+    datos = estadisticas.stats
+    hijos: Dict[Tuple, List[Tuple[Tuple, float]]] = {}
+    for llamado, (_, _, _, _, llamadores) in datos.items():
+        for llamador, (_, _, _, acumulado_arista) in llamadores.items():
+            if llamador in datos:
+                hijos.setdefault(llamador, []).append((llamado, acumulado_arista))
+
+    raices = [
+        clave
+        for clave, (_, _, _, _, llamadores) in datos.items()
+        if not any(llamador in datos for llamador in llamadores)
+    ]
+
+    resultado: Dict[str, float] = {}
+    # Pila explícita: (función, tiempo asignado a este camino, camino, conjunto del camino)
+    pendientes = [(raiz, datos[raiz][3], (), frozenset()) for raiz in raices]
+    while pendientes:
+        clave, tiempo, camino, en_camino = pendientes.pop()
+        acumulado = datos[clave][3]
+        if tiempo <= 0 or acumulado <= 0:
+            continue
+        fraccion = min(1.0, tiempo / acumulado)
+        camino = camino + (_nombre_funcion(clave),)
+        en_camino = en_camino | {clave}
+
+        propio = datos[clave][2] * fraccion
+        if propio > 0:
+            pila = ";".join(camino)
+            resultado[pila] = resultado.get(pila, 0.0) + propio
+
+        if len(camino) >= MAX_PROFUNDIDAD_PILA:
+            continue
+        for hijo, acumulado_arista in hijos.get(clave, ()):
+            # Las recursiones ya están contadas en el tiempo acumulado del primer nivel
+            if hijo not in en_camino:
+                pendientes.append((hijo, acumulado_arista * fraccion, camino, en_camino))
+    return resultado
+
+
+def _guardar(perfil: cProfile.Profile, etiqueta: str, duracion: float) -> InformePerfil:
+    estadisticas = pstats.Stats(perfil)
+    DIRECTORIO_LOGS.mkdir(parents=True, exist_ok=True)
+    base = f"perfil_{re.sub(r'[^A-Za-z0-9_-]+', '_', etiqueta)}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    ruta_pstats = DIRECTORIO_LOGS / f"{base}.pstats"
+    ruta_colapsado = DIRECTORIO_LOGS / f"{base}.collapsed"
+
+    estadisticas.dump_stats(str(ruta_pstats))
+    with open(ruta_colapsado, "w", encoding="utf-8") as f:
+        for pila, segundos in sorted(pilas_colapsadas(estadisticas).items()):
+            microsegundos = int(segundos * 1_000_000)
+            if microsegundos > 0:
+                f.write(f"{pila} {microsegundos}\n")
+
+    informe = InformePerfil(
+        etiqueta=etiqueta,
+        duracion_s=duracion,
+        ruta_pstats=ruta_pstats,
+        ruta_colapsado=ruta_colapsado,
+        funciones=_top_funciones(estadisticas, LIMITE_TOP),
+    )
+    logger.info(f"Perfil '{etiqueta}' ({duracion:.2f} s) guardado en {ruta_pstats}")
+    return informe
+
+
+# ========================================
+# SESIÓN DE PERFILADO
+# ========================================
+
+
+class SesionPerfilado:
+    """Sesión de cProfile que se inicia y detiene en caliente"""
+
+    def __init__(self):
+        self._perfil: Optional[cProfile.Profile] = None
+        self._inicio: Optional[datetime] = None
+        self._lock = threading.Lock()
+
+    @property
+    def activa(self) -> bool:
+        return self._perfil is not None
+
+    def iniciar(self):
+        with self._lock:
+            if self._perfil is not None:
+                return
+            self._perfil = cProfile.Profile()
+            self._inicio = datetime.now()
+            self._perfil.enable()
+        logger.info("Sesión de perfilado iniciada")
+
+    def detener(self, etiqueta: str = "sesion") -> Optional[InformePerfil]:
+        """Detiene la sesión y guarda el perfil; None si no había sesión"""
+        with self._lock:
+            perfil, inicio = self._perfil, self._inicio
+            if perfil is None:
+                return None
+            perfil.disable()
+            self._perfil = None
+            self._inicio = None
+        return _guardar(perfil, etiqueta, (datetime.now() - inicio).total_seconds())
+
+
+def perfilar_llamada(func: Callable, *args, etiqueta: Optional[str] = None, **kwargs):
+    """Perfila exactamente una llamada y devuelve (resultado, informe)
+
+    No se puede anidar dentro de una sesión activa: cProfile solo admite un
+    perfilador por hilo.
+    """
+    etiqueta = etiqueta or getattr(func, "__qualname__", "llamada")
+    perfil = cProfile.Profile()
+    inicio = datetime.now()
+    perfil.enable()
+    try:
+        resultado = func(*args, **kwargs)
+    finally:
+        perfil.disable()
+    return resultado, _guardar(perfil, etiqueta, (datetime.now() - inicio).total_seconds())
+
+
+_sesion: Optional[SesionPerfilado] = None
+
+
+def get_sesion_perfilado() -> SesionPerfilado:
+    """Instancia única de la sesión de perfilado"""
+    global _sesion
+    if _sesion is None:
+        _sesion = SesionPerfilado()
+    return _sesion
@@ -6,10 +6,14 @@ en equivalentes compatibles con PyQt6.
 
 import re
 import logging
+from collections import OrderedDict
 from PyQt6.QtCore import QObject, QEvent
 
 logger = logging.getLogger(__name__)
 
+# Máximo de hojas de estilo convertidas que guarda StylesheetFilter
+MAX_CACHE_STYLESHEETS = 512
+
 
 def convert_to_qt_compatible_css(css_code):
     """
@@ -95,7 +99,8 @@ class StylesheetFilter(QObject):
     def __init__(self, parent=None):
         """Inicializa el filtro de eventos"""
         super().__init__(parent)
-        self._filtered_stylesheets = {}  # Cache para no procesar repetidamente
+        # Cache LRU acotada para no procesar repetidamente
+        self._filtered_stylesheets: "OrderedDict[str, str]" = OrderedDict()
 
     def eventFilter(self, obj, event):
         """Filtra eventos de cambio de estilo"""
@@ -119,9 +124,12 @@ class StylesheetFilter(QObject):
                             # Usar cache si ya se procesó este stylesheet
                             if stylesheet in self._filtered_stylesheets:
                                 compatible = self._filtered_stylesheets[stylesheet]
+                                self._filtered_stylesheets.move_to_end(stylesheet)
                             else:
                                 compatible = convert_to_qt_compatible_css(stylesheet)
                                 self._filtered_stylesheets[stylesheet] = compatible
+                                if len(self._filtered_stylesheets) > MAX_CACHE_STYLESHEETS:
+                                    self._filtered_stylesheets.popitem(last=False)
 
                             # Aplicar stylesheet compatible
                             if compatible != stylesheet:
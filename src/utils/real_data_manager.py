@@ -6,7 +6,9 @@ Configuración inicial: todos los valores en cero (estado real del sistema)
 from PyQt6.QtCore import QObject, QTimer, pyqtSignal
 from typing import Dict, Any, Optional, Tuple
 import logging
-from datetime import datetime
+from datetime import datetime, timedelta
+
+from data.time_keys import a_epoch, clave_dia_servicio
 
 logger = logging.getLogger(__name__)
 
@@ -184,32 +186,36 @@ class RealDataManager(QObject):
             return None
 
         try:
-            # Mapeo de métricas a consultas históricas con lógica económica-administrativa
+            ahora = datetime.now()
+            ayer = clave_dia_servicio(dias=-1)
+            # Mapeo de métricas a (consulta, parámetros) históricos con lógica económica-administrativa
             historical_queries = {
-                "ventas_diarias": """
+                "ventas_diarias": ("""
                     SELECT COALESCE(SUM(total), 0)
                     FROM comandas
-                    WHERE DATE(fecha_hora) = DATE('now', '-1 day')
-                """,
-                "comandas_activas": """
+                    WHERE dia_servicio = ?
+                """, (ayer,)),
+                "comandas_activas": ("""
                     SELECT COUNT(*)
                     FROM comandas
                     WHERE estado IN ('pendiente', 'en_preparacion')
-                    AND datetime(fecha_hora) BETWEEN datetime('now', '-25 hours')
-                                                 AND datetime('now', '-23 hours')
-                """,
-                "ticket_promedio": """
+                    AND fecha_hora_ts BETWEEN ? AND ?
+                """, (a_epoch(ahora - timedelta(hours=25)), a_epoch(ahora - timedelta(hours=23)))),
+                "ticket_promedio": ("""
                     SELECT COALESCE(AVG(total), 0)
                     FROM comandas
-                    WHERE DATE(fecha_hora) = DATE('now', '-1 day') AND total > 0
-                """,
-                "reservas_futuras": """
+                    WHERE dia_servicio = ? AND total > 0
+                """, (ayer,)),
+                "reservas_futuras": ("""
                     SELECT COUNT(*)
                     FROM reservas
                     WHERE estado='confirmada'
-                    AND DATE(fecha_entrada) >= DATE('now', '-1 day')
-                    AND created_at <= datetime('now', '-1 day')
-                """,
+                    AND fecha_entrada >= ?
+                    AND created_at <= ?
+                """, (
+                    (ahora - timedelta(days=1)).date().isoformat(),
+                    (ahora - timedelta(days=1)).strftime("%Y-%m-%d %H:%M:%S"),
+                )),
                 "ocupacion_mesas": """
                     SELECT COALESCE(
                         (CAST((SELECT COUNT(*) FROM mesas WHERE estado='ocupada') AS FLOAT) /
@@ -225,29 +231,29 @@ class RealDataManager(QObject):
                 "productos_stock": """
                     SELECT COUNT(*) FROM productos WHERE stock > 0
                 """,
-                "satisfaccion_cliente": """
+                "satisfaccion_cliente": ("""
                     SELECT COALESCE(AVG(CAST(valoracion AS FLOAT)), 0)
                     FROM comandas
                     WHERE valoracion IS NOT NULL
-                    AND DATE(fecha_hora) = DATE('now', '-1 day')
-                """,
-                "tiempo_servicio": """
+                    AND dia_servicio = ?
+                """, (ayer,)),
+                "tiempo_servicio": ("""
                     SELECT COALESCE(AVG(
                         CASE
                             WHEN tiempo_servicio IS NOT NULL THEN tiempo_servicio
-                            ELSE (strftime('%s', fecha_completado) - strftime('%s', fecha_hora)) / 60
+                            ELSE (strftime('%s', fecha_completado) - fecha_hora_ts) / 60
                         END
                     ), 0)
                     FROM comandas
                     WHERE estado = 'completada'
-                    AND DATE(fecha_hora) = DATE('now', '-1 day')
-                """,
-                "rotacion_mesas": """
+                    AND dia_servicio = ?
+                """, (ayer,)),
+                "rotacion_mesas": ("""
                     SELECT COALESCE(
-                        (SELECT COUNT(*) FROM comandas WHERE DATE(fecha_hora) = DATE('now', '-1 day')) /
+                        (SELECT COUNT(*) FROM comandas WHERE dia_servicio = ?) /
                         NULLIF((SELECT COUNT(*) FROM mesas), 0)
                     , 0)
-                """,
+                """, (ayer,)),
                 "inventario_bebidas": """
                     SELECT COALESCE(
                         (CAST(SUM(stock) AS FLOAT) / NULLIF(SUM(stock_minimo), 0)) * 100, 0
@@ -255,18 +261,21 @@ class RealDataManager(QObject):
                     FROM productos
                     WHERE categoria = 'Bebidas' OR nombre LIKE '%bebida%' OR nombre LIKE '%refresco%'
                 """,
-                "margen_bruto": """
+                "margen_bruto": ("""
                     SELECT COALESCE(
                         ((SUM(total) - SUM(costo_ingredientes)) / NULLIF(SUM(total), 0)) * 100, 0
                     )
                     FROM comandas
-                    WHERE DATE(fecha_hora) = DATE('now', '-1 day') AND total > 0
-                """,
+                    WHERE dia_servicio = ? AND total > 0
+                """, (ayer,)),
             }
 
             query = historical_queries.get(metric_name)
             if query:
-                result = self._safe_query(query, 0.0)
+                if isinstance(query, tuple):
+                    result = self._safe_query(query[0], 0.0, query[1])
+                else:
+                    result = self._safe_query(query, 0.0)
                 return float(result) if result is not None else None
 
             return None
@@ -283,6 +292,7 @@ class RealDataManager(QObject):
 
         try:
             metrics = {}
+            hoy = clave_dia_servicio()
 
             # MESAS
             total_tables = self._safe_query("SELECT COUNT(*) FROM mesas", 0)
@@ -302,8 +312,9 @@ class RealDataManager(QObject):
 
             # VENTAS
             daily_sales = self._safe_query(
-                "SELECT COALESCE(SUM(total), 0) FROM comandas WHERE DATE(fecha_hora) = DATE('now')",
+                "SELECT COALESCE(SUM(total), 0) FROM comandas WHERE dia_servicio = ?",
                 0.0,
+                (hoy,),
             )
             metrics["ventas_diarias"] = float(daily_sales)
 
@@ -316,15 +327,17 @@ class RealDataManager(QObject):
 
             # TICKET PROMEDIO
             avg_ticket = self._safe_query(
-                "SELECT COALESCE(AVG(total), 0) FROM comandas WHERE DATE(fecha_hora) = DATE('now') AND total > 0",
+                "SELECT COALESCE(AVG(total), 0) FROM comandas WHERE dia_servicio = ? AND total > 0",
                 0.0,
+                (hoy,),
             )
             metrics["ticket_promedio"] = round(float(avg_ticket), 2)
 
             # RESERVAS
             future_reservations = self._safe_query(
-                "SELECT COUNT(*) FROM reservas WHERE estado='confirmada' AND DATE(fecha_entrada) >= DATE('now')",
+                "SELECT COUNT(*) FROM reservas WHERE estado='confirmada' AND fecha_entrada >= ?",
                 0,
+                (datetime.now().date().isoformat(),),
             )
             metrics["reservas_futuras"] = int(future_reservations)
 
@@ -348,8 +361,9 @@ class RealDataManager(QObject):
 
             # SATISFACCIÓN CLIENTE
             satisfaction = self._safe_query(
-                "SELECT COALESCE(AVG(CAST(valoracion AS FLOAT)), 0) FROM comandas WHERE valoracion IS NOT NULL AND DATE(fecha_hora) = DATE('now')",
+                "SELECT COALESCE(AVG(CAST(valoracion AS FLOAT)), 0) FROM comandas WHERE valoracion IS NOT NULL AND dia_servicio = ?",
                 0.0,
+                (hoy,),
             )
             metrics["satisfaccion_cliente"] = round(float(satisfaction), 1)
 
@@ -358,10 +372,11 @@ class RealDataManager(QObject):
                 """SELECT COALESCE(AVG(
                     CASE
                         WHEN tiempo_servicio IS NOT NULL THEN tiempo_servicio
-                        ELSE (strftime('%s', fecha_completado) - strftime('%s', fecha_hora)) / 60
+                        ELSE (strftime('%s', fecha_completado) - fecha_hora_ts) / 60
                     END
-                ), 0) FROM comandas WHERE estado = 'completada' AND DATE(fecha_hora) = DATE('now')""",
+                ), 0) FROM comandas WHERE estado = 'completada' AND dia_servicio = ?""",
                 0.0,
+                (hoy,),
             )
             metrics["tiempo_servicio"] = round(float(service_time), 1)
 
@@ -369,8 +384,9 @@ class RealDataManager(QObject):
             if total_tables > 0:
                 table_rotation = (
                     self._safe_query(
-                        "SELECT COALESCE(COUNT(*), 0) FROM comandas WHERE DATE(fecha_hora) = DATE('now')",
+                        "SELECT COALESCE(COUNT(*), 0) FROM comandas WHERE dia_servicio = ?",
                         0,
+                        (hoy,),
                     )
                     / total_tables
                 )
@@ -391,8 +407,9 @@ class RealDataManager(QObject):
             gross_margin = self._safe_query(
                 """SELECT COALESCE(
                     ((SUM(total) - SUM(costo_ingredientes)) / NULLIF(SUM(total), 0)) * 100, 0
-                ) FROM comandas WHERE DATE(fecha_hora) = DATE('now') AND total > 0""",
+                ) FROM comandas WHERE dia_servicio = ? AND total > 0""",
                 0.0,
+                (hoy,),
             )
             metrics["margen_bruto"] = round(float(gross_margin), 1)
 
@@ -430,12 +447,12 @@ class RealDataManager(QObject):
             "_total_rooms_text": "/0",
         }
 
-    def _safe_query(self, query: str, default_value: Any) -> Any:
+    def _safe_query(self, query: str, default_value: Any, params: tuple = ()) -> Any:
         """Ejecutar consulta de BD de forma segura"""
         try:
             if not self.db_manager:
                 return default_value
-            result = self.db_manager.query(query)
+            result = self.db_manager.query(query, params)
             if result and len(result) > 0:
                 return result[0][0]
             return default_value
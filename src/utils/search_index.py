@@ -0,0 +1,90 @@
+"""
+Índice de búsqueda incremental por prefijos de palabra.
+
+Cada registro se normaliza una sola vez al indexarlo (sin acentos ni
+mayúsculas) y sus palabras se descomponen en prefijos. Buscar consiste en
+intersecar los conjuntos de la última palabra escrita y las anteriores, sin
+recorrer los registros, por lo que el coste por pulsación no depende del
+tamaño del listado.
+"""
+
+import re
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set
+
+from utils.text_normalization import normalizar_texto
+
+_SEPARADORES = re.compile(r"[^0-9a-zñ]+")
+
+# Prefijos más largos no aportan selectividad y solo ocupan memoria
+LONGITUD_MAXIMA_PREFIJO = 24
+
+
+def tokenizar(texto: Any) -> List[str]:
+    """Divide un texto normalizado en palabras alfanuméricas"""
+    return [t for t in _SEPARADORES.split(normalizar_texto(texto)) if t]
+
+
+class IndiceBusqueda:
+    """Índice invertido prefijo -> claves de registro"""
+
+    def __init__(self, campos: Sequence[str]):
+        """
+        Args:
+            campos: Claves del diccionario de cada registro que se indexan
+        """
+        self.campos = list(campos)
+        self._prefijos: Dict[str, Set[int]] = {}
+        self._total = 0
+
+    def __len__(self) -> int:
+        return self._total
+
+    def limpiar(self):
+        self._prefijos.clear()
+        self._total = 0
+
+    def agregar(self, clave: int, registro: Dict[str, Any]):
+        """Indexa un registro identificado por ``clave`` (p. ej. su fila)"""
+        tokens: Set[str] = set()
+        for campo in self.campos:
+            palabras = tokenizar(registro.get(campo))
+            tokens.update(palabras)
+            # Teléfonos y códigos: permitir buscar los dígitos seguidos
+            if len(palabras) > 1 and all(p.isdigit() for p in palabras):
+                tokens.add("".join(palabras))
+
+        prefijos = set()
+        for token in tokens:
+            for i in range(1, min(len(token), LONGITUD_MAXIMA_PREFIJO) + 1):
+                prefijos.add(token[:i])
+
+        for prefijo in prefijos:
+            self._prefijos.setdefault(prefijo, set()).add(clave)
+        self._total += 1
+
+    def agregar_varios(self, registros: Iterable[Dict[str, Any]], inicio: int = 0):
+        """Indexa registros consecutivos empezando por la clave ``inicio``"""
+        for desplazamiento, registro in enumerate(registros):
+            self.agregar(inicio + desplazamiento, registro)
+
+    def buscar(self, consulta: str) -> Optional[Set[int]]:
+        """
+        Claves de los registros que contienen todas las palabras de la consulta
+        como prefijo de alguna de sus palabras.
+
+        Returns:
+            None si la consulta está vacía (sin filtro), o el conjunto de claves
+        """
+        palabras = tokenizar(consulta)
+        if not palabras:
+            return None
+
+        conjuntos = []
+        for palabra in palabras:
+            coincidencias = self._prefijos.get(palabra[:LONGITUD_MAXIMA_PREFIJO])
+            if not coincidencias:
+                return set()
+            conjuntos.append(coincidencias)
+
+        conjuntos.sort(key=len)
+        return set(conjuntos[0]).intersection(*conjuntos[1:])
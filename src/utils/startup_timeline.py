@@ -0,0 +1,294 @@
+"""
+Línea de tiempo del arranque de Hefest.
+
+Registra el tiempo de pared de cada fase del arranque (logging, QApplication,
+base de datos, login, ventana principal, primer módulo) y el coste de cada
+importación al estilo de ``python -X importtime`` (acumulado y propio), para
+vigilar el tiempo hasta que la aplicación es interactiva.
+
+El tiempo hasta interactivo descuenta las fases de espera del usuario
+(login, PIN), pero no el trabajo que se ejecuta dentro de ellas (p. ej. la
+construcción de MainWindow, que ocurre dentro del selector de usuario).
+
+Al finalizar se escribe logs/startup_timeline.json y se compara con el
+presupuesto (``PRESUPUESTO_INTERACTIVO_MS`` o ``HEFEST_STARTUP_BUDGET_MS``).
+"""
+
+import builtins
+import importlib.util
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Referencia del arranque: la primera importación de este módulo
+_T0 = time.perf_counter()
+_IMPORT_NATIVO = builtins.__import__
+
+PRESUPUESTO_INTERACTIVO_MS = 4000.0
+RUTA_INFORME = Path(__file__).resolve().parent.parent.parent / "logs" / "startup_timeline.json"
+LIMITE_IMPORTACIONES_INFORME = 25
+
+
+@dataclass
+class FaseArranque:
+    nombre: str
+    inicio_ms: float
+    duracion_ms: float = 0.0
+    profundidad: int = 0
+    espera_usuario: bool = False
+    # Trabajo de fases hijas que no es espera (solo relevante en fases de espera)
+    trabajo_hijos_ms: float = 0.0
+
+
+@dataclass
+class ImportacionMedida:
+    modulo: str
+    acumulado_ms: float
+    propio_ms: float
+    profundidad: int
+    fase: str
+
+
+def _presupuesto_configurado() -> float:
+    valor = os.environ.get("HEFEST_STARTUP_BUDGET_MS")
+    try:
+        return float(valor) if valor else PRESUPUESTO_INTERACTIVO_MS
+    except ValueError:
+        logger.warning(f"HEFEST_STARTUP_BUDGET_MS no válido: {valor}")
+        return PRESUPUESTO_INTERACTIVO_MS
+
+
+class StartupTimeline:
+    """Fases e importaciones medidas durante el arranque"""
+
+    def __init__(self, inicio: Optional[float] = None, presupuesto_ms: Optional[float] = None):
+        self.inicio = inicio if inicio is not None else time.perf_counter()
+        self.presupuesto_ms = presupuesto_ms if presupuesto_ms is not None else _presupuesto_configurado()
+        self.fases: List[FaseArranque] = []
+        self.hitos: Dict[str, float] = {}
+        self.importaciones: List[ImportacionMedida] = []
+        self.informe: Optional[Dict[str, Any]] = None
+
+        self._pila_fases: List[FaseArranque] = []
+        self._pila_importaciones: List[float] = []
+        self._import_original = None
+        self._hilo_principal = threading.get_ident()
+
+    def _ms(self, instante: float) -> float:
+        return (instante - self.inicio) * 1000.0
+
+    @property
+    def finalizado(self) -> bool:
+        return self.informe is not None
+
+    # ========================================
+    # FASES E HITOS
+    # ========================================
+
+    @contextmanager
+    def fase(self, nombre: str, espera_usuario: bool = False):
+        """Mide una fase del arranque (se pueden anidar)"""
+        if self.finalizado:
+            yield
+            return
+        inicio = time.perf_counter()
+        registro = FaseArranque(
+            nombre=nombre,
+            inicio_ms=self._ms(inicio),
+            profundidad=len(self._pila_fases),
+            espera_usuario=espera_usuario,
+        )
+        self.fases.append(registro)
+        self._pila_fases.append(registro)
+        try:
+            yield registro
+        finally:
+            registro.duracion_ms = (time.perf_counter() - inicio) * 1000.0
+            self._pila_fases.pop()
+            trabajo = registro.trabajo_hijos_ms if espera_usuario else registro.duracion_ms
+            if self._pila_fases:
+                self._pila_fases[-1].trabajo_hijos_ms += trabajo
+
+    def marcar(self, hito: str):
+        """Registra un instante significativo (solo la primera vez)"""
+        if not self.finalizado and hito not in self.hitos:
+            self.hitos[hito] = self._ms(time.perf_counter())
+
+    # ========================================
+    # IMPORTACIONES
+    # ========================================
+
+    def instrumentar_importaciones(self):
+        """Sustituye ``builtins.__import__`` para medir las importaciones nuevas"""
+        if self._import_original is not None:
+            return
+        self._import_original = builtins.__import__
+        builtins.__import__ = self._importar
+
+    def restaurar_importaciones(self):
+        # Los métodos ligados se crean en cada acceso: comparar con ==, no con is
+        if self._import_original is not None and builtins.__import__ == self._importar:
+            builtins.__import__ = self._import_original
+        self._import_original = None
+
+    def _importar(self, name, globals=None, locals=None, fromlist=(), level=0):
+        # Si otro envoltorio quedó por encima, tras restaurar se sigue llamando aquí
+        original = self._import_original or _IMPORT_NATIVO
+        if self.finalizado or threading.get_ident() != self._hilo_principal:
+            return original(name, globals, locals, fromlist, level)
+
+        cargados = len(sys.modules)
+        self._pila_importaciones.append(0.0)
+        inicio = time.perf_counter()
+        try:
+            return original(name, globals, locals, fromlist, level)
+        finally:
+            duracion = time.perf_counter() - inicio
+            hijos = self._pila_importaciones.pop()
+            # Solo interesan las importaciones que cargaron algún módulo
+            if len(sys.modules) > cargados:
+                self.importaciones.append(
+                    ImportacionMedida(
+                        modulo=self._resolver(name, globals, level),
+                        acumulado_ms=duracion * 1000.0,
+                        propio_ms=max(0.0, duracion - hijos) * 1000.0,
+                        profundidad=len(self._pila_importaciones),
+                        fase=self._pila_fases[-1].nombre if self._pila_fases else "",
+                    )
+                )
+                if self._pila_importaciones:
+                    self._pila_importaciones[-1] += duracion
+
+    @staticmethod
+    def _resolver(name: str, globals, level: int) -> str:
+        if not level:
+            return name
+        try:
+            paquete = (globals or {}).get("__package__") or ""
+            return importlib.util.resolve_name("." * level + name, paquete)
+        except (ImportError, ValueError):
+            return "." * level + name
+
+    # ========================================
+    # INFORME
+    # ========================================
+
+    def finalizar(self, ruta: Optional[Path] = RUTA_INFORME) -> Dict[str, Any]:
+        """Cierra la línea de tiempo, escribe el informe y lo devuelve"""
+        if self.finalizado:
+            return self.informe
+        fin = time.perf_counter()
+        self.restaurar_importaciones()
+
+        total_ms = self._ms(fin)
+        espera_ms = sum(
+            f.duracion_ms - f.trabajo_hijos_ms
+            for f in self.fases
+            if f.espera_usuario and not any(p.espera_usuario for p in self._ancestros(f))
+        )
+        interactivo_ms = total_ms - espera_ms
+
+        principales = sorted(
+            (i for i in self.importaciones if i.profundidad == 0),
+            key=lambda i: i.acumulado_ms,
+            reverse=True,
+        )
+        por_coste_propio = sorted(self.importaciones, key=lambda i: i.propio_ms, reverse=True)
+
+        self.informe = {
+            "total_ms": round(total_ms, 1),
+            "espera_usuario_ms": round(espera_ms, 1),
+            "tiempo_hasta_interactivo_ms": round(interactivo_ms, 1),
+            "presupuesto_ms": self.presupuesto_ms,
+            "dentro_de_presupuesto": interactivo_ms <= self.presupuesto_ms,
+            "hitos": {k: round(v, 1) for k, v in self.hitos.items()},
+            "fases": [self._redondear(asdict(f)) for f in self.fases],
+            "importaciones_principales": [
+                self._redondear(asdict(i)) for i in principales[:LIMITE_IMPORTACIONES_INFORME]
+            ],
+            "importaciones_por_coste_propio": [
+                self._redondear(asdict(i)) for i in por_coste_propio[:LIMITE_IMPORTACIONES_INFORME]
+            ],
+            "modulos_importados": len(self.importaciones),
+        }
+
+        if ruta is not None:
+            try:
+                ruta = Path(ruta)
+                ruta.parent.mkdir(parents=True, exist_ok=True)
+                with open(ruta, "w", encoding="utf-8") as f:
+                    json.dump(self.informe, f, ensure_ascii=False, indent=2)
+            except OSError as e:
+                logger.error(f"No se pudo escribir el informe de arranque: {e}")
+
+        mensaje = (
+            f"Arranque: {interactivo_ms:.0f} ms hasta interactivo "
+            f"(presupuesto {self.presupuesto_ms:.0f} ms, espera de usuario {espera_ms:.0f} ms)"
+        )
+        if self.informe["dentro_de_presupuesto"]:
+            logger.info(mensaje)
+        else:
+            logger.warning(f"{mensaje} - PRESUPUESTO SUPERADO")
+        return self.informe
+
+    def _ancestros(self, fase: FaseArranque) -> List[FaseArranque]:
+        """Fases que contienen a ``fase`` (las anteriores con menor profundidad)"""
+        ancestros = []
+        profundidad = fase.profundidad
+        for anterior in reversed(self.fases[: self.fases.index(fase)]):
+            if anterior.profundidad < profundidad:
+                ancestros.append(anterior)
+                profundidad = anterior.profundidad
+        return ancestros
+
+    @staticmethod
+    def _redondear(datos: Dict[str, Any]) -> Dict[str, Any]:
+        return {k: round(v, 1) if isinstance(v, float) else v for k, v in datos.items()}
+
+    def resumen_texto(self) -> str:
+        """Resumen legible para el diálogo Acerca de"""
+        if not self.finalizado:
+            return "El arranque aún no ha terminado."
+        informe = self.informe
+        lineas = [
+            f"Tiempo hasta interactivo: {informe['tiempo_hasta_interactivo_ms']:.0f} ms "
+            f"(presupuesto {informe['presupuesto_ms']:.0f} ms"
+            f"{'' if informe['dentro_de_presupuesto'] else ', SUPERADO'})",
+            f"Espera de usuario descontada: {informe['espera_usuario_ms']:.0f} ms",
+            "",
+            "Fases:",
+        ]
+        for fase in informe["fases"]:
+            sangria = "  " * (fase["profundidad"] + 1)
+            espera = " (espera de usuario)" if fase["espera_usuario"] else ""
+            lineas.append(
+                f"{sangria}{fase['nombre']}: {fase['duracion_ms']:.0f} ms "
+                f"[+{fase['inicio_ms']:.0f} ms]{espera}"
+            )
+        lineas += ["", f"Importaciones principales ({informe['modulos_importados']} medidas):"]
+        for imp in informe["importaciones_principales"][:15]:
+            lineas.append(
+                f"  {imp['modulo']}: {imp['acumulado_ms']:.0f} ms "
+                f"(propio {imp['propio_ms']:.0f} ms, fase {imp['fase'] or '-'})"
+            )
+        return "\n".join(lineas)
+
+
+_timeline: Optional[StartupTimeline] = None
+
+
+def get_startup_timeline() -> StartupTimeline:
+    """Línea de tiempo del arranque en curso (empieza al importar este módulo)"""
+    global _timeline
+    if _timeline is None:
+        _timeline = StartupTimeline(inicio=_T0)
+    return _timeline
@@ -0,0 +1,30 @@
+"""
+Normalización de texto para búsquedas y deduplicación en Hefest.
+
+Convierte nombres y textos libres a una forma canónica (minúsculas, sin
+acentos y con espacios colapsados) para compararlos de forma estable.
+"""
+
+import re
+import unicodedata
+from functools import lru_cache
+
+_ESPACIOS = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=4096)
+def normalizar_texto(texto) -> str:
+    """
+    Normaliza un texto para comparaciones insensibles a mayúsculas y acentos.
+
+    Args:
+        texto: Texto a normalizar (None se trata como cadena vacía)
+
+    Returns:
+        str: Texto en minúsculas, sin diacríticos y con espacios simples
+    """
+    if not texto:
+        return ""
+    descompuesto = unicodedata.normalize("NFKD", str(texto))
+    sin_acentos = "".join(c for c in descompuesto if not unicodedata.combining(c))
+    return _ESPACIOS.sub(" ", sin_acentos.casefold()).strip()
@@ -0,0 +1,204 @@
+"""
+Trazado de tramos (spans) para Hefest.
+
+Permite ver en qué se va el tiempo de una acción de la interfaz (servicios,
+SQLite, construcción de widgets) registrando tramos anidados con el hilo
+que los ejecuta:
+
+    with traza("TPVService.pagar_comanda", comanda_id=7):
+        ...
+
+    @trazar("tpv")
+    def populate_grid(instance): ...
+
+    @trazar_clase("servicio")
+    class ReservaService: ...
+
+Los tramos se guardan en un buffer circular y se exportan en el formato
+``trace_event`` de Chrome (abrir en chrome://tracing o https://ui.perfetto.dev).
+
+Desactivado por defecto; se activa en caliente con ``activar()`` o al
+arrancar con ``HEFEST_TRACE=1``. Desactivado, ``traza`` devuelve un contexto
+nulo compartido y ``trazar`` añade una sola comprobación por llamada.
+"""
+
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+CAPACIDAD_DEFECTO = 50000
+
+
+class _Estado:
+    __slots__ = ("activo", "eventos", "hilos", "lock")
+
+    def __init__(self):
+        self.activo = False
+        self.eventos: Deque[Dict[str, Any]] = deque(maxlen=CAPACIDAD_DEFECTO)
+        self.hilos: Dict[int, str] = {}
+        self.lock = threading.Lock()
+
+
+_estado = _Estado()
+_PID = os.getpid()
+
+
+class _TramoNulo:
+    """Contexto vacío que se devuelve con el trazado desactivado"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_TRAMO_NULO = _TramoNulo()
+
+
+class _Tramo:
+    __slots__ = ("nombre", "categoria", "args", "inicio")
+
+    def __init__(self, nombre: str, categoria: str, args: Dict[str, Any]):
+        self.nombre = nombre
+        self.categoria = categoria
+        self.args = args
+        self.inicio = 0
+
+    def __enter__(self):
+        self.inicio = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, tipo_exc, exc, tb):
+        fin = time.perf_counter_ns()
+        hilo = threading.get_ident()
+        evento = {
+            "name": self.nombre,
+            "cat": self.categoria,
+            "ph": "X",
+            "ts": self.inicio / 1000.0,
+            "dur": (fin - self.inicio) / 1000.0,
+            "pid": _PID,
+            "tid": hilo,
+        }
+        if self.args:
+            evento["args"] = {k: _serializable(v) for k, v in self.args.items()}
+        if tipo_exc is not None:
+            evento.setdefault("args", {})["error"] = tipo_exc.__name__
+        if hilo not in _estado.hilos:
+            _estado.hilos[hilo] = threading.current_thread().name
+        # deque.append es atómico: no hace falta lock en el camino caliente
+        _estado.eventos.append(evento)
+        return False
+
+
+def _serializable(valor: Any) -> Any:
+    if isinstance(valor, (int, float, bool)) or valor is None:
+        return valor
+    return str(valor)[:200]
+
+
+# ========================================
+# API
+# ========================================
+
+
+def traza(nombre: str, categoria: str = "app", **args):
+    """Contexto que registra un tramo (nulo si el trazado está desactivado)"""
+    if not _estado.activo:
+        return _TRAMO_NULO
+    return _Tramo(nombre, categoria, args)
+
+
+def trazar(categoria: str = "app", nombre: Optional[str] = None) -> Callable:
+    """Decorador que registra cada llamada a la función como un tramo"""
+
+    def decorador(func: Callable) -> Callable:
+        etiqueta = nombre or func.__qualname__
+
+        @functools.wraps(func)
+        def envoltorio(*a, **kw):
+            if not _estado.activo:
+                return func(*a, **kw)
+            with _Tramo(etiqueta, categoria, {}):
+                return func(*a, **kw)
+
+        envoltorio.__trazado__ = True
+        return envoltorio
+
+    return decorador
+
+
+def trazar_metodos(cls: type, categoria: str) -> type:
+    """Aplica ``trazar`` a los métodos públicos definidos en la clase"""
+    for atributo, valor in list(vars(cls).items()):
+        if atributo.startswith("_") or not callable(valor) or isinstance(valor, type):
+            continue
+        if isinstance(valor, (staticmethod, classmethod, property)):
+            continue
+        if getattr(valor, "__trazado__", False):
+            continue
+        setattr(cls, atributo, trazar(categoria, f"{cls.__name__}.{atributo}")(valor))
+    return cls
+
+
+def trazar_clase(categoria: str = "app") -> Callable[[type], type]:
+    """Decorador de clase equivalente a ``trazar_metodos``"""
+    return lambda cls: trazar_metodos(cls, categoria)
+
+
+def activar(capacidad: Optional[int] = None):
+    """Activa el trazado (opcionalmente cambiando el tamaño del buffer)"""
+    with _estado.lock:
+        if capacidad and capacidad != _estado.eventos.maxlen:
+            _estado.eventos = deque(_estado.eventos, maxlen=capacidad)
+        _estado.activo = True
+
+
+def desactivar():
+    _estado.activo = False
+
+
+def esta_activo() -> bool:
+    return _estado.activo
+
+
+def limpiar():
+    """Descarta los tramos registrados"""
+    _estado.eventos.clear()
+
+
+def get_eventos() -> List[Dict[str, Any]]:
+    """Copia de los tramos registrados, del más antiguo al más reciente"""
+    return list(_estado.eventos)
+
+
+def exportar_chrome_trace(ruta) -> Path:
+    """Escribe los tramos en formato trace_event de Chrome"""
+    eventos = get_eventos()
+    metadatos = [
+        {"name": "thread_name", "ph": "M", "pid": _PID, "tid": tid, "args": {"name": nombre}}
+        for tid, nombre in list(_estado.hilos.items())
+    ]
+    metadatos.append({"name": "process_name", "ph": "M", "pid": _PID, "args": {"name": "Hefest"}})
+
+    ruta = Path(ruta)
+    ruta.parent.mkdir(parents=True, exist_ok=True)
+    with open(ruta, "w", encoding="utf-8") as f:
+        json.dump(
+            {"traceEvents": metadatos + eventos, "displayTimeUnit": "ms"},
+            f,
+            ensure_ascii=False,
+        )
+    return ruta
+
+
+if os.environ.get("HEFEST_TRACE", "").lower() in ("1", "true", "si", "sí"):
+    activar()
@@ -0,0 +1,73 @@
+"""
+Integración de BackupManager (data/backup_manager.py) sobre bases temporales.
+"""
+
+import json
+import sqlite3
+from datetime import datetime, timedelta
+
+import pytest
+
+from data.backup_manager import BackupManager
+
+pytestmark = pytest.mark.integration
+
+
+def _crear_base(ruta):
+    conn = sqlite3.connect(ruta)
+    conn.executescript(
+        """
+        CREATE TABLE mesas (id INTEGER PRIMARY KEY, numero TEXT, estado TEXT);
+        CREATE TABLE comandas (id INTEGER PRIMARY KEY, mesa_id INTEGER, estado TEXT);
+        CREATE TABLE productos (id INTEGER PRIMARY KEY, nombre TEXT, stock INTEGER);
+        INSERT INTO productos (nombre, stock) VALUES ('Agua', 12), ('Café', 30);
+        """
+    )
+    conn.commit()
+    conn.close()
+
+
+@pytest.fixture
+def gestor(tmp_path):
+    db_path = tmp_path / "hefest.db"
+    _crear_base(db_path)
+    gestor = BackupManager(
+        db_path=str(db_path), directorio=str(tmp_path / "backups"), config={}, pausa_entre_pasos=0
+    )
+    gestor.retencion_dias = 30
+    return gestor
+
+
+def _envejecer(info, dias):
+    """Reescribe la fecha del manifiesto como si la copia tuviera ``dias`` días"""
+    with open(info.manifiesto, encoding="utf-8") as f:
+        datos = json.load(f)
+    datos["fecha"] = (datetime.now() - timedelta(days=dias)).replace(microsecond=0).isoformat()
+    with open(info.manifiesto, "w", encoding="utf-8") as f:
+        json.dump(datos, f)
+
+
+def test_restaurar_copia_mas_antigua_que_la_retencion(gestor):
+    antigua = gestor.crear_backup(motivo="manual")
+    _envejecer(antigua, 40)
+
+    with sqlite3.connect(gestor.db_path) as conn:
+        conn.execute("DELETE FROM productos")
+
+    previa = gestor.restaurar(antigua.ruta)
+
+    # La copia elegida sigue en disco y sus datos están en la base viva
+    assert antigua.manifiesto.exists()
+    assert gestor.verificar_backup(antigua.ruta)
+    assert previa.motivo == "pre_restauracion"
+    with sqlite3.connect(gestor.db_path) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM productos").fetchone()[0] == 2
+
+
+def test_la_poda_normal_sigue_borrando_copias_antiguas(gestor):
+    antigua = gestor.crear_backup(motivo="manual")
+    _envejecer(antigua, 40)
+
+    gestor.crear_backup(motivo="pre_migracion")
+
+    assert not antigua.manifiesto.exists()
@@ -0,0 +1,65 @@
+"""
+Integración de DatabaseManager.transaccion (data/db_manager.py) sin cola de escritura.
+"""
+
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from data.db_manager import DatabaseManager
+from data.write_queue import get_cola_escritura
+
+pytestmark = pytest.mark.integration
+
+
+@pytest.fixture
+def db(tmp_path):
+    ruta = tmp_path / "hefest.db"
+    # La tabla zonas la crea su migración (data/migrate_create_zonas_v0_0_12.py)
+    with sqlite3.connect(ruta) as conn:
+        conn.execute("CREATE TABLE zonas (id INTEGER PRIMARY KEY, nombre TEXT NOT NULL UNIQUE)")
+    db = DatabaseManager(str(ruta))
+    # Camino directo: sin hilo escritor para esta base
+    assert get_cola_escritura(db.db_path) is None
+    db.execute("INSERT INTO productos (id, nombre, precio, stock) VALUES (1, 'Agua', 1.5, 12)")
+    return db
+
+
+def _descontar(cantidad, leidos):
+    def funcion(conn):
+        stock = conn.execute("SELECT stock FROM productos WHERE id = 1").fetchone()[0]
+        leidos.append(stock)
+        # Ventana entre lectura y escritura: otro terminal podría escribir aquí
+        time.sleep(0.2)
+        conn.execute("UPDATE productos SET stock = ? WHERE id = 1", (stock - cantidad,))
+
+    return funcion
+
+
+def test_transacciones_concurrentes_no_pierden_descuentos(db):
+    leidos = []
+    hilos = [threading.Thread(target=db.transaccion, args=(_descontar(3, leidos),)) for _ in range(2)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+
+    # La segunda lectura espera al bloqueo de la primera transacción
+    assert sorted(leidos) == [9, 12]
+    assert db.query("SELECT stock FROM productos WHERE id = 1")[0][0] == 6
+
+
+def test_transaccion_deshace_si_la_funcion_falla(db):
+    def funcion(conn):
+        conn.execute("UPDATE productos SET stock = 0 WHERE id = 1")
+        raise ValueError("fallo a mitad")
+
+    with pytest.raises(ValueError):
+        db.transaccion(funcion)
+
+    assert db.query("SELECT stock FROM productos WHERE id = 1")[0][0] == 12
+    # La conexión no queda con una transacción abierta que bloquee a otros
+    db.execute("UPDATE productos SET stock = 11 WHERE id = 1")
+    assert db.query("SELECT stock FROM productos WHERE id = 1")[0][0] == 11
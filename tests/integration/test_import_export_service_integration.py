@@ -0,0 +1,58 @@
+"""
+Integración de ImportExportService (src/services/import_export_service.py):
+exportar e importar proveedores sobre una base temporal.
+"""
+
+import csv
+import sqlite3
+
+import pytest
+
+from data.db_manager import DatabaseManager
+from services.import_export_service import ImportExportService
+
+pytestmark = pytest.mark.integration
+
+
+@pytest.fixture
+def db(tmp_path):
+    ruta = tmp_path / "hefest.db"
+    # La tabla zonas la crea su migración (data/migrate_create_zonas_v0_0_12.py)
+    with sqlite3.connect(ruta) as conn:
+        conn.execute("CREATE TABLE zonas (id INTEGER PRIMARY KEY, nombre TEXT NOT NULL UNIQUE)")
+    db = DatabaseManager(str(ruta))
+    # Columna añadida por la migración de categorías de proveedores (v0.0.12)
+    db.execute("ALTER TABLE proveedores ADD COLUMN categoria TEXT DEFAULT 'General'")
+    db.execute_many(
+        "INSERT INTO proveedores (nombre, telefono, activo) VALUES (?, ?, ?)",
+        [("Bodegas Sur", "600", 1), ("Lácteos Norte", "601", 0), ("Pan Diario", "602", 0)],
+    )
+    return db
+
+
+def _inactivos(db):
+    return {fila[0] for fila in db.query("SELECT nombre FROM proveedores WHERE activo = 0")}
+
+
+@pytest.mark.parametrize("formato", ["csv", "jsonl"])
+def test_exportar_e_importar_conserva_proveedores_inactivos(db, tmp_path, formato):
+    servicio = ImportExportService(db)
+    ruta = str(tmp_path / f"proveedores.{formato}")
+    servicio.exportar("proveedores", ruta)
+
+    resultado = servicio.importar("proveedores", ruta)
+
+    assert resultado.actualizadas == 3
+    assert _inactivos(db) == {"Lácteos Norte", "Pan Diario"}
+
+
+def test_importar_sin_columna_activo_reactiva_el_proveedor(db, tmp_path):
+    ruta = tmp_path / "proveedores.csv"
+    with open(ruta, "w", newline="", encoding="utf-8") as f:
+        escritor = csv.writer(f)
+        escritor.writerow(["nombre", "telefono"])
+        escritor.writerow(["Pan Diario", "699"])
+
+    ImportExportService(db).importar("proveedores", str(ruta))
+
+    assert _inactivos(db) == {"Lácteos Norte"}
@@ -0,0 +1,96 @@
+"""
+Integración de ReposicionService (src/services/reposicion_service.py): momentos
+persistidos de consumo con varios procesos sincronizando a la vez.
+"""
+
+import multiprocessing
+import random
+import sqlite3
+from datetime import datetime, timedelta
+
+import pytest
+
+from data.db_manager import DatabaseManager
+from services.reposicion_service import ReposicionService
+
+pytestmark = pytest.mark.integration
+
+PRODUCTOS = 20
+PROCESOS = 3
+
+
+def _preparar_base(ruta):
+    # La tabla zonas la crea su migración (data/migrate_create_zonas_v0_0_12.py)
+    with sqlite3.connect(ruta) as conn:
+        conn.execute("CREATE TABLE zonas (id INTEGER PRIMARY KEY, nombre TEXT NOT NULL UNIQUE)")
+    db = DatabaseManager(str(ruta))
+    db.execute_many(
+        "INSERT INTO productos (id, nombre, precio, stock) VALUES (?, ?, 1.0, 100)",
+        [(i, f"Producto {i}") for i in range(1, PRODUCTOS + 1)],
+    )
+    return db
+
+
+def _insertar_movimientos(db, cantidad, semilla):
+    azar = random.Random(semilla)
+    ahora = datetime.now()
+    db.execute_many(
+        "INSERT INTO movimientos_stock (producto_id, tipo, cantidad, fecha) VALUES (?, ?, ?, ?)",
+        [
+            (
+                azar.randint(1, PRODUCTOS),
+                azar.choice(("venta", "merma", "entrada")),
+                azar.randint(1, 9),
+                (ahora - timedelta(days=azar.randint(0, 20), minutes=azar.randint(0, 600))).strftime(
+                    "%Y-%m-%d %H:%M:%S"
+                ),
+            )
+            for _ in range(cantidad)
+        ],
+    )
+
+
+def _sincronizar(ruta, barrera):
+    servicio = ReposicionService(DatabaseManager(ruta))
+    barrera.wait()
+    with servicio.db_manager._get_connection() as conn:
+        servicio._actualizar_consumo(conn)
+
+
+def _momentos(ruta):
+    with sqlite3.connect(ruta) as conn:
+        return {
+            fila[0]: (round(fila[1], 6), round(fila[2], 6), fila[3])
+            for fila in conn.execute(
+                "SELECT producto_id, suma, suma_cuadrados, primer_dia FROM reposicion_consumo"
+            )
+        }
+
+
+def test_sincronizaciones_simultaneas_no_duplican_momentos(tmp_path):
+    ruta = str(tmp_path / "hefest.db")
+    db = _preparar_base(ruta)
+    _insertar_movimientos(db, 2000, semilla=1)
+    servicio = ReposicionService(db)
+    with db._get_connection() as conn:
+        servicio._actualizar_consumo(conn)
+
+    contexto = multiprocessing.get_context("spawn")
+    for ronda in range(3):
+        _insertar_movimientos(db, 500, semilla=10 + ronda)
+        barrera = contexto.Barrier(PROCESOS)
+        procesos = [contexto.Process(target=_sincronizar, args=(ruta, barrera)) for _ in range(PROCESOS)]
+        for proceso in procesos:
+            proceso.start()
+        for proceso in procesos:
+            proceso.join(60)
+            assert proceso.exitcode == 0
+
+    incremental = _momentos(ruta)
+
+    # Referencia: reconstrucción completa desde el histórico
+    db.execute("DELETE FROM reposicion_consumo_estado")
+    with db._get_connection() as conn:
+        ReposicionService(db)._actualizar_consumo(conn)
+
+    assert incremental == _momentos(ruta)